@@ -31,6 +31,15 @@ ROOT_HELPER_OPTS = [
                help=_('Root helper application.')),
 ]
 
+ROOT_HELPER_DAEMON_OPTS = [
+    cfg.StrOpt('root_helper_daemon',
+               help=_('Long-lived root helper application used instead of '
+                      'root_helper for privileged commands.')),
+    cfg.IntOpt('root_helper_daemon_pool_size', default=4,
+               help=_('Maximum number of root helper daemon processes, '
+                      'each running one privileged command at a time.')),
+]
+
 AGENT_STATE_OPTS = [
     cfg.FloatOpt('report_interval', default=4,
                  help=_('Seconds between nodes reporting state to server')),
@@ -68,6 +77,7 @@ def register_root_helper(conf):
     # The first call is to ensure backward compatibility
     conf.register_opts(ROOT_HELPER_OPTS)
     conf.register_opts(ROOT_HELPER_OPTS, 'AGENT')
+    conf.register_opts(ROOT_HELPER_DAEMON_OPTS, 'AGENT')
 
 
 def register_agent_state_opts_helper(conf):
@@ -16,6 +16,7 @@
 #    under the License.
 
 import os
+import time
 
 import eventlet
 import netaddr
@@ -25,6 +26,7 @@ from neutron.agent.common import config
 from neutron.agent.linux import dhcp
 from neutron.agent.linux import external_process
 from neutron.agent.linux import interface
+from neutron.agent.linux import ip_lib
 from neutron.agent import rpc as agent_rpc
 from neutron.common import constants
 from neutron.common import legacy
@@ -35,12 +37,29 @@ from neutron import manager
 from neutron.openstack.common import importutils
 from neutron.openstack.common import log as logging
 from neutron.openstack.common import loopingcall
+from neutron.openstack.common.rpc import common as rpc_common
 from neutron.openstack.common.rpc import proxy
 from neutron.openstack.common import service
 from neutron import service as neutron_service
 
 LOG = logging.getLogger(__name__)
 
+# version of the dhcp RPC API with get_networks_info
+NETWORKS_INFO_RPC_VERSION = '1.2'
+
+
+def _dhcp_allocations(port):
+    """Return the port attributes written to the dnsmasq hosts file."""
+    return (port.mac_address,
+            sorted((fixed_ip.subnet_id, fixed_ip.ip_address)
+                   for fixed_ip in port.fixed_ips))
+
+
+def _extra_dhcp_opts(port):
+    """Return the extra dhcp options of a port in a comparable form."""
+    return sorted((opt.opt_name, opt.opt_value)
+                  for opt in getattr(port, 'extra_dhcp_opts', None) or [])
+
 
 class DhcpAgent(manager.Manager):
     OPTS = [
@@ -59,6 +78,9 @@ class DhcpAgent(manager.Manager):
                            "enable_isolated_metadata = True")),
         cfg.IntOpt('num_sync_threads', default=4,
                    help=_('Number of threads to use during sync process.')),
+        cfg.IntOpt('sync_batch_size', default=100,
+                   help=_('Number of networks to request from the server '
+                          'per RPC call during the sync process.')),
         cfg.StrOpt('metadata_proxy_socket',
                    default='$state_path/metadata_proxy',
                    help=_('Location of Metadata Proxy UNIX domain '
@@ -68,8 +90,13 @@ class DhcpAgent(manager.Manager):
     def __init__(self, host=None):
         super(DhcpAgent, self).__init__(host=host)
         self.needs_resync = False
+        # cleared when the server can not give the info of some networks
+        self.use_networks_info = True
         self.conf = cfg.CONF
         self.cache = NetworkCache()
+        self.sync_progress = {'sync_networks_total': 0,
+                              'sync_networks_done': 0,
+                              'sync_duration': None}
         self.root_helper = config.get_root_helper(self.conf)
         self.dhcp_driver_cls = importutils.import_class(self.conf.dhcp_driver)
         ctx = context.get_admin_context_without_session()
@@ -137,8 +164,8 @@ class DhcpAgent(manager.Manager):
         known_network_ids = set(self.cache.get_network_ids())
 
         try:
-            active_networks = self.plugin_rpc.get_active_networks_info()
-            active_network_ids = set(network.id for network in active_networks)
+            active_network_ids = set(self.plugin_rpc.get_active_networks())
+            self._start_sync_progress(len(active_network_ids))
             for deleted_id in known_network_ids - active_network_ids:
                 try:
                     self.disable_dhcp_helper(deleted_id)
@@ -147,13 +174,91 @@ class DhcpAgent(manager.Manager):
                     LOG.exception(_('Unable to sync network state on deleted '
                                     'network %s'), deleted_id)
 
-            for network in active_networks:
-                pool.spawn_n(self.configure_dhcp_for_network, network)
+            # The next batch is fetched as soon as the pool has room for it,
+            # so the RPC calls overlap with the drivers being configured.
+            for network in self._get_networks_in_batches(active_network_ids):
+                pool.spawn_n(self._sync_network, network)
 
         except Exception:
             self.needs_resync = True
             LOG.exception(_('Unable to sync network state.'))
 
+    def _get_networks_in_batches(self, network_ids):
+        """Yield the details of the networks, fetched in bounded batches.
+
+        The networks are all fetched in one call when the server does not
+        support the info of some networks.
+        """
+        network_ids = sorted(network_ids)
+        batch_size = max(self.conf.sync_batch_size, 1)
+        for i in range(0, len(network_ids), batch_size):
+            if not self.use_networks_info:
+                break
+            batch = network_ids[i:i + batch_size]
+            try:
+                networks = self.plugin_rpc.get_networks_info(batch)
+            except Exception as e:
+                if self._is_networks_info_unsupported(e):
+                    LOG.info(_("Network info RPC not supported by the "
+                               "server, falling back to the info of all "
+                               "the active networks"))
+                    self.use_networks_info = False
+                    break
+                self.needs_resync = True
+                LOG.exception(_('Unable to retrieve info for %d networks.'),
+                              len(batch))
+                self._network_synced(len(batch))
+                continue
+            # networks deleted meanwhile are not returned
+            self._network_synced(len(batch) - len(networks))
+            for network in networks:
+                yield network
+        else:
+            return
+
+        remaining_ids = set(network_ids[i:])
+        networks = [network for network
+                    in self.plugin_rpc.get_active_networks_info()
+                    if network.id in remaining_ids]
+        self._network_synced(len(remaining_ids) - len(networks))
+        for network in networks:
+            yield network
+
+    @staticmethod
+    def _is_networks_info_unsupported(error):
+        # An older server rejects the RPC API version, or does not have the
+        # method, whose error is deserialized back into an AttributeError
+        # or into a RemoteError when the builtin exceptions are not allowed
+        if isinstance(error, rpc_common.RemoteError):
+            return error.exc_type in ('UnsupportedRpcVersion',
+                                      'AttributeError')
+        return isinstance(error, AttributeError)
+
+    def _start_sync_progress(self, total):
+        self._sync_started = time.time()
+        self.sync_progress.update(sync_networks_total=total,
+                                  sync_networks_done=0,
+                                  sync_duration=None)
+        if not total:
+            self._network_synced(0)
+
+    def _network_synced(self, count=1):
+        progress = self.sync_progress
+        progress['sync_networks_done'] += count
+        if progress['sync_networks_done'] >= progress['sync_networks_total']:
+            progress['sync_duration'] = round(
+                time.time() - self._sync_started, 2)
+            LOG.info(_('Synchronized %(total)d networks in %(duration)s '
+                       'seconds'),
+                     {'total': progress['sync_networks_total'],
+                      'duration': progress['sync_duration']})
+
+    def _sync_network(self, network):
+        try:
+            self.configure_dhcp_for_network(network)
+        finally:
+            self._network_synced()
+
     def _periodic_resync_helper(self):
         """Resync the dhcp state at the configured interval."""
         while True:
@@ -227,9 +332,8 @@ class DhcpAgent(manager.Manager):
         else:
             self.disable_dhcp_helper(network.id)
 
-    def release_lease_for_removed_ips(self, port, network):
+    def release_lease_for_removed_ips(self, port, network, prev_port):
         """Releases the dhcp lease for ips removed from a port."""
-        prev_port = self.cache.get_port_by_id(port.id)
         if prev_port:
             previous_ips = set(fixed_ip.ip_address
                                for fixed_ip in prev_port.fixed_ips)
@@ -286,9 +390,27 @@ class DhcpAgent(manager.Manager):
         port = dhcp.DictModel(payload['port'])
         network = self.cache.get_network_by_id(port.network_id)
         if network:
-            self.release_lease_for_removed_ips(port, network)
+            old_port = self.cache.get_port_by_id(port.id)
+            self.release_lease_for_removed_ips(port, network, old_port)
             self.cache.put_port(port)
-            self.call_driver('reload_allocations', network)
+            if getattr(port, 'device_owner', None) == (
+                    constants.DEVICE_OWNER_DHCP):
+                # the interface of the dhcp server itself may have changed
+                self.call_driver('reload_allocations', network)
+                return
+            old_opts = _extra_dhcp_opts(old_port) if old_port else []
+            new_opts = _extra_dhcp_opts(port)
+            if (old_port and old_opts == new_opts and
+                    _dhcp_allocations(old_port) == _dhcp_allocations(port)):
+                LOG.debug(_('DHCP configuration of port %s is unchanged'),
+                          port.id)
+                return
+            mac_addresses = set([port.mac_address])
+            if old_port:
+                mac_addresses.add(old_port.mac_address)
+            self.call_driver('reload_ports', network,
+                             mac_addresses=list(mac_addresses),
+                             update_options=old_opts != new_opts)
 
     # Use the update handler for the port create event.
     port_create_end = port_update_end
@@ -306,7 +428,9 @@ class DhcpAgent(manager.Manager):
                              network,
                              mac_address=port.mac_address,
                              removed_ips=removed_ips)
-            self.call_driver('reload_allocations', network)
+            self.call_driver('reload_ports', network,
+                             mac_addresses=[port.mac_address],
+                             update_options=bool(_extra_dhcp_opts(port)))
 
     def enable_isolated_metadata_proxy(self, network):
 
@@ -369,6 +493,7 @@ class DhcpPluginApi(proxy.RpcProxy):
         1.0 - Initial version.
         1.1 - Added get_active_networks_info, create_dhcp_port,
               and update_dhcp_port methods.
+        1.2 - Added get_networks_info.
 
     """
 
@@ -389,6 +514,23 @@ class DhcpPluginApi(proxy.RpcProxy):
                              topic=self.topic)
         return [dhcp.NetModel(self.use_namespaces, n) for n in networks]
 
+    def get_active_networks(self):
+        """Make a remote process call to retrieve the active network ids."""
+        return self.call(self.context,
+                         self.make_msg('get_active_networks',
+                                       host=self.host),
+                         topic=self.topic)
+
+    def get_networks_info(self, network_ids):
+        """Make a remote process call to retrieve info for some networks."""
+        networks = self.call(self.context,
+                             self.make_msg('get_networks_info',
+                                           network_ids=network_ids,
+                                           host=self.host),
+                             topic=self.topic,
+                             version=NETWORKS_INFO_RPC_VERSION)
+        return [dhcp.NetModel(self.use_namespaces, n) for n in networks]
+
     def get_network_info(self, network_id):
         """Make a remote process call to retrieve network info."""
         return dhcp.NetModel(self.use_namespaces,
@@ -548,8 +690,9 @@ class DhcpAgentWithStateReport(DhcpAgent):
 
     def _report_state(self):
         try:
-            self.agent_state.get('configurations').update(
-                self.cache.get_state())
+            configurations = self.agent_state.get('configurations')
+            configurations.update(self.cache.get_state())
+            configurations.update(self.sync_progress)
             ctx = context.get_admin_context_without_session()
             self.state_rpc.report_state(ctx, self.agent_state, self.use_call)
             self.use_call = False
@@ -581,6 +724,7 @@ def register_options():
     config.register_root_helper(cfg.CONF)
     cfg.CONF.register_opts(dhcp.OPTS)
     cfg.CONF.register_opts(interface.OPTS)
+    cfg.CONF.register_opts(ip_lib.OPTS)
 
 
 def main():
@@ -50,10 +50,22 @@ class FirewallDriver(object):
       if direction is egress:
         remote_group_id will be a list of dest_ip_prefix
       remote_group_id will also remaining membership update management
+
+    Drivers setting supports_security_group_info may instead be given
+    rules with an unexpanded remote_group_id: the rules of the security
+    groups of the port and the member IPs of the remote groups are then
+    passed separately, through update_security_group_rules and
+    update_security_group_members, and security_group_rules only holds
+    the rules which belong to no security group.  Drivers also setting
+    updates_members_in_place apply member updates without having the
+    filters of the ports updated.
     """
 
     __metaclass__ = abc.ABCMeta
 
+    supports_security_group_info = False
+    updates_members_in_place = False
+
     def prepare_port_filter(self, port):
         """Prepare filters for the port.
 
@@ -84,6 +96,14 @@ class FirewallDriver(object):
         """Stop filtering port."""
         raise NotImplementedError()
 
+    def update_security_group_rules(self, sg_id, rules):
+        """Update the rules of a security group."""
+        raise NotImplementedError()
+
+    def update_security_group_members(self, sg_id, member_ips):
+        """Update the member IPs of a security group, by ethertype."""
+        raise NotImplementedError()
+
     def filter_defer_apply_on(self):
         """Defer application of filtering rule."""
         pass
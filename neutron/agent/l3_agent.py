@@ -17,6 +17,11 @@
 # @author: Dan Wendlandt, Nicira, Inc
 #
 
+import hashlib
+import heapq
+import itertools
+import time
+
 import eventlet
 import netaddr
 from oslo.config import cfg
@@ -35,7 +40,7 @@ from neutron.common import utils as common_utils
 from neutron import context
 from neutron import manager
 from neutron.openstack.common import importutils
-from neutron.openstack.common import lockutils
+from neutron.openstack.common import jsonutils
 from neutron.openstack.common import log as logging
 from neutron.openstack.common import loopingcall
 from neutron.openstack.common import periodic_task
@@ -51,6 +56,13 @@ INTERNAL_DEV_PREFIX = 'qr-'
 EXTERNAL_DEV_PREFIX = 'qg-'
 RPC_LOOP_INTERVAL = 1
 
+# Priorities of router updates, lower values are processed first
+PRIORITY_RPC = 0
+PRIORITY_SYNC_ROUTERS_TASK = 1
+
+UPDATE_ROUTER = 'update'
+DELETE_ROUTER = 'delete'
+
 
 class L3PluginApi(proxy.RpcProxy):
     """Agent side of the l3 agent RPC API.
@@ -87,6 +99,77 @@ class L3PluginApi(proxy.RpcProxy):
                          topic=self.topic)
 
 
+class RouterUpdate(object):
+    """A change to apply to a router.
+
+    timestamp is the time the router was fetched from the server, or the
+    time the router was found deleted, so that older data never overrides
+    newer data.
+    """
+
+    def __init__(self, router_id, priority, action=UPDATE_ROUTER,
+                 router=None, timestamp=None):
+        self.id = router_id
+        self.priority = priority
+        self.action = action
+        self.router = router
+        self.timestamp = timestamp or time.time()
+
+
+class RouterUpdateQueue(object):
+    """Queue of router updates ordered by priority.
+
+    A router has at most one pending update: an update for a router which
+    is already queued replaces the older one, and keeps the highest of
+    their priorities.  A router popped from the queue is not handed out
+    again until task_done is called for it, so that a router is processed
+    by one worker at a time.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._pending = {}
+        self._in_progress = set()
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _push(self, update):
+        heapq.heappush(self._heap,
+                       (update.priority, next(self._counter), update))
+
+    def add(self, update):
+        pending = self._pending.get(update.id)
+        if pending:
+            if pending.timestamp > update.timestamp:
+                # the queued update is more recent, keep its data
+                pending.priority = min(pending.priority, update.priority)
+                update = pending
+            else:
+                update.priority = min(pending.priority, update.priority)
+        self._pending[update.id] = update
+        if update.id not in self._in_progress:
+            self._push(update)
+
+    def pop(self):
+        """Return the next router update, None if none can be processed."""
+        while self._heap:
+            update = heapq.heappop(self._heap)[2]
+            if self._pending.get(update.id) is not update:
+                # superseded by a later update
+                continue
+            del self._pending[update.id]
+            self._in_progress.add(update.id)
+            return update
+
+    def task_done(self, router_id):
+        self._in_progress.discard(router_id)
+        update = self._pending.get(router_id)
+        if update:
+            self._push(update)
+
+
 class RouterInfo(object):
 
     def __init__(self, router_id, root_helper, use_namespaces, router):
@@ -96,6 +179,12 @@ class RouterInfo(object):
         self._snat_action = None
         self.internal_ports = []
         self.floating_ips = []
+        # SNAT rules currently installed for the router
+        self.snat_rules = []
+        # fingerprint of the router dict last processed with success
+        self.fingerprint = None
+        # time the processed router dict was fetched from the server
+        self.timestamp = 0
         self.root_helper = root_helper
         self.use_namespaces = use_namespaces
         # Invoke the setter for establishing initial SNAT action
@@ -185,6 +274,8 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
                    default='$state_path/metadata_proxy',
                    help=_('Location of Metadata Proxy UNIX domain '
                           'socket')),
+        cfg.IntOpt('router_processing_workers', default=8,
+                   help=_("Number of routers processed concurrently.")),
     ]
 
     def __init__(self, host, conf=None):
@@ -194,6 +285,9 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
             self.conf = cfg.CONF
         self.root_helper = config.get_root_helper(self.conf)
         self.router_info = {}
+        # time each router was found deleted, so that data fetched before
+        # the deletion does not bring the router back
+        self._deleted_routers = {}
 
         self._check_config_params()
 
@@ -214,6 +308,10 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
         self.updated_routers = set()
         self.removed_routers = set()
         self.sync_progress = False
+        self._queue = RouterUpdateQueue()
+        self._pool = eventlet.GreenPool(
+            size=max(self.conf.router_processing_workers, 1))
+        self._reset_processing_stats()
         if self.conf.use_namespaces:
             self._destroy_router_namespaces(self.conf.router_id)
 
@@ -416,24 +514,24 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
 
     def _handle_router_snat_rules(self, ri, ex_gw_port, internal_cidrs,
                                   interface_name, action):
-        # Remove all the rules
-        # This is safe because if use_namespaces is set as False
-        # then the agent can only configure one router, otherwise
-        # each router's SNAT rules will be in their own namespace
-        ri.iptables_manager.ipv4['nat'].empty_chain('POSTROUTING')
-        ri.iptables_manager.ipv4['nat'].empty_chain('snat')
-
-        # Add back the jump to float-snat
-        ri.iptables_manager.ipv4['nat'].add_rule('snat', '-j $float-snat')
-
-        # And add them back if the action if add_rules
+        # Only the rules which changed are removed and added, so the jump
+        # to float-snat at the top of the snat chain and the rules other
+        # components add to the nat chains are left untouched
+        snat_rules = []
         if action == 'add_rules' and ex_gw_port:
             # ex_gw_port should not be None in this case
             ex_gw_ip = ex_gw_port['fixed_ips'][0]['ip_address']
-            for rule in self.external_gateway_nat_rules(ex_gw_ip,
-                                                        internal_cidrs,
-                                                        interface_name):
-                ri.iptables_manager.ipv4['nat'].add_rule(*rule)
+            snat_rules = self.external_gateway_nat_rules(ex_gw_ip,
+                                                         internal_cidrs,
+                                                         interface_name)
+        nat = ri.iptables_manager.ipv4['nat']
+        for rule in ri.snat_rules:
+            if rule not in snat_rules:
+                nat.remove_rule(*rule)
+        for rule in snat_rules:
+            if rule not in ri.snat_rules:
+                nat.add_rule(*rule)
+        ri.snat_rules = snat_rules
         ri.iptables_manager.apply()
 
     def process_router_floating_ips(self, ri, ex_gw_port):
@@ -442,26 +540,28 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
         cur_floating_ip_ids = set([fip['id'] for fip in floating_ips])
 
         id_to_fip_map = {}
+        # (floating_ip, fixed_ip) pairs, changed with one ip process each
+        added_fips = []
+        removed_fips = []
+        remapped_fips = []
 
         for fip in floating_ips:
             if fip['port_id']:
                 if fip['id'] not in existing_floating_ip_ids:
                     ri.floating_ips.append(fip)
-                    self.floating_ip_added(ri, ex_gw_port,
-                                           fip['floating_ip_address'],
-                                           fip['fixed_ip_address'])
+                    added_fips.append((fip['floating_ip_address'],
+                                       fip['fixed_ip_address']))
 
                 # store to see if floatingip was remapped
                 id_to_fip_map[fip['id']] = fip
 
         floating_ip_ids_to_remove = (existing_floating_ip_ids -
                                      cur_floating_ip_ids)
-        for fip in ri.floating_ips:
+        for fip in ri.floating_ips[:]:
             if fip['id'] in floating_ip_ids_to_remove:
                 ri.floating_ips.remove(fip)
-                self.floating_ip_removed(ri, ri.ex_gw_port,
-                                         fip['floating_ip_address'],
-                                         fip['fixed_ip_address'])
+                removed_fips.append((fip['floating_ip_address'],
+                                     fip['fixed_ip_address']))
             else:
                 # handle remapping of a floating IP
                 new_fip = id_to_fip_map[fip['id']]
@@ -470,13 +570,18 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
                 if (new_fixed_ip and existing_fixed_ip and
                         new_fixed_ip != existing_fixed_ip):
                     floating_ip = fip['floating_ip_address']
-                    self.floating_ip_removed(ri, ri.ex_gw_port,
-                                             floating_ip, existing_fixed_ip)
-                    self.floating_ip_added(ri, ri.ex_gw_port,
-                                           floating_ip, new_fixed_ip)
+                    removed_fips.append((floating_ip, existing_fixed_ip))
+                    remapped_fips.append((floating_ip, new_fixed_ip))
                     ri.floating_ips.remove(fip)
                     ri.floating_ips.append(new_fip)
 
+        if removed_fips:
+            self._floating_ips_removed(ri, ri.ex_gw_port, removed_fips)
+        if added_fips:
+            self._floating_ips_added(ri, ex_gw_port, added_fips)
+        if remapped_fips:
+            self._floating_ips_added(ri, ri.ex_gw_port, remapped_fips)
+
     def _get_ex_gw_port(self, ri):
         return ri.router.get('gw_port')
 
@@ -597,31 +702,44 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
         return rules
 
     def floating_ip_added(self, ri, ex_gw_port, floating_ip, fixed_ip):
-        ip_cidr = str(floating_ip) + '/32'
-        interface_name = self.get_external_device_name(ex_gw_port['id'])
-        device = ip_lib.IPDevice(interface_name, self.root_helper,
-                                 namespace=ri.ns_name())
+        self._floating_ips_added(ri, ex_gw_port, [(floating_ip, fixed_ip)])
 
-        if ip_cidr not in [addr['cidr'] for addr in device.addr.list()]:
-            net = netaddr.IPNetwork(ip_cidr)
-            device.addr.add(net.version, ip_cidr, str(net.broadcast))
+    def _floating_ips_added(self, ri, ex_gw_port, fips):
+        interface_name = self.get_external_device_name(ex_gw_port['id'])
+        added_ips = []
+        with ip_lib.IpBatch(self.root_helper, ri.ns_name()) as batch:
+            device = batch.device(interface_name)
+            existing_cidrs = [addr['cidr'] for addr in device.addr.list()]
+            for floating_ip, fixed_ip in fips:
+                ip_cidr = str(floating_ip) + '/32'
+                if ip_cidr not in existing_cidrs:
+                    net = netaddr.IPNetwork(ip_cidr)
+                    device.addr.add(net.version, ip_cidr, str(net.broadcast))
+                    added_ips.append(floating_ip)
+
+                for chain, rule in self.floating_forward_rules(floating_ip,
+                                                               fixed_ip):
+                    ri.iptables_manager.ipv4['nat'].add_rule(chain, rule)
+        # the addresses must be configured before they are announced
+        for floating_ip in added_ips:
             self._send_gratuitous_arp_packet(ri, interface_name, floating_ip)
-
-        for chain, rule in self.floating_forward_rules(floating_ip, fixed_ip):
-            ri.iptables_manager.ipv4['nat'].add_rule(chain, rule)
         ri.iptables_manager.apply()
 
     def floating_ip_removed(self, ri, ex_gw_port, floating_ip, fixed_ip):
-        ip_cidr = str(floating_ip) + '/32'
-        net = netaddr.IPNetwork(ip_cidr)
-        interface_name = self.get_external_device_name(ex_gw_port['id'])
-
-        device = ip_lib.IPDevice(interface_name, self.root_helper,
-                                 namespace=ri.ns_name())
-        device.addr.delete(net.version, ip_cidr)
+        self._floating_ips_removed(ri, ex_gw_port, [(floating_ip, fixed_ip)])
 
-        for chain, rule in self.floating_forward_rules(floating_ip, fixed_ip):
-            ri.iptables_manager.ipv4['nat'].remove_rule(chain, rule)
+    def _floating_ips_removed(self, ri, ex_gw_port, fips):
+        interface_name = self.get_external_device_name(ex_gw_port['id'])
+        with ip_lib.IpBatch(self.root_helper, ri.ns_name()) as batch:
+            device = batch.device(interface_name)
+            for floating_ip, fixed_ip in fips:
+                ip_cidr = str(floating_ip) + '/32'
+                net = netaddr.IPNetwork(ip_cidr)
+                device.addr.delete(net.version, ip_cidr)
+
+                for chain, rule in self.floating_forward_rules(floating_ip,
+                                                               fixed_ip):
+                    ri.iptables_manager.ipv4['nat'].remove_rule(chain, rule)
         ri.iptables_manager.apply()
 
     def floating_forward_rules(self, floating_ip, fixed_ip):
@@ -654,8 +772,7 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
         LOG.debug(_('Got router added to agent :%r'), payload)
         self.routers_updated(context, payload)
 
-    def _process_routers(self, routers, all_routers=False):
-        pool = eventlet.GreenPool()
+    def _process_routers(self, routers, all_routers=False, timestamp=None):
         if (self.conf.external_network_bridge and
             not ip_lib.device_exists(self.conf.external_network_bridge)):
             LOG.error(_("The external network bridge '%s' does not exist"),
@@ -670,9 +787,12 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
         # from subset of incoming routers and ones we have now.
         if all_routers:
             prev_router_ids = set(self.router_info)
+            priority = PRIORITY_SYNC_ROUTERS_TASK
         else:
             prev_router_ids = set(self.router_info) & set(
                 [router['id'] for router in routers])
+            priority = PRIORITY_RPC
+        timestamp = timestamp or time.time()
         cur_router_ids = set()
         for r in routers:
             if not r['admin_state_up']:
@@ -689,38 +809,102 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
             if ex_net_id and ex_net_id != target_ex_net_id:
                 continue
             cur_router_ids.add(r['id'])
-            if r['id'] not in self.router_info:
-                self._router_added(r['id'], r)
-            ri = self.router_info[r['id']]
-            ri.router = r
-            pool.spawn_n(self.process_router, ri)
+            self._queue.add(RouterUpdate(r['id'], priority, router=r,
+                                         timestamp=timestamp))
         # identify and remove routers that no longer exist
         for router_id in prev_router_ids - cur_router_ids:
-            pool.spawn_n(self._router_removed, router_id)
-        pool.waitall()
+            self._queue.add(RouterUpdate(router_id, priority,
+                                         action=DELETE_ROUTER,
+                                         timestamp=timestamp))
+
+    def _process_router_update(self, update):
+        ri = self.router_info.get(update.id)
+        if ri and ri.timestamp > update.timestamp:
+            LOG.debug(_("Ignoring outdated update of router %s"), update.id)
+            return
+        if update.action == DELETE_ROUTER:
+            if ri:
+                self._router_removed(update.id)
+            self._deleted_routers[update.id] = max(
+                update.timestamp, self._deleted_routers.get(update.id, 0))
+            return
+
+        fingerprint = self._router_fingerprint(update.router)
+        if not ri:
+            if self._deleted_routers.get(update.id, 0) > update.timestamp:
+                LOG.debug(_("Ignoring outdated update of deleted router %s"),
+                          update.id)
+                return
+            self._deleted_routers.pop(update.id, None)
+            self._router_added(update.id, update.router)
+            ri = self.router_info[update.id]
+        elif ri.fingerprint == fingerprint:
+            LOG.debug(_("Router %s is unchanged, skipping it"), update.id)
+            ri.timestamp = update.timestamp
+            return
+        ri.router = update.router
+        # the router is processed again on the next sync if this fails
+        ri.fingerprint = None
+        self.process_router(ri)
+        ri.fingerprint = fingerprint
+        ri.timestamp = update.timestamp
+
+    def _process_router_updates(self):
+        """Process queued router updates until none is ready."""
+        while True:
+            update = self._queue.pop()
+            if not update:
+                return
+            start = time.time()
+            try:
+                self._process_router_update(update)
+            except Exception:
+                LOG.exception(_("Failed processing router %s"), update.id)
+                self.fullsync = True
+            finally:
+                self._queue.task_done(update.id)
+                self._record_processing_time(time.time() - start)
+
+    def _spawn_router_workers(self):
+        for i in range(min(self._pool.free(), len(self._queue))):
+            self._pool.spawn_n(self._process_router_updates)
+
+    def _reset_processing_stats(self):
+        self._processed_routers = 0
+        self._processing_time = 0.0
+        self._max_processing_time = 0.0
+
+    def _record_processing_time(self, seconds):
+        self._processed_routers += 1
+        self._processing_time += seconds
+        self._max_processing_time = max(self._max_processing_time, seconds)
+
+    def _router_fingerprint(self, router):
+        """Return a digest of everything the server sent for a router."""
+        return hashlib.sha1(jsonutils.dumps(router, sort_keys=True)).digest()
 
-    @lockutils.synchronized('l3-agent', 'neutron-')
     def _rpc_loop(self):
-        # _rpc_loop and _sync_routers_task will not be
-        # executed in the same time because of lock.
-        # so we can clear the value of updated_routers
-        # and removed_routers
+        # updates of a router are serialized by the queue, so this can run
+        # concurrently with _sync_routers_task
         try:
             if self.updated_routers:
                 router_ids = list(self.updated_routers)
                 self.updated_routers.clear()
+                timestamp = time.time()
                 routers = self.plugin_rpc.get_routers(
                     self.context, router_ids)
-                self._process_routers(routers)
+                self._process_routers(routers, timestamp=timestamp)
             self._process_router_delete()
         except Exception:
             LOG.exception(_("Failed synchronizing routers"))
             self.fullsync = True
+        self._spawn_router_workers()
 
     def _process_router_delete(self):
         current_removed_routers = list(self.removed_routers)
         for router_id in current_removed_routers:
-            self._router_removed(router_id)
+            self._queue.add(RouterUpdate(router_id, PRIORITY_RPC,
+                                         action=DELETE_ROUTER))
             self.removed_routers.remove(router_id)
 
     def _router_ids(self):
@@ -728,7 +912,6 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
             return [self.conf.router_id]
 
     @periodic_task.periodic_task
-    @lockutils.synchronized('l3-agent', 'neutron-')
     def _sync_routers_task(self, context):
         if self.services_sync:
             super(L3NATAgent, self).process_services_sync(context)
@@ -736,22 +919,28 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
             return
         try:
             router_ids = self._router_ids()
-            self.updated_routers.clear()
-            self.removed_routers.clear()
+            timestamp = time.time()
             routers = self.plugin_rpc.get_routers(
                 context, router_ids)
 
             LOG.debug(_('Processing :%r'), routers)
-            self._process_routers(routers, all_routers=True)
+            self._process_routers(routers, all_routers=True,
+                                  timestamp=timestamp)
             self.fullsync = False
         except Exception:
             LOG.exception(_("Failed synchronizing routers"))
             self.fullsync = True
+        self._spawn_router_workers()
 
     def after_start(self):
         LOG.info(_("L3 agent started"))
 
-    def _update_routing_table(self, ri, operation, route):
+    def _update_routing_table(self, ri, operation, route, batch=None):
+        if batch:
+            batch.add('route', [operation, 'to', route['destination'],
+                                'via', route['nexthop']],
+                      check_exit_code=False)
+            return
         cmd = ['ip', 'route', operation, 'to', route['destination'],
                'via', route['nexthop']]
         #TODO(nati) move this code to iplib
@@ -768,17 +957,18 @@ class L3NATAgent(firewall_l3_agent.FWaaSL3AgentRpcCallback, manager.Manager):
         old_routes = ri.routes
         adds, removes = common_utils.diff_list_of_dict(old_routes,
                                                        new_routes)
-        for route in adds:
-            LOG.debug(_("Added route entry is '%s'"), route)
-            # remove replaced route from deleted route
-            for del_route in removes:
-                if route['destination'] == del_route['destination']:
-                    removes.remove(del_route)
-            #replace success even if there is no existing route
-            self._update_routing_table(ri, 'replace', route)
-        for route in removes:
-            LOG.debug(_("Removed route entry is '%s'"), route)
-            self._update_routing_table(ri, 'delete', route)
+        with ip_lib.IpBatch(self.root_helper, ri.ns_name()) as batch:
+            for route in adds:
+                LOG.debug(_("Added route entry is '%s'"), route)
+                # remove replaced route from deleted route
+                for del_route in removes:
+                    if route['destination'] == del_route['destination']:
+                        removes.remove(del_route)
+                #replace success even if there is no existing route
+                self._update_routing_table(ri, 'replace', route, batch)
+            for route in removes:
+                LOG.debug(_("Removed route entry is '%s'"), route)
+                self._update_routing_table(ri, 'delete', route, batch)
         ri.routes = new_routes
 
 
@@ -827,6 +1017,14 @@ class L3NATAgentWithStateReport(L3NATAgent):
         configurations['ex_gw_ports'] = num_ex_gw_ports
         configurations['interfaces'] = num_interfaces
         configurations['floating_ips'] = num_floating_ips
+        # processing times are those of the routers processed since the
+        # previous report
+        configurations['router_update_queue_depth'] = len(self._queue)
+        configurations['router_processing_time_avg'] = round(
+            self._processing_time / max(self._processed_routers, 1), 3)
+        configurations['router_processing_time_max'] = round(
+            self._max_processing_time, 3)
+        self._reset_processing_stats()
         try:
             self.state_rpc.report_state(self.context, self.agent_state,
                                         self.use_call)
@@ -855,6 +1053,7 @@ def main(manager='neutron.agent.l3_agent.L3NATAgentWithStateReport'):
     config.register_root_helper(conf)
     conf.register_opts(interface.OPTS)
     conf.register_opts(external_process.OPTS)
+    conf.register_opts(ip_lib.OPTS)
     conf(project='neutron')
     config.setup_logging(conf)
     legacy.modernize_quantum_config(conf)
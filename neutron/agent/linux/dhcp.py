@@ -138,6 +138,16 @@ class DhcpBase(object):
     def reload_allocations(self):
         """Force the DHCP server to reload the assignment database."""
 
+    def reload_ports(self, mac_addresses, update_options=True):
+        """Reload the assignment database after a change to user ports.
+
+        :param mac_addresses: MAC addresses of the changed or removed ports
+        Drivers may override this to only update the entries of these
+        ports, and to skip the work that only depends on the subnets or on
+        the dhcp port, which ports do not change.
+        """
+        self.reload_allocations()
+
     @classmethod
     def existing_dhcp_networks(cls, conf, root_helper):
         """Return a list of existing networks ids that we have configs for."""
@@ -388,36 +398,83 @@ class Dnsmasq(DhcpLocalProcess):
 
         self._output_hosts_file()
         self._output_opts_file()
+        self._reload()
+        self.device_manager.update(self.network)
+
+    def reload_ports(self, mac_addresses, update_options=True):
+        """Update the host entries of ports and signal the dnsmasq to reload.
+
+        Only the entries of the given MAC addresses are rebuilt in the
+        hosts file.  The subnet options and the dhcp port are left alone,
+        so the opts file is only rebuilt when the extra dhcp options of a
+        port changed.  dnsmasq still rereads the whole hosts file on the
+        signal: --dhcp-hostsdir, which does not, needs dnsmasq 2.73.
+        """
+        if not self._enable_dhcp():
+            self.reload_allocations()
+            return
+
+        self._update_hosts_file(mac_addresses)
+        if update_options:
+            self._output_opts_file()
+        self._reload()
+
+    def _reload(self):
         if self.active:
             cmd = ['kill', '-HUP', self.pid]
             utils.execute(cmd, self.root_helper)
         else:
             LOG.debug(_('Pid %d is stale, relaunching dnsmasq'), self.pid)
         LOG.debug(_('Reloading allocations for network: %s'), self.network.id)
-        self.device_manager.update(self.network)
+
+    def _write_host_entries(self, buf, port):
+        """Writes the dnsmasq hosts file entries of a port."""
+        r = re.compile('[:.]')
+        for alloc in port.fixed_ips:
+            name = 'host-%s.%s' % (r.sub('-', alloc.ip_address),
+                                   self.conf.dhcp_domain)
+            set_tag = ''
+            if getattr(port, 'extra_dhcp_opts', False):
+                if self.version >= self.MINIMUM_VERSION:
+                    set_tag = 'set:'
+
+                buf.write('%s,%s,%s,%s%s\n' %
+                          (port.mac_address, name, alloc.ip_address,
+                           set_tag, port.id))
+            else:
+                buf.write('%s,%s,%s\n' %
+                          (port.mac_address, name, alloc.ip_address))
 
     def _output_hosts_file(self):
         """Writes a dnsmasq compatible hosts file."""
-        r = re.compile('[:.]')
         buf = StringIO.StringIO()
 
         for port in self.network.ports:
-            for alloc in port.fixed_ips:
-                name = 'host-%s.%s' % (r.sub('-', alloc.ip_address),
-                                       self.conf.dhcp_domain)
-                set_tag = ''
-                if getattr(port, 'extra_dhcp_opts', False):
-                    if self.version >= self.MINIMUM_VERSION:
-                        set_tag = 'set:'
+            self._write_host_entries(buf, port)
 
-                    buf.write('%s,%s,%s,%s%s\n' %
-                              (port.mac_address, name, alloc.ip_address,
-                               set_tag, port.id))
-                else:
-                    buf.write('%s,%s,%s\n' %
-                              (port.mac_address, name, alloc.ip_address))
+        name = self.get_conf_file_name('host')
+        utils.replace_file(name, buf.getvalue())
+        return name
+
+    def _update_hosts_file(self, mac_addresses):
+        """Rebuilds the hosts file entries of the given MAC addresses.
 
+        The entries of the other ports are copied from the current file.
+        """
         name = self.get_conf_file_name('host')
+        if not os.path.exists(name):
+            return self._output_hosts_file()
+        mac_addresses = set(mac_addresses)
+        buf = StringIO.StringIO()
+
+        with open(name) as hosts_file:
+            for line in hosts_file.read().splitlines(True):
+                if line.split(',', 1)[0] not in mac_addresses:
+                    buf.write(line)
+        for port in self.network.ports:
+            if port.mac_address in mac_addresses:
+                self._write_host_entries(buf, port)
+
         utils.replace_file(name, buf.getvalue())
         return name
 
@@ -14,24 +14,58 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+import socket
+
 import netaddr
 from oslo.config import cfg
 
+from neutron.agent.linux import netlink
 from neutron.agent.linux import utils
 from neutron.common import exceptions
+from neutron.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
 
 
 OPTS = [
     cfg.BoolOpt('ip_lib_force_root',
                 default=False,
                 help=_('Force ip_lib calls to use the root helper')),
+    cfg.BoolOpt('ip_lib_use_netlink',
+                default=False,
+                help=_('Answer device, address, route and namespace queries '
+                       'with rtnetlink instead of running ip')),
 ]
 
 
 LOOPBACK_DEVNAME = 'lo'
 
 
+def _netlink_query(netlink_method):
+    """Answer a query with netlink_method when netlink is enabled.
+
+    The ip command is run when the query cannot be answered with netlink.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if self.use_netlink:
+                try:
+                    return getattr(self, netlink_method)(*args, **kwargs)
+                except netlink.NetlinkError as e:
+                    LOG.debug(_("Running ip for %(query)s: %(error)s"),
+                              {'query': func.__name__, 'error': e})
+            return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class SubProcessBase(object):
+    # IpBatch queuing the link, addr and route changes, if any
+    batch = None
+
     def __init__(self, root_helper=None, namespace=None):
         self.root_helper = root_helper
         self.namespace = namespace
@@ -41,6 +75,10 @@ class SubProcessBase(object):
             # Only callers that need to force use of the root helper
             # need to register the option.
             self.force_root = False
+        try:
+            self.use_netlink = cfg.CONF.ip_lib_use_netlink
+        except cfg.NoSuchOptError:
+            self.use_netlink = False
 
     def _run(self, options, command, args):
         if self.namespace:
@@ -85,6 +123,13 @@ class IPWrapper(SubProcessBase):
     def device(self, name):
         return IPDevice(name, self.root_helper, self.namespace)
 
+    def _netlink_get_devices(self, exclude_loopback=False):
+        return [IPDevice(link['name'], self.root_helper, self.namespace)
+                for link in netlink.get_links(self.namespace)
+                if not (exclude_loopback and
+                        link['name'] == LOOPBACK_DEVNAME)]
+
+    @_netlink_query('_netlink_get_devices')
     def get_devices(self, exclude_loopback=False):
         retval = []
         output = self._execute('o', 'link', ('list',),
@@ -200,10 +245,23 @@ class IpCommandBase(object):
         return self._parent._run(kwargs.get('options', []), self.COMMAND, args)
 
     def _as_root(self, *args, **kwargs):
-        return self._parent._as_root(kwargs.get('options', []),
+        options = kwargs.get('options', [])
+        use_root_namespace = kwargs.get('use_root_namespace', False)
+        batch = self._parent.batch
+        if (batch and self.COMMAND in IpBatch.COMMANDS and
+                not use_root_namespace and
+                all(option in (4, 6) for option in options)):
+            # the address family is implied by the addresses in a batch
+            batch.add(self.COMMAND, args)
+            return
+        return self._parent._as_root(options,
                                      self.COMMAND,
                                      args,
-                                     kwargs.get('use_root_namespace', False))
+                                     use_root_namespace)
+
+    @property
+    def use_netlink(self):
+        return self._parent.use_netlink
 
 
 class IpDeviceCommandBase(IpCommandBase):
@@ -211,6 +269,12 @@ class IpDeviceCommandBase(IpCommandBase):
     def name(self):
         return self._parent.name
 
+    def _netlink_link(self):
+        link = netlink.get_link(self.name, self._parent.namespace)
+        if link is None:
+            raise RuntimeError(_('Device "%s" does not exist.') % self.name)
+        return link
+
 
 class IpLinkCommand(IpDeviceCommandBase):
     COMMAND = 'link'
@@ -228,6 +292,12 @@ class IpLinkCommand(IpDeviceCommandBase):
         self._as_root('set', self.name, 'down')
 
     def set_netns(self, namespace):
+        batch = self._parent.batch
+        if batch:
+            # the queued commands must run before the device moves, and
+            # the later ones do not belong to the namespace of the batch
+            batch.execute()
+            self._parent.batch = None
         self._as_root('set', self.name, 'netns', namespace)
         self._parent.namespace = namespace
 
@@ -266,9 +336,25 @@ class IpLinkCommand(IpDeviceCommandBase):
         return self.attributes.get('alias')
 
     @property
+    @_netlink_query('_netlink_attributes')
     def attributes(self):
         return self._parse_line(self._run('show', self.name, options='o'))
 
+    def _netlink_attributes(self):
+        link = self._netlink_link()
+        retval = {'state': link['operstate']}
+        for key, value in (('mtu', link['mtu']),
+                           ('qdisc', link['qdisc']),
+                           ('qlen', link['txqlen']),
+                           ('alias', link['alias'])):
+            if value is not None:
+                retval[key] = value
+        if link['address']:
+            link_type = netlink.LINK_TYPES.get(link['type'], 'none')
+            retval['link/%s' % link_type] = link['address']
+            retval['brd'] = link['broadcast']
+        return retval
+
     def _parse_line(self, value):
         if not value:
             return {}
@@ -306,6 +392,7 @@ class IpAddrCommand(IpDeviceCommandBase):
     def flush(self):
         self._as_root('flush', self.name)
 
+    @_netlink_query('_netlink_list')
     def list(self, scope=None, to=None, filters=None):
         if filters is None:
             filters = []
@@ -345,6 +432,37 @@ class IpAddrCommand(IpDeviceCommandBase):
                                dynamic=('dynamic' == parts[-1])))
         return retval
 
+    def _netlink_list(self, scope=None, to=None, filters=None):
+        filters = filters or []
+        if [f for f in filters if f not in ('permanent', 'dynamic')]:
+            raise netlink.NetlinkError(_('Unsupported filters %s') % filters)
+        index = self._netlink_link()['index']
+        to = to and netaddr.IPNetwork(to)
+
+        retval = []
+        for address in netlink.get_addresses(self._parent.namespace):
+            dynamic = not address['flags'] & netlink.IFA_F_PERMANENT
+            if (address['index'] != index or
+                    (scope and address['scope'] != scope) or
+                    ('permanent' in filters and dynamic) or
+                    ('dynamic' in filters and not dynamic) or
+                    (to and netaddr.IPAddress(address['address']) not in to)):
+                continue
+            cidr = '%s/%d' % (address['address'], address['prefixlen'])
+            if address['family'] == socket.AF_INET6:
+                version = 6
+                broadcast = '::'
+            else:
+                version = 4
+                broadcast = (address['broadcast'] or
+                             str(netaddr.IPNetwork(cidr).broadcast))
+            retval.append(dict(cidr=cidr,
+                               broadcast=broadcast,
+                               scope=address['scope'],
+                               ip_version=version,
+                               dynamic=dynamic))
+        return retval
+
 
 class IpRouteCommand(IpDeviceCommandBase):
     COMMAND = 'route'
@@ -364,6 +482,7 @@ class IpRouteCommand(IpDeviceCommandBase):
                       'dev',
                       self.name)
 
+    @_netlink_query('_netlink_get_gateway')
     def get_gateway(self, scope=None, filters=None):
         if filters is None:
             filters = []
@@ -389,6 +508,21 @@ class IpRouteCommand(IpDeviceCommandBase):
 
         return retval
 
+    def _netlink_get_gateway(self, scope=None, filters=None):
+        if filters:
+            raise netlink.NetlinkError(_('Unsupported filters %s') % filters)
+        index = self._netlink_link()['index']
+        for route in netlink.get_routes(namespace=self._parent.namespace):
+            if (route['table'] == netlink.RT_TABLE_MAIN and
+                    route['type'] == netlink.RTN_UNICAST and
+                    route['dst_len'] == 0 and route['oif'] == index and
+                    route['gateway'] and
+                    (not scope or route['scope'] == scope)):
+                retval = dict(gateway=route['gateway'])
+                if route['priority'] is not None:
+                    retval.update(metric=route['priority'])
+                return retval
+
     def pullup_route(self, interface_name):
         """Ensures that the route entry for the interface is before all
         others on the same subnet.
@@ -455,6 +589,7 @@ class IpNetnsCommand(IpCommandBase):
                 root_helper=self._parent.root_helper,
                 check_exit_code=check_exit_code)
 
+    @_netlink_query('_netlink_exists')
     def exists(self, name):
         output = self._as_root('list', options='o', use_root_namespace=True)
 
@@ -463,6 +598,120 @@ class IpNetnsCommand(IpCommandBase):
                 return True
         return False
 
+    def _netlink_exists(self, name):
+        return netlink.namespace_exists(name)
+
+
+class IpBatchError(RuntimeError):
+    """Some of the commands of an IpBatch failed.
+
+    failures is a list of (command, error) tuples.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        super(IpBatchError, self).__init__(
+            _("ip batch commands failed: %s") %
+            '; '.join("'%s': %s" % failure for failure in failures))
+
+
+class IpBatch(object):
+    """Run ip link, addr and route commands of a namespace in one process.
+
+    Changes made through the devices returned by device(), and commands
+    added with add(), are queued and then run by a single
+    'ip netns exec <namespace> ip -force -batch -' when execute() is called
+    or when the with block using the batch is left without an exception.
+    Reads, such as listing addresses, are run right away and do not see
+    the queued changes.
+
+    All the commands are run even if some fail, and the failures are
+    reported per command by an IpBatchError.
+    """
+
+    COMMANDS = ('link', 'addr', 'route')
+
+    def __init__(self, root_helper=None, namespace=None):
+        self.root_helper = root_helper
+        self.namespace = namespace
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.execute()
+
+    def device(self, name):
+        device = IPDevice(name, self.root_helper, namespace=self.namespace)
+        device.batch = self
+        return device
+
+    def add(self, command, args, check_exit_code=True):
+        """Queue 'ip <command> <args>'.
+
+        The failure of a command queued with check_exit_code False is only
+        logged.
+        """
+        line = ' '.join([command] + [str(arg) for arg in args])
+        self.commands.append((line, check_exit_code))
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        if not commands:
+            return
+        if not self.root_helper:
+            raise exceptions.SudoRequired()
+
+        if self.namespace:
+            cmd = ['ip', 'netns', 'exec', self.namespace, 'ip']
+        else:
+            cmd = ['ip']
+        cmd += ['-force', '-batch', '-']
+        _stdout, stderr = utils.execute(
+            cmd, root_helper=self.root_helper,
+            process_input='\n'.join(line for line, check in commands) + '\n',
+            check_exit_code=False, return_stderr=True)
+
+        failures = []
+        for index, error in self._parse_errors(stderr, len(commands)):
+            line, check_exit_code = commands[index]
+            if check_exit_code:
+                failures.append((line, error))
+            else:
+                LOG.debug(_("Ignoring failure of 'ip %(line)s': %(error)s"),
+                          {'line': line, 'error': error})
+        if failures:
+            raise IpBatchError(failures)
+
+    @staticmethod
+    def _parse_errors(stderr, count):
+        """Return (command index, error) for the commands which failed.
+
+        ip prints the error of a failed command followed by a line like
+        'Command failed -:<line number>'.  Errors which are not followed by
+        such a line are not specific to a command, ip stopped before running
+        them, so they are reported for all the commands.
+        """
+        errors = []
+        messages = []
+        for line in (stderr or '').split('\n'):
+            line = line.strip()
+            if line.startswith('Command failed -:'):
+                try:
+                    index = int(line.rsplit(':', 1)[1]) - 1
+                except ValueError:
+                    index = -1
+                if 0 <= index < count:
+                    errors.append((index, ' '.join(messages)))
+                messages = []
+            elif line:
+                messages.append(line)
+        if messages and not errors:
+            errors = [(i, ' '.join(messages)) for i in range(count)]
+        return errors
+
 
 def device_exists(device_name, root_helper=None, namespace=None):
     try:
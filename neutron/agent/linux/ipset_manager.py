@@ -0,0 +1,96 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Maintain kernel ipsets with the ipset utility."""
+
+from neutron.agent.linux import utils as linux_utils
+from neutron.common import constants
+from neutron.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# the kernel limits set names to 31 characters
+MAX_SET_NAME_LEN = 31
+SET_NAME_PREFIX = 'N'
+SET_FAMILY = {constants.IPv4: 'inet',
+              constants.IPv6: 'inet6'}
+
+
+def get_set_name(sg_id, ethertype):
+    """Return the name of the set holding the members of a group."""
+    name = SET_NAME_PREFIX + ethertype + sg_id.replace('-', '')
+    return name[:MAX_SET_NAME_LEN]
+
+
+class IpsetManager(object):
+    """Wrapper for ipset.
+
+    Sets are hash:net sets, so they can hold both addresses and the
+    prefixes of allowed address pairs.  The members of the sets created by
+    the manager are remembered, so that updates only add and remove the
+    members which changed.  All the changes of a call are made by a single
+    ipset restore.
+    """
+
+    def __init__(self, _execute=None, root_helper=None, namespace=None):
+        if _execute:
+            self.execute = _execute
+        else:
+            self.execute = linux_utils.execute
+        self.root_helper = root_helper
+        self.namespace = namespace
+        self.sets = {}
+
+    def _run(self, args, process_input=None):
+        args = ['ipset'] + args
+        if self.namespace:
+            args = ['ip', 'netns', 'exec', self.namespace] + args
+        return self.execute(args, process_input=process_input,
+                            root_helper=self.root_helper)
+
+    def set_members(self, set_name, ethertype, member_ips):
+        """Create a set if needed and make it hold member_ips."""
+        member_ips = set(member_ips)
+        lines = []
+        current = self.sets.get(set_name)
+        if current is None:
+            # the set may be left over by a previous run of the agent
+            lines.append('create %s hash:net family %s' %
+                         (set_name, SET_FAMILY[ethertype]))
+            lines.append('flush %s' % set_name)
+            current = set()
+        lines += ['del %s %s' % (set_name, ip)
+                  for ip in sorted(current - member_ips)]
+        lines += ['add %s %s' % (set_name, ip)
+                  for ip in sorted(member_ips - current)]
+        if lines:
+            LOG.debug(_("Updating ipset %(set_name)s with %(members)d "
+                        "members"),
+                      {'set_name': set_name, 'members': len(member_ips)})
+            self._run(['restore', '-exist'],
+                      process_input='\n'.join(lines) + '\n')
+        self.sets[set_name] = member_ips
+
+    def destroy_set(self, set_name):
+        """Destroy a set, which must not be referenced by iptables rules."""
+        if self.sets.pop(set_name, None) is None:
+            return
+        LOG.debug(_("Destroying ipset %s"), set_name)
+        try:
+            self._run(['destroy', set_name])
+        except RuntimeError:
+            LOG.exception(_("Failed destroying ipset %s"), set_name)
@@ -19,12 +19,15 @@ import netaddr
 from oslo.config import cfg
 
 from neutron.agent import firewall
+from neutron.agent.linux import ipset_manager
 from neutron.agent.linux import iptables_manager
 from neutron.common import constants
 from neutron.openstack.common import log as logging
 
 
 LOG = logging.getLogger(__name__)
+cfg.CONF.import_opt('enable_ipset', 'neutron.agent.securitygroups_rpc',
+                    'SECURITYGROUP')
 SG_CHAIN = 'sg-chain'
 INGRESS_DIRECTION = 'ingress'
 EGRESS_DIRECTION = 'egress'
@@ -33,12 +36,17 @@ CHAIN_NAME_PREFIX = {INGRESS_DIRECTION: 'i',
                      EGRESS_DIRECTION: 'o',
                      SPOOF_FILTER: 's'}
 LINUX_DEV_LEN = 14
+DIRECTION_IP_PREFIX = {INGRESS_DIRECTION: 'source_ip_prefix',
+                       EGRESS_DIRECTION: 'dest_ip_prefix'}
+IPSET_DIRECTION = {INGRESS_DIRECTION: 'src',
+                   EGRESS_DIRECTION: 'dst'}
 
 
 class IptablesFirewallDriver(firewall.FirewallDriver):
     """Driver which enforces security groups through iptables rules."""
     IPTABLES_DIRECTION = {INGRESS_DIRECTION: 'physdev-out',
                           EGRESS_DIRECTION: 'physdev-in'}
+    supports_security_group_info = True
 
     def __init__(self):
         self.iptables = iptables_manager.IptablesManager(
@@ -49,11 +57,42 @@ class IptablesFirewallDriver(firewall.FirewallDriver):
         self._add_fallback_chain_v4v6()
         self._defer_apply = False
         self._pre_defer_filtered_ports = None
+        # rules and member ips of the security groups, when they are not
+        # expanded into the rules of each port by the server
+        self.sg_rules = {}
+        self.sg_members = {}
+        self._expanded_sg_rules = {}
+        # remote groups are matched with one ipset per ethertype, which
+        # member updates change in place
+        self.enable_ipset = cfg.CONF.SECURITYGROUP.enable_ipset
+        self.updates_members_in_place = self.enable_ipset
+        if self.enable_ipset:
+            self.ipset = ipset_manager.IpsetManager(
+                root_helper=cfg.CONF.AGENT.root_helper)
 
     @property
     def ports(self):
         return self.filtered_ports
 
+    def update_security_group_rules(self, sg_id, rules):
+        LOG.debug(_("Updating rules of security group %s"), sg_id)
+        self.sg_rules[sg_id] = rules
+        self._expanded_sg_rules = {}
+
+    def update_security_group_members(self, sg_id, member_ips):
+        LOG.debug(_("Updating members of security group %s"), sg_id)
+        known_group = sg_id in self.sg_members
+        self.sg_members[sg_id] = member_ips
+        if self.enable_ipset:
+            for ethertype in (constants.IPv4, constants.IPv6):
+                self.ipset.set_members(
+                    ipset_manager.get_set_name(sg_id, ethertype),
+                    ethertype, member_ips.get(ethertype, []))
+            if known_group:
+                # the rules match the sets, whatever their members
+                return
+        self._expanded_sg_rules = {}
+
     def prepare_port_filter(self, port):
         LOG.debug(_("Preparing device (%s) filter"), port['device'])
         self._remove_chains()
@@ -83,6 +122,8 @@ class IptablesFirewallDriver(firewall.FirewallDriver):
         self.filtered_ports.pop(port['device'], None)
         self._setup_chains()
         self.iptables.apply()
+        if not self._defer_apply:
+            self._remove_unused_ipsets()
 
     def _setup_chains(self):
         """Setup ingress and egress chain for a port."""
@@ -176,14 +217,57 @@ class IptablesFirewallDriver(firewall.FirewallDriver):
                 ipv4_sg_rules.append(rule)
             elif rule.get('ethertype') == constants.IPv6:
                 if rule.get('protocol') == 'icmp':
-                    rule['protocol'] = 'icmpv6'
+                    # the rule may be shared with other ports
+                    rule = dict(rule, protocol='icmpv6')
                 ipv6_sg_rules.append(rule)
         return ipv4_sg_rules, ipv6_sg_rules
 
+    def _expand_sg_rules(self, sg_id, direction):
+        """Return the rules of a security group with the member IPs.
+
+        Returns (rule, member ip) pairs, with a None ip for the rules
+        without a remote group.  With ipsets, a remote group rule is
+        instead returned once, matching the set of the remote group.  The
+        result is shared by all the ports in the security group until its
+        rules or members change.
+        """
+        key = (sg_id, direction)
+        if key not in self._expanded_sg_rules:
+            expanded = []
+            for rule in self.sg_rules.get(sg_id, []):
+                if rule['direction'] != direction:
+                    continue
+                remote_group_id = rule.get('remote_group_id')
+                if not remote_group_id:
+                    expanded.append((rule, None))
+                    continue
+                if self.enable_ipset:
+                    if remote_group_id in self.sg_members:
+                        ipset_rule = dict(rule, ipset=(
+                            ipset_manager.get_set_name(remote_group_id,
+                                                       rule['ethertype'])))
+                        expanded.append((ipset_rule, None))
+                    continue
+                members = self.sg_members.get(remote_group_id, {})
+                for ip in members.get(rule['ethertype'], []):
+                    ip_rule = rule.copy()
+                    ip_rule[DIRECTION_IP_PREFIX[direction]] = str(
+                        netaddr.IPNetwork(ip).cidr)
+                    expanded.append((ip_rule, ip))
+            self._expanded_sg_rules[key] = expanded
+        return self._expanded_sg_rules[key]
+
     def _select_sgr_by_direction(self, port, direction):
-        return [rule
-                for rule in port.get('security_group_rules', [])
-                if rule['direction'] == direction]
+        rules = [rule
+                 for rule in port.get('security_group_rules', [])
+                 if rule['direction'] == direction]
+        if self.sg_rules:
+            fixed_ips = port.get('fixed_ips', [])
+            for sg_id in port.get('security_groups', []):
+                rules.extend(rule for rule, ip
+                             in self._expand_sg_rules(sg_id, direction)
+                             if ip not in fixed_ips)
+        return rules
 
     def _arp_spoofing_rule(self, port):
         return '-m mac ! --mac-source %s -j DROP' % port['mac_address']
@@ -289,6 +373,7 @@ class IptablesFirewallDriver(firewall.FirewallDriver):
                                    rule.get('protocol'),
                                    rule.get('port_range_min'),
                                    rule.get('port_range_max'))
+            args += self._ipset_arg(rule.get('ipset'), rule['direction'])
             args += ['-j RETURN']
             iptables_rules += [' '.join(args)]
 
@@ -334,10 +419,35 @@ class IptablesFirewallDriver(firewall.FirewallDriver):
             return ['-%s' % direction, ip_prefix]
         return []
 
+    def _ipset_arg(self, set_name, direction):
+        if set_name:
+            return ['-m set --match-set', set_name,
+                    IPSET_DIRECTION[direction]]
+        return []
+
     def _port_chain_name(self, port, direction):
         return iptables_manager.get_chain_name(
             '%s%s' % (CHAIN_NAME_PREFIX[direction], port['device'][3:]))
 
+    def _remove_unused_ipsets(self):
+        """Destroy the sets of the groups no filtered port refers to.
+
+        This must follow the removal of the iptables rules matching them.
+        """
+        if not self.enable_ipset:
+            return
+        remote_group_ids = set()
+        for port in self.filtered_ports.values():
+            for sg_id in port.get('security_groups', []):
+                remote_group_ids.update(
+                    rule.get('remote_group_id')
+                    for rule in self.sg_rules.get(sg_id, []))
+        for sg_id in set(self.sg_members) - remote_group_ids:
+            del self.sg_members[sg_id]
+            for ethertype in (constants.IPv4, constants.IPv6):
+                self.ipset.destroy_set(
+                    ipset_manager.get_set_name(sg_id, ethertype))
+
     def filter_defer_apply_on(self):
         if not self._defer_apply:
             self.iptables.defer_apply_on()
@@ -351,6 +461,7 @@ class IptablesFirewallDriver(firewall.FirewallDriver):
             self._pre_defer_filtered_ports = None
             self._setup_chains_apply(self.filtered_ports)
             self.iptables.defer_apply_off()
+            self._remove_unused_ipsets()
 
 
 class OVSHybridIptablesFirewallDriver(IptablesFirewallDriver):
@@ -24,12 +24,24 @@
 import inspect
 import os
 
+from oslo.config import cfg
+
 from neutron.agent.linux import utils as linux_utils
 from neutron.common import utils
 from neutron.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+iptables_opts = [
+    cfg.BoolOpt('iptables_incremental_apply', default=False,
+                help=_("Only rewrite the wrapped iptables chains that changed "
+                       "since the last apply, using iptables-restore "
+                       "--noflush, instead of saving and restoring whole "
+                       "tables. Packet and byte counters of rewritten chains "
+                       "are reset.")),
+]
+cfg.CONF.register_opts(iptables_opts, 'AGENT')
+
 
 # NOTE(vish): Iptables supports chain names of up to 28 characters,  and we
 #             add up to 12 characters to binary_name which is used as a prefix,
@@ -97,6 +109,24 @@ class IptablesTable(object):
         self.unwrapped_chains = set()
         self.remove_chains = set()
         self.wrap_name = binary_name[:16]
+        # Wrapped chains changed since the last apply, the wrapped chains
+        # present after the last apply, and whether anything outside the
+        # wrapped chains changed, which requires rewriting the whole table.
+        self.dirty_chains = set()
+        self.applied_chains = set()
+        self.unwrapped_dirty = True
+
+    def _mark_dirty(self, chain, wrap):
+        if wrap:
+            self.dirty_chains.add(chain)
+        else:
+            self.unwrapped_dirty = True
+
+    def mark_applied(self):
+        """Record that the kernel table matches the in-memory one."""
+        self.dirty_chains.clear()
+        self.applied_chains = set(self.chains)
+        self.unwrapped_dirty = False
 
     def add_chain(self, name, wrap=True):
         """Adds a named chain to the table.
@@ -115,6 +145,7 @@ class IptablesTable(object):
             self.chains.add(name)
         else:
             self.unwrapped_chains.add(name)
+        self._mark_dirty(name, wrap)
 
     def _select_chain_set(self, wrap):
         if wrap:
@@ -153,6 +184,7 @@ class IptablesTable(object):
             return
 
         chain_set.remove(name)
+        self._mark_dirty(name, wrap)
 
         if not wrap:
             # non-wrapped chains and rules need to be dealt with specially,
@@ -174,6 +206,9 @@ class IptablesTable(object):
             jump_snippet = '-j %s-%s' % (self.wrap_name, name)
 
         # finally, remove rules from list that have a matching jump chain
+        for r in self.rules:
+            if jump_snippet in r.rule:
+                self._mark_dirty(r.chain, r.wrap)
         self.rules = [r for r in self.rules
                       if jump_snippet not in r.rule]
 
@@ -196,6 +231,7 @@ class IptablesTable(object):
             rule = ' '.join(map(self._wrap_target_chain, rule.split(' ')))
 
         self.rules.append(IptablesRule(chain, rule, wrap, top, self.wrap_name))
+        self._mark_dirty(chain, wrap)
 
     def _wrap_target_chain(self, s):
         if s.startswith('$'):
@@ -214,6 +250,7 @@ class IptablesTable(object):
         try:
             self.rules.remove(IptablesRule(chain, rule, wrap, top,
                                            self.wrap_name))
+            self._mark_dirty(chain, wrap)
             if not wrap:
                 self.remove_rules.append(IptablesRule(chain, rule, wrap, top,
                                                       self.wrap_name))
@@ -230,6 +267,8 @@ class IptablesTable(object):
                          if rule.chain == chain and rule.wrap == wrap]
         for rule in chained_rules:
             self.rules.remove(rule)
+        if chained_rules:
+            self._mark_dirty(chain, wrap)
 
 
 class IptablesManager(object):
@@ -257,12 +296,15 @@ class IptablesManager(object):
 
     def __init__(self, _execute=None, state_less=False,
                  root_helper=None, use_ipv6=False, namespace=None,
-                 binary_name=binary_name):
+                 binary_name=binary_name, incremental=None):
         if _execute:
             self.execute = _execute
         else:
             self.execute = linux_utils.execute
 
+        if incremental is None:
+            incremental = cfg.CONF.AGENT.iptables_incremental_apply
+        self.incremental = incremental
         self.use_ipv6 = use_ipv6
         self.root_helper = root_helper
         self.namespace = namespace
@@ -356,22 +398,95 @@ class IptablesManager(object):
             s += [('ip6tables', self.ipv6)]
 
         for cmd, tables in s:
-            args = ['%s-save' % (cmd,), '-c']
-            if self.namespace:
-                args = ['ip', 'netns', 'exec', self.namespace] + args
-            all_tables = self.execute(args, root_helper=self.root_helper)
-            all_lines = all_tables.split('\n')
-            for table_name, table in tables.iteritems():
-                start, end = self._find_table(all_lines, table_name)
-                all_lines[start:end] = self._modify_rules(
-                    all_lines[start:end], table, table_name)
-
-            args = ['%s-restore' % (cmd,), '-c']
+            if self.incremental and self._apply_incremental(cmd, tables):
+                continue
+            self._apply_full(cmd, tables)
+        LOG.debug(_("IPTablesManager.apply completed with success"))
+
+    def _apply_full(self, cmd, tables):
+        """Rewrite whole tables with iptables-save and iptables-restore."""
+        args = ['%s-save' % (cmd,), '-c']
+        if self.namespace:
+            args = ['ip', 'netns', 'exec', self.namespace] + args
+        all_tables = self.execute(args, root_helper=self.root_helper)
+        all_lines = all_tables.split('\n')
+        for table_name, table in tables.iteritems():
+            start, end = self._find_table(all_lines, table_name)
+            all_lines[start:end] = self._modify_rules(
+                all_lines[start:end], table, table_name)
+
+        args = ['%s-restore' % (cmd,), '-c']
+        if self.namespace:
+            args = ['ip', 'netns', 'exec', self.namespace] + args
+        self.execute(args, process_input='\n'.join(all_lines),
+                     root_helper=self.root_helper)
+        for table in tables.itervalues():
+            table.mark_applied()
+
+    def _apply_incremental(self, cmd, tables):
+        """Rewrite only the wrapped chains that changed.
+
+        Declaring an existing chain in iptables-restore --noflush input
+        flushes it, so each changed chain is declared and all its rules are
+        appended again.  Chains that went away are flushed and deleted.
+
+        Returns False when the tables have to be rewritten as a whole,
+        which is the case for the first apply and whenever chains or rules
+        that are not wrapped changed.
+        """
+        if any(table.unwrapped_dirty for table in tables.itervalues()):
+            return False
+
+        lines = []
+        for table_name, table in sorted(tables.iteritems()):
+            lines += self._modify_chains(table, table_name)
+        if lines:
+            args = ['%s-restore' % (cmd,), '--noflush']
             if self.namespace:
                 args = ['ip', 'netns', 'exec', self.namespace] + args
-            self.execute(args, process_input='\n'.join(all_lines),
-                         root_helper=self.root_helper)
-        LOG.debug(_("IPTablesManager.apply completed with success"))
+            try:
+                self.execute(args, process_input='\n'.join(lines) + '\n',
+                             root_helper=self.root_helper)
+            except RuntimeError:
+                LOG.warn(_('Incremental %s-restore failed, rewriting the '
+                           'whole tables'), cmd)
+                return False
+        for table in tables.itervalues():
+            table.mark_applied()
+        return True
+
+    def _modify_chains(self, table, table_name):
+        """Return iptables-restore input for the changed wrapped chains."""
+        removed = table.applied_chains - table.chains
+        changed = (table.dirty_chains & table.chains) | removed
+        if not changed:
+            return []
+
+        top_rules = {}
+        bot_rules = {}
+        for rule in table.rules:
+            if rule.wrap and rule.chain in changed:
+                chain_rules = top_rules if rule.top else bot_rules
+                chain_rules.setdefault(rule.chain, []).append(str(rule))
+
+        lines = ['*%s' % table_name]
+        lines += [':%s-%s - [0:0]' % (self.wrap_name, chain)
+                  for chain in sorted(changed)]
+        for chain in sorted(changed):
+            chain_rules = (top_rules.get(chain, []) +
+                           bot_rules.get(chain, []))
+            # Like a full apply, let the last duplicate take precedence
+            seen_rules = set()
+            unique_rules = []
+            for rule in reversed(chain_rules):
+                if rule not in seen_rules:
+                    seen_rules.add(rule)
+                    unique_rules.append(rule)
+            lines += reversed(unique_rules)
+        lines += ['-X %s-%s' % (self.wrap_name, chain)
+                  for chain in sorted(removed)]
+        lines += ['COMMIT']
+        return lines
 
     def _find_table(self, lines, table_name):
         if len(lines) < 3:
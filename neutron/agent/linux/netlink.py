@@ -0,0 +1,324 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Read links, addresses and routes with rtnetlink.
+
+The dumps are requested on a NETLINK_ROUTE socket, so no ip process is
+run.  A socket stays bound to the network namespace it was created in:
+sockets for other namespaces are created after entering them with
+setns(), and the agent goes back to its own namespace right away.
+Entering a namespace needs CAP_SYS_ADMIN.  Once setns() has been denied,
+NetlinkError is raised for all the namespaces, and callers should fall
+back to the ip command.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import itertools
+import os
+import socket
+import struct
+
+from neutron.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+NETNS_RUN_DIR = '/var/run/netns'
+CLONE_NEWNET = 0x40000000
+
+NETLINK_ROUTE = 0
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+RTM_NEWLINK = 16
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+RTM_NEWROUTE = 24
+RTM_GETROUTE = 26
+
+IFLA_ADDRESS = 1
+IFLA_BROADCAST = 2
+IFLA_IFNAME = 3
+IFLA_MTU = 4
+IFLA_QDISC = 6
+IFLA_TXQLEN = 13
+IFLA_OPERSTATE = 16
+IFLA_IFALIAS = 20
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_BROADCAST = 4
+IFA_FLAGS = 8
+IFA_F_PERMANENT = 0x80
+
+RTA_DST = 1
+RTA_OIF = 4
+RTA_GATEWAY = 5
+RTA_PRIORITY = 6
+RTA_TABLE = 15
+
+RT_TABLE_MAIN = 254
+RTN_UNICAST = 1
+
+# the names used by the ip command
+SCOPES = {0: 'global', 200: 'site', 253: 'link', 254: 'host', 255: 'nowhere'}
+OPERSTATES = ['UNKNOWN', 'NOTPRESENT', 'DOWN', 'LOWERLAYERDOWN', 'TESTING',
+              'DORMANT', 'UP']
+LINK_TYPES = {1: 'ether', 772: 'loopback'}
+
+NLMSGHDR = struct.Struct('IHHII')
+RTATTR = struct.Struct('HH')
+IFINFOMSG = struct.Struct('BxHiII')
+IFADDRMSG = struct.Struct('BBBBI')
+RTMSG = struct.Struct('BBBBBBBBI')
+
+RECV_SIZE = 65536
+
+_sequence = itertools.count(1)
+_libc = None
+_setns_denied = False
+
+
+class NetlinkError(Exception):
+    """A netlink query could not be answered."""
+
+
+def _align(length):
+    return (length + 3) & ~3
+
+
+def _setns(fd):
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                            use_errno=True)
+    if _libc.setns(fd, CLONE_NEWNET) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def _new_socket():
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+    sock.bind((0, 0))
+    return sock
+
+
+def _open_socket(namespace=None):
+    """Return a NETLINK_ROUTE socket bound to namespace."""
+    global _setns_denied
+    if not hasattr(socket, 'AF_NETLINK'):
+        raise NetlinkError(_('Netlink sockets are not supported'))
+    if not namespace:
+        return _new_socket()
+    if _setns_denied:
+        raise NetlinkError(_('Not allowed to enter network namespaces'))
+
+    try:
+        target = os.open(os.path.join(NETNS_RUN_DIR, namespace), os.O_RDONLY)
+    except OSError as e:
+        raise NetlinkError(_('Cannot open network namespace %(namespace)s: '
+                             '%(error)s') % {'namespace': namespace,
+                                             'error': e})
+    try:
+        own = os.open('/proc/self/ns/net', os.O_RDONLY)
+        try:
+            try:
+                _setns(target)
+            except (AttributeError, OSError) as e:
+                if getattr(e, 'errno', None) == errno.EPERM:
+                    LOG.info(_('Not allowed to enter network namespaces, '
+                               'ip will be used for namespace queries'))
+                    _setns_denied = True
+                raise NetlinkError(_('Cannot enter network namespace '
+                                     '%(namespace)s: %(error)s') %
+                                   {'namespace': namespace, 'error': e})
+            try:
+                return _new_socket()
+            finally:
+                # no green thread switch can happen before this point
+                _setns(own)
+        finally:
+            os.close(own)
+    finally:
+        os.close(target)
+
+
+def _parse_attributes(data, offset):
+    attributes = {}
+    while offset + RTATTR.size <= len(data):
+        length, attr_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attributes[attr_type] = data[offset + RTATTR.size:offset + length]
+        offset += _align(length)
+    return attributes
+
+
+def _dump(msg_type, request, namespace=None):
+    """Return (message type, payload) for the messages of a dump."""
+    seq = next(_sequence)
+    request = (NLMSGHDR.pack(NLMSGHDR.size + len(request), msg_type,
+                             NLM_F_REQUEST | NLM_F_DUMP, seq, 0) + request)
+    sock = _open_socket(namespace)
+    try:
+        sock.sendall(request)
+        messages = []
+        while True:
+            data = sock.recv(RECV_SIZE)
+            if not data:
+                raise NetlinkError(_('Netlink dump interrupted'))
+            offset = 0
+            while offset + NLMSGHDR.size <= len(data):
+                length, nl_type, _flags, nl_seq, _pid = NLMSGHDR.unpack_from(
+                    data, offset)
+                if length < NLMSGHDR.size:
+                    raise NetlinkError(_('Malformed netlink message'))
+                payload = data[offset + NLMSGHDR.size:offset + length]
+                offset += _align(length)
+                if nl_seq != seq:
+                    continue
+                if nl_type == NLMSG_DONE:
+                    return messages
+                if nl_type == NLMSG_ERROR:
+                    error = -struct.unpack_from('i', payload)[0]
+                    if error:
+                        raise NetlinkError(os.strerror(error))
+                    continue
+                messages.append((nl_type, payload))
+    except socket.error as e:
+        raise NetlinkError(e)
+    finally:
+        sock.close()
+
+
+def _ip(family, data):
+    return socket.inet_ntop(family, data)
+
+
+def _mac(data):
+    return ':'.join('%02x' % byte for byte in bytearray(data))
+
+
+def _string(data):
+    return data.split(b'\0', 1)[0]
+
+
+def _u32(data):
+    return struct.unpack('I', data[:4])[0]
+
+
+def get_links(namespace=None):
+    """Return a dict for each link of namespace."""
+    links = []
+    request = IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+    for msg_type, payload in _dump(RTM_GETLINK, request, namespace):
+        if msg_type != RTM_NEWLINK:
+            continue
+        _family, link_type, index, flags, _change = IFINFOMSG.unpack_from(
+            payload)
+        attrs = _parse_attributes(payload, IFINFOMSG.size)
+        operstate = ord(attrs.get(IFLA_OPERSTATE, b'\0')[:1])
+        links.append({
+            'index': index,
+            'name': _string(attrs.get(IFLA_IFNAME, b'')),
+            'type': link_type,
+            'flags': flags,
+            'address': (_mac(attrs[IFLA_ADDRESS])
+                        if IFLA_ADDRESS in attrs else None),
+            'broadcast': (_mac(attrs[IFLA_BROADCAST])
+                          if IFLA_BROADCAST in attrs else None),
+            'mtu': _u32(attrs[IFLA_MTU]) if IFLA_MTU in attrs else None,
+            'qdisc': (_string(attrs[IFLA_QDISC])
+                      if IFLA_QDISC in attrs else None),
+            'txqlen': (_u32(attrs[IFLA_TXQLEN])
+                       if IFLA_TXQLEN in attrs else None),
+            'operstate': (OPERSTATES[operstate]
+                          if operstate < len(OPERSTATES) else 'UNKNOWN'),
+            'alias': (_string(attrs[IFLA_IFALIAS])
+                      if IFLA_IFALIAS in attrs else None)})
+    return links
+
+
+def get_link(name, namespace=None):
+    """Return the dict of the link called name, None if there is none."""
+    for link in get_links(namespace):
+        if link['name'] == name:
+            return link
+
+
+def get_addresses(namespace=None):
+    """Return a dict for each address of namespace."""
+    addresses = []
+    request = IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+    for msg_type, payload in _dump(RTM_GETADDR, request, namespace):
+        if msg_type != RTM_NEWADDR:
+            continue
+        family, prefixlen, flags, scope, index = IFADDRMSG.unpack_from(
+            payload)
+        attrs = _parse_attributes(payload, IFADDRMSG.size)
+        if IFA_FLAGS in attrs:
+            flags = _u32(attrs[IFA_FLAGS])
+        local = attrs.get(IFA_LOCAL, attrs.get(IFA_ADDRESS))
+        if local is None:
+            continue
+        addresses.append({
+            'index': index,
+            'family': family,
+            'address': _ip(family, local),
+            'prefixlen': prefixlen,
+            'broadcast': (_ip(family, attrs[IFA_BROADCAST])
+                          if IFA_BROADCAST in attrs else None),
+            'scope': SCOPES.get(scope, str(scope)),
+            'flags': flags})
+    return addresses
+
+
+def get_routes(family=socket.AF_INET, namespace=None):
+    """Return a dict for each route of family in namespace."""
+    routes = []
+    request = RTMSG.pack(family, 0, 0, 0, 0, 0, 0, 0, 0)
+    for msg_type, payload in _dump(RTM_GETROUTE, request, namespace):
+        if msg_type != RTM_NEWROUTE:
+            continue
+        (rt_family, dst_len, _src_len, _tos, table, protocol, scope,
+         route_type, _flags) = RTMSG.unpack_from(payload)
+        if rt_family != family:
+            continue
+        attrs = _parse_attributes(payload, RTMSG.size)
+        routes.append({
+            'table': _u32(attrs[RTA_TABLE]) if RTA_TABLE in attrs else table,
+            'dst': _ip(family, attrs[RTA_DST]) if RTA_DST in attrs else None,
+            'dst_len': dst_len,
+            'gateway': (_ip(family, attrs[RTA_GATEWAY])
+                        if RTA_GATEWAY in attrs else None),
+            'oif': _u32(attrs[RTA_OIF]) if RTA_OIF in attrs else None,
+            'priority': (_u32(attrs[RTA_PRIORITY])
+                         if RTA_PRIORITY in attrs else None),
+            'protocol': protocol,
+            'scope': SCOPES.get(scope, str(scope)),
+            'type': route_type})
+    return routes
+
+
+def namespace_exists(name):
+    """Tell if the namespace is listed by 'ip netns list'."""
+    return os.path.exists(os.path.join(NETNS_RUN_DIR, name))
@@ -36,6 +36,7 @@ class VifPort:
         self.vif_id = vif_id
         self.vif_mac = vif_mac
         self.switch = switch
+        self.xs_vif_uuid = None
 
     def __str__(self):
         return ("iface-id=" + self.vif_id + ", vif_mac=" +
@@ -51,6 +52,9 @@ class OVSBridge:
         self.re_id = self.re_compile_id()
         self.defer_apply_flows = False
         self.deferred_flows = {'add': '', 'mod': '', 'del': ''}
+        # Parsed VifPort objects from the last get_vif_ports() call,
+        # keyed by port name
+        self.vif_port_cache = {}
 
     def re_compile_id(self):
         external = 'external_ids\s*'
@@ -272,49 +276,79 @@ class OVSBridge:
             LOG.error(_("Unable to execute %(cmd)s. Exception: %(exception)s"),
                       {'cmd': args, 'exception': e})
 
+    def _list_interfaces(self, columns):
+        """Return the given columns for every row of the Interface table.
+
+        A single ovs-vsctl invocation is used regardless of the number of
+        interfaces.  Each row is returned as a list of column values in the
+        order requested, with maps decoded to dicts.
+        """
+        args = ['--format=json', '--', '--columns=%s' % ','.join(columns),
+                'list', 'Interface']
+        result = self.run_vsctl(args)
+        if not result:
+            return []
+        rows = []
+        for row in jsonutils.loads(result)['data']:
+            values = []
+            for cell in row:
+                if isinstance(cell, list) and cell and cell[0] == 'map':
+                    cell = dict(cell[1])
+                values.append(cell)
+            rows.append(values)
+        return rows
+
+    def _get_vif_id(self, name, external_ids):
+        if "attached-mac" not in external_ids:
+            return
+        if "iface-id" in external_ids:
+            return external_ids["iface-id"]
+        if "xs-vif-uuid" in external_ids:
+            # if this is a xenserver and iface-id is not automatically
+            # synced to OVS from XAPI, we grab it from XAPI directly,
+            # reusing the value already known for this port if possible
+            xs_vif_uuid = external_ids["xs-vif-uuid"]
+            cached = self.vif_port_cache.get(name)
+            if cached and cached.xs_vif_uuid == xs_vif_uuid:
+                return cached.vif_id
+            return self.get_xapi_iface_id(xs_vif_uuid)
+
     # returns a VIF object for each VIF port
     def get_vif_ports(self):
         edge_ports = []
-        port_names = self.get_port_name_list()
-        for name in port_names:
-            external_ids = self.db_get_map("Interface", name, "external_ids")
-            ofport = self.db_get_val("Interface", name, "ofport")
-            if "iface-id" in external_ids and "attached-mac" in external_ids:
-                p = VifPort(name, ofport, external_ids["iface-id"],
-                            external_ids["attached-mac"], self)
-                edge_ports.append(p)
-            elif ("xs-vif-uuid" in external_ids and
-                  "attached-mac" in external_ids):
-                # if this is a xenserver and iface-id is not automatically
-                # synced to OVS from XAPI, we grab it from XAPI directly
-                iface_id = self.get_xapi_iface_id(external_ids["xs-vif-uuid"])
-                p = VifPort(name, ofport, iface_id,
-                            external_ids["attached-mac"], self)
-                edge_ports.append(p)
-
+        vif_port_cache = {}
+        port_names = set(self.get_port_name_list())
+        rows = self._list_interfaces(['name', 'external_ids', 'ofport'])
+        for name, external_ids, ofport in rows:
+            if name not in port_names:
+                continue
+            vif_id = self._get_vif_id(name, external_ids)
+            if not vif_id:
+                continue
+            if not isinstance(ofport, int):
+                # ofport has not been assigned yet
+                ofport = constants.INVALID_OFPORT
+            vif_mac = external_ids["attached-mac"]
+            p = self.vif_port_cache.get(name)
+            if not (p and p.ofport == ofport and p.vif_id == vif_id and
+                    p.vif_mac == vif_mac):
+                p = VifPort(name, ofport, vif_id, vif_mac, self)
+                p.xs_vif_uuid = external_ids.get("xs-vif-uuid")
+            vif_port_cache[name] = p
+            edge_ports.append(p)
+        self.vif_port_cache = vif_port_cache
         return edge_ports
 
     def get_vif_port_set(self):
         port_names = self.get_port_name_list()
         edge_ports = set()
-        args = ['--format=json', '--', '--columns=name,external_ids',
-                'list', 'Interface']
-        result = self.run_vsctl(args)
-        if not result:
-            return edge_ports
-        for row in jsonutils.loads(result)['data']:
-            name = row[0]
+        for name, external_ids in self._list_interfaces(['name',
+                                                         'external_ids']):
             if name not in port_names:
                 continue
-            external_ids = dict(row[1][1])
-            if "iface-id" in external_ids and "attached-mac" in external_ids:
-                edge_ports.add(external_ids['iface-id'])
-            elif ("xs-vif-uuid" in external_ids and
-                  "attached-mac" in external_ids):
-                # if this is a xenserver and iface-id is not automatically
-                # synced to OVS from XAPI, we grab it from XAPI directly
-                iface_id = self.get_xapi_iface_id(external_ids["xs-vif-uuid"])
-                edge_ports.add(iface_id)
+            vif_id = self._get_vif_id(name, external_ids)
+            if vif_id:
+                edge_ports.add(vif_id)
         return edge_ports
 
     def get_vif_port_by_id(self, port_id):
@@ -25,16 +25,23 @@ import struct
 import tempfile
 
 from eventlet.green import subprocess
+from eventlet import semaphore
+from oslo.config import cfg
 
 from neutron.common import utils
+from neutron.openstack.common import jsonutils
 from neutron.openstack.common import log as logging
 
 
 LOG = logging.getLogger(__name__)
 
 
-def execute(cmd, root_helper=None, process_input=None, addl_env=None,
-            check_exit_code=True, return_stderr=False):
+def create_process(cmd, root_helper=None, addl_env=None):
+    """Create a process object for the given command.
+
+    The return value will be a tuple of the process object and the
+    list of command arguments used to create it.
+    """
     if root_helper:
         cmd = shlex.split(root_helper) + cmd
     cmd = map(str, cmd)
@@ -43,21 +50,122 @@ def execute(cmd, root_helper=None, process_input=None, addl_env=None,
     env = os.environ.copy()
     if addl_env:
         env.update(addl_env)
+
     obj = utils.subprocess_popen(cmd, shell=False,
                                  stdin=subprocess.PIPE,
                                  stdout=subprocess.PIPE,
                                  stderr=subprocess.PIPE,
                                  env=env)
 
-    _stdout, _stderr = (process_input and
-                        obj.communicate(process_input) or
-                        obj.communicate())
-    obj.stdin.close()
+    return obj, cmd
+
+
+class RootHelperDaemon(object):
+    """Runs privileged commands through long-lived root helper processes.
+
+    The daemon (see neutron.cmd.rootwrap_daemon) applies the rootwrap
+    filters to each command it receives, so using it is equivalent to
+    running every command through the root helper, minus the cost of
+    starting a new root helper process each time.
+
+    A daemon process runs one command at a time, so up to pool_size of
+    them are started on demand, and a slow command does not hold back the
+    commands of the other green threads.
+    """
+
+    def __init__(self, daemon_cmd, pool_size=1):
+        self.daemon_cmd = daemon_cmd
+        # Processes waiting for a request
+        self._idle_processes = []
+        self._slots = semaphore.Semaphore(max(pool_size, 1))
+
+    def _get_process(self):
+        while self._idle_processes:
+            process = self._idle_processes.pop()
+            if process.poll() is None:
+                return process
+            self._stop_process(process)
+        LOG.debug(_("Starting root helper daemon: %s"), self.daemon_cmd)
+        return utils.subprocess_popen(shlex.split(self.daemon_cmd),
+                                      stdin=subprocess.PIPE,
+                                      stdout=subprocess.PIPE)
+
+    def _stop_process(self, process):
+        try:
+            process.stdin.close()
+        except IOError:
+            pass
+
+    def execute(self, cmd, process_input=None):
+        """Run cmd in the daemon and return (returncode, stdout, stderr)."""
+        if process_input is not None:
+            process_input = process_input.decode('latin-1')
+        request = jsonutils.dumps({'cmd': cmd,
+                                   'process_input': process_input})
+        with self._slots:
+            process = self._get_process()
+            response = None
+            try:
+                process.stdin.write(request + '\n')
+                process.stdin.flush()
+                response = process.stdout.readline()
+            except IOError:
+                pass
+            finally:
+                # A process which did not answer may still be writing the
+                # response, so it is never given another request
+                if response:
+                    self._idle_processes.append(process)
+                else:
+                    self._stop_process(process)
+            if not response:
+                raise RuntimeError(_("Root helper daemon exited while "
+                                     "running %s") % cmd)
+        response = jsonutils.loads(response)
+        return (response['returncode'],
+                response['stdout'].encode('latin-1'),
+                response['stderr'].encode('latin-1'))
+
+
+_root_helper_daemons = {}
+
+
+def get_root_helper_daemon():
+    """Return the configured root helper daemon, if any."""
+    try:
+        daemon_cmd = cfg.CONF.AGENT.root_helper_daemon
+    except cfg.NoSuchOptError:
+        return
+    if not daemon_cmd:
+        return
+    if daemon_cmd not in _root_helper_daemons:
+        _root_helper_daemons[daemon_cmd] = RootHelperDaemon(
+            daemon_cmd, cfg.CONF.AGENT.root_helper_daemon_pool_size)
+    return _root_helper_daemons[daemon_cmd]
+
+
+def execute(cmd, root_helper=None, process_input=None, addl_env=None,
+            check_exit_code=True, return_stderr=False):
+    # The root helper daemon runs commands in its own environment, so
+    # commands needing additional environment variables are forked as usual
+    daemon = root_helper and not addl_env and get_root_helper_daemon()
+    if daemon:
+        cmd = map(str, cmd)
+        LOG.debug(_("Running command via root helper daemon: %s"), cmd)
+        returncode, _stdout, _stderr = daemon.execute(cmd, process_input)
+    else:
+        obj, cmd = create_process(cmd, root_helper=root_helper,
+                                  addl_env=addl_env)
+        _stdout, _stderr = (process_input and
+                            obj.communicate(process_input) or
+                            obj.communicate())
+        obj.stdin.close()
+        returncode = obj.returncode
     m = _("\nCommand: %(cmd)s\nExit code: %(code)s\nStdout: %(stdout)r\n"
-          "Stderr: %(stderr)r") % {'cmd': cmd, 'code': obj.returncode,
+          "Stderr: %(stderr)r") % {'cmd': cmd, 'code': returncode,
                                    'stdout': _stdout, 'stderr': _stderr}
     LOG.debug(m)
-    if obj.returncode and check_exit_code:
+    if returncode and check_exit_code:
         raise RuntimeError(m)
 
     return return_stderr and (_stdout, _stderr) or _stdout
@@ -89,3 +197,18 @@ def replace_file(file_name, data):
     tmp_file.close()
     os.chmod(tmp_file.name, 0o644)
     os.rename(tmp_file.name, file_name)
+
+
+def find_child_pids(pid):
+    """Retrieve a list of the pids of child processes of the given pid."""
+
+    try:
+        raw_pids = execute(['ps', '--ppid', pid, '-o', 'pid='])
+    except RuntimeError as e:
+        # Exception has already been logged by execute
+        no_children_found = 'Exit code: 1' in str(e)
+        if no_children_found:
+            return []
+        # Unexpected errors are the responsibility of the caller
+        raise
+    return [x.strip() for x in raw_pids.split('\n') if x.strip()]
@@ -16,13 +16,17 @@
 #
 # @author: Mark McClain, DreamHost
 
+import collections
 import hashlib
 import hmac
+import itertools
 import os
 import socket
+import time
 import urlparse
 
 import eventlet
+from eventlet import pools
 import httplib2
 from neutronclient.v2_0 import client
 from oslo.config import cfg
@@ -38,6 +42,66 @@ LOG = logging.getLogger(__name__)
 DEVICE_OWNER_ROUTER_INTF = "network:router_interface"
 
 
+class InstanceIdCache(object):
+    """LRU cache of instance ids with a time to live.
+
+    Entries are keyed by the network or router id of the request along
+    with the address of the instance.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        # key -> (instance id, expiry time, last use)
+        self._entries = {}
+        # (use, key) in the order of use, oldest first.  An entry used
+        # again leaves a stale item behind, skipped when evicting.
+        self._uses = collections.deque()
+        self._use_counter = itertools.count()
+
+    def _use(self, key, instance_id, expires):
+        use = next(self._use_counter)
+        self._entries[key] = (instance_id, expires, use)
+        self._uses.append((use, key))
+        if len(self._uses) > 2 * self.size:
+            # drop the stale items
+            self._uses = collections.deque(sorted(
+                (entry[2], key) for key, entry in self._entries.items()))
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if not entry:
+            return
+        instance_id, expires, use = entry
+        if expires < time.time():
+            del self._entries[key]
+            return
+        # Move the entry to the most recently used end
+        self._use(key, instance_id, expires)
+        return instance_id
+
+    def set(self, key, instance_id):
+        if self.size <= 0:
+            return
+        self._entries.pop(key, None)
+        while len(self._entries) >= self.size:
+            use, old_key = self._uses.popleft()
+            entry = self._entries.get(old_key)
+            if entry and entry[2] == use:
+                del self._entries[old_key]
+        self._use(key, instance_id, time.time() + self.ttl)
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+
+class HttpPool(pools.Pool):
+    """Pool of keep-alive HTTP clients to the Nova metadata server."""
+
+    def create(self):
+        return httplib2.Http()
+
+
 class MetadataProxyHandler(object):
     OPTS = [
         cfg.StrOpt('admin_user',
@@ -65,12 +129,32 @@ class MetadataProxyHandler(object):
         cfg.StrOpt('metadata_proxy_shared_secret',
                    default='',
                    help=_('Shared secret to sign instance-id request'),
-                   secret=True)
+                   secret=True),
+        cfg.IntOpt('metadata_cache_size', default=1024,
+                   help=_("Number of instance ids looked up from the "
+                          "address of metadata requests to cache, 0 "
+                          "disables the cache")),
+        cfg.IntOpt('metadata_cache_ttl', default=5,
+                   help=_("Seconds an instance id looked up from the "
+                          "address of metadata requests stays cached")),
+        cfg.IntOpt('nova_metadata_pool_size', default=16,
+                   help=_("Maximum number of connections kept open to the "
+                          "Nova metadata server")),
+        cfg.IntOpt('metadata_stats_interval', default=300,
+                   help=_("Seconds between logging the metadata proxy "
+                          "cache and upstream request statistics, 0 "
+                          "disables them")),
     ]
 
     def __init__(self, conf):
         self.conf = conf
         self.auth_info = {}
+        self.instance_ids = InstanceIdCache(conf.metadata_cache_size,
+                                            conf.metadata_cache_ttl)
+        self.http_pool = HttpPool(max_size=conf.nova_metadata_pool_size)
+        self.stats = {'cache_hits': 0, 'cache_misses': 0,
+                      'upstream_requests': 0, 'upstream_time': 0.0}
+        self._stats_logged = time.time()
 
     def _get_neutron_client(self):
         qclient = client.Client(
@@ -103,7 +187,24 @@ class MetadataProxyHandler(object):
                     'Please try your request again.')
             return webob.exc.HTTPInternalServerError(explanation=unicode(msg))
 
+    def _get_cache_key(self, req):
+        return (req.headers.get('X-Neutron-Network-ID') or
+                req.headers.get('X-Neutron-Router-ID'),
+                req.headers.get('X-Forwarded-For'))
+
     def _get_instance_id(self, req):
+        cache_key = self._get_cache_key(req)
+        instance_id = self.instance_ids.get(cache_key)
+        if instance_id:
+            self.stats['cache_hits'] += 1
+            return instance_id
+        self.stats['cache_misses'] += 1
+        instance_id = self._lookup_instance_id(req)
+        if instance_id:
+            self.instance_ids.set(cache_key, instance_id)
+        return instance_id
+
+    def _lookup_instance_id(self, req):
         qclient = self._get_neutron_client()
 
         remote_address = req.headers.get('X-Forwarded-For')
@@ -143,9 +244,11 @@ class MetadataProxyHandler(object):
             req.query_string,
             ''))
 
-        h = httplib2.Http()
-        resp, content = h.request(url, method=req.method, headers=headers,
-                                  body=req.body)
+        start = time.time()
+        with self.http_pool.item() as h:
+            resp, content = h.request(url, method=req.method,
+                                      headers=headers, body=req.body)
+        self._record_upstream_request(time.time() - start)
 
         if resp.status == 200:
             LOG.debug(str(resp))
@@ -158,6 +261,8 @@ class MetadataProxyHandler(object):
             LOG.warn(msg)
             return webob.exc.HTTPForbidden()
         elif resp.status == 404:
+            # The instance might be gone, look it up again next time
+            self.instance_ids.invalidate(self._get_cache_key(req))
             return webob.exc.HTTPNotFound()
         elif resp.status == 409:
             return webob.exc.HTTPConflict()
@@ -170,6 +275,21 @@ class MetadataProxyHandler(object):
         else:
             raise Exception(_('Unexpected response code: %s') % resp.status)
 
+    def _record_upstream_request(self, duration):
+        self.stats['upstream_requests'] += 1
+        self.stats['upstream_time'] += duration
+        interval = self.conf.metadata_stats_interval
+        now = time.time()
+        if interval > 0 and now - self._stats_logged >= interval:
+            self._stats_logged = now
+            requests = self.stats['upstream_requests']
+            LOG.info(_("Metadata proxy statistics: %(cache_hits)d instance "
+                       "id cache hits, %(cache_misses)d misses, "
+                       "%(upstream_requests)d requests to the Nova metadata "
+                       "server taking %(average).3f seconds on average"),
+                     dict(self.stats,
+                          average=self.stats['upstream_time'] / requests))
+
     def _sign_instance_id(self, instance_id):
         return hmac.new(self.conf.metadata_proxy_shared_secret,
                         instance_id,
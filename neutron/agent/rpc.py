@@ -17,6 +17,8 @@
 
 import itertools
 
+from oslo.config import cfg
+
 from neutron.common import topics
 
 from neutron.openstack.common import log as logging
@@ -27,6 +29,25 @@ from neutron.openstack.common import timeutils
 
 LOG = logging.getLogger(__name__)
 
+device_rpc_opts = [
+    cfg.IntOpt('device_rpc_batch_size', default=100,
+               help=_("Maximum number of devices whose details are "
+                      "requested, or which are reported up or down, in a "
+                      "single RPC call to the plugin")),
+]
+cfg.CONF.register_opts(device_rpc_opts, 'AGENT')
+
+# version of the plugin RPC API with the calls handling lists of devices
+DEVICE_LIST_RPC_VERSION = '1.2'
+
+
+def get_device_batches(devices):
+    """Split devices into lists of at most device_rpc_batch_size devices."""
+    devices = list(devices)
+    batch_size = max(cfg.CONF.AGENT.device_rpc_batch_size, 1)
+    return [devices[index:index + batch_size]
+            for index in range(0, len(devices), batch_size)]
+
 
 def create_consumers(dispatcher, prefix, topic_details):
     """Create agent RPC consumers.
@@ -79,6 +100,8 @@ class PluginApi(proxy.RpcProxy):
 
     API version history:
         1.0 - Initial version.
+        1.2 - Added get_devices_details_list, update_devices_up and
+              update_devices_down.
 
     '''
 
@@ -94,6 +117,13 @@ class PluginApi(proxy.RpcProxy):
                                        agent_id=agent_id),
                          topic=self.topic)
 
+    def get_devices_details_list(self, context, devices, agent_id):
+        return self.call(context,
+                         self.make_msg('get_devices_details_list',
+                                       devices=devices, agent_id=agent_id),
+                         topic=self.topic,
+                         version=DEVICE_LIST_RPC_VERSION)
+
     def update_device_down(self, context, device, agent_id, host=None):
         return self.call(context,
                          self.make_msg('update_device_down', device=device,
@@ -106,6 +136,20 @@ class PluginApi(proxy.RpcProxy):
                                        agent_id=agent_id, host=host),
                          topic=self.topic)
 
+    def update_devices_down(self, context, devices, agent_id, host=None):
+        return self.call(context,
+                         self.make_msg('update_devices_down', devices=devices,
+                                       agent_id=agent_id, host=host),
+                         topic=self.topic,
+                         version=DEVICE_LIST_RPC_VERSION)
+
+    def update_devices_up(self, context, devices, agent_id, host=None):
+        return self.call(context,
+                         self.make_msg('update_devices_up', devices=devices,
+                                       agent_id=agent_id, host=host),
+                         topic=self.topic,
+                         version=DEVICE_LIST_RPC_VERSION)
+
     def tunnel_sync(self, context, tunnel_ip, tunnel_type=None):
         return self.call(context,
                          self.make_msg('tunnel_sync', tunnel_ip=tunnel_ip,
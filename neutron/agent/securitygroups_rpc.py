@@ -21,6 +21,7 @@ from oslo.config import cfg
 from neutron.common import topics
 from neutron.openstack.common import importutils
 from neutron.openstack.common import log as logging
+from neutron.openstack.common.rpc import common as rpc_common
 
 LOG = logging.getLogger(__name__)
 SG_RPC_VERSION = "1.1"
@@ -29,7 +30,14 @@ security_group_opts = [
     cfg.StrOpt(
         'firewall_driver',
         default='neutron.agent.firewall.NoopFirewallDriver',
-        help=_('Driver for Security Groups Firewall'))
+        help=_('Driver for Security Groups Firewall')),
+    cfg.BoolOpt(
+        'enable_ipset',
+        default=False,
+        help=_('Match the members of remote security groups with ipsets, '
+               'updated in place when the members change, instead of one '
+               'iptables rule per member. Only used by the iptables '
+               'firewall drivers, which then require the ipset utility.'))
 ]
 cfg.CONF.register_opts(security_group_opts, 'SECURITYGROUP')
 
@@ -57,6 +65,15 @@ class SecurityGroupServerRpcApiMixin(object):
                          version=SG_RPC_VERSION,
                          topic=self.topic)
 
+    def security_group_info_for_devices(self, context, devices):
+        LOG.debug(_("Get security group information "
+                    "for devices via rpc %r"), devices)
+        return self.call(context,
+                         self.make_msg('security_group_info_for_devices',
+                                       devices=devices),
+                         version=SG_RPC_VERSION,
+                         topic=self.topic)
+
 
 class SecurityGroupAgentRpcCallbackMixin(object):
     """A mix-in that enable SecurityGroup agent
@@ -111,14 +128,48 @@ class SecurityGroupAgentRpcMixin(object):
         firewall_driver = cfg.CONF.SECURITYGROUP.firewall_driver
         LOG.debug(_("Init firewall settings (driver=%s)"), firewall_driver)
         self.firewall = importutils.import_object(firewall_driver)
+        # cleared if the server turns out not to support it
+        self.use_security_group_info = (
+            self.firewall.supports_security_group_info)
+
+    def _get_devices_info(self, device_ids):
+        """Return the devices to filter, by port id.
+
+        When possible, the rules of their security groups and the members
+        of the remote groups are fetched separately and handed to the
+        firewall, instead of being expanded into rules for each port.
+        """
+        if self.use_security_group_info:
+            try:
+                info = self.plugin_rpc.security_group_info_for_devices(
+                    self.context, device_ids)
+            except (AttributeError, rpc_common.RemoteError) as e:
+                # The missing method error of the server is deserialized
+                # back into an AttributeError, or into a RemoteError when
+                # the builtin exceptions are not allowed
+                if (isinstance(e, rpc_common.RemoteError) and
+                        e.exc_type != 'AttributeError'):
+                    raise
+                LOG.info(_("Security group information RPC not supported "
+                           "by the server, falling back to the rules "
+                           "of each device"))
+                self.use_security_group_info = False
+            else:
+                for sg_id, rules in info['security_groups'].items():
+                    self.firewall.update_security_group_rules(sg_id, rules)
+                for sg_id, member_ips in info['sg_member_ips'].items():
+                    self.firewall.update_security_group_members(sg_id,
+                                                                member_ips)
+                return info['devices']
+        return self.plugin_rpc.security_group_rules_for_devices(
+            self.context, device_ids)
 
     def prepare_devices_filter(self, device_ids):
         if not device_ids:
             return
         LOG.info(_("Preparing filters for devices %s"), device_ids)
-        devices = self.plugin_rpc.security_group_rules_for_devices(
-            self.context, list(device_ids))
         with self.firewall.defer_apply():
+            devices = self._get_devices_info(list(device_ids))
             for device in devices.values():
                 self.firewall.prepare_port_filter(device)
 
@@ -132,11 +183,18 @@ class SecurityGroupAgentRpcMixin(object):
     def security_groups_member_updated(self, security_groups):
         LOG.info(_("Security group "
                    "member updated %r"), security_groups)
+        if (self.use_security_group_info and
+                self.firewall.updates_members_in_place):
+            refresh = self.refresh_security_group_members
+        else:
+            refresh = self.refresh_firewall
         self._security_group_updated(
             security_groups,
-            'security_group_source_groups')
+            'security_group_source_groups',
+            refresh)
 
-    def _security_group_updated(self, security_groups, attribute):
+    def _security_group_updated(self, security_groups, attribute,
+                                refresh=None):
         devices = []
         sec_grp_set = set(security_groups)
         for device in self.firewall.ports.values():
@@ -144,7 +202,7 @@ class SecurityGroupAgentRpcMixin(object):
                 devices.append(device)
 
         if devices:
-            self.refresh_firewall(devices)
+            (refresh or self.refresh_firewall)(devices)
 
     def security_groups_provider_updated(self):
         LOG.info(_("Provider rule updated"))
@@ -161,6 +219,20 @@ class SecurityGroupAgentRpcMixin(object):
                     continue
                 self.firewall.remove_port_filter(device)
 
+    def refresh_security_group_members(self, devices):
+        """Update the remote group members of the devices in place.
+
+        The port filters are left alone, unless the server turns out to
+        only send the rules of each device.
+        """
+        LOG.info(_("Refresh security group members"))
+        device_ids = [d['device'] for d in devices]
+        devices = self._get_devices_info(device_ids)
+        if not self.use_security_group_info:
+            with self.firewall.defer_apply():
+                for device in devices.values():
+                    self.firewall.update_port_filter(device)
+
     def refresh_firewall(self, devices=None):
         LOG.info(_("Refresh firewall rules"))
 
@@ -171,9 +243,8 @@ class SecurityGroupAgentRpcMixin(object):
         if not device_ids:
             LOG.info(_("No ports here to refresh firewall"))
             return
-        devices = self.plugin_rpc.security_group_rules_for_devices(
-            self.context, device_ids)
         with self.firewall.defer_apply():
+            devices = self._get_devices_info(device_ids)
             for device in devices.values():
                 LOG.debug(_("Update port filter for %s"), device['device'])
                 self.firewall.update_port_filter(device)
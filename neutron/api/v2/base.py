@@ -25,6 +25,7 @@ from neutron.api.rpc.agentnotifiers import dhcp_rpc_agent_api
 from neutron.api.v2 import attributes
 from neutron.api.v2 import resource as wsgi_resource
 from neutron.common import exceptions
+from neutron.db import api as db_api
 from neutron.openstack.common import log as logging
 from neutron.openstack.common.notifier import api as notifier_api
 from neutron import policy
@@ -117,41 +118,61 @@ class Controller(object):
                                     % self._plugin.__class__.__name__)
         return getattr(self._plugin, native_sorting_attr_name, False)
 
-    def _is_visible(self, context, attr_name, data):
-        action = "%s:%s" % (self._plugin_handlers[self.SHOW], attr_name)
-        # Optimistically init authz_check to True
-        authz_check = True
-        try:
-            attr = (attributes.RESOURCE_ATTRIBUTE_MAP
-                    [self._collection].get(attr_name))
-            if attr and attr.get('enforce_policy'):
-                authz_check = policy.check_if_exists(
-                    context, action, data)
-        except KeyError:
-            # The extension was not configured for adding its resources
-            # to the global resource attribute map. Policy check should
-            # not be performed
-            LOG.debug(_("The resource %(resource)s was not found in the "
-                        "RESOURCE_ATTRIBUTE_MAP; unable to perform authZ "
-                        "check for attribute %(attr)s"),
-                      {'resource': self._collection,
-                       'attr': attr_name})
-        except exceptions.PolicyRuleNotFound:
-            LOG.debug(_("Policy rule:%(action)s not found. Assuming no "
-                        "authZ check is defined for %(attr)s"),
-                      {'action': action,
-                       'attr': attr_name})
-        attr_val = self._attr_info.get(attr_name)
-        return attr_val and attr_val['is_visible'] and authz_check
-
-    def _view(self, context, data, fields_to_strip=None):
+    def _get_visibility_plan(self, context):
+        """Work out which attributes can be shown in the given context.
+
+        Returns a dict mapping each attribute name to True or False when
+        its visibility is the same for every resource, or to the policy
+        action which must be checked against each resource otherwise.
+        """
+        plan = {}
+        for attr_name, attr_val in self._attr_info.iteritems():
+            if not attr_val['is_visible']:
+                plan[attr_name] = False
+                continue
+            action = "%s:%s" % (self._plugin_handlers[self.SHOW], attr_name)
+            # Optimistically init visibility to True
+            plan[attr_name] = True
+            try:
+                attr = (attributes.RESOURCE_ATTRIBUTE_MAP
+                        [self._collection].get(attr_name))
+                if attr and attr.get('enforce_policy'):
+                    if policy.depends_on_target(action):
+                        plan[attr_name] = action
+                    else:
+                        plan[attr_name] = policy.check(context, action, {})
+            except KeyError:
+                # The extension was not configured for adding its resources
+                # to the global resource attribute map. Policy check should
+                # not be performed
+                LOG.debug(_("The resource %(resource)s was not found in the "
+                            "RESOURCE_ATTRIBUTE_MAP; unable to perform authZ "
+                            "check for attribute %(attr)s"),
+                          {'resource': self._collection,
+                           'attr': attr_name})
+            except exceptions.PolicyRuleNotFound:
+                LOG.debug(_("Policy rule:%(action)s not found. Assuming no "
+                            "authZ check is defined for %(attr)s"),
+                          {'action': action,
+                           'attr': attr_name})
+        return plan
+
+    def _is_visible(self, context, plan, attr_name, data):
+        visible = plan.get(attr_name, False)
+        if visible is True or visible is False:
+            return visible
+        return policy.check(context, visible, data)
+
+    def _view(self, context, data, fields_to_strip=None, plan=None):
         # make sure fields_to_strip is iterable
         if not fields_to_strip:
             fields_to_strip = []
+        if plan is None:
+            plan = self._get_visibility_plan(context)
 
         return dict(item for item in data.iteritems()
-                    if (self._is_visible(context, item[0], data) and
-                        item[0] not in fields_to_strip))
+                    if (item[0] not in fields_to_strip and
+                        self._is_visible(context, plan, item[0], data)))
 
     def _do_field_list(self, original_fields):
         fields_to_add = None
@@ -224,6 +245,13 @@ class Controller(object):
         if parent_id:
             kwargs[self._parent_id_name] = parent_id
         obj_getter = getattr(self._plugin, self._plugin_handlers[self.LIST])
+        if self._can_stream_items(pagination_helper, parent_id):
+            if (original_fields and
+                    self._primary_key not in original_fields):
+                original_fields.append(self._primary_key)
+                fields_to_add.append(self._primary_key)
+            return {self._collection: self._iter_items(
+                request, obj_getter, kwargs, do_authz, fields_to_add)}
         obj_list = obj_getter(request.context, **kwargs)
         obj_list = sorting_helper.sort(obj_list)
         obj_list = pagination_helper.paginate(obj_list)
@@ -232,14 +260,14 @@ class Controller(object):
             # FIXME(salvatore-orlando): obj_getter might return references to
             # other resources. Must check authZ on them too.
             # Omit items from list that should not be visible
-            obj_list = [obj for obj in obj_list
-                        if policy.check(request.context,
-                                        self._plugin_handlers[self.SHOW],
-                                        obj,
-                                        plugin=self._plugin)]
+            obj_list = policy.check_many(request.context,
+                                         self._plugin_handlers[self.SHOW],
+                                         obj_list)
+        plan = self._get_visibility_plan(request.context)
         collection = {self._collection:
                       [self._view(request.context, obj,
-                                  fields_to_strip=fields_to_add)
+                                  fields_to_strip=fields_to_add,
+                                  plan=plan)
                        for obj in obj_list]}
         pagination_links = pagination_helper.get_links(obj_list)
         if pagination_links:
@@ -247,6 +275,51 @@ class Controller(object):
 
         return collection
 
+    def _can_stream_items(self, pagination_helper, parent_id):
+        return (cfg.CONF.list_batch_size > 0 and not parent_id and
+                self._allow_pagination and self._allow_sorting and
+                self._native_pagination and self._native_sorting and
+                not getattr(pagination_helper, 'limit', None))
+
+    def _iter_items(self, request, obj_getter, kwargs, do_authz,
+                    fields_to_strip):
+        """Returns a generator of the formatted elements of the entity.
+
+        The plugin is asked for list_batch_size elements at a time, each
+        batch starting after the last element of the previous one, so
+        only a batch is held in memory while the response is streamed.
+        The first batch is fetched before returning, for the errors of
+        the request to be raised by the controller.
+        """
+        batch_size = cfg.CONF.list_batch_size
+        sorts = list(kwargs.get('sorts') or [])
+        if self._primary_key not in dict(sorts):
+            sorts.append((self._primary_key, True))
+        kwargs.update({'sorts': sorts, 'limit': batch_size,
+                       'marker': None, 'page_reverse': False})
+        obj_list = obj_getter(request.context, **kwargs)
+        plan = self._get_visibility_plan(request.context)
+
+        def _iter_batches(obj_list):
+            while True:
+                visible = obj_list
+                if do_authz:
+                    visible = policy.check_many(
+                        request.context, self._plugin_handlers[self.SHOW],
+                        obj_list)
+                for obj in visible:
+                    yield self._view(request.context, obj,
+                                     fields_to_strip=fields_to_strip,
+                                     plan=plan)
+                if len(obj_list) < batch_size:
+                    return
+                kwargs['marker'] = obj_list[-1][self._primary_key]
+                with db_api.slave_reads(request.context,
+                                        self._plugin_handlers[self.LIST],
+                                        obj_getter):
+                    obj_list = obj_getter(request.context, **kwargs)
+        return _iter_batches(obj_list)
+
     def _item(self, request, id, do_authz=False, field_list=None,
               parent_id=None):
         """Retrieves and formats a single element of the requested entity."""
@@ -270,10 +343,19 @@ class Controller(object):
     def index(self, request, **kwargs):
         """Returns a list of the requested entity."""
         parent_id = kwargs.get(self._parent_id_name)
-        return self._items(request, True, parent_id)
+        action = self._plugin_handlers[self.LIST]
+        with db_api.slave_reads(request.context, action,
+                                getattr(self._plugin, action)):
+            return self._items(request, True, parent_id)
 
     def show(self, request, id, **kwargs):
         """Returns detailed information about the requested entity."""
+        action = self._plugin_handlers[self.SHOW]
+        with db_api.slave_reads(request.context, action,
+                                getattr(self._plugin, action)):
+            return self._show(request, id, **kwargs)
+
+    def _show(self, request, id, **kwargs):
         try:
             # NOTE(salvatore-orlando): The following ensures that fields
             # which are needed for authZ policy validation are not stripped
@@ -297,6 +379,7 @@ class Controller(object):
 
     def _emulate_bulk_create(self, obj_creator, request, body, parent_id=None):
         objs = []
+        plan = self._get_visibility_plan(request.context)
         try:
             for item in body[self._collection]:
                 kwargs = {self._resource: item}
@@ -304,7 +387,8 @@ class Controller(object):
                     kwargs[self._parent_id_name] = parent_id
                 objs.append(self._view(request.context,
                                        obj_creator(request.context,
-                                                   **kwargs)))
+                                                   **kwargs),
+                                       plan=plan))
             return objs
         # Note(salvatore-orlando): broad catch as in theory a plugin
         # could raise any kind of exception
@@ -391,7 +475,9 @@ class Controller(object):
             # plugin does atomic bulk create operations
             obj_creator = getattr(self._plugin, "%s_bulk" % action)
             objs = obj_creator(request.context, body, **kwargs)
-            return notify({self._collection: [self._view(request.context, obj)
+            plan = self._get_visibility_plan(request.context)
+            return notify({self._collection: [self._view(request.context, obj,
+                                                         plan=plan)
                                               for obj in objs]})
         else:
             obj_creator = getattr(self._plugin, action)
@@ -17,6 +17,8 @@
 Utility methods for working with WSGI servers redux
 """
 
+import types
+
 import netaddr
 import webob.dec
 import webob.exc
@@ -131,6 +133,12 @@ def Resource(controller, faults=None, deserializers=None, serializers=None):
             content_type = ''
             body = None
 
+        if isinstance(body, types.GeneratorType):
+            # NOTE: the length of a streamed body is not known, the
+            # server sends it with chunked transfer encoding
+            return webob.Response(request=request, status=status,
+                                  content_type=content_type,
+                                  app_iter=body)
         return webob.Response(request=request, status=status,
                               content_type=content_type,
                               body=body)
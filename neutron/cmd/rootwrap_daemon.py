@@ -0,0 +1,143 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Long-lived root wrapper for Neutron agents
+
+   Applies the same filters as neutron-rootwrap, but loads them once and
+   then serves any number of commands read from stdin, so that agents do
+   not pay for a sudo and Python interpreter startup on every privileged
+   command.
+
+   Each request is a single line holding a JSON object with the command
+   arguments ("cmd") and optional data to feed to the command's stdin
+   ("process_input").  Each response is a single line holding a JSON object
+   with the "returncode", "stdout" and "stderr" of the command.  Command
+   output and input are transported as latin-1 decoded strings so that
+   arbitrary bytes survive the JSON encoding.
+
+   To use this with neutron agents, set the following in the [AGENT]
+   section of the agent configuration:
+   root_helper_daemon=sudo neutron-rootwrap-daemon /etc/neutron/rootwrap.conf
+
+   and let the neutron user run it as root in sudoers:
+   neutron ALL = (root) NOPASSWD: /usr/bin/neutron-rootwrap-daemon
+                                   /etc/neutron/rootwrap.conf
+
+   Filter definitions are only read at startup, so agents must be restarted
+   for filter changes to take effect.
+"""
+
+from __future__ import print_function
+
+import ConfigParser
+import json
+import logging
+import os
+import pwd
+import subprocess
+import sys
+
+from neutron.openstack.common.rootwrap import cmd
+from neutron.openstack.common.rootwrap import wrapper
+
+
+def _response(returncode, stdout='', stderr=''):
+    return {'returncode': returncode,
+            'stdout': stdout.decode('latin-1'),
+            'stderr': stderr.decode('latin-1')}
+
+
+def run_command(execname, config, filters, request):
+    """Run a single request through the filters and return its response."""
+    userargs = [arg.encode('utf-8') for arg in request['cmd']]
+    process_input = request.get('process_input')
+    if process_input is not None:
+        process_input = process_input.encode('latin-1')
+
+    try:
+        filtermatch = wrapper.match_filter(filters, userargs,
+                                           exec_dirs=config.exec_dirs)
+        command = filtermatch.get_command(userargs,
+                                          exec_dirs=config.exec_dirs)
+        if config.use_syslog:
+            logging.info("(%s > %s) Executing %s (filter match = %s)" % (
+                cmd._getlogin(), pwd.getpwuid(os.getuid())[0],
+                command, filtermatch.name))
+
+        obj = subprocess.Popen(command,
+                               stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               preexec_fn=cmd._subprocess_setup,
+                               close_fds=True,
+                               env=filtermatch.get_environment(userargs))
+        stdout, stderr = obj.communicate(process_input)
+        return _response(obj.returncode, stdout, stderr)
+
+    except wrapper.FilterMatchNotExecutable as exc:
+        msg = ("Executable not found: %s (filter match = %s)"
+               % (exc.match.exec_path, exc.match.name))
+        returncode = cmd.RC_NOEXECFOUND
+
+    except wrapper.NoFilterMatched:
+        msg = ("Unauthorized command: %s (no filter matched)"
+               % ' '.join(userargs))
+        returncode = cmd.RC_UNAUTHORIZED
+
+    except OSError as exc:
+        msg = "Unable to execute %s: %s" % (' '.join(userargs), exc)
+        returncode = cmd.RC_NOEXECFOUND
+
+    if config.use_syslog:
+        logging.error(msg)
+    return _response(returncode, stderr="%s: %s\n" % (execname, msg))
+
+
+def serve(execname, config, filters, stdin, stdout):
+    for line in iter(stdin.readline, ''):
+        request = json.loads(line)
+        response = run_command(execname, config, filters, request)
+        stdout.write(json.dumps(response) + '\n')
+        stdout.flush()
+
+
+def main():
+    execname = sys.argv.pop(0)
+    if len(sys.argv) != 1:
+        cmd._exit_error(execname, "No configuration file specified",
+                        cmd.RC_BADCONFIG, log=False)
+
+    configfile = sys.argv.pop(0)
+    try:
+        rawconfig = ConfigParser.RawConfigParser()
+        rawconfig.read(configfile)
+        config = wrapper.RootwrapConfig(rawconfig)
+    except ValueError as exc:
+        msg = "Incorrect value in %s: %s" % (configfile, exc.message)
+        cmd._exit_error(execname, msg, cmd.RC_BADCONFIG, log=False)
+    except ConfigParser.Error:
+        cmd._exit_error(execname,
+                        "Incorrect configuration file: %s" % configfile,
+                        cmd.RC_BADCONFIG, log=False)
+
+    if config.use_syslog:
+        wrapper.setup_syslog(execname,
+                             config.syslog_log_facility,
+                             config.syslog_log_level)
+
+    filters = wrapper.load_filters(config.filters_path)
+    serve(execname, config, filters, sys.stdin, sys.stdout)
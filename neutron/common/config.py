@@ -65,12 +65,23 @@ core_opts = [
                help=_("The maximum number of items returned in a single "
                       "response, value was 'infinite' or negative integer "
                       "means no limit")),
+    cfg.IntOpt('list_batch_size', default=0,
+               help=_("The number of items fetched at a time from the "
+                      "plugin when a list is requested without a limit, "
+                      "the list being streamed in the response. 0 means "
+                      "the whole list is fetched at once")),
     cfg.IntOpt('max_dns_nameservers', default=5,
                help=_("Maximum number of DNS nameservers")),
     cfg.IntOpt('max_subnet_host_routes', default=20,
                help=_("Maximum number of host routes per subnet")),
     cfg.IntOpt('max_fixed_ips_per_port', default=5,
                help=_("Maximum number of fixed ips per port")),
+    cfg.StrOpt('ipam_backend',
+               help=_("Class of the IP address management backend used by "
+                      "the db plugin. The default keeps free addresses in "
+                      "the IP availability range tables. Availability "
+                      "ranges are not maintained while another backend is "
+                      "in use.")),
     cfg.IntOpt('dhcp_lease_duration', default=86400,
                deprecated_name='dhcp_lease_time',
                help=_("DHCP lease duration")),
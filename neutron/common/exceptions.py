@@ -301,3 +301,7 @@ class NetworkVlanRangeError(NeutronException):
 
 class NetworkVxlanPortRangeError(object):
     message = _("Invalid network VXLAN port range: '%(vxlan_range)s'")
+
+
+class SlaveDatabaseWrite(NeutronException):
+    message = _("Changes can not be written to the slave database")
@@ -15,6 +15,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import time
+
+from oslo.config import cfg
+
 from neutron import context
 from neutron.openstack.common import log as logging
 from neutron.openstack.common.rpc import dispatcher
@@ -22,6 +27,14 @@ from neutron.openstack.common.rpc import dispatcher
 
 LOG = logging.getLogger(__name__)
 
+rpc_stats_opts = [
+    cfg.IntOpt('rpc_stats_interval', default=300,
+               help=_("Seconds between logs of the number and duration of "
+                      "the RPC requests handled by each server process. "
+                      "0 disables the logs.")),
+]
+cfg.CONF.register_opts(rpc_stats_opts)
+
 
 class PluginRpcDispatcher(dispatcher.RpcDispatcher):
     """This class is used to convert RPC common context into
@@ -30,6 +43,29 @@ class PluginRpcDispatcher(dispatcher.RpcDispatcher):
 
     def __init__(self, callbacks):
         super(PluginRpcDispatcher, self).__init__(callbacks)
+        self._stats = {}
+        self._stats_started = time.time()
+
+    def _record_request(self, method, duration):
+        stats = self._stats.setdefault(method, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+
+        interval = cfg.CONF.rpc_stats_interval
+        now = time.time()
+        if interval <= 0 or now - self._stats_started < interval:
+            return
+        for method, (count, total, longest) in sorted(self._stats.items()):
+            LOG.info(_("RPC stats for process %(pid)d: %(method)s handled "
+                       "%(count)d times in the last %(interval)d seconds, "
+                       "%(average).3f seconds on average, %(longest).3f "
+                       "at most"),
+                     {'pid': os.getpid(), 'method': method, 'count': count,
+                      'interval': now - self._stats_started,
+                      'average': total / count, 'longest': longest})
+        self._stats = {}
+        self._stats_started = now
 
     def dispatch(self, rpc_ctxt, version, method, namespace, **kwargs):
         rpc_ctxt_dict = rpc_ctxt.to_dict()
@@ -40,5 +76,9 @@ class PluginRpcDispatcher(dispatcher.RpcDispatcher):
         if not tenant_id:
             tenant_id = rpc_ctxt_dict.pop('project_id', None)
         neutron_ctxt = context.Context(user_id, tenant_id, **rpc_ctxt_dict)
-        return super(PluginRpcDispatcher, self).dispatch(
-            neutron_ctxt, version, method, namespace, **kwargs)
+        start = time.time()
+        try:
+            return super(PluginRpcDispatcher, self).dispatch(
+                neutron_ctxt, version, method, namespace, **kwargs)
+        finally:
+            self._record_request(method, time.time() - start)
@@ -17,6 +17,7 @@
 
 """Context: context for security/db session."""
 
+import contextlib
 import copy
 
 from datetime import datetime
@@ -55,6 +56,8 @@ class ContextBase(common_context.RequestContext):
             timestamp = datetime.utcnow()
         self.timestamp = timestamp
         self._session = None
+        self._slave_session = None
+        self._slave_reads = False
         self.roles = roles or []
         if self.is_admin is None:
             self.is_admin = policy.check_is_admin(self)
@@ -129,10 +132,37 @@ class ContextBase(common_context.RequestContext):
 class Context(ContextBase):
     @property
     def session(self):
+        if self._slave_reads:
+            if self._slave_session is None:
+                self._slave_session = db_api.get_session(slave_session=True)
+            return self._slave_session
         if self._session is None:
             self._session = db_api.get_session()
         return self._session
 
+    @contextlib.contextmanager
+    def slave_reads(self, operation):
+        """Make the session of the context a slave session in the block.
+
+        Nothing changes when no slave connection is configured, or when
+        changes were written with the session of the context: they may not
+        have reached the slave yet.  The block must not write changes.
+        """
+        if not db_api.is_slave_configured() or self._slave_reads:
+            yield
+            return
+        if self._session is not None and self._session.wrote_changes:
+            LOG.debug(_("%s reads from the master database, which has "
+                        "changes of the request"), operation)
+            yield
+            return
+        LOG.debug(_("%s reads from the slave database"), operation)
+        self._slave_reads = True
+        try:
+            yield
+        finally:
+            self._slave_reads = False
+
 
 def get_admin_context(read_deleted="no", load_admin_roles=True):
     return Context(user_id=None,
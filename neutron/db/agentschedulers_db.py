@@ -23,6 +23,7 @@ from sqlalchemy.orm import joinedload
 
 from neutron.common import constants
 from neutron.db import agents_db
+from neutron.db import api as db_api
 from neutron.db import model_base
 from neutron.extensions import dhcpagentscheduler
 from neutron.openstack.common import log as logging
@@ -174,6 +175,7 @@ class DhcpAgentSchedulerDbMixin(dhcpagentscheduler
         else:
             return {'networks': []}
 
+    @db_api.supports_slave_reads
     def list_active_networks_on_active_dhcp_agent(self, context, host):
         agent = self._get_agent_by_type_and_host(
             context, constants.AGENT_TYPE_DHCP, host)
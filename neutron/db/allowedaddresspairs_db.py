@@ -91,6 +91,8 @@ class AllowedAddressPairsMixin(object):
     # Register dict extend functions for ports
     db_base_plugin_v2.NeutronDbPluginV2.register_dict_extend_funcs(
         attr.PORTS, ['_extend_port_dict_allowed_address_pairs'])
+    db_base_plugin_v2.NeutronDbPluginV2.register_model_eager_loads(
+        models_v2.Port, ['allowed_address_pairs'])
 
     def _delete_allowed_address_pairs(self, context, id):
         query = self._model_query(context, AllowedAddressPair)
@@ -17,8 +17,13 @@
 # @author: Brad Hall, Nicira Networks, Inc.
 # @author: Dan Wendlandt, Nicira Networks, Inc.
 
+import contextlib
+
+from oslo.config import cfg
 import sqlalchemy as sql
+from sqlalchemy import event
 
+from neutron.common import exceptions
 from neutron.db import model_base
 from neutron.openstack.common.db.sqlalchemy import session
 from neutron.openstack.common import log as logging
@@ -38,16 +43,84 @@ def configure_db():
     register_models()
 
 
+def get_engine(slave_engine=False):
+    """Helper method to grab the engine."""
+    return session.get_engine(sqlite_fk=True, slave_engine=slave_engine)
+
+
+def dispose_connections():
+    """Drop the pooled connections, e.g. the ones inherited by a fork."""
+    get_engine().pool.dispose()
+    if is_slave_configured():
+        get_engine(slave_engine=True).pool.dispose()
+
+
 def clear_db(base=BASE):
     unregister_models(base)
     session.cleanup()
 
 
-def get_session(autocommit=True, expire_on_commit=False):
-    """Helper method to grab session."""
-    return session.get_session(autocommit=autocommit,
-                               expire_on_commit=expire_on_commit,
-                               sqlite_fk=True)
+def is_slave_configured():
+    """Tell if a slave database is configured for reads."""
+    return bool(cfg.CONF.database.slave_connection)
+
+
+def _record_writes(db_session, *args):
+    db_session.wrote_changes = True
+
+
+def _refuse_writes(db_session, *args):
+    if db_session.new or db_session.dirty or db_session.deleted:
+        raise exceptions.SlaveDatabaseWrite()
+
+
+def get_session(autocommit=True, expire_on_commit=False, slave_session=False):
+    """Helper method to grab session.
+
+    A session on the slave database is returned when slave_session is set
+    and a slave connection is configured; it refuses to flush changes.
+    The wrote_changes attribute of the sessions on the master database is
+    set once they wrote changes.
+    """
+    slave_session = slave_session and is_slave_configured()
+    db_session = session.get_session(autocommit=autocommit,
+                                     expire_on_commit=expire_on_commit,
+                                     sqlite_fk=True,
+                                     slave_session=slave_session)
+    if slave_session:
+        event.listen(db_session, 'before_flush', _refuse_writes)
+    else:
+        db_session.wrote_changes = False
+        for event_name in ('after_flush', 'after_bulk_update',
+                           'after_bulk_delete'):
+            event.listen(db_session, event_name, _record_writes)
+    return db_session
+
+
+def supports_slave_reads(f):
+    """Mark a plugin handler which only reads the database.
+
+    The API and the agent sync RPCs run the marked handlers on the slave
+    database.  Overriding handlers must be marked again.
+    """
+    f.slave_reads_support = True
+    return f
+
+
+def is_slave_reads_supported(*handlers):
+    """Tell if all the handlers can read from the slave database."""
+    return all(getattr(handler, 'slave_reads_support', False)
+               for handler in handlers)
+
+
+@contextlib.contextmanager
+def slave_reads(context, operation, *handlers):
+    """Read from the slave database in the block if the handlers allow it."""
+    if is_slave_configured() and is_slave_reads_supported(*handlers):
+        with context.slave_reads(operation):
+            yield
+    else:
+        yield
 
 
 def register_models(base=BASE):
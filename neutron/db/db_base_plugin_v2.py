@@ -27,6 +27,7 @@ from neutron.api.v2 import attributes
 from neutron.common import constants
 from neutron.common import exceptions as q_exc
 from neutron.db import api as db
+from neutron.db import ipam_backend
 from neutron.db import models_v2
 from neutron.db import sqlalchemyutils
 from neutron import neutron_plugin_base_v2
@@ -64,6 +65,18 @@ class CommonDbMixin(object):
     # TODO(salvatore-orlando): Avoid using class-level variables
     _dict_extend_functions = {}
 
+    # Relationships loaded eagerly by the collection queries of a model,
+    # mapped to their loading strategy. Mixins register the relationships
+    # read by their dict extend functions, so that listing a collection
+    # does not issue queries for every row.
+    _model_eager_loads = {}
+
+    # Fields of the dicts of a model which hold the value of the model
+    # column with the same name. Requests for some of these fields only are
+    # answered by querying the columns, without loading model objects and
+    # their relationships or running dict extend functions.
+    _model_column_fields = {}
+
     @classmethod
     def register_model_query_hook(cls, model, name, query_hook, filter_hook,
                                   result_filters=None):
@@ -89,6 +102,65 @@ class CommonDbMixin(object):
         model_hooks[name] = {'query': query_hook, 'filter': filter_hook,
                              'result_filters': result_filters}
 
+    @classmethod
+    def register_model_eager_loads(cls, model, relationships,
+                                   strategy=orm.subqueryload):
+        """Load relationships of model eagerly in collection queries.
+
+        relationships are names of relationships of model, or dotted paths
+        to relationships of related models. The default strategy loads each
+        relationship with a single extra query for the whole collection,
+        which suits collections: joined loads of several collections
+        multiply the number of rows returned. Scalar relationships are
+        better loaded with orm.joinedload.
+        """
+        model_loads = cls._model_eager_loads.setdefault(model, {})
+        for relationship in relationships:
+            model_loads[relationship] = strategy
+
+    @classmethod
+    def register_model_column_fields(cls, model, fields):
+        cls._model_column_fields.setdefault(model, set()).update(fields)
+
+    def _get_projection(self, model, fields):
+        """Return the fields to query as columns of model, if possible.
+
+        None is returned unless all the fields are column fields of model.
+        """
+        if not fields:
+            return None
+        column_fields = self._model_column_fields.get(model, ())
+        projection = []
+        for field in fields:
+            if field not in column_fields:
+                return None
+            if field not in projection:
+                projection.append(field)
+        return projection
+
+    def _make_dicts(self, query, model, dict_func, fields):
+        """Return the dicts of the objects of query."""
+        projection = self._get_projection(model, fields)
+        if projection:
+            query = query.with_entities(*[getattr(model, field)
+                                          for field in projection])
+            return [dict(zip(projection, row)) for row in query]
+        return [dict_func(c, fields) for c in query]
+
+    def _get_projected_by_id(self, context, model, id, fields):
+        """Return the fields of an object queried as columns.
+
+        None is returned when the fields cannot be queried as columns or
+        when there is no such object; callers then load the object.
+        """
+        projection = self._get_projection(model, fields)
+        if not projection:
+            return None
+        query = self._model_query(context, model).filter(model.id == id)
+        row = query.with_entities(*[getattr(model, field)
+                                    for field in projection]).first()
+        return row and dict(zip(projection, row))
+
     def _model_query(self, context, model):
         query = context.session.query(model)
         # define basic filter condition for model query
@@ -172,10 +244,19 @@ class CommonDbMixin(object):
             if func:
                 func(*args)
 
+    def _apply_eager_loads(self, query, model):
+        model_loads = self._model_eager_loads.get(model)
+        if model_loads:
+            query = query.options(*[strategy(relationship)
+                                    for relationship, strategy
+                                    in sorted(model_loads.items())])
+        return query
+
     def _get_collection_query(self, context, model, filters=None,
                               sorts=None, limit=None, marker_obj=None,
                               page_reverse=False):
         collection = self._model_query(context, model)
+        collection = self._apply_eager_loads(collection, model)
         collection = self._apply_filters_to_query(collection, model, filters)
         if limit and page_reverse and sorts:
             sorts = [(s[0], not s[1]) for s in sorts]
@@ -192,7 +273,7 @@ class CommonDbMixin(object):
                                            limit=limit,
                                            marker_obj=marker_obj,
                                            page_reverse=page_reverse)
-        items = [dict_func(c, fields) for c in query]
+        items = self._make_dicts(query, model, dict_func, fields)
         if limit and page_reverse:
             items.reverse()
         return items
@@ -223,6 +304,24 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
     __native_pagination_support = True
     __native_sorting_support = True
 
+    # Relationships read by _make_network_dict and _make_subnet_dict
+    CommonDbMixin.register_model_eager_loads(models_v2.Network, ['subnets'])
+    CommonDbMixin.register_model_eager_loads(
+        models_v2.Subnet, ['dns_nameservers', 'routes'])
+
+    # Fields copied from columns by the _make_*_dict methods
+    CommonDbMixin.register_model_column_fields(
+        models_v2.Network,
+        ['id', 'name', 'tenant_id', 'admin_state_up', 'status', 'shared'])
+    CommonDbMixin.register_model_column_fields(
+        models_v2.Subnet,
+        ['id', 'name', 'tenant_id', 'network_id', 'ip_version', 'cidr',
+         'gateway_ip', 'enable_dhcp', 'shared'])
+    CommonDbMixin.register_model_column_fields(
+        models_v2.Port,
+        ['id', 'name', 'network_id', 'tenant_id', 'mac_address',
+         'admin_state_up', 'status', 'device_id', 'device_owner'])
+
     def __init__(self):
         # NOTE(jkoelker) This is an incomplete implementation. Subclasses
         #                must override __init__ and setup the database
@@ -324,6 +423,10 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
         """Return an IP address to the pool of free IP's on the network
         subnet.
         """
+        backend = ipam_backend.get_backend()
+        if backend:
+            return backend.recycle_ip(context, network_id, subnet_id,
+                                      ip_address)
         # Grab all allocation pools for the subnet
         allocation_pools = (context.session.query(
             models_v2.IPAllocationPool).filter_by(subnet_id=subnet_id).
@@ -445,6 +548,9 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
         The IP address will be generated from one of the subnets defined on
         the network.
         """
+        backend = ipam_backend.get_backend()
+        if backend:
+            return backend.generate_ip(context, subnets)
         range_qry = context.session.query(
             models_v2.IPAvailabilityRange).join(
                 models_v2.IPAllocationPool).with_lockmode('update')
@@ -475,6 +581,10 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
     @staticmethod
     def _allocate_specific_ip(context, subnet_id, ip_address):
         """Allocate a specific IP address on the subnet."""
+        backend = ipam_backend.get_backend()
+        if backend:
+            return backend.allocate_specific_ip(context, subnet_id,
+                                                ip_address)
         ip = int(netaddr.IPAddress(ip_address))
         range_qry = context.session.query(
             models_v2.IPAvailabilityRange).join(
@@ -505,6 +615,37 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
                     context.session.add(ip_range)
                     return
 
+    @staticmethod
+    def _store_ip_allocation(context, ip_address, network_id, subnet_id,
+                             port_id):
+        """Record the allocation of an IP address to a port.
+
+        IPAM backends reserve the IPAllocation row when the address is
+        picked, in which case the reserved row is bound to the port.
+        """
+        LOG.debug(_("Allocated IP %(ip_address)s "
+                    "(%(network_id)s/%(subnet_id)s/%(port_id)s)"),
+                  {'ip_address': ip_address,
+                   'network_id': network_id,
+                   'subnet_id': subnet_id,
+                   'port_id': port_id})
+        allocated = None
+        if ipam_backend.get_backend():
+            alloc_qry = context.session.query(models_v2.IPAllocation)
+            allocated = alloc_qry.filter_by(network_id=network_id,
+                                            subnet_id=subnet_id,
+                                            ip_address=ip_address).first()
+        if allocated:
+            allocated.port_id = port_id
+        else:
+            allocated = models_v2.IPAllocation(
+                network_id=network_id,
+                port_id=port_id,
+                ip_address=ip_address,
+                subnet_id=subnet_id,
+            )
+            context.session.add(allocated)
+
     @staticmethod
     def _check_unique_ip(context, network_id, subnet_id, ip_address):
         """Validate that the IP address on the subnet is not in use."""
@@ -995,14 +1136,24 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
                 self._delete_port(context, port['id'])
 
             # clean up subnets
+            backend = ipam_backend.get_backend()
+            if backend:
+                for subnet in network.subnets:
+                    backend.remove_subnet(subnet.id)
             subnets_qry = context.session.query(models_v2.Subnet)
             subnets_qry.filter_by(network_id=id).delete()
             context.session.delete(network)
 
+    @db.supports_slave_reads
     def get_network(self, context, id, fields=None):
+        network = self._get_projected_by_id(context, models_v2.Network, id,
+                                            fields)
+        if network:
+            return network
         network = self._get_network(context, id)
         return self._make_network_dict(network, fields)
 
+    @db.supports_slave_reads
     def get_networks(self, context, filters=None, fields=None,
                      sorts=None, limit=None, marker=None,
                      page_reverse=False):
@@ -1269,11 +1420,20 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
             allocated.delete()
 
             context.session.delete(subnet)
+        backend = ipam_backend.get_backend()
+        if backend:
+            backend.remove_subnet(id)
 
+    @db.supports_slave_reads
     def get_subnet(self, context, id, fields=None):
+        subnet = self._get_projected_by_id(context, models_v2.Subnet, id,
+                                           fields)
+        if subnet:
+            return subnet
         subnet = self._get_subnet(context, id)
         return self._make_subnet_dict(subnet, fields)
 
+    @db.supports_slave_reads
     def get_subnets(self, context, filters=None, fields=None,
                     sorts=None, limit=None, marker=None,
                     page_reverse=False):
@@ -1340,21 +1500,9 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
             # Update the allocated IP's
             if ips:
                 for ip in ips:
-                    ip_address = ip['ip_address']
-                    subnet_id = ip['subnet_id']
-                    LOG.debug(_("Allocated IP %(ip_address)s "
-                                "(%(network_id)s/%(subnet_id)s/%(port_id)s)"),
-                              {'ip_address': ip_address,
-                               'network_id': network_id,
-                               'subnet_id': subnet_id,
-                               'port_id': port_id})
-                    allocated = models_v2.IPAllocation(
-                        network_id=network_id,
-                        port_id=port_id,
-                        ip_address=ip_address,
-                        subnet_id=subnet_id,
-                    )
-                    context.session.add(allocated)
+                    NeutronDbPluginV2._store_ip_allocation(
+                        context, ip['ip_address'], network_id,
+                        ip['subnet_id'], port_id)
 
         return self._make_port_dict(port, process_extensions=False)
 
@@ -1374,10 +1522,9 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
 
                 # Update ips if necessary
                 for ip in added_ips:
-                    allocated = models_v2.IPAllocation(
-                        network_id=port['network_id'], port_id=port.id,
-                        ip_address=ip['ip_address'], subnet_id=ip['subnet_id'])
-                    context.session.add(allocated)
+                    NeutronDbPluginV2._store_ip_allocation(
+                        context, ip['ip_address'], port['network_id'],
+                        ip['subnet_id'], port.id)
             # Remove all attributes in p which are not in the port DB model
             # and then update the port
             port.update(self._filter_non_model_columns(p, models_v2.Port))
@@ -1423,7 +1570,11 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
 
         context.session.delete(port)
 
+    @db.supports_slave_reads
     def get_port(self, context, id, fields=None):
+        port = self._get_projected_by_id(context, models_v2.Port, id, fields)
+        if port:
+            return port
         port = self._get_port(context, id)
         return self._make_port_dict(port, fields)
 
@@ -1436,6 +1587,7 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
             filters = {}
 
         query = self._model_query(context, Port)
+        query = self._apply_eager_loads(query, Port)
 
         fixed_ips = filters.pop('fixed_ips', {})
         ip_addresses = fixed_ips.get('ip_address')
@@ -1454,6 +1606,7 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
                                                sorts, marker_obj)
         return query
 
+    @db.supports_slave_reads
     def get_ports(self, context, filters=None, fields=None,
                   sorts=None, limit=None, marker=None,
                   page_reverse=False):
@@ -1462,7 +1615,8 @@ class NeutronDbPluginV2(neutron_plugin_base_v2.NeutronPluginBaseV2,
                                       sorts=sorts, limit=limit,
                                       marker_obj=marker_obj,
                                       page_reverse=page_reverse)
-        items = [self._make_port_dict(c, fields) for c in query]
+        items = self._make_dicts(query, models_v2.Port, self._make_port_dict,
+                                 fields)
         if limit and page_reverse:
             items.reverse()
         return items
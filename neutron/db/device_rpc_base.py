@@ -0,0 +1,65 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from neutron.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+
+class DeviceDetailsRpcCallbackMixin(object):
+    """A mix-in that handles the device details of a list of devices."""
+
+    def get_devices_details_list(self, rpc_context, **kwargs):
+        """Agent requests the details of a list of devices."""
+        devices = kwargs.pop('devices', [])
+        LOG.debug(_("Details of %(count)d devices requested by agent "
+                    "%(agent_id)s"),
+                  {'count': len(devices), 'agent_id': kwargs.get('agent_id')})
+        return [self.get_device_details(rpc_context, device=device, **kwargs)
+                for device in devices]
+
+
+class DeviceUpRpcCallbackMixin(object):
+    """A mix-in that handles a list of devices up on the agent."""
+
+    def update_devices_up(self, rpc_context, **kwargs):
+        """A list of devices is up on the agent."""
+        devices = kwargs.pop('devices', [])
+        return [self.update_device_up(rpc_context, device=device, **kwargs)
+                for device in devices]
+
+
+class DeviceDownRpcCallbackMixin(object):
+    """A mix-in that handles a list of devices down on the agent."""
+
+    def update_devices_down(self, rpc_context, **kwargs):
+        """A list of devices is no longer in use on the agent."""
+        devices = kwargs.pop('devices', [])
+        return [self.update_device_down(rpc_context, device=device, **kwargs)
+                for device in devices]
+
+
+class DeviceRpcCallbackMixin(DeviceDetailsRpcCallbackMixin,
+                             DeviceUpRpcCallbackMixin,
+                             DeviceDownRpcCallbackMixin):
+    """A mix-in that handles lists of devices in L2 agent rpc calls.
+
+    Each device is handled by the get_device_details, update_device_up
+    and update_device_down methods of the plugin rpc callbacks, so an
+    agent needs a single round trip for a whole list of devices.
+    """
@@ -19,6 +19,7 @@ from sqlalchemy.orm import exc
 from neutron.api.v2 import attributes
 from neutron.common import constants
 from neutron.common import utils
+from neutron.db import api as db_api
 from neutron.extensions import portbindings
 from neutron import manager
 from neutron.openstack.common import log as logging
@@ -38,11 +39,17 @@ class DhcpRpcCallbackMixin(object):
             plugin, constants.DHCP_AGENT_SCHEDULER_EXT_ALIAS):
             if cfg.CONF.network_auto_schedule:
                 plugin.auto_schedule_networks(context, host)
-            nets = plugin.list_active_networks_on_active_dhcp_agent(
-                context, host)
+            with db_api.slave_reads(
+                    context, 'get_active_networks',
+                    plugin.list_active_networks_on_active_dhcp_agent,
+                    plugin.get_networks):
+                nets = plugin.list_active_networks_on_active_dhcp_agent(
+                    context, host)
         else:
             filters = dict(admin_state_up=[True])
-            nets = plugin.get_networks(context, filters=filters)
+            with db_api.slave_reads(context, 'get_active_networks',
+                                    plugin.get_networks):
+                nets = plugin.get_networks(context, filters=filters)
         return nets
 
     def get_active_networks(self, context, **kwargs):
@@ -60,6 +67,33 @@ class DhcpRpcCallbackMixin(object):
         host = kwargs.get('host')
         LOG.debug(_('get_active_networks_info from %s'), host)
         networks = self._get_active_networks(context, **kwargs)
+        plugin = manager.NeutronManager.get_plugin()
+        with db_api.slave_reads(context, 'get_active_networks_info',
+                                plugin.get_subnets, plugin.get_ports):
+            return self._add_subnets_and_ports(context, networks)
+
+    def get_networks_info(self, context, **kwargs):
+        """Returns the networks/subnets/ports for a batch of network ids.
+
+        Lets the agent fetch the networks listed by get_active_networks in
+        bounded chunks instead of in a single, possibly huge, message.
+        Networks which no longer exist are left out of the result.
+        """
+        host = kwargs.get('host')
+        network_ids = kwargs.get('network_ids') or []
+        LOG.debug(_('get_networks_info for %(count)d networks from '
+                    '%(host)s'), {'count': len(network_ids), 'host': host})
+        if not network_ids:
+            return []
+        plugin = manager.NeutronManager.get_plugin()
+        with db_api.slave_reads(context, 'get_networks_info',
+                                plugin.get_networks, plugin.get_subnets,
+                                plugin.get_ports):
+            networks = plugin.get_networks(context,
+                                           filters={'id': network_ids})
+            return self._add_subnets_and_ports(context, networks)
+
+    def _add_subnets_and_ports(self, context, networks):
         plugin = manager.NeutronManager.get_plugin()
         filters = {'network_id': [network['id'] for network in networks]}
         ports = plugin.get_ports(context, filters=filters)
@@ -21,6 +21,7 @@ import sqlalchemy as sa
 from sqlalchemy import orm
 
 from neutron.common import utils
+from neutron.db import api as db_api
 from neutron.db import db_base_plugin_v2
 from neutron.db import l3_db
 from neutron.db import model_base
@@ -152,12 +153,14 @@ class ExtraRoute_db_mixin(l3_db.L3_NAT_db_mixin):
         query.filter(RouterRoute.router_id == id)
         return self._make_extra_route_list(query)
 
+    @db_api.supports_slave_reads
     def get_router(self, context, id, fields=None):
         with context.session.begin(subtransactions=True):
             router = super(ExtraRoute_db_mixin, self).get_router(
                 context, id, fields)
             return router
 
+    @db_api.supports_slave_reads
     def get_routers(self, context, filters=None, fields=None,
                     sorts=None, limit=None, marker=None,
                     page_reverse=False):
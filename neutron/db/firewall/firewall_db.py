@@ -271,11 +271,16 @@ class Firewall_db_mixin(firewall.FirewallPluginBase, base_db.CommonDbMixin):
         fw = self._get_firewall(context, id)
         return self._make_firewall_dict(fw, fields)
 
-    def get_firewalls(self, context, filters=None, fields=None):
+    def get_firewalls(self, context, filters=None, fields=None,
+                      sorts=None, limit=None, marker=None, page_reverse=False):
         LOG.debug(_("get_firewalls() called"))
+        marker_obj = self._get_marker_obj(context, 'firewall', limit, marker)
         return self._get_collection(context, Firewall,
                                     self._make_firewall_dict,
-                                    filters=filters, fields=fields)
+                                    filters=filters, fields=fields,
+                                    sorts=sorts, limit=limit,
+                                    marker_obj=marker_obj,
+                                    page_reverse=page_reverse)
 
     def get_firewalls_count(self, context, filters=None):
         LOG.debug(_("get_firewalls_count() called"))
@@ -327,11 +332,18 @@ class Firewall_db_mixin(firewall.FirewallPluginBase, base_db.CommonDbMixin):
         fwp = self._get_firewall_policy(context, id)
         return self._make_firewall_policy_dict(fwp, fields)
 
-    def get_firewall_policies(self, context, filters=None, fields=None):
+    def get_firewall_policies(self, context, filters=None, fields=None,
+                              sorts=None, limit=None, marker=None,
+                              page_reverse=False):
         LOG.debug(_("get_firewall_policies() called"))
+        marker_obj = self._get_marker_obj(context, 'firewall_policy', limit,
+                                          marker)
         return self._get_collection(context, FirewallPolicy,
                                     self._make_firewall_policy_dict,
-                                    filters=filters, fields=fields)
+                                    filters=filters, fields=fields,
+                                    sorts=sorts, limit=limit,
+                                    marker_obj=marker_obj,
+                                    page_reverse=page_reverse)
 
     def get_firewalls_policies_count(self, context, filters=None):
         LOG.debug(_("get_firewall_policies_count() called"))
@@ -403,11 +415,18 @@ class Firewall_db_mixin(firewall.FirewallPluginBase, base_db.CommonDbMixin):
         fwr = self._get_firewall_rule(context, id)
         return self._make_firewall_rule_dict(fwr, fields)
 
-    def get_firewall_rules(self, context, filters=None, fields=None):
+    def get_firewall_rules(self, context, filters=None, fields=None,
+                           sorts=None, limit=None, marker=None,
+                           page_reverse=False):
         LOG.debug(_("get_firewall_rules() called"))
+        marker_obj = self._get_marker_obj(context, 'firewall_rule', limit,
+                                          marker)
         return self._get_collection(context, FirewallRule,
                                     self._make_firewall_rule_dict,
-                                    filters=filters, fields=fields)
+                                    filters=filters, fields=fields,
+                                    sorts=sorts, limit=limit,
+                                    marker_obj=marker_obj,
+                                    page_reverse=page_reverse)
 
     def get_firewalls_rules_count(self, context, filters=None):
         LOG.debug(_("get_firewall_rules_count() called"))
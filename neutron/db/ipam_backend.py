@@ -0,0 +1,254 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""IP address management backends for NeutronDbPluginV2.
+
+By default the db plugin tracks free addresses in the IPAvailabilityRange
+table, locking the first range row of a subnet for every allocation.  The
+backend defined here keeps the free address space of each subnet in memory
+instead and uses the primary key of the IPAllocation table as the only
+arbiter between concurrent allocations: a candidate picked from memory is
+reserved by inserting its IPAllocation row, and a duplicate key simply means
+the candidate is taken and the next one is tried.
+
+The in-memory state is only a hint.  It is built lazily from the allocation
+pools and allocations stored in the database and is reloaded whenever a
+subnet looks exhausted, so addresses taken by other servers, or leaked by
+rolled back transactions, are eventually accounted for.
+"""
+
+import bisect
+
+import netaddr
+from oslo.config import cfg
+
+from neutron.common import exceptions as q_exc
+from neutron.db import models_v2
+from neutron.openstack.common.db import exception as db_exc
+from neutron.openstack.common import importutils
+from neutron.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+
+class FreeAddressSpace(object):
+    """Sorted list of the free address intervals of a subnet.
+
+    Addresses are handled as integers so the same structure serves both
+    IPv4 and IPv6 subnets.  Only addresses inside the allocation pools of
+    the subnet are ever considered free.
+    """
+
+    def __init__(self, pools, used=()):
+        self._pools = sorted(pools)
+        self._firsts = []
+        self._lasts = []
+        for first, last in self._pools:
+            self._firsts.append(first)
+            self._lasts.append(last)
+        for ip in used:
+            self.remove(ip)
+
+    def __len__(self):
+        return sum(last - first + 1
+                   for first, last in zip(self._firsts, self._lasts))
+
+    def _in_pool(self, ip):
+        for first, last in self._pools:
+            if first <= ip <= last:
+                return True
+        return False
+
+    def pop_first(self):
+        """Remove and return the lowest free address, or None."""
+        if not self._firsts:
+            return None
+        ip = self._firsts[0]
+        self.remove(ip)
+        return ip
+
+    def remove(self, ip):
+        """Mark an address as used.  Returns False if it was not free."""
+        index = bisect.bisect_right(self._firsts, ip) - 1
+        if index < 0 or ip > self._lasts[index]:
+            return False
+        first, last = self._firsts[index], self._lasts[index]
+        if first == last:
+            del self._firsts[index]
+            del self._lasts[index]
+        elif ip == first:
+            self._firsts[index] = ip + 1
+        elif ip == last:
+            self._lasts[index] = ip - 1
+        else:
+            self._lasts[index] = ip - 1
+            self._firsts.insert(index + 1, ip + 1)
+            self._lasts.insert(index + 1, last)
+        return True
+
+    def add(self, ip):
+        """Mark an address of the allocation pools as free again."""
+        if not self._in_pool(ip):
+            return False
+        index = bisect.bisect_right(self._firsts, ip) - 1
+        if index >= 0 and ip <= self._lasts[index]:
+            # already free
+            return False
+        merge_prev = index >= 0 and self._lasts[index] == ip - 1
+        merge_next = (index + 1 < len(self._firsts) and
+                      self._firsts[index + 1] == ip + 1)
+        if merge_prev and merge_next:
+            self._lasts[index] = self._lasts[index + 1]
+            del self._firsts[index + 1]
+            del self._lasts[index + 1]
+        elif merge_prev:
+            self._lasts[index] = ip
+        elif merge_next:
+            self._firsts[index + 1] = ip
+        else:
+            self._firsts.insert(index + 1, ip)
+            self._lasts.insert(index + 1, ip)
+        return True
+
+
+class InMemoryIpamBackend(object):
+    """Allocate addresses from in-memory free lists without row locks."""
+
+    def __init__(self):
+        self._subnets = {}
+
+    def _load(self, context, subnet_id):
+        pools = [(int(netaddr.IPAddress(pool['first_ip'])),
+                  int(netaddr.IPAddress(pool['last_ip'])))
+                 for pool in context.session.query(
+                     models_v2.IPAllocationPool).filter_by(
+                         subnet_id=subnet_id)]
+        used = [int(netaddr.IPAddress(alloc.ip_address))
+                for alloc in context.session.query(
+                    models_v2.IPAllocation.ip_address).filter_by(
+                        subnet_id=subnet_id)]
+        space = FreeAddressSpace(pools, used)
+        LOG.debug(_("Loaded %(free)d free addresses for subnet "
+                    "%(subnet_id)s"),
+                  {'free': len(space), 'subnet_id': subnet_id})
+        self._subnets[subnet_id] = space
+        return space
+
+    def _get_space(self, context, subnet_id):
+        space = self._subnets.get(subnet_id)
+        if space is None:
+            space = self._load(context, subnet_id)
+        return space
+
+    @staticmethod
+    def _reserve(context, network_id, subnet_id, ip_address):
+        """Insert the IPAllocation row for an address.
+
+        Returns False if the address is already allocated.  The row is
+        created without a port and is bound to the port by the plugin.
+        """
+        session = context.session
+        query = session.query(models_v2.IPAllocation)
+        if query.filter_by(network_id=network_id, subnet_id=subnet_id,
+                           ip_address=ip_address).first():
+            return False
+        allocated = models_v2.IPAllocation(network_id=network_id,
+                                           subnet_id=subnet_id,
+                                           ip_address=ip_address)
+        try:
+            if session.bind.dialect.name == 'sqlite':
+                # NOTE: pysqlite does not support savepoints, and sqlite
+                # serializes writers anyway so the check above is enough
+                session.add(allocated)
+                session.flush()
+            else:
+                with session.begin(nested=True):
+                    session.add(allocated)
+        except db_exc.DBDuplicateEntry:
+            LOG.debug(_("IP %(ip_address)s (%(subnet_id)s) was allocated "
+                        "concurrently"),
+                      {'ip_address': ip_address, 'subnet_id': subnet_id})
+            return False
+        return True
+
+    def _reserve_next(self, context, subnet):
+        for reload in (False, True):
+            if reload:
+                space = self._load(context, subnet['id'])
+            else:
+                space = self._get_space(context, subnet['id'])
+            while True:
+                candidate = space.pop_first()
+                if candidate is None:
+                    break
+                ip_address = str(netaddr.IPAddress(candidate))
+                if self._reserve(context, subnet['network_id'],
+                                 subnet['id'], ip_address):
+                    return ip_address
+
+    def generate_ip(self, context, subnets):
+        for subnet in subnets:
+            ip_address = self._reserve_next(context, subnet)
+            if ip_address:
+                LOG.debug(_("Allocated IP - %(ip_address)s from subnet "
+                            "%(subnet_id)s"),
+                          {'ip_address': ip_address,
+                           'subnet_id': subnet['id']})
+                return {'ip_address': ip_address, 'subnet_id': subnet['id']}
+            LOG.debug(_("All IP's from subnet %(subnet_id)s (%(cidr)s) "
+                        "allocated"),
+                      {'subnet_id': subnet['id'], 'cidr': subnet['cidr']})
+        raise q_exc.IpAddressGenerationFailure(net_id=subnets[0]['network_id'])
+
+    def allocate_specific_ip(self, context, subnet_id, ip_address):
+        subnet = context.session.query(models_v2.Subnet).filter_by(
+            id=subnet_id).one()
+        self._get_space(context, subnet_id).remove(
+            int(netaddr.IPAddress(ip_address)))
+        if not self._reserve(context, subnet['network_id'], subnet_id,
+                             ip_address):
+            raise q_exc.IpAddressInUse(net_id=subnet['network_id'],
+                                       ip_address=ip_address)
+
+    def recycle_ip(self, context, network_id, subnet_id, ip_address):
+        LOG.debug(_("Recycle %s"), ip_address)
+        alloc_qry = context.session.query(models_v2.IPAllocation)
+        alloc_qry.filter_by(network_id=network_id,
+                            ip_address=ip_address,
+                            subnet_id=subnet_id).delete()
+        space = self._subnets.get(subnet_id)
+        if space is not None:
+            space.add(int(netaddr.IPAddress(ip_address)))
+
+    def remove_subnet(self, subnet_id):
+        self._subnets.pop(subnet_id, None)
+
+
+_backend = None
+_backend_class = None
+
+
+def get_backend():
+    """Return the configured IPAM backend, or None for the range tables."""
+    global _backend, _backend_class
+    backend_class = cfg.CONF.ipam_backend
+    if backend_class != _backend_class:
+        _backend = (importutils.import_object(backend_class)
+                    if backend_class else None)
+        _backend_class = backend_class
+    return _backend
@@ -24,6 +24,7 @@ from sqlalchemy.orm import joinedload
 from neutron.common import constants
 from neutron.db import agents_db
 from neutron.db.agentschedulers_db import AgentSchedulerDbMixin
+from neutron.db import api as db_api
 from neutron.db import model_base
 from neutron.db import models_v2
 from neutron.extensions import l3agentscheduler
@@ -125,6 +126,7 @@ class L3AgentSchedulerDbMixin(l3agentscheduler.L3AgentSchedulerPluginBase,
         else:
             return {'routers': []}
 
+    @db_api.supports_slave_reads
     def list_active_sync_routers_on_active_l3_agent(
             self, context, host, router_ids):
         agent = self._get_agent_by_type_and_host(
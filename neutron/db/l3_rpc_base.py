@@ -18,6 +18,7 @@ from oslo.config import cfg
 from neutron.common import constants
 from neutron.common import utils
 from neutron import context as neutron_context
+from neutron.db import api as db_api
 from neutron.extensions import portbindings
 from neutron import manager
 from neutron.openstack.common import jsonutils
@@ -52,10 +53,17 @@ class L3RpcCallbackMixin(object):
                 l3plugin, constants.L3_AGENT_SCHEDULER_EXT_ALIAS):
             if cfg.CONF.router_auto_schedule:
                 l3plugin.auto_schedule_routers(context, host, router_ids)
-            routers = l3plugin.list_active_sync_routers_on_active_l3_agent(
-                context, host, router_ids)
+            with db_api.slave_reads(
+                    context, 'sync_routers',
+                    l3plugin.list_active_sync_routers_on_active_l3_agent,
+                    l3plugin.get_sync_data):
+                routers = (
+                    l3plugin.list_active_sync_routers_on_active_l3_agent(
+                        context, host, router_ids))
         else:
-            routers = l3plugin.get_sync_data(context, router_ids)
+            with db_api.slave_reads(context, 'sync_routers',
+                                    l3plugin.get_sync_data):
+                routers = l3plugin.get_sync_data(context, router_ids)
         plugin = manager.NeutronManager.get_plugin()
         if utils.is_extension_supported(
             plugin, constants.PORT_BINDING_EXT_ALIAS):
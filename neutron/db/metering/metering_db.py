@@ -83,27 +83,25 @@ class MeteringDbMixin(metering.MeteringPluginBase,
 
         return self._make_metering_label_dict(metering_db)
 
+    def _get_metering_label(self, context, label_id):
+        try:
+            return self._get_by_id(context, MeteringLabel, label_id)
+        except orm.exc.NoResultFound:
+            raise metering.MeteringLabelNotFound(label_id=label_id)
+
     def delete_metering_label(self, context, label_id):
         with context.session.begin(subtransactions=True):
-            try:
-                label = self._get_by_id(context, MeteringLabel, label_id)
-            except orm.exc.NoResultFound:
-                raise metering.MeteringLabelNotFound(label_id=label_id)
-
+            label = self._get_metering_label(context, label_id)
             context.session.delete(label)
 
     def get_metering_label(self, context, label_id, fields=None):
-        try:
-            metering_label = self._get_by_id(context, MeteringLabel, label_id)
-        except orm.exc.NoResultFound:
-            raise metering.MeteringLabelNotFound(label_id=label_id)
-
+        metering_label = self._get_metering_label(context, label_id)
         return self._make_metering_label_dict(metering_label, fields)
 
     def get_metering_labels(self, context, filters=None, fields=None,
                             sorts=None, limit=None, marker=None,
                             page_reverse=False):
-        marker_obj = self._get_marker_obj(context, 'metering_labels', limit,
+        marker_obj = self._get_marker_obj(context, 'metering_label', limit,
                                           marker)
         return self._get_collection(context, MeteringLabel,
                                     self._make_metering_label_dict,
@@ -124,7 +122,7 @@ class MeteringDbMixin(metering.MeteringPluginBase,
     def get_metering_label_rules(self, context, filters=None, fields=None,
                                  sorts=None, limit=None, marker=None,
                                  page_reverse=False):
-        marker_obj = self._get_marker_obj(context, 'metering_label_rules',
+        marker_obj = self._get_marker_obj(context, 'metering_label_rule',
                                           limit, marker)
 
         return self._get_collection(context, MeteringLabelRule,
@@ -135,13 +133,14 @@ class MeteringDbMixin(metering.MeteringPluginBase,
                                     marker_obj=marker_obj,
                                     page_reverse=page_reverse)
 
-    def get_metering_label_rule(self, context, rule_id, fields=None):
+    def _get_metering_label_rule(self, context, rule_id):
         try:
-            metering_label_rule = self._get_by_id(context,
-                                                  MeteringLabelRule, rule_id)
+            return self._get_by_id(context, MeteringLabelRule, rule_id)
         except orm.exc.NoResultFound:
             raise metering.MeteringLabelRuleNotFound(rule_id=rule_id)
 
+    def get_metering_label_rule(self, context, rule_id, fields=None):
+        metering_label_rule = self._get_metering_label_rule(context, rule_id)
         return self._make_metering_label_rule_dict(metering_label_rule, fields)
 
     def _validate_cidr(self, context, label_id, remote_ip_prefix,
@@ -182,11 +181,7 @@ class MeteringDbMixin(metering.MeteringPluginBase,
 
     def delete_metering_label_rule(self, context, rule_id):
         with context.session.begin(subtransactions=True):
-            try:
-                rule = self._get_by_id(context, MeteringLabelRule, rule_id)
-            except orm.exc.NoResultFound:
-                raise metering.MeteringLabelRuleNotFound(rule_id=rule_id)
-
+            rule = self._get_metering_label_rule(context, rule_id)
             context.session.delete(rule)
 
     def _get_metering_rules_dict(self, metering_label):
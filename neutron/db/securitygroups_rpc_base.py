@@ -16,16 +16,22 @@
 #    under the License.
 
 import netaddr
+import sqlalchemy as sa
 
 from neutron.common import constants as q_const
 from neutron.common import utils
+from neutron.db import api as db_api
 from neutron.db import models_v2
 from neutron.db import securitygroups_db as sg_db
 from neutron.extensions import securitygroup as ext_sg
+from neutron import manager
 from neutron.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+# keeps the IN clauses of the device lookups reasonably short
+MAX_PORTS_PER_QUERY = 500
+
 
 IP_MASK = {q_const.IPv4: 32,
            q_const.IPv6: 128}
@@ -35,6 +41,66 @@ DIRECTION_IP_PREFIX = {'ingress': 'source_ip_prefix',
                        'egress': 'dest_ip_prefix'}
 
 
+def get_ports_with_security_groups(devices_by_port_id, prefix_match=False):
+    """Get the ports of devices from database with security group info.
+
+    The ports are looked up with one query per MAX_PORTS_PER_QUERY devices.
+    With prefix_match, the port ids may be prefixes of the ids of the
+    ports, such as the ones found in tap device names.
+
+    :param devices_by_port_id: devices, by port id
+    :returns: port dicts with security groups, by device
+    """
+    LOG.debug(_("get_ports_with_security_groups() called for %d ports"),
+              len(devices_by_port_id))
+    session = db_api.get_session()
+    sg_binding_port = sg_db.SecurityGroupPortBinding.port_id
+    plugin = manager.NeutronManager.get_plugin()
+    ports = {}
+    port_ids = list(devices_by_port_id)
+    for index in range(0, len(port_ids), MAX_PORTS_PER_QUERY):
+        chunk = port_ids[index:index + MAX_PORTS_PER_QUERY]
+        query = session.query(models_v2.Port,
+                              sg_db.SecurityGroupPortBinding.security_group_id)
+        query = query.outerjoin(sg_db.SecurityGroupPortBinding,
+                                models_v2.Port.id == sg_binding_port)
+        if prefix_match:
+            query = query.filter(sa.or_(*[models_v2.Port.id.startswith(
+                port_id) for port_id in chunk]))
+        else:
+            query = query.filter(models_v2.Port.id.in_(chunk))
+        sg_ids = {}
+        port_dbs = {}
+        for port, sg_id in query:
+            port_dbs[port.id] = port
+            port_sg_ids = sg_ids.setdefault(port.id, [])
+            if sg_id:
+                port_sg_ids.append(sg_id)
+        for port_id in chunk:
+            if prefix_match:
+                matches = [db_id for db_id in port_dbs
+                           if db_id.startswith(port_id)]
+                if len(matches) != 1:
+                    if matches:
+                        LOG.error(_("Multiple ports have port_id starting "
+                                    "with %s"), port_id)
+                    continue
+                port = port_dbs[matches[0]]
+            elif port_id in port_dbs:
+                port = port_dbs[port_id]
+            else:
+                continue
+            port_dict = plugin._make_port_dict(port)
+            port_dict[ext_sg.SECURITYGROUPS] = sg_ids[port.id]
+            port_dict['security_group_rules'] = []
+            port_dict['security_group_source_groups'] = []
+            port_dict['fixed_ips'] = [ip['ip_address']
+                                      for ip in port['fixed_ips']]
+            port_dict['device'] = devices_by_port_id[port_id]
+            ports[port_dict['device']] = port_dict
+    return ports
+
+
 class SecurityGroupServerRpcMixin(sg_db.SecurityGroupDbMixin):
 
     def create_security_group_rule(self, context, security_group_rule):
@@ -136,16 +202,50 @@ class SecurityGroupServerRpcCallbackMixin(object):
         :returns: port correspond to the devices with security group rules
         """
         devices = kwargs.get('devices')
+        ports = self._get_ports_for_devices(devices)
+        with db_api.slave_reads(context, 'security_group_rules_for_devices',
+                                self._security_group_rules_for_ports):
+            return self._security_group_rules_for_ports(context, ports)
+
+    def security_group_info_for_devices(self, context, **kwargs):
+        """Return security group information for each port.
+
+        Unlike security_group_rules_for_devices, the rules are returned
+        once per security group, and rules with a remote group are not
+        expanded: the member IPs of each remote group are returned once.
+
+        :params devices: list of devices
+        :returns: dict with
+            devices: port correspond to the devices, with provider rules
+            security_groups: rules of each security group
+            sg_member_ips: member IPs of each remote group, by ethertype
+        """
+        devices = kwargs.get('devices')
+        ports = self._get_ports_for_devices(devices)
+        with db_api.slave_reads(context, 'security_group_info_for_devices',
+                                self._security_group_info_for_ports):
+            return self._security_group_info_for_ports(context, ports)
+
+    def get_ports_from_devices(self, devices):
+        """Return the ports of the devices, by device.
 
+        Plugins should look all the devices up at once; by default each
+        one is looked up with get_port_from_device.
+        """
         ports = {}
         for device in devices:
             port = self.get_port_from_device(device)
-            if not port:
-                continue
+            if port:
+                ports[device] = port
+        return ports
+
+    def _get_ports_for_devices(self, devices):
+        ports = {}
+        for port in self.get_ports_from_devices(devices).values():
             if port['device_owner'].startswith('network:'):
                 continue
             ports[port['id']] = port
-        return self._security_group_rules_for_ports(context, ports)
+        return ports
 
     def _select_rules_for_ports(self, context, ports):
         if not ports:
@@ -286,25 +386,73 @@ class SecurityGroupServerRpcCallbackMixin(object):
             self._add_ingress_ra_rule(port, ips)
             self._add_ingress_dhcp_rule(port, ips)
 
+    def _make_rule_dict(self, rule_in_db):
+        direction = rule_in_db['direction']
+        rule_dict = {
+            'security_group_id': rule_in_db['security_group_id'],
+            'direction': direction,
+            'ethertype': rule_in_db['ethertype'],
+        }
+        for key in ('protocol', 'port_range_min', 'port_range_max',
+                    'remote_ip_prefix', 'remote_group_id'):
+            if rule_in_db.get(key):
+                if key == 'remote_ip_prefix':
+                    direction_ip_prefix = DIRECTION_IP_PREFIX[direction]
+                    rule_dict[direction_ip_prefix] = rule_in_db[key]
+                    continue
+                rule_dict[key] = rule_in_db[key]
+        return rule_dict
+
+    @db_api.supports_slave_reads
     def _security_group_rules_for_ports(self, context, ports):
         rules_in_db = self._select_rules_for_ports(context, ports)
         for (binding, rule_in_db) in rules_in_db:
             port_id = binding['port_id']
             port = ports[port_id]
-            direction = rule_in_db['direction']
-            rule_dict = {
-                'security_group_id': rule_in_db['security_group_id'],
-                'direction': direction,
-                'ethertype': rule_in_db['ethertype'],
-            }
-            for key in ('protocol', 'port_range_min', 'port_range_max',
-                        'remote_ip_prefix', 'remote_group_id'):
-                if rule_in_db.get(key):
-                    if key == 'remote_ip_prefix':
-                        direction_ip_prefix = DIRECTION_IP_PREFIX[direction]
-                        rule_dict[direction_ip_prefix] = rule_in_db[key]
-                        continue
-                    rule_dict[key] = rule_in_db[key]
-            port['security_group_rules'].append(rule_dict)
+            port['security_group_rules'].append(
+                self._make_rule_dict(rule_in_db))
         self._apply_provider_rule(context, ports)
         return self._convert_remote_group_id_to_ip_prefix(context, ports)
+
+    @db_api.supports_slave_reads
+    def _security_group_info_for_ports(self, context, ports):
+        security_groups = {}
+        for port in ports.values():
+            for security_group_id in port.get('security_groups', []):
+                security_groups.setdefault(security_group_id, [])
+
+        rule_ids = set()
+        remote_group_ids = set()
+        for (binding, rule_in_db) in self._select_rules_for_ports(context,
+                                                                  ports):
+            remote_group_id = rule_in_db['remote_group_id']
+            if remote_group_id:
+                remote_group_ids.add(remote_group_id)
+                source_groups = ports[binding['port_id']][
+                    'security_group_source_groups']
+                if remote_group_id not in source_groups:
+                    source_groups.append(remote_group_id)
+            # each rule is joined once per port bound to its group
+            if rule_in_db['id'] in rule_ids:
+                continue
+            rule_ids.add(rule_in_db['id'])
+            security_groups.setdefault(
+                rule_in_db['security_group_id'], []).append(
+                    self._make_rule_dict(rule_in_db))
+
+        member_ips = {}
+        ips = self._select_ips_for_remote_group(context, remote_group_ids)
+        for remote_group_id, group_ips in ips.items():
+            by_ethertype = {q_const.IPv4: set(), q_const.IPv6: set()}
+            for ip in group_ips:
+                version = netaddr.IPNetwork(ip).version
+                by_ethertype['IPv%s' % version].add(ip)
+            member_ips[remote_group_id] = dict(
+                (ethertype, sorted(group_ips))
+                for ethertype, group_ips in by_ethertype.items())
+
+        # provider rules do not belong to a security group
+        self._apply_provider_rule(context, ports)
+        return {'devices': ports,
+                'security_groups': security_groups,
+                'sg_member_ips': member_ips}
@@ -389,7 +389,8 @@ class FirewallPluginBase(ServicePluginBase):
         return 'Firewall service plugin'
 
     @abc.abstractmethod
-    def get_firewalls(self, context, filters=None, fields=None):
+    def get_firewalls(self, context, filters=None, fields=None,
+                      sorts=None, limit=None, marker=None, page_reverse=False):
         pass
 
     @abc.abstractmethod
@@ -409,7 +410,9 @@ class FirewallPluginBase(ServicePluginBase):
         pass
 
     @abc.abstractmethod
-    def get_firewall_rules(self, context, filters=None, fields=None):
+    def get_firewall_rules(self, context, filters=None, fields=None,
+                           sorts=None, limit=None, marker=None,
+                           page_reverse=False):
         pass
 
     @abc.abstractmethod
@@ -433,7 +436,9 @@ class FirewallPluginBase(ServicePluginBase):
         pass
 
     @abc.abstractmethod
-    def get_firewall_policies(self, context, filters=None, fields=None):
+    def get_firewall_policies(self, context, filters=None, fields=None,
+                              sorts=None, limit=None, marker=None,
+                              page_reverse=False):
         pass
 
     @abc.abstractmethod
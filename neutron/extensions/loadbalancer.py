@@ -389,7 +389,8 @@ class LoadBalancerPluginBase(ServicePluginBase):
         return 'LoadBalancer service plugin'
 
     @abc.abstractmethod
-    def get_vips(self, context, filters=None, fields=None):
+    def get_vips(self, context, filters=None, fields=None,
+                 sorts=None, limit=None, marker=None, page_reverse=False):
         pass
 
     @abc.abstractmethod
@@ -409,7 +410,8 @@ class LoadBalancerPluginBase(ServicePluginBase):
         pass
 
     @abc.abstractmethod
-    def get_pools(self, context, filters=None, fields=None):
+    def get_pools(self, context, filters=None, fields=None,
+                  sorts=None, limit=None, marker=None, page_reverse=False):
         pass
 
     @abc.abstractmethod
@@ -445,7 +447,8 @@ class LoadBalancerPluginBase(ServicePluginBase):
         pass
 
     @abc.abstractmethod
-    def get_members(self, context, filters=None, fields=None):
+    def get_members(self, context, filters=None, fields=None,
+                    sorts=None, limit=None, marker=None, page_reverse=False):
         pass
 
     @abc.abstractmethod
@@ -465,7 +468,9 @@ class LoadBalancerPluginBase(ServicePluginBase):
         pass
 
     @abc.abstractmethod
-    def get_health_monitors(self, context, filters=None, fields=None):
+    def get_health_monitors(self, context, filters=None, fields=None,
+                            sorts=None, limit=None, marker=None,
+                            page_reverse=False):
         pass
 
     @abc.abstractmethod
@@ -423,7 +423,9 @@ class ServerPool(object):
 
 class RpcProxy(dhcp_rpc_base.DhcpRpcCallbackMixin):
 
-    RPC_API_VERSION = '1.1'
+    # history
+    #   1.2 Support get_networks_info of the DHCP agent
+    RPC_API_VERSION = '1.2'
 
     def create_rpc_dispatcher(self):
         return q_rpc.PluginRpcDispatcher([self])
@@ -437,6 +439,12 @@ class NeutronRestProxyV2(db_base_plugin_v2.NeutronDbPluginV2,
     supported_extension_aliases = ["external-net", "router", "binding",
                                    "router_rules", "extra_dhcp_opt"]
 
+    # This attribute specifies whether the plugin supports or not
+    # pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
+    __native_pagination_support = True
+    __native_sorting_support = True
+
     def __init__(self, server_timeout=None):
         LOG.info(_('NeutronRestProxy: Starting plugin. Version=%s'),
                  version_string_with_vcs())
@@ -680,10 +688,11 @@ class NeutronRestProxyV2(db_base_plugin_v2.NeutronDbPluginV2,
             self._extend_port_dict_binding(context, port)
         return self._fields(port, fields)
 
-    def get_ports(self, context, filters=None, fields=None):
+    def get_ports(self, context, filters=None, fields=None,
+                  sorts=None, limit=None, marker=None, page_reverse=False):
         with context.session.begin(subtransactions=True):
-            ports = super(NeutronRestProxyV2, self).get_ports(context, filters,
-                                                              fields)
+            ports = super(NeutronRestProxyV2, self).get_ports(
+                context, filters, fields, sorts, limit, marker, page_reverse)
             for port in ports:
                 self._extend_port_dict_binding(context, port)
         return [self._fields(port, fields) for port in ports]
@@ -219,6 +219,12 @@ class BrocadePluginV2(db_base_plugin_v2.NeutronDbPluginV2,
 
     """
 
+    # This attribute specifies whether the plugin supports or not
+    # pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
+    __native_pagination_support = True
+    __native_sorting_support = True
+
     def __init__(self):
         """Initialize Brocade Plugin.
 
@@ -124,6 +124,13 @@ class VirtualPhysicalSwitchModelV2(neutron_plugin_base_v2.NeutronPluginBaseV2):
             plugin = super_getattribute('_plugins')[const.VSWITCH_PLUGIN]
             return getattr(plugin, name)
 
+    def start_rpc_listener(self):
+        """Start the RPC consumers of the OVS sub-plugin."""
+        return self._plugins[const.VSWITCH_PLUGIN].start_rpc_listener()
+
+    def rpc_workers_supported(self):
+        return self._plugins[const.VSWITCH_PLUGIN].rpc_workers_supported()
+
     def _func_name(self, offset=0):
         """Get the name of the calling function."""
         frame_record = inspect.stack()[1 + offset]
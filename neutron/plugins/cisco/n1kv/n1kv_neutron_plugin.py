@@ -145,8 +145,10 @@ class N1kvNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
     """
 
     # This attribute specifies whether the plugin supports or not
-    # bulk operations.
+    # bulk/pagination/sorting operations.
     __native_bulk_support = False
+    __native_pagination_support = True
+    __native_sorting_support = True
     supported_extension_aliases = ["provider", "agent",
                                    "policy_profile_binding",
                                    "network_profile_binding",
@@ -1183,7 +1185,8 @@ class N1kvNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         self._extend_network_dict_member_segments(context, net)
         return self._fields(net, fields)
 
-    def get_networks(self, context, filters=None, fields=None):
+    def get_networks(self, context, filters=None, fields=None,
+                     sorts=None, limit=None, marker=None, page_reverse=False):
         """
         Retreive a list of networks.
 
@@ -1199,8 +1202,8 @@ class N1kvNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         :returns: list of network dictionaries.
         """
         LOG.debug(_("Get networks"))
-        nets = super(N1kvNeutronPluginV2, self).get_networks(context, filters,
-                                                             None)
+        nets = super(N1kvNeutronPluginV2, self).get_networks(
+            context, filters, None, sorts, limit, marker, page_reverse)
         for net in nets:
             self._extend_network_dict_provider(context, net)
             self._extend_network_dict_profile(context, net)
@@ -1313,7 +1316,8 @@ class N1kvNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         self._extend_port_dict_profile(context, port)
         return self._fields(port, fields)
 
-    def get_ports(self, context, filters=None, fields=None):
+    def get_ports(self, context, filters=None, fields=None,
+                  sorts=None, limit=None, marker=None, page_reverse=False):
         """
         Retrieve a list of ports.
 
@@ -1329,8 +1333,8 @@ class N1kvNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         :returns: list of port dictionaries
         """
         LOG.debug(_("Get ports"))
-        ports = super(N1kvNeutronPluginV2, self).get_ports(context, filters,
-                                                           fields)
+        ports = super(N1kvNeutronPluginV2, self).get_ports(
+            context, filters, fields, sorts, limit, marker, page_reverse)
         for port in ports:
             self._extend_port_dict_profile(context, port)
 
@@ -1397,7 +1401,8 @@ class N1kvNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
                                                              fields)
         return self._fields(subnet, fields)
 
-    def get_subnets(self, context, filters=None, fields=None):
+    def get_subnets(self, context, filters=None, fields=None,
+                    sorts=None, limit=None, marker=None, page_reverse=False):
         """
         Retrieve a list of subnets.
 
@@ -1413,9 +1418,8 @@ class N1kvNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         :returns: list of dictionaries of subnets
         """
         LOG.debug(_("Get subnets"))
-        subnets = super(N1kvNeutronPluginV2, self).get_subnets(context,
-                                                               filters,
-                                                               fields)
+        subnets = super(N1kvNeutronPluginV2, self).get_subnets(
+            context, filters, fields, sorts, limit, marker, page_reverse)
         return [self._fields(subnet, fields) for subnet in subnets]
 
     def create_network_profile(self, context, network_profile):
@@ -117,6 +117,13 @@ class PluginV2(db_base_plugin_v2.NeutronDbPluginV2):
                 _("'%(model)s' object has no attribute '%(name)s'") %
                 {'model': self._model, 'name': name})
 
+    def start_rpc_listener(self):
+        """Start the RPC consumers of the model."""
+        return self._model.start_rpc_listener()
+
+    def rpc_workers_supported(self):
+        return self._model.rpc_workers_supported()
+
     def _extend_fault_map(self):
         """Extend the Neutron Fault Map for Cisco exceptions.
 
@@ -215,27 +215,25 @@ class EmbranePlugin(object):
     def get_routers(self, context, filters=None, fields=None, sorts=None,
                     limit=None, marker=None, page_reverse=False):
         """Retrieves the router list defined by the incoming filters."""
-        router_query = self._apply_filters_to_query(
-            self._model_query(context, l3_db.Router),
-            l3_db.Router, filters)
-        id_list = [x["id"] for x in router_query
+        marker_obj = self._get_marker_obj(context, 'router', limit, marker)
+        routers = self._get_collection_query(
+            context, l3_db.Router, filters=filters, sorts=sorts, limit=limit,
+            marker_obj=marker_obj, page_reverse=page_reverse).all()
+        if limit and page_reverse:
+            routers.reverse()
+        id_list = [x["id"] for x in routers
                    if x["status"] != p_con.Status.CREATING]
         try:
             self._esm_api.get_dvas(id_list)
         except h_exc.DvaNotFound:
             LOG.error(_("The following routers have not physical match: %s"),
                       repr(id_list))
-            error_routers = []
-            for id in id_list:
-                try:
-                    error_routers.append(self._get_router(context, id))
-                except l3.RouterNotFound:
-                    pass
-            for error_router in error_routers:
-                self._set_db_router_state(context, error_router,
-                                          p_con.Status.ERROR)
+            for router in routers:
+                if router["id"] in id_list:
+                    self._set_db_router_state(context, router,
+                                              p_con.Status.ERROR)
         return [self._make_router_dict(router, fields)
-                for router in router_query]
+                for router in routers]
 
     def delete_router(self, context, id):
         """Deletes the DVA with the specific router id."""
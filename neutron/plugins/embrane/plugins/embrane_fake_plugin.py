@@ -26,6 +26,8 @@ from neutron.plugins.embrane.l2base.fake import fakeplugin_support as sup
 class EmbraneFakePlugin(base.EmbranePlugin, extraroute_db.ExtraRoute_db_mixin,
                         l2.FakeL2Plugin):
     _plugin_support = sup.FakePluginSupport
+    __native_pagination_support = True
+    __native_sorting_support = True
 
     def __init__(self):
         '''First run plugin specific initialization, then Embrane's.'''
@@ -30,6 +30,8 @@ class EmbraneOvsPlugin(base.EmbranePlugin, l2.OVSNeutronPluginV2):
 
     '''
     _plugin_support = openvswitch_support.OpenvswitchSupport
+    __native_pagination_support = True
+    __native_sorting_support = True
 
     def __init__(self):
         '''First run plugin specific initialization, then Embrane's.'''
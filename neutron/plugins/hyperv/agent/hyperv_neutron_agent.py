@@ -285,49 +285,53 @@ class HyperVNeutronAgent(object):
 
     def _treat_devices_added(self, devices):
         resync = False
-        for device in devices:
-            LOG.info(_("Adding port %s"), device)
+        for devices_batch in agent_rpc.get_device_batches(devices):
+            LOG.info(_("Adding ports %s"), devices_batch)
             try:
-                device_details = self.plugin_rpc.get_device_details(
+                devices_details = self.plugin_rpc.get_devices_details_list(
                     self.context,
-                    device,
+                    devices_batch,
                     self.agent_id)
             except Exception as e:
                 LOG.debug(
                     _("Unable to get port details for "
-                      "device %(device)s: %(e)s"),
-                    {'device': device, 'e': e})
+                      "devices %(devices)s: %(e)s"),
+                    {'devices': devices_batch, 'e': e})
                 resync = True
                 continue
-            if 'port_id' in device_details:
-                LOG.info(
-                    _("Port %(device)s updated. Details: %(device_details)s"),
-                    {'device': device, 'device_details': device_details})
-                self._treat_vif_port(
-                    device_details['port_id'],
-                    device_details['network_id'],
-                    device_details['network_type'],
-                    device_details['physical_network'],
-                    device_details['segmentation_id'],
-                    device_details['admin_state_up'])
+            for device_details in devices_details:
+                if 'port_id' in device_details:
+                    LOG.info(
+                        _("Port %(device)s updated. "
+                          "Details: %(device_details)s"),
+                        {'device': device_details['device'],
+                         'device_details': device_details})
+                    self._treat_vif_port(
+                        device_details['port_id'],
+                        device_details['network_id'],
+                        device_details['network_type'],
+                        device_details['physical_network'],
+                        device_details['segmentation_id'],
+                        device_details['admin_state_up'])
         return resync
 
     def _treat_devices_removed(self, devices):
         resync = False
-        for device in devices:
-            LOG.info(_("Removing port %s"), device)
+        for devices_batch in agent_rpc.get_device_batches(devices):
+            LOG.info(_("Removing ports %s"), devices_batch)
             try:
-                self.plugin_rpc.update_device_down(self.context,
-                                                   device,
-                                                   self.agent_id,
-                                                   cfg.CONF.host)
+                self.plugin_rpc.update_devices_down(self.context,
+                                                    devices_batch,
+                                                    self.agent_id,
+                                                    cfg.CONF.host)
             except Exception as e:
                 LOG.debug(
-                    _("Removing port failed for device %(device)s: %(e)s"),
-                    dict(device=device, e=e))
+                    _("Removing ports failed for devices %(devices)s: %(e)s"),
+                    dict(devices=devices_batch, e=e))
                 resync = True
                 continue
-            self._port_unbound(device)
+            for device in devices_batch:
+                self._port_unbound(device)
         return resync
 
     def _process_network_ports(self, port_info):
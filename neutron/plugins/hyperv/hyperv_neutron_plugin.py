@@ -151,9 +151,11 @@ class HyperVNeutronPlugin(agents_db.AgentDbMixin,
                           portbindings_base.PortBindingBaseMixin):
 
     # This attribute specifies whether the plugin supports or not
-    # bulk operations. Name mangling is used in order to ensure it
-    # is qualified by class
+    # bulk/pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
     __native_bulk_support = True
+    __native_pagination_support = True
+    __native_sorting_support = True
     supported_extension_aliases = ["provider", "external-net", "router",
                                    "agent", "ext-gw-mode", "binding", "quotas"]
 
@@ -254,9 +256,10 @@ class HyperVNeutronPlugin(agents_db.AgentDbMixin,
             LOG.debug(_("Created network: %s"), net['id'])
             return net
 
-    def _extend_network_dict_provider(self, context, network):
-        binding = self._db.get_network_binding(
-            context.session, network['id'])
+    def _extend_network_dict_provider(self, context, network, binding=None):
+        if binding is None:
+            binding = self._db.get_network_binding(
+                context.session, network['id'])
         network[provider.NETWORK_TYPE] = binding.network_type
         p = self._network_providers_map[binding.network_type]
         p.extend_network_dict(network, binding)
@@ -288,11 +291,15 @@ class HyperVNeutronPlugin(agents_db.AgentDbMixin,
         self._extend_network_dict_provider(context, net)
         return self._fields(net, fields)
 
-    def get_networks(self, context, filters=None, fields=None):
+    def get_networks(self, context, filters=None, fields=None,
+                     sorts=None, limit=None, marker=None, page_reverse=False):
         nets = super(HyperVNeutronPlugin, self).get_networks(
-            context, filters, None)
+            context, filters, None, sorts, limit, marker, page_reverse)
+        bindings = self._db.get_network_bindings(
+            context.session, [net['id'] for net in nets])
         for net in nets:
-            self._extend_network_dict_provider(context, net)
+            self._extend_network_dict_provider(context, net,
+                                               bindings.get(net['id']))
 
         return [self._fields(net, fields) for net in nets]
 
@@ -19,6 +19,7 @@
 from neutron.common import constants as q_const
 from neutron.common import rpc as q_rpc
 from neutron.db import agents_db
+from neutron.db import device_rpc_base
 from neutron.db import dhcp_rpc_base
 from neutron.db import l3_rpc_base
 from neutron.openstack.common import log as logging
@@ -30,10 +31,15 @@ LOG = logging.getLogger(__name__)
 
 class HyperVRpcCallbacks(
         dhcp_rpc_base.DhcpRpcCallbackMixin,
-        l3_rpc_base.L3RpcCallbackMixin):
+        l3_rpc_base.L3RpcCallbackMixin,
+        device_rpc_base.DeviceDetailsRpcCallbackMixin,
+        device_rpc_base.DeviceDownRpcCallbackMixin):
 
     # Set RPC API version to 1.0 by default.
-    RPC_API_VERSION = '1.1'
+    # 1.2 Support lists of devices in device details and down RPC,
+    #     the agent has no device up RPC, and get_networks_info of the
+    #     DHCP agent
+    RPC_API_VERSION = '1.2'
 
     def __init__(self, notifier):
         self.notifier = notifier
@@ -858,19 +858,24 @@ class LinuxBridgeNeutronAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
     def treat_devices_added(self, devices):
         resync = False
         self.prepare_devices_filter(devices)
-        for device in devices:
-            LOG.debug(_("Port %s added"), device)
+        for devices_batch in agent_rpc.get_device_batches(devices):
+            LOG.debug(_("Ports %s added"), devices_batch)
             try:
-                details = self.plugin_rpc.get_device_details(self.context,
-                                                             device,
-                                                             self.agent_id)
+                devices_details = self.plugin_rpc.get_devices_details_list(
+                    self.context, devices_batch, self.agent_id)
             except Exception as e:
                 LOG.debug(_("Unable to get port details for "
-                            "%(device)s: %(e)s"),
-                          {'device': device, 'e': e})
+                            "%(devices)s: %(e)s"),
+                          {'devices': devices_batch, 'e': e})
                 resync = True
                 continue
-            if 'port_id' in details:
+            devices_up = []
+            devices_down = []
+            for details in devices_details:
+                device = details['device']
+                if 'port_id' not in details:
+                    LOG.info(_("Device %s not defined on plugin"), device)
+                    continue
                 LOG.info(_("Port %(device)s updated. Details: %(details)s"),
                          {'device': device, 'details': details})
                 if details['admin_state_up']:
@@ -888,43 +893,46 @@ class LinuxBridgeNeutronAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
                                                  details['physical_network'],
                                                  segmentation_id,
                                                  details['port_id']):
-
-                        # update plugin about port status
-                        self.plugin_rpc.update_device_up(self.context,
-                                                         device,
-                                                         self.agent_id,
-                                                         cfg.CONF.host)
+                        devices_up.append(device)
                     else:
-                        self.plugin_rpc.update_device_down(self.context,
-                                                           device,
-                                                           self.agent_id,
-                                                           cfg.CONF.host)
+                        devices_down.append(device)
                 else:
                     self.remove_port_binding(details['network_id'],
                                              details['port_id'])
-            else:
-                LOG.info(_("Device %s not defined on plugin"), device)
+            # update plugin about port status
+            if devices_up:
+                self.plugin_rpc.update_devices_up(self.context,
+                                                  devices_up,
+                                                  self.agent_id,
+                                                  cfg.CONF.host)
+            if devices_down:
+                self.plugin_rpc.update_devices_down(self.context,
+                                                    devices_down,
+                                                    self.agent_id,
+                                                    cfg.CONF.host)
         return resync
 
     def treat_devices_removed(self, devices):
         resync = False
         self.remove_devices_filter(devices)
-        for device in devices:
-            LOG.info(_("Attachment %s removed"), device)
+        for devices_batch in agent_rpc.get_device_batches(devices):
+            LOG.info(_("Attachments %s removed"), devices_batch)
             try:
-                details = self.plugin_rpc.update_device_down(self.context,
-                                                             device,
-                                                             self.agent_id,
-                                                             cfg.CONF.host)
+                devices_details = self.plugin_rpc.update_devices_down(
+                    self.context, devices_batch, self.agent_id,
+                    cfg.CONF.host)
             except Exception as e:
-                LOG.debug(_("port_removed failed for %(device)s: %(e)s"),
-                          {'device': device, 'e': e})
+                LOG.debug(_("port_removed failed for %(devices)s: %(e)s"),
+                          {'devices': devices_batch, 'e': e})
                 resync = True
-            if details['exists']:
-                LOG.info(_("Port %s updated."), device)
-            else:
-                LOG.debug(_("Device %s not defined on plugin"), device)
-            self.br_mgr.remove_empty_bridges()
+                continue
+            for details in devices_details:
+                if details['exists']:
+                    LOG.info(_("Port %s updated."), details['device'])
+                else:
+                    LOG.debug(_("Device %s not defined on plugin"),
+                              details['device'])
+        self.br_mgr.remove_empty_bridges()
         return resync
 
     def daemon_loop(self):
@@ -201,6 +201,16 @@ def get_network_binding(session, network_id):
         return
 
 
+def get_network_bindings(session, network_ids):
+    """Return the bindings of the networks, by network id."""
+    if not network_ids:
+        return {}
+    bindings = (session.query(l2network_models_v2.NetworkBinding).
+                filter(l2network_models_v2.NetworkBinding.network_id.in_(
+                    network_ids)))
+    return dict((binding.network_id, binding) for binding in bindings)
+
+
 def get_port_from_device(device):
     """Get port from database."""
     LOG.debug(_("get_port_from_device() called"))
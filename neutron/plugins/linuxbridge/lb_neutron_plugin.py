@@ -30,6 +30,7 @@ from neutron.db import agents_db
 from neutron.db import agentschedulers_db
 from neutron.db import api as db_api
 from neutron.db import db_base_plugin_v2
+from neutron.db import device_rpc_base
 from neutron.db import dhcp_rpc_base
 from neutron.db import external_net_db
 from neutron.db import extraroute_db
@@ -57,12 +58,15 @@ LOG = logging.getLogger(__name__)
 
 class LinuxBridgeRpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin,
                               l3_rpc_base.L3RpcCallbackMixin,
-                              sg_db_rpc.SecurityGroupServerRpcCallbackMixin
+                              sg_db_rpc.SecurityGroupServerRpcCallbackMixin,
+                              device_rpc_base.DeviceRpcCallbackMixin
                               ):
 
     # history
     #   1.1 Support Security Group RPC
-    RPC_API_VERSION = '1.1'
+    #   1.2 Support lists of devices in device details and up/down RPC,
+    #       and get_networks_info of the DHCP agent
+    RPC_API_VERSION = '1.2'
     # Device names start with "tap"
     TAP_PREFIX_LEN = 3
 
@@ -82,6 +86,12 @@ class LinuxBridgeRpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin,
             port['device'] = device
         return port
 
+    @classmethod
+    def get_ports_from_devices(cls, devices):
+        return sg_db_rpc.get_ports_with_security_groups(
+            dict((device[cls.TAP_PREFIX_LEN:], device) for device in devices),
+            prefix_match=True)
+
     def get_device_details(self, rpc_context, **kwargs):
         """Agent requests device details."""
         agent_id = kwargs.get('agent_id')
@@ -313,8 +323,9 @@ class LinuxBridgePluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         if physical_network not in self.network_vlan_ranges:
             self.network_vlan_ranges[physical_network] = []
 
-    def _extend_network_dict_provider(self, context, network):
-        binding = db.get_network_binding(context.session, network['id'])
+    def _extend_network_dict_provider(self, context, network, binding=None):
+        if binding is None:
+            binding = db.get_network_binding(context.session, network['id'])
         if binding.vlan_id == constants.FLAT_VLAN_ID:
             network[provider.NETWORK_TYPE] = constants.TYPE_FLAT
             network[provider.PHYSICAL_NETWORK] = binding.physical_network
@@ -450,6 +461,7 @@ class LinuxBridgePluginV2(db_base_plugin_v2.NeutronDbPluginV2,
             # the network record, so explicit removal is not necessary
         self.notifier.network_delete(context, id)
 
+    @db_api.supports_slave_reads
     def get_network(self, context, id, fields=None):
         session = context.session
         with session.begin(subtransactions=True):
@@ -458,6 +470,7 @@ class LinuxBridgePluginV2(db_base_plugin_v2.NeutronDbPluginV2,
             self._extend_network_dict_provider(context, net)
         return self._fields(net, fields)
 
+    @db_api.supports_slave_reads
     def get_networks(self, context, filters=None, fields=None,
                      sorts=None, limit=None, marker=None, page_reverse=False):
         session = context.session
@@ -465,8 +478,11 @@ class LinuxBridgePluginV2(db_base_plugin_v2.NeutronDbPluginV2,
             nets = super(LinuxBridgePluginV2,
                          self).get_networks(context, filters, None, sorts,
                                             limit, marker, page_reverse)
+            bindings = db.get_network_bindings(
+                session, [net['id'] for net in nets])
             for net in nets:
-                self._extend_network_dict_provider(context, net)
+                self._extend_network_dict_provider(context, net,
+                                                   bindings.get(net['id']))
 
         return [self._fields(net, fields) for net in nets]
 
@@ -115,6 +115,25 @@ class MetaPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         plugin_klass = importutils.import_class(plugin_provider)
         return plugin_klass()
 
+    def _get_rpc_plugins(self):
+        plugins = dict((id(plugin), plugin) for plugin
+                       in self.plugins.values() + self.l3_plugins.values())
+        return [plugin for plugin in plugins.values()
+                if plugin.rpc_workers_supported()]
+
+    def start_rpc_listener(self):
+        """Start the RPC consumers of the sub-plugins supporting it.
+
+        The other sub-plugins start their consumers when initialized.
+        """
+        servers = []
+        for plugin in self._get_rpc_plugins():
+            servers.extend(plugin.start_rpc_listener())
+        return servers
+
+    def rpc_workers_supported(self):
+        return bool(self._get_rpc_plugins())
+
     def _get_plugin(self, flavor):
         if flavor not in self.plugins:
             raise FlavorNotFound(flavor=flavor)
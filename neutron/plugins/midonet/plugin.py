@@ -171,7 +171,9 @@ def _check_resource_exists(func, id, name, raise_exc=False):
 
 
 class MidoRpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin):
-    RPC_API_VERSION = '1.1'
+    # history
+    #   1.2 Support get_networks_info of the DHCP agent
+    RPC_API_VERSION = '1.2'
 
     def create_rpc_dispatcher(self):
         """Get the rpc dispatcher for this manager.
@@ -198,6 +200,8 @@ class MidonetPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
     supported_extension_aliases = ['external-net', 'router', 'security-group',
                                    'agent' 'dhcp_agent_scheduler']
     __native_bulk_support = False
+    __native_pagination_support = True
+    __native_sorting_support = True
 
     def __init__(self):
         # Read config values
@@ -568,13 +572,15 @@ class MidonetPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         LOG.debug(_("MidonetPluginV2.get_port exiting: port=%r"), port)
         return port
 
-    def get_ports(self, context, filters=None, fields=None):
+    def get_ports(self, context, filters=None, fields=None,
+                  sorts=None, limit=None, marker=None, page_reverse=False):
         """List neutron ports and verify that they exist in MidoNet."""
         LOG.debug(_("MidonetPluginV2.get_ports called: filters=%(filters)s "
                     "fields=%(fields)r"),
                   {'filters': filters, 'fields': fields})
         ports = super(MidonetPluginV2, self).get_ports(context, filters,
-                                                       fields)
+                                                       fields, sorts, limit,
+                                                       marker, page_reverse)
         return ports
 
     def delete_port(self, context, id, l3_port_check=True):
@@ -49,15 +49,31 @@ def add_network_segment(session, network_id, segment):
               'network_id': record.network_id})
 
 
+def _make_segment_dict(record):
+    return {api.ID: record.id,
+            api.NETWORK_TYPE: record.network_type,
+            api.PHYSICAL_NETWORK: record.physical_network,
+            api.SEGMENTATION_ID: record.segmentation_id}
+
+
 def get_network_segments(session, network_id):
     with session.begin(subtransactions=True):
         records = (session.query(models.NetworkSegment).
                    filter_by(network_id=network_id))
-        return [{api.ID: record.id,
-                 api.NETWORK_TYPE: record.network_type,
-                 api.PHYSICAL_NETWORK: record.physical_network,
-                 api.SEGMENTATION_ID: record.segmentation_id}
-                for record in records]
+        return [_make_segment_dict(record) for record in records]
+
+
+def get_networks_segments(session, network_ids):
+    """Return the segments of the networks, by network id."""
+    if not network_ids:
+        return {}
+    with session.begin(subtransactions=True):
+        records = (session.query(models.NetworkSegment).
+                   filter(models.NetworkSegment.network_id.in_(network_ids)))
+        segments = dict((network_id, []) for network_id in network_ids)
+        for record in records:
+            segments[record.network_id].append(_make_segment_dict(record))
+        return segments
 
 
 def ensure_port_binding(session, port_id):
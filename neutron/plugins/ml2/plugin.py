@@ -23,6 +23,7 @@ from neutron.common import exceptions as exc
 from neutron.common import topics
 from neutron.db import agentschedulers_db
 from neutron.db import allowedaddresspairs_db as addr_pair_db
+from neutron.db import api as db_api
 from neutron.db import db_base_plugin_v2
 from neutron.db import external_net_db
 from neutron.db import extradhcpopt_db
@@ -118,11 +119,14 @@ class Ml2Plugin(db_base_plugin_v2.NeutronDbPluginV2,
         )
         self.callbacks = rpc.RpcCallbacks(self.notifier, self.type_manager)
         self.topic = topics.PLUGIN
+
+    def start_rpc_listener(self):
         self.conn = c_rpc.create_connection(new=True)
         self.dispatcher = self.callbacks.create_rpc_dispatcher()
         self.conn.create_consumer(self.topic, self.dispatcher,
                                   fanout=False)
         self.conn.consume_in_thread()
+        return [self.conn]
 
     def _process_provider_segment(self, segment):
         network_type = self._get_attribute(segment, provider.NETWORK_TYPE)
@@ -173,9 +177,10 @@ class Ml2Plugin(db_base_plugin_v2.NeutronDbPluginV2,
             value = None
         return value
 
-    def _extend_network_dict_provider(self, context, network):
+    def _extend_network_dict_provider(self, context, network, segments=None):
         id = network['id']
-        segments = db.get_network_segments(context.session, id)
+        if segments is None:
+            segments = db.get_network_segments(context.session, id)
         if not segments:
             LOG.error(_("Network %s has no segments"), id)
             network[provider.NETWORK_TYPE] = None
@@ -344,6 +349,7 @@ class Ml2Plugin(db_base_plugin_v2.NeutronDbPluginV2,
         self.mechanism_manager.update_network_postcommit(mech_context)
         return updated_network
 
+    @db_api.supports_slave_reads
     def get_network(self, context, id, fields=None):
         session = context.session
         with session.begin(subtransactions=True):
@@ -352,6 +358,7 @@ class Ml2Plugin(db_base_plugin_v2.NeutronDbPluginV2,
 
         return self._fields(result, fields)
 
+    @db_api.supports_slave_reads
     def get_networks(self, context, filters=None, fields=None,
                      sorts=None, limit=None, marker=None, page_reverse=False):
         session = context.session
@@ -359,8 +366,11 @@ class Ml2Plugin(db_base_plugin_v2.NeutronDbPluginV2,
             nets = super(Ml2Plugin,
                          self).get_networks(context, filters, None, sorts,
                                             limit, marker, page_reverse)
+            segments = db.get_networks_segments(
+                session, [net['id'] for net in nets])
             for net in nets:
-                self._extend_network_dict_provider(context, net)
+                self._extend_network_dict_provider(context, net,
+                                                   segments[net['id']])
 
             nets = self._filter_nets_provider(context, nets, filters)
             nets = self._filter_nets_l3(context, nets, filters)
@@ -19,6 +19,7 @@ from neutron.common import rpc as q_rpc
 from neutron.common import topics
 from neutron.db import agents_db
 from neutron.db import api as db_api
+from neutron.db import device_rpc_base
 from neutron.db import dhcp_rpc_base
 from neutron.db import securitygroups_rpc_base as sg_db_rpc
 from neutron import manager
@@ -38,12 +39,15 @@ TAP_DEVICE_PREFIX_LENGTH = 3
 
 class RpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin,
                    sg_db_rpc.SecurityGroupServerRpcCallbackMixin,
-                   type_tunnel.TunnelRpcCallbackMixin):
+                   type_tunnel.TunnelRpcCallbackMixin,
+                   device_rpc_base.DeviceRpcCallbackMixin):
 
-    RPC_API_VERSION = '1.1'
+    RPC_API_VERSION = '1.2'
     # history
     #   1.0 Initial version (from openvswitch/linuxbridge)
     #   1.1 Support Security Group RPC
+    #   1.2 Support lists of devices in device details and up/down RPC,
+    #       and get_networks_info of the DHCP agent
 
     def __init__(self, notifier, type_manager):
         # REVISIT(kmestery): This depends on the first three super classes
@@ -79,6 +83,13 @@ class RpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin,
             port['device'] = device
         return port
 
+    @classmethod
+    def get_ports_from_devices(cls, devices):
+        devices_by_port_id = dict((cls._device_to_port_id(device), device)
+                                  for device in devices)
+        return sg_db_rpc.get_ports_with_security_groups(devices_by_port_id,
+                                                        prefix_match=True)
+
     def get_device_details(self, rpc_context, **kwargs):
         """Agent requests device details."""
         agent_id = kwargs.get('agent_id')
@@ -202,6 +202,16 @@ def get_network_binding(session, network_id):
             filter_by(network_id=network_id).first())
 
 
+def get_network_bindings(session, network_ids):
+    """Return the bindings of the networks, by network id."""
+    if not network_ids:
+        return {}
+    bindings = (session.query(mlnx_models_v2.NetworkBinding).
+                filter(mlnx_models_v2.NetworkBinding.network_id.in_(
+                    network_ids)))
+    return dict((binding.network_id, binding) for binding in bindings)
+
+
 def add_port_profile_binding(session, port_id, vnic_type):
     with session.begin(subtransactions=True):
         binding = mlnx_models_v2.PortProfileBinding(port_id, vnic_type)
@@ -75,9 +75,11 @@ class MellanoxEswitchPlugin(db_base_plugin_v2.NeutronDbPluginV2,
     """
 
     # This attribute specifies whether the plugin supports or not
-    # bulk operations. Name mangling is used in order to ensure it
-    # is qualified by class
+    # bulk/pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
     __native_bulk_support = True
+    __native_pagination_support = True
+    __native_sorting_support = True
 
     _supported_extension_aliases = ["provider", "external-net", "router",
                                     "ext-gw-mode", "binding", "quotas",
@@ -150,8 +152,9 @@ class MellanoxEswitchPlugin(db_base_plugin_v2.NeutronDbPluginV2,
         if physical_network not in self.network_vlan_ranges:
             self.network_vlan_ranges[physical_network] = []
 
-    def _extend_network_dict_provider(self, context, network):
-        binding = db.get_network_binding(context.session, network['id'])
+    def _extend_network_dict_provider(self, context, network, binding=None):
+        if binding is None:
+            binding = db.get_network_binding(context.session, network['id'])
         network[provider.NETWORK_TYPE] = binding.network_type
         if binding.network_type == constants.TYPE_FLAT:
             network[provider.PHYSICAL_NETWORK] = binding.physical_network
@@ -376,8 +379,11 @@ class MellanoxEswitchPlugin(db_base_plugin_v2.NeutronDbPluginV2,
             nets = super(MellanoxEswitchPlugin,
                          self).get_networks(context, filters, None, sorts,
                                             limit, marker, page_reverse)
+            bindings = db.get_network_bindings(
+                session, [net['id'] for net in nets])
             for net in nets:
-                self._extend_network_dict_provider(context, net)
+                self._extend_network_dict_provider(context, net,
+                                                   bindings.get(net['id']))
 
         return [self._fields(net, fields) for net in nets]
 
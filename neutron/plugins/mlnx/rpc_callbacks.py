@@ -69,6 +69,19 @@ class MlnxRpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin,
                 port['device'] = device
         return port
 
+    @classmethod
+    def get_ports_from_devices(cls, devices):
+        ports = sg_db_rpc.get_ports_with_security_groups(
+            dict((device[cls.TAP_PREFIX_LEN:], device) for device in devices),
+            prefix_match=True)
+        # the devices of the DHCP/L3 services are found by mac address
+        for device in set(devices) - set(ports):
+            port = db.get_port_from_device_mac(device)
+            if port:
+                port['device'] = device
+                ports[device] = port
+        return ports
+
     def get_device_details(self, rpc_context, **kwargs):
         """Agent requests device details."""
         agent_id = kwargs.get('agent_id')
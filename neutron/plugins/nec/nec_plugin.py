@@ -74,6 +74,12 @@ class NECPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
     The port binding extension enables an external application relay
     information to and from the plugin.
     """
+    # This attribute specifies whether the plugin supports or not
+    # pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
+    __native_pagination_support = True
+    __native_sorting_support = True
+
     _supported_extension_aliases = ["agent",
                                     "allowed-address-pairs",
                                     "binding",
@@ -650,8 +656,8 @@ class NECPluginV2AgentNotifierApi(proxy.RpcProxy,
 
 
 class DhcpRpcCallback(dhcp_rpc_base.DhcpRpcCallbackMixin):
-    # DhcpPluginApi BASE_RPC_API_VERSION
-    RPC_API_VERSION = '1.1'
+    # DhcpPluginApi NETWORKS_INFO_RPC_VERSION
+    RPC_API_VERSION = '1.2'
 
 
 class L3RpcCallback(l3_rpc_base.L3RpcCallbackMixin):
@@ -674,6 +680,11 @@ class SecurityGroupServerRpcCallback(
                   {'device': device, 'ret': port})
         return port
 
+    @staticmethod
+    def get_ports_from_devices(devices):
+        return sg_db_rpc.get_ports_with_security_groups(
+            dict((device, device) for device in devices))
+
 
 class NECPluginV2RPCCallbacks(object):
 
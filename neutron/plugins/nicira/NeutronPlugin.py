@@ -151,6 +151,8 @@ class NvpPluginV2(addr_pair_db.AllowedAddressPairsMixin,
                                    "security-group"]
 
     __native_bulk_support = True
+    __native_pagination_support = True
+    __native_sorting_support = True
 
     # Map nova zones to cluster for easy retrieval
     novazone_cluster_map = {}
@@ -1077,10 +1079,12 @@ class NvpPluginV2(addr_pair_db.AllowedAddressPairsMixin,
             self._extend_network_dict_provider(context, net_result)
         return self._fields(net_result, fields)
 
-    def get_networks(self, context, filters=None, fields=None):
+    def get_networks(self, context, filters=None, fields=None,
+                     sorts=None, limit=None, marker=None, page_reverse=False):
         filters = filters or {}
         with context.session.begin(subtransactions=True):
-            networks = super(NvpPluginV2, self).get_networks(context, filters)
+            networks = super(NvpPluginV2, self).get_networks(
+                context, filters, None, sorts, limit, marker, page_reverse)
             for net in networks:
                 self._extend_network_dict_provider(context, net)
         return [self._fields(network, fields) for network in networks]
@@ -88,6 +88,12 @@ class NvpAdvancedPlugin(sr_db.ServiceRouter_mixin,
             "lbaas"
         ])
 
+    # This attribute specifies whether the plugin supports or not
+    # pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
+    __native_pagination_support = True
+    __native_sorting_support = True
+
     def __init__(self):
         super(NvpAdvancedPlugin, self).__init__()
 
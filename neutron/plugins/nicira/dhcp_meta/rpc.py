@@ -45,7 +45,9 @@ METADATA_DHCP_ROUTE = '169.254.169.254/32'
 
 class NVPRpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin):
 
-    RPC_API_VERSION = '1.1'
+    # history
+    #   1.2 Support get_networks_info of the DHCP agent
+    RPC_API_VERSION = '1.2'
 
     def create_rpc_dispatcher(self):
         '''Get the rpc dispatcher for this manager.
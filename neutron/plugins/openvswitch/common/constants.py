@@ -16,6 +16,9 @@
 # Special vlan_id value in ovs_vlan_allocations table indicating flat network
 FLAT_VLAN_ID = -1
 
+# The ofport value reported for interfaces that have no valid ofport
+INVALID_OFPORT = -1
+
 # Topic for tunnel notifications between the plugin and agent
 TUNNEL = 'tunnel'
 
@@ -48,3 +51,6 @@ UCAST_TO_TUN = 20
 FLOOD_TO_TUN = 21
 # Map tunnel types to tables number
 TUN_TABLE = {TYPE_GRE: GRE_TUN_TO_LV, TYPE_VXLAN: VXLAN_TUN_TO_LV}
+
+# The default respawn interval for the ovsdb monitor
+DEFAULT_OVSDBMON_RESPAWN = 30
@@ -48,6 +48,17 @@ def get_network_binding(session, network_id):
         return
 
 
+def get_network_bindings(session, network_ids):
+    """Return the bindings of the networks, by network id."""
+    session = session or db.get_session()
+    if not network_ids:
+        return {}
+    bindings = (session.query(ovs_models_v2.NetworkBinding).
+                filter(ovs_models_v2.NetworkBinding.network_id.in_(
+                    network_ids)))
+    return dict((binding.network_id, binding) for binding in bindings)
+
+
 def add_network_binding(session, network_id, network_type,
                         physical_network, segmentation_id):
     with session.begin(subtransactions=True):
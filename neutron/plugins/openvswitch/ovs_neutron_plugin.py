@@ -37,7 +37,9 @@ from neutron.common import utils
 from neutron.db import agents_db
 from neutron.db import agentschedulers_db
 from neutron.db import allowedaddresspairs_db as addr_pair_db
+from neutron.db import api as db_api
 from neutron.db import db_base_plugin_v2
+from neutron.db import device_rpc_base
 from neutron.db import dhcp_rpc_base
 from neutron.db import external_net_db
 from neutron.db import extradhcpopt_db
@@ -69,13 +71,16 @@ LOG = logging.getLogger(__name__)
 
 class OVSRpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin,
                       l3_rpc_base.L3RpcCallbackMixin,
-                      sg_db_rpc.SecurityGroupServerRpcCallbackMixin):
+                      sg_db_rpc.SecurityGroupServerRpcCallbackMixin,
+                      device_rpc_base.DeviceRpcCallbackMixin):
 
     # history
     #   1.0 Initial version
     #   1.1 Support Security Group RPC
+    #   1.2 Support lists of devices in device details and up/down RPC,
+    #       and get_networks_info of the DHCP agent
 
-    RPC_API_VERSION = '1.1'
+    RPC_API_VERSION = '1.2'
 
     def __init__(self, notifier, tunnel_type):
         self.notifier = notifier
@@ -97,6 +102,11 @@ class OVSRpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin,
             port['device'] = device
         return port
 
+    @classmethod
+    def get_ports_from_devices(cls, devices):
+        return sg_db_rpc.get_ports_with_security_groups(
+            dict((device, device) for device in devices))
+
     def get_device_details(self, rpc_context, **kwargs):
         """Agent requests device details."""
         agent_id = kwargs.get('agent_id')
@@ -336,7 +346,6 @@ class OVSNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
         # RPC support
         self.service_topics = {svc_constants.CORE: topics.PLUGIN,
                                svc_constants.L3_ROUTER_NAT: topics.L3PLUGIN}
-        self.conn = rpc.create_connection(new=True)
         self.notifier = AgentNotifierApi(topics.AGENT)
         self.agent_notifiers[q_const.AGENT_TYPE_DHCP] = (
             dhcp_rpc_agent_api.DhcpAgentNotifyAPI()
@@ -345,11 +354,15 @@ class OVSNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
             l3_rpc_agent_api.L3AgentNotify
         )
         self.callbacks = OVSRpcCallbacks(self.notifier, self.tunnel_type)
+
+    def start_rpc_listener(self):
+        self.conn = rpc.create_connection(new=True)
         self.dispatcher = self.callbacks.create_rpc_dispatcher()
         for svc_topic in self.service_topics.values():
             self.conn.create_consumer(svc_topic, self.dispatcher, fanout=False)
         # Consume from all consumers in a thread
         self.conn.consume_in_thread()
+        return [self.conn]
 
     def _parse_network_vlan_ranges(self):
         try:
@@ -373,9 +386,10 @@ class OVSNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
                 sys.exit(1)
         LOG.info(_("Tunnel ID ranges: %s"), self.tunnel_id_ranges)
 
-    def _extend_network_dict_provider(self, context, network):
-        binding = ovs_db_v2.get_network_binding(context.session,
-                                                network['id'])
+    def _extend_network_dict_provider(self, context, network, binding=None):
+        if binding is None:
+            binding = ovs_db_v2.get_network_binding(context.session,
+                                                    network['id'])
         network[provider.NETWORK_TYPE] = binding.network_type
         if binding.network_type in constants.TUNNEL_NETWORK_TYPES:
             network[provider.PHYSICAL_NETWORK] = None
@@ -536,6 +550,7 @@ class OVSNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
             # the network record, so explicit removal is not necessary
         self.notifier.network_delete(context, id)
 
+    @db_api.supports_slave_reads
     def get_network(self, context, id, fields=None):
         session = context.session
         with session.begin(subtransactions=True):
@@ -544,6 +559,7 @@ class OVSNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
             self._extend_network_dict_provider(context, net)
         return self._fields(net, fields)
 
+    @db_api.supports_slave_reads
     def get_networks(self, context, filters=None, fields=None,
                      sorts=None,
                      limit=None, marker=None, page_reverse=False):
@@ -552,8 +568,11 @@ class OVSNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
             nets = super(OVSNeutronPluginV2,
                          self).get_networks(context, filters, None, sorts,
                                             limit, marker, page_reverse)
+            bindings = ovs_db_v2.get_network_bindings(
+                session, [net['id'] for net in nets])
             for net in nets:
-                self._extend_network_dict_provider(context, net)
+                self._extend_network_dict_provider(context, net,
+                                                   bindings.get(net['id']))
 
         return [self._fields(net, fields) for net in nets]
 
@@ -62,6 +62,12 @@ class NeutronPluginPLUMgridV2(db_base_plugin_v2.NeutronDbPluginV2,
 
     supported_extension_aliases = ["external-net", "router", "binding"]
 
+    # This attribute specifies whether the plugin supports or not
+    # pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
+    __native_pagination_support = True
+    __native_sorting_support = True
+
     binding_view = "extension:port_binding:view"
     binding_set = "extension:port_binding:set"
 
@@ -270,10 +276,12 @@ class NeutronPluginPLUMgridV2(db_base_plugin_v2.NeutronDbPluginV2,
             self._port_viftype_binding(context, port_db)
         return self._fields(port_db, fields)
 
-    def get_ports(self, context, filters=None, fields=None):
+    def get_ports(self, context, filters=None, fields=None,
+                  sorts=None, limit=None, marker=None, page_reverse=False):
         with context.session.begin(subtransactions=True):
             ports_db = super(NeutronPluginPLUMgridV2,
-                             self).get_ports(context, filters, fields)
+                             self).get_ports(context, filters, fields, sorts,
+                                             limit, marker, page_reverse)
             for port_db in ports_db:
                 self._port_viftype_binding(context, port_db)
         return [self._fields(port, fields) for port in ports_db]
@@ -70,6 +70,11 @@ class RyuRpcCallbacks(dhcp_rpc_base.DhcpRpcCallbackMixin,
             port['device'] = device
         return port
 
+    @classmethod
+    def get_ports_from_devices(cls, devices):
+        return sg_db_rpc.get_ports_with_security_groups(
+            dict((device, device) for device in devices))
+
 
 class AgentNotifierApi(proxy.RpcProxy,
                        sg_rpc.SecurityGroupAgentRpcApiMixin):
@@ -96,6 +101,12 @@ class RyuNeutronPluginV2(db_base_plugin_v2.NeutronDbPluginV2,
                          sg_db_rpc.SecurityGroupServerRpcMixin,
                          portbindings_base.PortBindingBaseMixin):
 
+    # This attribute specifies whether the plugin supports or not
+    # pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
+    __native_pagination_support = True
+    __native_sorting_support = True
+
     _supported_extension_aliases = ["external-net", "router", "ext-gw-mode",
                                     "extraroute", "security-group",
                                     "binding"]
@@ -35,6 +35,7 @@ from neutron.openstack.common import policy
 LOG = logging.getLogger(__name__)
 _POLICY_PATH = None
 _POLICY_CACHE = {}
+_MATCH_RULE_CACHE = {}
 ADMIN_CTX_POLICY = 'context_is_admin'
 # Maps deprecated 'extension' policies to new-style policies
 DEPRECATED_POLICY_MAP = {
@@ -59,8 +60,10 @@ cfg.CONF.import_opt('policy_file', 'neutron.common.config')
 def reset():
     global _POLICY_PATH
     global _POLICY_CACHE
+    global _MATCH_RULE_CACHE
     _POLICY_PATH = None
     _POLICY_CACHE = {}
+    _MATCH_RULE_CACHE = {}
     policy.reset()
 
 
@@ -192,6 +195,40 @@ def _build_match_rule(action, target):
     return match_rule
 
 
+def _get_match_rule_key(action, target):
+    """Return what the match rule for an action depends on.
+
+    The rule only depends on the action and, for write actions, on the
+    policy enforced attributes explicitly set in the target along with
+    the keys of their values when these are dicts.
+    """
+    resource, is_write = get_resource_and_action(action)
+    res_map = attributes.RESOURCE_ATTRIBUTE_MAP.get(resource)
+    if not is_write or not res_map:
+        return (action,)
+    key = []
+    for attribute_name in target:
+        attribute = res_map.get(attribute_name)
+        if (attribute and 'enforce_policy' in attribute and
+                _is_attribute_explicitly_set(attribute_name, res_map,
+                                             target)):
+            value = target[attribute_name]
+            sub_attrs = (frozenset(value) if isinstance(value, dict)
+                         else None)
+            key.append((attribute_name, sub_attrs))
+    return (action, tuple(sorted(key)))
+
+
+def _get_match_rule(action, target):
+    """Return the match rule for an action, building it only once."""
+    key = _get_match_rule_key(action, target)
+    match_rule = _MATCH_RULE_CACHE.get(key)
+    if match_rule is None:
+        match_rule = _build_match_rule(action, target)
+        _MATCH_RULE_CACHE[key] = match_rule
+    return match_rule
+
+
 # This check is registered as 'tenant_id' so that it can override
 # GenericCheck which was used for validating parent resource ownership.
 # This will prevent us from having to handling backward compatibility
@@ -320,7 +357,7 @@ def _prepare_check(context, action, target):
     # Compare with None to distinguish case in which target is {}
     if target is None:
         target = {}
-    match_rule = _build_match_rule(action, target)
+    match_rule = _get_match_rule(action, target)
     credentials = context.to_dict()
     return match_rule, target, credentials
 
@@ -342,6 +379,34 @@ def check(context, action, target, plugin=None):
     return policy.check(*(_prepare_check(context, action, target)))
 
 
+def check_many(context, action, targets):
+    """Return the targets on which the action is valid in this context.
+
+    This is equivalent to calling check() for each target, but the
+    credentials are only built once and, when the rule for the action does
+    not look at the target, it is only evaluated once.
+
+    :param context: neutron context
+    :param action: string representing the action to be checked
+    :param targets: list of dictionaries representing the objects of the
+        action
+
+    :return: Returns the list of targets for which access is permitted.
+    """
+    init()
+    credentials = context.to_dict()
+    resource, is_write = get_resource_and_action(action)
+    if not is_write and targets:
+        match_rule = _get_match_rule(action, {})
+        if not _rule_depends_on_target(match_rule):
+            if policy.check(match_rule, {}, credentials):
+                return list(targets)
+            return []
+    return [target for target in targets
+            if policy.check(_get_match_rule(action, target), target,
+                            credentials)]
+
+
 def check_if_exists(context, action, target):
     """Verify if the action can be authorized, and raise if it is unknown.
 
@@ -358,6 +423,41 @@ def check_if_exists(context, action, target):
     return policy.check(*(_prepare_check(context, action, target)))
 
 
+def _rule_depends_on_target(rule):
+    if isinstance(rule, (policy.TrueCheck, policy.FalseCheck,
+                         policy.RoleCheck)):
+        return False
+    if isinstance(rule, policy.RuleCheck):
+        try:
+            return _rule_depends_on_target(policy._rules[rule.match])
+        except KeyError:
+            # Missing rules always fail
+            return False
+    if isinstance(rule, policy.NotCheck):
+        return _rule_depends_on_target(rule.rule)
+    if isinstance(rule, (policy.AndCheck, policy.OrCheck)):
+        return any(_rule_depends_on_target(r) for r in rule.rules)
+    if type(rule) is policy.GenericCheck:
+        return '%(' in rule.match
+    # Any other check, e.g. ownership or field checks, might look at the
+    # target
+    return True
+
+
+def depends_on_target(action):
+    """Verify if the authorization of a read action depends on the target.
+
+    When it does not, the result of check() for the action is the same for
+    every target, so it can be evaluated once for many of them. Raise a
+    PolicyRuleNotFound exception if the action is not defined in the
+    policy engine.
+    """
+    init()
+    if not policy._rules or action not in policy._rules:
+        raise exceptions.PolicyRuleNotFound(rule=action)
+    return _rule_depends_on_target(_build_match_rule(action, {}))
+
+
 def enforce(context, action, target, plugin=None):
     """Verifies that the action is valid on the target in this context.
 
@@ -20,11 +20,14 @@ import logging as std_logging
 import os
 import random
 
+import eventlet
 from oslo.config import cfg
 
 from neutron.common import config
 from neutron.common import legacy
 from neutron import context
+from neutron.db import api as db_api
+from neutron import manager
 from neutron.openstack.common import importutils
 from neutron.openstack.common import log as logging
 from neutron.openstack.common import loopingcall
@@ -41,6 +44,15 @@ service_opts = [
                help=_('Range of seconds to randomly delay when starting the '
                       'periodic task scheduler to reduce stampeding. '
                       '(Disable by setting to 0)')),
+    cfg.IntOpt('api_workers',
+               default=0,
+               help=_('Number of separate worker processes for the API '
+                      'service. 0 serves the API from the main process.')),
+    cfg.IntOpt('rpc_workers',
+               default=0,
+               help=_('Number of separate worker processes consuming the '
+                      'RPC topics of the core plugin. 0 consumes them from '
+                      'the main process.')),
 ]
 CONF = cfg.CONF
 CONF.register_opts(service_opts)
@@ -67,6 +79,10 @@ class WsgiService(object):
     def wait(self):
         self.wsgi_app.wait()
 
+    @property
+    def launcher(self):
+        return self.wsgi_app.launcher if self.wsgi_app else None
+
 
 class NeutronApiService(WsgiService):
     """Class for neutron-api service."""
@@ -105,13 +121,68 @@ def serve_wsgi(cls):
     return service
 
 
+class RpcWorker(object):
+    """Wraps the RPC consumers of a plugin to be run by a ProcessLauncher."""
+
+    def __init__(self, plugin):
+        self._plugin = plugin
+        self._servers = []
+        self._stopped = eventlet.event.Event()
+
+    def start(self):
+        # We may have just been forked from the parent process, so drop the
+        # database connections inherited from it.
+        db_api.dispose_connections()
+        self._servers = self._plugin.start_rpc_listener()
+
+    def wait(self):
+        self._stopped.wait()
+
+    def stop(self):
+        for server in self._servers:
+            server.close()
+        self._servers = []
+        if not self._stopped.ready():
+            self._stopped.send()
+
+
+def serve_rpc(launcher=None):
+    """Start the RPC consumers of the core plugin.
+
+    With rpc_workers > 0 the consumers run in that number of worker
+    processes, which are added to the given launcher if there is one, and
+    None is returned.  Otherwise the object to wait on is returned.
+    Raises NotImplementedError if the plugin creates its consumers itself.
+    """
+    plugin = manager.NeutronManager.get_plugin()
+    if not plugin.rpc_workers_supported():
+        LOG.debug(_("Active plugin doesn't implement start_rpc_listener"))
+        if cfg.CONF.rpc_workers > 0:
+            LOG.error(_("'rpc_workers = %d' ignored because "
+                        "start_rpc_listener is not implemented."),
+                      cfg.CONF.rpc_workers)
+        raise NotImplementedError()
+
+    rpc = RpcWorker(plugin)
+    if cfg.CONF.rpc_workers < 1:
+        rpc.start()
+        return rpc
+    if launcher is not None:
+        launcher.launch_service(rpc, workers=cfg.CONF.rpc_workers)
+        return None
+    launcher = wsgi.WorkerLauncher()
+    launcher.launch_service(rpc, workers=cfg.CONF.rpc_workers)
+    return launcher
+
+
 def _run_wsgi(app_name):
     app = config.load_paste_app(app_name)
     if not app:
         LOG.error(_('No known API applications configured.'))
         return
     server = wsgi.Server("Neutron")
-    server.start(app, cfg.CONF.bind_port, cfg.CONF.bind_host)
+    server.start(app, cfg.CONF.bind_port, cfg.CONF.bind_host,
+                 workers=cfg.CONF.api_workers)
     # Dump all option values here after all options are parsed
     cfg.CONF.log_opt_values(LOG, std_logging.DEBUG)
     LOG.info(_("Neutron service started, listening on %(host)s:%(port)s"),
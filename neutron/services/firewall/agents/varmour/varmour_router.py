@@ -318,7 +318,7 @@ class vArmourL3NATAgent(l3_agent.L3NATAgent,
         self.driver.init_l3(interface_name, [ex_gw_port['ip_cidr']],
                             namespace=ri.ns_name())
 
-    def _update_routing_table(self, ri, operation, route):
+    def _update_routing_table(self, ri, operation, route, batch=None):
         return
 
 
@@ -335,6 +335,7 @@ def main():
     config.register_root_helper(conf)
     conf.register_opts(interface.OPTS)
     conf.register_opts(external_process.OPTS)
+    conf.register_opts(ip_lib.OPTS)
     conf(project='neutron')
     config.setup_logging(conf)
     legacy.modernize_quantum_config(conf)
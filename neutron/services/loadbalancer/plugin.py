@@ -41,6 +41,11 @@ class LoadBalancerPlugin(ldb.LoadBalancerPluginDb,
     supported_extension_aliases = ["lbaas",
                                    "lbaas_agent_scheduler",
                                    "service-type"]
+    # This attribute specifies whether the plugin supports or not
+    # pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
+    __native_pagination_support = True
+    __native_sorting_support = True
 
     # lbaas agent notifiers to handle agent update operations;
     # can be updated by plugin drivers while loading;
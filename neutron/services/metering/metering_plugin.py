@@ -38,6 +38,11 @@ class MeteringCallbacks(metering_db.MeteringDbMixin):
 class MeteringPlugin(metering_db.MeteringDbMixin):
     """Implementation of the Neutron Metering Service Plugin."""
     supported_extension_aliases = ["metering"]
+    # This attribute specifies whether the plugin supports or not
+    # pagination/sorting operations. Name mangling is used in
+    # order to ensure it is qualified by class
+    __native_pagination_support = True
+    __native_sorting_support = True
 
     def __init__(self):
         super(MeteringPlugin, self).__init__()
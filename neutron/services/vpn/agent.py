@@ -33,6 +33,8 @@ cfg.CONF.register_opts(vpn_agent_opts, 'vpnagent')
 class VPNAgent(l3_agent.L3NATAgentWithStateReport):
     """VPNAgent class which can handle vpn service drivers."""
     def __init__(self, host, conf=None):
+        # routers processed since the last sync with the devices
+        self.routers_to_sync = {}
         super(VPNAgent, self).__init__(host=host, conf=conf)
         self.setup_device_drivers(host)
 
@@ -132,15 +134,30 @@ class VPNAgent(l3_agent.L3NATAgentWithStateReport):
         for device in self.devices:
             device.destroy_router(router_id)
 
-    def _process_routers(self, routers, all_routers=False):
+    def _process_router_update(self, update):
+        """Router update event.
+
+        This method overwrites parent class method.
+        The router is synced with the devices once the updates queued with
+        it are processed, when its namespace exists.
+        :param update: RouterUpdate
+        """
+        super(VPNAgent, self)._process_router_update(update)
+        if (update.action != l3_agent.DELETE_ROUTER and
+                update.id in self.router_info):
+            self.routers_to_sync[update.id] = update.router
+
+    def _process_router_updates(self):
         """Router sync event.
 
         This method overwrites parent class method.
-        :param routers: list of routers
         """
-        super(VPNAgent, self)._process_routers(routers, all_routers)
-        for device in self.devices:
-            device.sync(self.context, routers)
+        super(VPNAgent, self)._process_router_updates()
+        routers = self.routers_to_sync.values()
+        self.routers_to_sync.clear()
+        if routers:
+            for device in self.devices:
+                device.sync(self.context, routers)
 
 
 def main():
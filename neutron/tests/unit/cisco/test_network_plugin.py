@@ -84,6 +84,17 @@ class TestCiscoV2HTTPResponse(CiscoNetworkPluginV2TestCase,
     pass
 
 
+class TestCiscoRpcListener(CiscoNetworkPluginV2TestCase):
+
+    def test_start_rpc_listener(self):
+        plugin = NeutronManager.get_plugin()
+        self.assertTrue(plugin.rpc_workers_supported())
+        with mock.patch.object(self._get_plugin_ref(), 'start_rpc_listener',
+                               return_value=['conn']) as start:
+            self.assertEqual(['conn'], plugin.start_rpc_listener())
+            start.assert_called_once_with()
+
+
 class TestCiscoPortsV2(CiscoNetworkPluginV2TestCase,
                        test_db_plugin.TestPortsV2,
                        test_bindings.PortBindingsHostTestCaseMixin):
@@ -174,6 +174,24 @@ class MeteringPluginDbTestCase(test_db_plugin.NeutronDbPluginV2TestCase,
 
             self._test_list_resources('metering-label', metering_label)
 
+    def test_list_metering_labels_with_pagination(self):
+        with contextlib.nested(self.metering_label('label1'),
+                               self.metering_label('label2'),
+                               self.metering_label('label3')
+                               ) as (label1, label2, label3):
+            self._test_list_with_pagination('metering-label',
+                                            (label1, label2, label3),
+                                            ('name', 'asc'), 2, 2)
+
+    def test_list_metering_labels_with_pagination_reverse(self):
+        with contextlib.nested(self.metering_label('label1'),
+                               self.metering_label('label2'),
+                               self.metering_label('label3')
+                               ) as (label1, label2, label3):
+            self._test_list_with_pagination_reverse('metering-label',
+                                                    (label1, label2, label3),
+                                                    ('name', 'asc'), 2, 2)
+
     def test_create_metering_label_rule(self):
         name = 'my label'
         description = 'my metering label'
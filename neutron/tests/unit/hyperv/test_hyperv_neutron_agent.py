@@ -91,9 +91,9 @@ class TestHyperVNeutronAgent(base.BaseTestCase):
                 self.agent._port_unbound(net_uuid)
 
     def test_treat_devices_added_returns_true_for_missing_device(self):
-        attrs = {'get_device_details.side_effect': Exception()}
+        attrs = {'get_devices_details_list.side_effect': Exception()}
         self.agent.plugin_rpc.configure_mock(**attrs)
-        self.assertTrue(self.agent._treat_devices_added([{}]))
+        self.assertTrue(self.agent._treat_devices_added(['tap1']))
 
     def mock_treat_devices_added(self, details, func_name):
         """Mock treat devices added.
@@ -102,10 +102,10 @@ class TestHyperVNeutronAgent(base.BaseTestCase):
         :param func_name: the function that should be called
         :returns: whether the named function was called
         """
-        attrs = {'get_device_details.return_value': details}
+        attrs = {'get_devices_details_list.return_value': [details]}
         self.agent.plugin_rpc.configure_mock(**attrs)
         with mock.patch.object(self.agent, func_name) as func:
-            self.assertFalse(self.agent._treat_devices_added([{}]))
+            self.assertFalse(self.agent._treat_devices_added(['tap1']))
         return func.called
 
     def test_treat_devices_added_updates_known_port(self):
@@ -115,16 +115,16 @@ class TestHyperVNeutronAgent(base.BaseTestCase):
                                                       '_treat_vif_port'))
 
     def test_treat_devices_removed_returns_true_for_missing_device(self):
-        attrs = {'update_device_down.side_effect': Exception()}
+        attrs = {'update_devices_down.side_effect': Exception()}
         self.agent.plugin_rpc.configure_mock(**attrs)
-        self.assertTrue(self.agent._treat_devices_removed([{}]))
+        self.assertTrue(self.agent._treat_devices_removed(['tap1']))
 
     def mock_treat_devices_removed(self, port_exists):
-        details = dict(exists=port_exists)
-        attrs = {'update_device_down.return_value': details}
+        details = dict(device='tap1', exists=port_exists)
+        attrs = {'update_devices_down.return_value': [details]}
         self.agent.plugin_rpc.configure_mock(**attrs)
         with mock.patch.object(self.agent, '_port_unbound') as func:
-            self.assertFalse(self.agent._treat_devices_removed([{}]))
+            self.assertFalse(self.agent._treat_devices_removed(['tap1']))
         self.assertEqual(func.called, not port_exists)
 
     def test_treat_devices_removed_unbinds_port(self):
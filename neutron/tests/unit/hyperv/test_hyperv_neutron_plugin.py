@@ -18,11 +18,13 @@
 
 import contextlib
 
+import mock
 from oslo.config import cfg
 
 from neutron import context
 from neutron.extensions import portbindings
 from neutron.manager import NeutronManager
+from neutron.plugins.hyperv import rpc_callbacks
 from neutron.tests.unit import test_db_plugin as test_plugin
 
 
@@ -67,3 +69,23 @@ class TestHyperVVirtualSwitchPortsV2(
 class TestHyperVVirtualSwitchNetworksV2(
         test_plugin.TestNetworksV2, HyperVNeutronPluginTestCase):
     pass
+
+
+class TestHyperVRpcCallbacks(HyperVNeutronPluginTestCase):
+
+    def setUp(self):
+        super(TestHyperVRpcCallbacks, self).setUp()
+        self.callbacks = rpc_callbacks.HyperVRpcCallbacks(mock.Mock())
+        self.dispatcher = self.callbacks.create_rpc_dispatcher()
+
+    def test_update_devices_down(self):
+        devices = self.dispatcher.dispatch(
+            context.get_admin_context(), '1.2', 'update_devices_down', None,
+            devices=['unknown'], agent_id='agent')
+        self.assertEqual(devices, [{'device': 'unknown', 'exists': False}])
+
+    def test_update_devices_up_not_supported(self):
+        self.assertRaises(AttributeError, self.dispatcher.dispatch,
+                          context.get_admin_context(), '1.2',
+                          'update_devices_up', None,
+                          devices=['unknown'], agent_id='agent')
@@ -157,6 +157,65 @@ class TestLinuxBridgeAgent(base.BaseTestCase):
                 agent.daemon_loop()
             self.assertEqual(3, log.call_count)
 
+    def test_treat_devices_added_returns_true_for_missing_device(self):
+        agent = linuxbridge_neutron_agent.LinuxBridgeNeutronAgentRPC({},
+                                                                     0,
+                                                                     None)
+        with contextlib.nested(
+            mock.patch.object(agent, 'prepare_devices_filter'),
+            mock.patch.object(agent.plugin_rpc, 'get_devices_details_list',
+                              side_effect=Exception())
+        ):
+            self.assertTrue(agent.treat_devices_added(['tap1']))
+
+    def test_treat_devices_added_reports_status_per_batch(self):
+        cfg.CONF.set_override('device_rpc_batch_size', 2, 'AGENT')
+        self.addCleanup(cfg.CONF.reset)
+        agent = linuxbridge_neutron_agent.LinuxBridgeNeutronAgentRPC({},
+                                                                     0,
+                                                                     None)
+        agent.br_mgr.add_interface.side_effect = [True, False, True]
+
+        def get_devices_details_list(context, devices, agent_id):
+            return [{'device': device, 'port_id': device,
+                     'network_id': 'net1', 'network_type': 'flat',
+                     'physical_network': 'physnet1',
+                     'segmentation_id': None, 'admin_state_up': True}
+                    for device in devices]
+
+        with contextlib.nested(
+            mock.patch.object(agent, 'prepare_devices_filter'),
+            mock.patch.object(agent.plugin_rpc, 'get_devices_details_list',
+                              side_effect=get_devices_details_list),
+            mock.patch.object(agent.plugin_rpc, 'update_devices_up'),
+            mock.patch.object(agent.plugin_rpc, 'update_devices_down')
+        ) as (_, get_details, devices_up, devices_down):
+            self.assertFalse(agent.treat_devices_added(['tap1', 'tap2',
+                                                        'tap3']))
+        self.assertEqual(get_details.call_count, 2)
+        devices_up.assert_has_calls([
+            mock.call(agent.context, ['tap1'], agent.agent_id,
+                      cfg.CONF.host),
+            mock.call(agent.context, ['tap3'], agent.agent_id,
+                      cfg.CONF.host)])
+        devices_down.assert_called_once_with(agent.context, ['tap2'],
+                                             agent.agent_id, cfg.CONF.host)
+
+    def test_treat_devices_removed(self):
+        agent = linuxbridge_neutron_agent.LinuxBridgeNeutronAgentRPC({},
+                                                                     0,
+                                                                     None)
+        with contextlib.nested(
+            mock.patch.object(agent, 'remove_devices_filter'),
+            mock.patch.object(agent.plugin_rpc, 'update_devices_down',
+                              return_value=[{'device': 'tap1',
+                                             'exists': True}])
+        ) as (_, devices_down):
+            self.assertFalse(agent.treat_devices_removed(['tap1']))
+        devices_down.assert_called_once_with(agent.context, ['tap1'],
+                                             agent.agent_id, cfg.CONF.host)
+        agent.br_mgr.remove_empty_bridges.assert_called_once_with()
+
 
 class TestLinuxBridgeManager(base.BaseTestCase):
     def setUp(self):
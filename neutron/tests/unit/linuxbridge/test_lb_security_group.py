@@ -20,6 +20,7 @@ import mock
 from neutron.api.v2 import attributes
 from neutron.extensions import securitygroup as ext_sg
 from neutron.plugins.linuxbridge.db import l2network_db_v2 as lb_db
+from neutron.plugins.linuxbridge import lb_neutron_plugin as lb_plugin
 from neutron.tests.unit import test_extension_security_group as test_sg
 from neutron.tests.unit import test_security_groups_rpc as test_sg_rpc
 
@@ -97,6 +98,28 @@ class TestLinuxBridgeSecurityGroupsDB(LinuxBridgeSecurityGroupsTestCase):
         port_dict = lb_db.get_port_from_device('bad_device_id')
         self.assertEqual(None, port_dict)
 
+    def test_security_group_get_ports_from_devices(self):
+        with self.network() as n:
+            with self.subnet(n):
+                with self.security_group() as sg:
+                    security_group_id = sg['security_group']['id']
+                    res = self._create_port(
+                        self.fmt, n['network']['id'],
+                        security_groups=[security_group_id])
+                    port = self.deserialize(self.fmt, res)['port']
+                    device = 'tap' + port['id'][:11]
+                    ports = lb_plugin.LinuxBridgeRpcCallbacks.\
+                        get_ports_from_devices([device, 'tapbad_device'])
+                    self.assertEqual([device], ports.keys())
+                    port_dict = ports[device]
+                    self.assertEqual(port['id'], port_dict['id'])
+                    self.assertEqual(device, port_dict['device'])
+                    self.assertEqual([security_group_id],
+                                     port_dict[ext_sg.SECURITYGROUPS])
+                    self.assertEqual([port['fixed_ips'][0]['ip_address']],
+                                     port_dict['fixed_ips'])
+                    self._delete('ports', port['id'])
+
 
 class TestLinuxBridgeSecurityGroupsDBXML(TestLinuxBridgeSecurityGroupsDB):
     fmt = 'xml'
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 from neutron.extensions import portbindings
+from neutron.plugins.linuxbridge.db import l2network_models_v2
 from neutron.tests.unit import _test_extension_portbindings as test_bindings
 from neutron.tests.unit import test_db_plugin as test_plugin
 from neutron.tests.unit import test_security_groups_rpc as test_sg_rpc
@@ -75,3 +76,14 @@ class TestLinuxBridgePortBindingHost(
     LinuxBridgePluginV2TestCase,
     test_bindings.PortBindingsHostTestCaseMixin):
     pass
+
+
+class TestLinuxBridgeCollectionQueryCount(
+        test_plugin.TestCollectionQueryCount, LinuxBridgePluginV2TestCase):
+
+    def _network_bindings(self, network, index):
+        return [l2network_models_v2.NetworkBinding(network.id, 'physnet1',
+                                                   index % 4094 + 1)]
+
+    def test_get_networks_projection(self):
+        self.skipTest("Plugin reads the provider attributes of every network")
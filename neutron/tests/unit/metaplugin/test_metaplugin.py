@@ -15,6 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import os
 
 import mock
@@ -291,6 +292,21 @@ class MetaNeutronPluginV2Test(base.BaseTestCase):
         with testtools.ExpectedException(FlavorNotFound):
             self.plugin.get_router(self.context, router_ret1['id'])
 
+    def test_rpc_workers_not_supported(self):
+        self.assertFalse(self.plugin.rpc_workers_supported())
+
+    def test_start_rpc_listener(self):
+        fake1 = self.plugin.plugins['fake1']
+        with contextlib.nested(
+            mock.patch.object(fake1, 'rpc_workers_supported',
+                              return_value=True),
+            mock.patch.object(fake1, 'start_rpc_listener',
+                              return_value=['conn'])
+        ) as (supported, start):
+            self.assertTrue(self.plugin.rpc_workers_supported())
+            self.assertEqual(['conn'], self.plugin.start_rpc_listener())
+            start.assert_called_once_with()
+
     def test_extension_method(self):
         self.assertEqual('fake1', self.plugin.fake_func())
         self.assertEqual('fake2', self.plugin.fake_func2())
@@ -16,7 +16,9 @@
 from neutron.extensions import multiprovidernet as mpnet
 from neutron.extensions import portbindings
 from neutron.extensions import providernet as pnet
+from neutron.openstack.common import uuidutils
 from neutron.plugins.ml2 import config
+from neutron.plugins.ml2 import models as ml2_models
 from neutron.tests.unit import _test_extension_portbindings as test_bindings
 from neutron.tests.unit import test_db_plugin as test_plugin
 from neutron.tests.unit import test_extension_extradhcpopts as test_dhcpopts
@@ -202,3 +204,16 @@ class DHCPOptsTestCase(test_dhcpopts.TestExtraDhcpOpt):
     def setUp(self, plugin=None):
         super(test_dhcpopts.ExtraDhcpOptDBTestCase, self).setUp(
             plugin=PLUGIN_NAME)
+
+
+class TestMl2CollectionQueryCount(test_plugin.TestCollectionQueryCount,
+                                  Ml2PluginV2TestCase):
+
+    def _network_bindings(self, network, index):
+        return [ml2_models.NetworkSegment(
+            id=uuidutils.generate_uuid(), network_id=network.id,
+            network_type='vlan', physical_network=self.physnet,
+            segmentation_id=index % 4094 + 1)]
+
+    def test_get_networks_projection(self):
+        self.skipTest("Plugin reads the provider attributes of every network")
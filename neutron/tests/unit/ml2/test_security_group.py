@@ -84,6 +84,32 @@ class TestMl2SecurityGroups(Ml2SecurityGroupsTestCase,
         port_dict = plugin.callbacks.get_port_from_device('bad_device_id')
         self.assertEqual(None, port_dict)
 
+    def test_security_group_get_ports_from_devices(self):
+        with self.network() as n:
+            with self.subnet(n):
+                with self.security_group() as sg:
+                    security_group_id = sg['security_group']['id']
+                    res1 = self._create_port(
+                        self.fmt, n['network']['id'],
+                        security_groups=[security_group_id])
+                    port1 = self.deserialize(self.fmt, res1)['port']
+                    res2 = self._create_port(
+                        self.fmt, n['network']['id'])
+                    port2 = self.deserialize(self.fmt, res2)['port']
+                    device1 = 'tap' + port1['id'][:11]
+                    plugin = manager.NeutronManager.get_plugin()
+                    ports = plugin.callbacks.get_ports_from_devices(
+                        [device1, port2['id'], 'bad_device_id'])
+                    self.assertEqual(set([device1, port2['id']]),
+                                     set(ports))
+                    self.assertEqual(port1['id'], ports[device1]['id'])
+                    self.assertEqual(device1, ports[device1]['device'])
+                    self.assertEqual([security_group_id],
+                                     ports[device1][ext_sg.SECURITYGROUPS])
+                    self.assertEqual(port2['id'], ports[port2['id']]['id'])
+                    self._delete('ports', port1['id'])
+                    self._delete('ports', port2['id'])
+
 
 class TestMl2SecurityGroupsXML(TestMl2SecurityGroups):
     fmt = 'xml'
@@ -267,7 +267,7 @@ class OVS_Lib_Test(base.BaseTestCase):
 
     def _test_get_vif_ports(self, is_xen=False):
         pname = "tap99"
-        ofport = "6"
+        ofport = 6
         vif_id = uuidutils.generate_uuid()
         mac = "ca:fe:de:ad:be:ef"
 
@@ -275,18 +275,19 @@ class OVS_Lib_Test(base.BaseTestCase):
                       root_helper=self.root_helper).AndReturn("%s\n" % pname)
 
         if is_xen:
-            external_ids = ('{xs-vif-uuid="%s", attached-mac="%s"}'
-                            % (vif_id, mac))
+            external_ids = {"xs-vif-uuid": vif_id, "attached-mac": mac}
         else:
-            external_ids = ('{iface-id="%s", attached-mac="%s"}'
-                            % (vif_id, mac))
+            external_ids = {"iface-id": vif_id, "attached-mac": mac}
 
-        utils.execute(["ovs-vsctl", self.TO, "get",
-                       "Interface", pname, "external_ids"],
-                      root_helper=self.root_helper).AndReturn(external_ids)
-        utils.execute(["ovs-vsctl", self.TO, "get",
-                       "Interface", pname, "ofport"],
-                      root_helper=self.root_helper).AndReturn(ofport)
+        headings = ['name', 'external_ids', 'ofport']
+        data = [[pname, external_ids, ofport],
+                # A vif port on another bridge
+                ["tap88", {"iface-id": "tap88id", "attached-mac": mac}, 7]]
+        utils.execute(["ovs-vsctl", self.TO, "--format=json",
+                       "--", "--columns=name,external_ids,ofport",
+                       "list", "Interface"],
+                      root_helper=self.root_helper).AndReturn(
+                          self._encode_ovs_json(headings, data))
         if is_xen:
             utils.execute(["xe", "vif-param-get", "param-name=other-config",
                            "param-key=nicira-iface-id", "uuid=" + vif_id],
@@ -300,6 +301,64 @@ class OVS_Lib_Test(base.BaseTestCase):
         self.assertEqual(ports[0].vif_id, vif_id)
         self.assertEqual(ports[0].vif_mac, mac)
         self.assertEqual(ports[0].switch.br_name, self.BR_NAME)
+        self.assertEqual({pname: ports[0]}, self.br.vif_port_cache)
+        self.mox.VerifyAll()
+
+    def test_get_vif_ports_reuses_cached_ports(self):
+        mac = "ca:fe:de:ad:be:ef"
+        headings = ['name', 'external_ids', 'ofport']
+        list_ports = ["ovs-vsctl", self.TO, "list-ports", self.BR_NAME]
+        list_interfaces = ["ovs-vsctl", self.TO, "--format=json",
+                           "--", "--columns=name,external_ids,ofport",
+                           "list", "Interface"]
+        xs_ids = {"xs-vif-uuid": "tap1xs", "attached-mac": mac}
+        utils.execute(list_ports, root_helper=self.root_helper).AndReturn(
+            "tap1\ntap2\n")
+        utils.execute(list_interfaces,
+                      root_helper=self.root_helper).AndReturn(
+                          self._encode_ovs_json(headings, [
+                              ["tap1", xs_ids, 1],
+                              ["tap2", {"iface-id": "tap2id",
+                                        "attached-mac": mac}, 2]]))
+        utils.execute(["xe", "vif-param-get", "param-name=other-config",
+                       "param-key=nicira-iface-id", "uuid=tap1xs"],
+                      root_helper=self.root_helper).AndReturn("tap1id")
+        # The second query must not consult XAPI again for tap1 and must
+        # rebuild tap2 whose ofport changed
+        utils.execute(list_ports, root_helper=self.root_helper).AndReturn(
+            "tap1\ntap2\n")
+        utils.execute(list_interfaces,
+                      root_helper=self.root_helper).AndReturn(
+                          self._encode_ovs_json(headings, [
+                              ["tap1", xs_ids, 1],
+                              ["tap2", {"iface-id": "tap2id",
+                                        "attached-mac": mac}, 3]]))
+        self.mox.ReplayAll()
+
+        first = dict((p.port_name, p) for p in self.br.get_vif_ports())
+        second = dict((p.port_name, p) for p in self.br.get_vif_ports())
+        self.assertIs(first['tap1'], second['tap1'])
+        self.assertEqual('tap1id', second['tap1'].vif_id)
+        self.assertIsNot(first['tap2'], second['tap2'])
+        self.assertEqual(3, second['tap2'].ofport)
+        self.mox.VerifyAll()
+
+    def test_get_vif_ports_unassigned_ofport(self):
+        utils.execute(["ovs-vsctl", self.TO, "list-ports", self.BR_NAME],
+                      root_helper=self.root_helper).AndReturn("tap1\n")
+        data = [["tap1", {"iface-id": "tap1id",
+                          "attached-mac": "ca:fe:de:ad:be:ef"},
+                 ["set", []]]]
+        utils.execute(["ovs-vsctl", self.TO, "--format=json",
+                       "--", "--columns=name,external_ids,ofport",
+                       "list", "Interface"],
+                      root_helper=self.root_helper).AndReturn(
+                          self._encode_ovs_json(
+                              ['name', 'external_ids', 'ofport'], data))
+        self.mox.ReplayAll()
+
+        ports = self.br.get_vif_ports()
+        self.assertEqual(-1, ports[0].ofport)
         self.mox.VerifyAll()
 
     def _encode_ovs_json(self, headings, data):
@@ -310,12 +369,13 @@ class OVS_Lib_Test(base.BaseTestCase):
             ovs_row = []
             r["data"].append(ovs_row)
             for cell in row:
-                if isinstance(cell, str):
+                if isinstance(cell, (str, int, list)):
                     ovs_row.append(cell)
                 elif isinstance(cell, dict):
                     ovs_row.append(["map", cell.items()])
                 else:
-                    raise TypeError('%r not str or dict' % type(cell))
+                    raise TypeError('%r not int, str, list or dict' %
+                                    type(cell))
         return jsonutils.dumps(r)
 
     def _test_get_vif_port_set(self, is_xen):
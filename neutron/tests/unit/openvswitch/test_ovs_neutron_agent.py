@@ -168,10 +168,45 @@ class TestOvsNeutronAgent(base.BaseTestCase):
         actual = self.mock_update_ports(vif_port_set, registered_ports)
         self.assertEqual(expected, actual)
 
+    def _test_rpc_loop_polling(self, polling_required):
+        polling_manager = mock.Mock()
+        polling_manager.is_polling_required = polling_required
+        with contextlib.nested(
+            mock.patch.object(self.agent, 'update_ports', return_value=None),
+            mock.patch.object(ovs_neutron_agent.time, 'sleep',
+                              side_effect=[None, RuntimeError])
+        ) as (update_ports, sleep):
+            self.assertRaises(RuntimeError, self.agent.rpc_loop,
+                              polling_manager)
+        polling_manager.force_polling.assert_called_once_with()
+        return update_ports, polling_manager
+
+    def test_rpc_loop_polls_ports_when_required(self):
+        update_ports, pm = self._test_rpc_loop_polling(True)
+        self.assertEqual(2, update_ports.call_count)
+        self.assertEqual(2, pm.polling_completed.call_count)
+
+    def test_rpc_loop_skips_port_polling_without_updates(self):
+        update_ports, pm = self._test_rpc_loop_polling(False)
+        self.assertFalse(update_ports.called)
+        self.assertFalse(pm.polling_completed.called)
+
+    def test_daemon_loop_uses_polling_manager(self):
+        with contextlib.nested(
+            mock.patch('neutron.agent.linux.polling.get_polling_manager'),
+            mock.patch.object(self.agent, 'rpc_loop')
+        ) as (mock_get_pm, mock_loop):
+            self.agent.daemon_loop()
+        mock_get_pm.assert_called_with(False, 'sudo',
+                                       constants.DEFAULT_OVSDBMON_RESPAWN)
+        mock_loop.assert_called_once_with(
+            polling_manager=mock_get_pm.return_value.__enter__.return_value)
+
     def test_treat_devices_added_returns_true_for_missing_device(self):
-        with mock.patch.object(self.agent.plugin_rpc, 'get_device_details',
+        with mock.patch.object(self.agent.plugin_rpc,
+                               'get_devices_details_list',
                                side_effect=Exception()):
-            self.assertTrue(self.agent.treat_devices_added([{}]))
+            self.assertTrue(self.agent.treat_devices_added(['tap1']))
 
     def _mock_treat_devices_added(self, details, port, func_name):
         """Mock treat devices added.
@@ -182,14 +217,15 @@ class TestOvsNeutronAgent(base.BaseTestCase):
         :returns: whether the named function was called
         """
         with contextlib.nested(
-            mock.patch.object(self.agent.plugin_rpc, 'get_device_details',
-                              return_value=details),
+            mock.patch.object(self.agent.plugin_rpc,
+                              'get_devices_details_list',
+                              return_value=[details]),
             mock.patch.object(self.agent.int_br, 'get_vif_port_by_id',
                               return_value=port),
-            mock.patch.object(self.agent.plugin_rpc, 'update_device_up'),
+            mock.patch.object(self.agent.plugin_rpc, 'update_devices_up'),
             mock.patch.object(self.agent, func_name)
         ) as (get_dev_fn, get_vif_func, upd_dev_up, func):
-            self.assertFalse(self.agent.treat_devices_added([{}]))
+            self.assertFalse(self.agent.treat_devices_added(['tap1']))
         return func.called
 
     def test_treat_devices_added_ignores_invalid_ofport(self):
@@ -211,17 +247,45 @@ class TestOvsNeutronAgent(base.BaseTestCase):
                                                        mock.Mock(),
                                                        'treat_vif_port'))
 
+    def test_treat_devices_added_batches_rpc_calls(self):
+        cfg.CONF.set_override('device_rpc_batch_size', 2, 'AGENT')
+        devices = ['tap1', 'tap2', 'tap3']
+
+        def get_devices_details_list(context, devices, agent_id):
+            return [{'device': device, 'port_id': device,
+                     'network_id': 'net1', 'network_type': 'flat',
+                     'physical_network': 'physnet1',
+                     'segmentation_id': None, 'admin_state_up': True}
+                    for device in devices]
+
+        with contextlib.nested(
+            mock.patch.object(self.agent.plugin_rpc,
+                              'get_devices_details_list',
+                              side_effect=get_devices_details_list),
+            mock.patch.object(self.agent.int_br, 'get_vif_port_by_id'),
+            mock.patch.object(self.agent.plugin_rpc, 'update_devices_up'),
+            mock.patch.object(self.agent, 'treat_vif_port')
+        ) as (get_dev_fn, get_vif_func, upd_dev_up, treat_vif_port):
+            self.assertFalse(self.agent.treat_devices_added(devices))
+        self.assertEqual(get_dev_fn.call_count, 2)
+        self.assertEqual(treat_vif_port.call_count, 3)
+        upd_dev_up.assert_has_calls([
+            mock.call(self.agent.context, ['tap1', 'tap2'],
+                      self.agent.agent_id, cfg.CONF.host),
+            mock.call(self.agent.context, ['tap3'],
+                      self.agent.agent_id, cfg.CONF.host)])
+
     def test_treat_devices_removed_returns_true_for_missing_device(self):
-        with mock.patch.object(self.agent.plugin_rpc, 'update_device_down',
+        with mock.patch.object(self.agent.plugin_rpc, 'update_devices_down',
                                side_effect=Exception()):
-            self.assertTrue(self.agent.treat_devices_removed([{}]))
+            self.assertTrue(self.agent.treat_devices_removed(['tap1']))
 
     def _mock_treat_devices_removed(self, port_exists):
-        details = dict(exists=port_exists)
-        with mock.patch.object(self.agent.plugin_rpc, 'update_device_down',
-                               return_value=details):
+        details = dict(device='tap1', exists=port_exists)
+        with mock.patch.object(self.agent.plugin_rpc, 'update_devices_down',
+                               return_value=[details]):
             with mock.patch.object(self.agent, 'port_unbound') as port_unbound:
-                self.assertFalse(self.agent.treat_devices_removed([{}]))
+                self.assertFalse(self.agent.treat_devices_removed(['tap1']))
         self.assertEqual(port_unbound.called, not port_exists)
 
     def test_treat_devices_removed_unbinds_port(self):
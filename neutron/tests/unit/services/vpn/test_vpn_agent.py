@@ -183,6 +183,8 @@ class TestVPNAgent(base.BaseTestCase):
 
     def test_process_routers(self):
         self.plugin_api.get_external_network_id.return_value = None
+        mock.patch(
+            'neutron.agent.linux.iptables_manager.IptablesManager').start()
         routers = [
             {'id': _uuid(),
              'admin_state_up': True,
@@ -190,6 +192,18 @@ class TestVPNAgent(base.BaseTestCase):
              'external_gateway_info': {}}]
 
         device = mock.Mock()
+        device.sync.side_effect = lambda context, routers: (
+            self.assertIn(routers[0]['id'], self.agent.router_info))
         self.agent.devices = [device]
-        self.agent._process_routers(routers, False)
+        with mock.patch.object(self.agent, 'process_router'):
+            self.agent._process_routers(routers, False)
+            self.assertFalse(device.sync.called)
+            self.agent._process_router_updates()
         device.sync.assert_called_once_with(mock.ANY, routers)
+        self.assertEqual({}, self.agent.routers_to_sync)
+
+    def test_process_router_updates_without_updates(self):
+        device = mock.Mock()
+        self.agent.devices = [device]
+        self.agent._process_router_updates()
+        self.assertFalse(device.sync.called)
@@ -15,10 +15,14 @@
 #    under the License.
 # @author: Dan Wendlandt, Nicira, Inc.
 
+import eventlet
 import fixtures
 import mock
+from oslo.config import cfg
 
+from neutron.agent.common import config
 from neutron.agent.linux import utils
+from neutron.openstack.common import jsonutils
 from neutron.tests import base
 
 
@@ -79,6 +83,124 @@ class AgentUtilsExecuteTest(base.BaseTestCase):
         self.assertEqual(result, expected)
 
 
+class AgentUtilsExecuteDaemonTest(base.BaseTestCase):
+    def setUp(self):
+        super(AgentUtilsExecuteDaemonTest, self).setUp()
+        config.register_root_helper(cfg.CONF)
+        cfg.CONF.set_override('root_helper_daemon', 'sudo daemon', 'AGENT')
+        self.addCleanup(cfg.CONF.reset)
+        self.addCleanup(utils._root_helper_daemons.clear)
+        daemon = utils.get_root_helper_daemon()
+        self.daemon_execute = mock.patch.object(daemon, 'execute').start()
+        self.create_process = mock.patch.object(utils,
+                                                'create_process').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_root_commands_use_daemon(self):
+        self.daemon_execute.return_value = (0, 'out', 'err')
+        result = utils.execute(['ls', 1], root_helper='sudo',
+                               process_input='in', return_stderr=True)
+        self.assertEqual(('out', 'err'), result)
+        self.daemon_execute.assert_called_once_with(['ls', '1'], 'in')
+        self.assertFalse(self.create_process.called)
+
+    def test_daemon_failure_raises(self):
+        self.daemon_execute.return_value = (99, '', 'Unauthorized command')
+        self.assertRaises(RuntimeError, utils.execute, ['ls'],
+                          root_helper='sudo')
+
+    def test_commands_without_root_helper_do_not_use_daemon(self):
+        self.create_process.return_value = (mock.Mock(returncode=0),
+                                            ['ls'])
+        self.create_process.return_value[0].communicate.return_value = (
+            'out', '')
+        self.assertEqual('out', utils.execute(['ls']))
+        self.assertFalse(self.daemon_execute.called)
+
+    def test_commands_with_addl_env_do_not_use_daemon(self):
+        self.create_process.return_value = (mock.Mock(returncode=0),
+                                            ['ls'])
+        self.create_process.return_value[0].communicate.return_value = (
+            'out', '')
+        utils.execute(['ls'], root_helper='sudo', addl_env={'foo': 'bar'})
+        self.assertFalse(self.daemon_execute.called)
+
+
+class RootHelperDaemonTest(base.BaseTestCase):
+    def setUp(self):
+        super(RootHelperDaemonTest, self).setUp()
+        self.popen = mock.patch.object(utils.utils,
+                                       'subprocess_popen').start()
+        self.addCleanup(mock.patch.stopall)
+        self.process = self.popen.return_value
+        self.process.poll.return_value = None
+        self.daemon = utils.RootHelperDaemon('sudo daemon conf')
+
+    def test_execute(self):
+        self.process.stdout.readline.return_value = jsonutils.dumps(
+            {'returncode': 1, 'stdout': u'\xff', 'stderr': u'err'})
+        result = self.daemon.execute(['cat'], process_input='\xfe')
+        self.assertEqual((1, '\xff', 'err'), result)
+        request = jsonutils.loads(
+            self.process.stdin.write.call_args[0][0])
+        self.assertEqual({'cmd': ['cat'], 'process_input': u'\xfe'},
+                         request)
+        self.popen.assert_called_once_with(['sudo', 'daemon', 'conf'],
+                                           stdin=mock.ANY, stdout=mock.ANY)
+
+    def test_process_is_reused(self):
+        self.process.stdout.readline.return_value = jsonutils.dumps(
+            {'returncode': 0, 'stdout': u'', 'stderr': u''})
+        self.daemon.execute(['ls'])
+        self.daemon.execute(['ls'])
+        self.assertEqual(1, self.popen.call_count)
+
+    def test_process_is_respawned_after_exit(self):
+        self.process.stdout.readline.return_value = jsonutils.dumps(
+            {'returncode': 0, 'stdout': u'', 'stderr': u''})
+        self.daemon.execute(['ls'])
+        self.process.poll.return_value = 1
+        self.daemon.execute(['ls'])
+        self.assertEqual(2, self.popen.call_count)
+
+    def test_execute_raises_when_daemon_dies(self):
+        self.process.stdout.readline.return_value = ''
+        self.assertRaises(RuntimeError, self.daemon.execute, ['ls'])
+        self.process.stdin.close.assert_called_once_with()
+        self.assertEqual([], self.daemon._idle_processes)
+
+    def _new_process(self, *args, **kwargs):
+        def readline():
+            # let the other green threads send their requests
+            eventlet.sleep(0)
+            return jsonutils.dumps({'returncode': 0, 'stdout': u'',
+                                    'stderr': u''})
+
+        process = mock.Mock()
+        process.poll.return_value = None
+        process.stdout.readline.side_effect = readline
+        return process
+
+    def _execute_concurrently(self, count):
+        self.popen.side_effect = self._new_process
+        pool = eventlet.GreenPool()
+        for i in range(count):
+            pool.spawn_n(self.daemon.execute, ['ls'])
+        pool.waitall()
+
+    def test_concurrent_commands_use_several_processes(self):
+        self.daemon = utils.RootHelperDaemon('sudo daemon conf', 4)
+        self._execute_concurrently(3)
+        self.assertEqual(3, self.popen.call_count)
+        self.assertEqual(3, len(self.daemon._idle_processes))
+
+    def test_processes_are_bounded_by_pool_size(self):
+        self.daemon = utils.RootHelperDaemon('sudo daemon conf', 2)
+        self._execute_concurrently(5)
+        self.assertEqual(2, self.popen.call_count)
+        self.assertEqual(2, len(self.daemon._idle_processes))
+
+
 class AgentUtilsGetInterfaceMAC(base.BaseTestCase):
     def test_get_interface_mac(self):
         expect_val = '01:02:03:04:05:06'
@@ -106,3 +228,20 @@ class AgentUtilsReplaceFile(base.BaseTestCase):
                     ntf.assert_has_calls(expected)
                     chmod.assert_called_once_with('/baz', 0o644)
                     rename.assert_called_once_with('/baz', '/foo')
+
+
+class TestFindChildPids(base.BaseTestCase):
+
+    def test_returns_empty_list_for_exit_code_1(self):
+        with mock.patch.object(utils, 'execute',
+                               side_effect=RuntimeError('Exit code: 1')):
+            self.assertEqual(utils.find_child_pids(-1), [])
+
+    def test_returns_list_of_child_process_ids_for_good_ouput(self):
+        with mock.patch.object(utils, 'execute', return_value=' 123 \n 185\n'):
+            self.assertEqual(utils.find_child_pids(-1), ['123', '185'])
+
+    def test_raises_unknown_exception(self):
+        with mock.patch.object(utils, 'execute',
+                               side_effect=RuntimeError('Exit code: 2')):
+            self.assertRaises(RuntimeError, utils.find_child_pids, -1)
@@ -16,6 +16,7 @@
 #    under the License.
 
 import mock
+from oslo.config import cfg
 
 from neutron.agent import rpc
 from neutron.openstack.common import context
@@ -45,6 +46,48 @@ class AgentRPCPluginApi(base.BaseTestCase):
     def test_tunnel_sync(self):
         self._test_rpc_call('tunnel_sync')
 
+    def _test_devices_rpc_call(self, method):
+        agent = rpc.PluginApi('fake_topic')
+        ctxt = context.RequestContext('fake_user', 'fake_project')
+        expect_val = [{'device': 'fake_device'}]
+        with mock.patch.object(agent, 'call',
+                               return_value=expect_val) as rpc_call:
+            func_obj = getattr(agent, method)
+            actual_val = func_obj(ctxt, ['fake_device'], 'fake_agent_id')
+        self.assertEqual(actual_val, expect_val)
+        msg = rpc_call.call_args[0][1]
+        self.assertEqual(msg['method'], method)
+        self.assertEqual(msg['args']['devices'], ['fake_device'])
+        self.assertEqual(rpc_call.call_args[1]['version'],
+                         rpc.DEVICE_LIST_RPC_VERSION)
+
+    def test_get_devices_details_list(self):
+        self._test_devices_rpc_call('get_devices_details_list')
+
+    def test_update_devices_up(self):
+        self._test_devices_rpc_call('update_devices_up')
+
+    def test_update_devices_down(self):
+        self._test_devices_rpc_call('update_devices_down')
+
+
+class AgentDeviceBatches(base.BaseTestCase):
+    def setUp(self):
+        super(AgentDeviceBatches, self).setUp()
+        self.addCleanup(cfg.CONF.reset)
+
+    def test_get_device_batches(self):
+        cfg.CONF.set_override('device_rpc_batch_size', 2, 'AGENT')
+        self.assertEqual(rpc.get_device_batches(['a', 'b', 'c']),
+                         [['a', 'b'], ['c']])
+
+    def test_get_device_batches_no_devices(self):
+        self.assertEqual(rpc.get_device_batches(set()), [])
+
+    def test_get_device_batches_invalid_batch_size(self):
+        cfg.CONF.set_override('device_rpc_batch_size', 0, 'AGENT')
+        self.assertEqual(rpc.get_device_batches(['a', 'b']), [['a'], ['b']])
+
 
 class AgentPluginReportState(base.BaseTestCase):
     def test_plugin_report_state_use_call(self):
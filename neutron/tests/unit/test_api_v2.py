@@ -15,6 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import os
 import urlparse
 
@@ -36,6 +37,7 @@ from neutron.manager import NeutronManager
 from neutron.openstack.common.notifier import api as notifer_api
 from neutron.openstack.common import policy as common_policy
 from neutron.openstack.common import uuidutils
+from neutron import policy
 from neutron.tests import base
 from neutron.tests.unit import testlib_api
 
@@ -288,6 +290,28 @@ class APIv2TestCase(APIv2TestBase):
         kwargs = self._get_collection_kwargs(limit=10)
         instance.get_networks.assert_called_once_with(mock.ANY, **kwargs)
 
+    def test_limit_with_list_batch_size(self):
+        cfg.CONF.set_override('list_batch_size', 2)
+        instance = self.plugin.return_value
+        instance.get_networks.return_value = []
+
+        self.api.get(_get_path('networks'), {'limit': '10'})
+        kwargs = self._get_collection_kwargs(limit=10)
+        instance.get_networks.assert_called_once_with(mock.ANY, **kwargs)
+
+    def test_list_batch_size_without_allow_pagination(self):
+        cfg.CONF.set_override('list_batch_size', 2)
+        cfg.CONF.set_override('allow_pagination', False)
+        cfg.CONF.set_override('allow_sorting', False)
+        instance = self.plugin.return_value
+        instance.get_networks.return_value = []
+        api = webtest.TestApp(router.APIRouter())
+        api.get(_get_path('networks'))
+        kwargs = self._get_collection_kwargs(skipargs=['sorts', 'limit',
+                                                       'marker',
+                                                       'page_reverse'])
+        instance.get_networks.assert_called_once_with(mock.ANY, **kwargs)
+
     def test_limit_with_great_than_max_limit(self):
         cfg.CONF.set_default('pagination_max_limit', '1000')
         instance = self.plugin.return_value
@@ -564,6 +588,29 @@ class JSONV2TestCase(APIv2TestBase, testlib_api.WebTestCase):
         tenant_id = _uuid()
         self._test_list(tenant_id + "bad", tenant_id)
 
+    def test_list_streamed(self):
+        cfg.CONF.set_override('list_batch_size', 2)
+        networks = [{'id': str(_uuid()), 'name': 'net%d' % i,
+                     'admin_state_up': True, 'status': "ACTIVE",
+                     'tenant_id': '', 'shared': False, 'subnets': []}
+                    for i in range(3)]
+        instance = self.plugin.return_value
+        instance.get_networks.side_effect = [networks[:2], networks[2:]]
+
+        res = self.api.get(_get_path('networks', fmt=self.fmt),
+                           params={'sort_key': ['name'],
+                                   'sort_dir': ['desc']})
+
+        self.assertEqual(networks,
+                         self.deserialize(res)['networks'])
+        kwargs = {'filters': mock.ANY, 'fields': mock.ANY,
+                  'sorts': [('name', False), ('id', True)], 'limit': 2,
+                  'page_reverse': False}
+        instance.get_networks.assert_has_calls([
+            mock.call(mock.ANY, **dict(kwargs, marker=None)),
+            mock.call(mock.ANY, **dict(kwargs, marker=networks[1]['id']))])
+        self.assertEqual(2, instance.get_networks.call_count)
+
     def test_list_pagination(self):
         id1 = str(_uuid())
         id2 = str(_uuid())
@@ -1247,6 +1294,33 @@ class V2Views(base.BaseTestCase):
                 'ip_version', 'cidr', 'enable_dhcp')
         self._view(keys, 'subnets', 'subnet')
 
+    def test_visibility_plan(self):
+        attr_info = {'id': {'is_visible': True},
+                     'hidden': {'is_visible': False},
+                     'static': {'is_visible': True, 'enforce_policy': True},
+                     'owned': {'is_visible': True, 'enforce_policy': True}}
+        data = dict((key, 'value') for key in attr_info)
+        ctx = context.get_admin_context()
+        with contextlib.nested(
+            mock.patch.dict(attributes.RESOURCE_ATTRIBUTE_MAP,
+                            {'things': attr_info}),
+            mock.patch.object(policy, 'depends_on_target',
+                              side_effect=lambda a: a == 'get_thing:owned'),
+            mock.patch.object(policy, 'check', return_value=True)
+        ) as (attr_map, depends_on_target, check):
+            controller = v2_base.Controller(None, 'things', 'thing',
+                                            attr_info)
+            plan = controller._get_visibility_plan(ctx)
+            self.assertEqual({'id': True, 'hidden': False, 'static': True,
+                              'owned': 'get_thing:owned'}, plan)
+            for i in range(3):
+                self.assertEqual(
+                    {'id': 'value', 'static': 'value', 'owned': 'value'},
+                    controller._view(ctx, data, plan=plan))
+        # 'static' is checked once, 'owned' once per resource
+        self.assertEqual(4, check.call_count)
+        check.assert_called_with(ctx, 'get_thing:owned', data)
+
 
 class NotificationTest(APIv2TestBase):
     def _resource_op_notifier(self, opname, resource, expected_errors=False,
@@ -0,0 +1,61 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo.config import cfg
+
+from neutron.common import rpc as q_rpc
+from neutron.openstack.common.rpc import common as rpc_common
+from neutron.tests import base
+
+
+class FakeCallbacks(object):
+    RPC_API_VERSION = '1.0'
+
+    def ping(self, context, **kwargs):
+        return 'pong'
+
+
+class TestPluginRpcDispatcher(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestPluginRpcDispatcher, self).setUp()
+        self.addCleanup(cfg.CONF.reset)
+        self.dispatcher = q_rpc.PluginRpcDispatcher([FakeCallbacks()])
+        self.ctxt = rpc_common.CommonRpcContext(user_id='u', tenant_id='t')
+
+    def test_dispatch_records_stats(self):
+        self.assertEqual('pong', self.dispatcher.dispatch(
+            self.ctxt, '1.0', 'ping', None))
+        self.dispatcher.dispatch(self.ctxt, '1.0', 'ping', None)
+        self.assertEqual(2, self.dispatcher._stats['ping'][0])
+
+    def test_stats_logged_after_interval(self):
+        cfg.CONF.set_override('rpc_stats_interval', 10)
+        with mock.patch.object(q_rpc, 'time') as time:
+            time.time.return_value = self.dispatcher._stats_started + 11
+            with mock.patch.object(q_rpc.LOG, 'info') as log:
+                self.dispatcher.dispatch(self.ctxt, '1.0', 'ping', None)
+                self.assertEqual(1, log.call_count)
+        self.assertEqual({}, self.dispatcher._stats)
+
+    def test_stats_logging_disabled(self):
+        cfg.CONF.set_override('rpc_stats_interval', 0)
+        self.dispatcher._stats_started = 0
+        with mock.patch.object(q_rpc.LOG, 'info') as log:
+            self.dispatcher.dispatch(self.ctxt, '1.0', 'ping', None)
+            self.assertFalse(log.called)
@@ -0,0 +1,141 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo.config import cfg
+
+from neutron.common import exceptions as q_exc
+from neutron import context
+from neutron.db import api as db
+from neutron.db import ipam_backend
+from neutron.db import models_v2
+from neutron.tests import base
+
+
+class TestFreeAddressSpace(base.BaseTestCase):
+
+    def test_pop_first_in_order(self):
+        space = ipam_backend.FreeAddressSpace([(10, 11), (1, 2)])
+        self.assertEqual([1, 2, 10, 11, None],
+                         [space.pop_first() for i in range(5)])
+
+    def test_used_addresses_are_skipped(self):
+        space = ipam_backend.FreeAddressSpace([(1, 5)], used=[1, 3, 9])
+        self.assertEqual(3, len(space))
+        self.assertEqual([2, 4, 5],
+                         [space.pop_first() for i in range(3)])
+
+    def test_remove_splits_interval(self):
+        space = ipam_backend.FreeAddressSpace([(1, 5)])
+        self.assertTrue(space.remove(3))
+        self.assertFalse(space.remove(3))
+        self.assertEqual([1, 2, 4, 5],
+                         [space.pop_first() for i in range(4)])
+
+    def test_add_merges_intervals(self):
+        space = ipam_backend.FreeAddressSpace([(1, 5)], used=[2, 3, 4])
+        self.assertTrue(space.add(3))
+        self.assertTrue(space.add(2))
+        self.assertTrue(space.add(4))
+        self.assertFalse(space.add(4))
+        self.assertEqual(([1], [5]), (space._firsts, space._lasts))
+
+    def test_add_outside_pools_is_ignored(self):
+        space = ipam_backend.FreeAddressSpace([(1, 5)], used=range(1, 6))
+        self.assertFalse(space.add(7))
+        self.assertIsNone(space.pop_first())
+
+
+class TestInMemoryIpamBackend(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestInMemoryIpamBackend, self).setUp()
+        db.configure_db()
+        self.addCleanup(db.clear_db)
+        self.context = context.get_admin_context()
+        self.backend = ipam_backend.InMemoryIpamBackend()
+        session = self.context.session
+        with session.begin():
+            session.add(models_v2.Network(id='net', name='net',
+                                          status='ACTIVE',
+                                          admin_state_up=True))
+            session.add(models_v2.Subnet(id='sub', network_id='net',
+                                         ip_version=4, cidr='10.0.0.0/29',
+                                         gateway_ip='10.0.0.1'))
+            session.add(models_v2.IPAllocationPool(subnet_id='sub',
+                                                   first_ip='10.0.0.2',
+                                                   last_ip='10.0.0.4'))
+        self.subnet = {'id': 'sub', 'network_id': 'net',
+                       'cidr': '10.0.0.0/29'}
+
+    def _allocate_behind_backend(self, ip_address):
+        with self.context.session.begin():
+            self.context.session.add(models_v2.IPAllocation(
+                network_id='net', subnet_id='sub', ip_address=ip_address))
+
+    def _generate(self):
+        with self.context.session.begin():
+            return self.backend.generate_ip(self.context,
+                                            [self.subnet])['ip_address']
+
+    def test_generate_ip_reserves_allocation(self):
+        self.assertEqual('10.0.0.2', self._generate())
+        allocations = self.context.session.query(models_v2.IPAllocation)
+        self.assertEqual(['10.0.0.2'],
+                         [a['ip_address'] for a in allocations])
+
+    def test_generate_ip_skips_concurrent_allocation(self):
+        self.assertEqual('10.0.0.2', self._generate())
+        self._allocate_behind_backend('10.0.0.3')
+        self.assertEqual('10.0.0.4', self._generate())
+
+    def test_generate_ip_reloads_when_exhausted(self):
+        self.assertEqual('10.0.0.2', self._generate())
+        self.assertEqual('10.0.0.3', self._generate())
+        with self.context.session.begin():
+            self.context.session.query(models_v2.IPAllocation).filter_by(
+                ip_address='10.0.0.2').delete()
+        self.assertEqual('10.0.0.4', self._generate())
+        # the address released behind the backend is found after a reload
+        self.assertEqual('10.0.0.2', self._generate())
+        self.assertRaises(q_exc.IpAddressGenerationFailure, self._generate)
+
+    def test_recycle_ip(self):
+        self.assertEqual('10.0.0.2', self._generate())
+        with self.context.session.begin():
+            self.backend.recycle_ip(self.context, 'net', 'sub', '10.0.0.2')
+        self.assertEqual(
+            0, self.context.session.query(models_v2.IPAllocation).count())
+        with mock.patch.object(self.backend, '_load') as load:
+            self.assertEqual('10.0.0.2', self._generate())
+            self.assertFalse(load.called)
+
+    def test_allocate_specific_ip_in_use(self):
+        self._allocate_behind_backend('10.0.0.3')
+        with self.context.session.begin():
+            self.assertRaises(q_exc.IpAddressInUse,
+                              self.backend.allocate_specific_ip,
+                              self.context, 'sub', '10.0.0.3')
+
+    def test_get_backend_follows_config(self):
+        self.assertIsNone(ipam_backend.get_backend())
+        cfg.CONF.set_override('ipam_backend',
+                              'neutron.db.ipam_backend.InMemoryIpamBackend')
+        self.addCleanup(cfg.CONF.reset)
+        backend = ipam_backend.get_backend()
+        self.assertIsInstance(backend, ipam_backend.InMemoryIpamBackend)
+        self.assertIs(backend, ipam_backend.get_backend())
@@ -23,6 +23,7 @@ import random
 
 import mock
 from oslo.config import cfg
+from sqlalchemy import event
 from testtools import matchers
 import webob.exc
 
@@ -38,10 +39,14 @@ from neutron.common.test_lib import test_config
 from neutron import context
 from neutron.db import api as db
 from neutron.db import db_base_plugin_v2
+from neutron.db import model_base
 from neutron.db import models_v2
 from neutron.manager import NeutronManager
+from neutron.openstack.common.db import exception as db_exc
+from neutron.openstack.common.db.sqlalchemy import session as db_session
 from neutron.openstack.common import importutils
 from neutron.openstack.common import timeutils
+from neutron.openstack.common import uuidutils
 from neutron.tests import base
 from neutron.tests.unit import test_extensions
 from neutron.tests.unit import testlib_api
@@ -3626,3 +3631,219 @@ class TestSubnetsV2XML(TestSubnetsV2):
 
 class TestV2HTTPResponseXML(TestV2HTTPResponse):
     fmt = 'xml'
+
+
+class InMemoryIpamTestMixin(object):
+    def setUp(self):
+        super(InMemoryIpamTestMixin, self).setUp()
+        cfg.CONF.set_override(
+            'ipam_backend', 'neutron.db.ipam_backend.InMemoryIpamBackend')
+
+
+class TestPortsV2InMemoryIpam(InMemoryIpamTestMixin, TestPortsV2):
+    pass
+
+
+class TestSubnetsV2InMemoryIpam(InMemoryIpamTestMixin, TestSubnetsV2):
+    pass
+
+
+class TestCollectionQueryCount(NeutronDbPluginV2TestCase):
+    """Listing a collection costs the same queries whatever its size."""
+
+    ROWS = 1000
+
+    def setUp(self):
+        super(TestCollectionQueryCount, self).setUp()
+        self.plugin = NeutronManager.get_plugin()
+        self.context = context.get_admin_context()
+        self.statements = []
+        event.listen(db.get_engine(), 'before_cursor_execute',
+                     self._record_statement)
+
+    def _record_statement(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def _network_bindings(self, network, index):
+        """Return the plugin specific rows to create for a network."""
+        return []
+
+    def _create_networks(self, first, count):
+        bindings = []
+        with self.context.session.begin(subtransactions=True):
+            for i in range(first, first + count):
+                prefix = '10.%d.%d.' % (i // 256, i % 256)
+                network = models_v2.Network(
+                    id=uuidutils.generate_uuid(), name='net%d' % i,
+                    tenant_id='tenant', status='ACTIVE',
+                    admin_state_up=True, shared=False)
+                subnet = models_v2.Subnet(
+                    id=uuidutils.generate_uuid(), network_id=network.id,
+                    tenant_id='tenant', ip_version=4, cidr=prefix + '0/24',
+                    gateway_ip=prefix + '1', enable_dhcp=True, shared=False)
+                port = models_v2.Port(
+                    id=uuidutils.generate_uuid(), network_id=network.id,
+                    tenant_id='tenant', name='port%d' % i,
+                    mac_address='fa:16:3e:00:%02x:%02x' % (i // 256,
+                                                           i % 256),
+                    admin_state_up=True, status='ACTIVE',
+                    device_id='dev', device_owner='compute')
+                self.context.session.add_all([
+                    network, subnet, port,
+                    models_v2.DNSNameServer(address='8.8.8.8',
+                                            subnet_id=subnet.id),
+                    models_v2.SubnetRoute(destination='192.168.0.0/24',
+                                          nexthop=prefix + '254',
+                                          subnet_id=subnet.id),
+                    models_v2.IPAllocation(port_id=port.id,
+                                           ip_address=prefix + '2',
+                                           subnet_id=subnet.id,
+                                           network_id=network.id)])
+                bindings.extend(self._network_bindings(network, i))
+            # the bindings have no relationship ordering them after the
+            # networks they reference
+            self.context.session.flush()
+            self.context.session.add_all(bindings)
+
+    def _count_queries(self, list_func):
+        del self.statements[:]
+        self.context.session.expunge_all()
+        items = list_func(self.context)
+        return items, len(self.statements)
+
+    def _test_query_count(self, list_func):
+        self._create_networks(0, 10)
+        items, small_count = self._count_queries(list_func)
+        self.assertEqual(10, len(items))
+
+        self._create_networks(10, self.ROWS - 10)
+        items, count = self._count_queries(list_func)
+        self.assertEqual(self.ROWS, len(items))
+        self.assertEqual(small_count, count)
+        self.assertLess(count, 10)
+
+    def test_get_networks_query_count(self):
+        self._test_query_count(self.plugin.get_networks)
+
+    def test_get_subnets_query_count(self):
+        self._test_query_count(self.plugin.get_subnets)
+
+    def test_get_ports_query_count(self):
+        self._test_query_count(self.plugin.get_ports)
+
+    def test_get_networks_count_with_eager_loads(self):
+        self._create_networks(0, 10)
+        self.assertEqual(10, self.plugin.get_networks_count(self.context))
+
+    def _test_projection(self, list_func, show_func, fields):
+        self._create_networks(0, 10)
+        items, count = self._count_queries(
+            lambda context: list_func(context, fields=fields + fields[:1]))
+        self.assertEqual(10, len(items))
+        self.assertEqual(1, count)
+        self.assertEqual(set(fields), set(items[0]))
+
+        # the columns hold the values the dicts are made of
+        full_items = list_func(self.context)
+        self.assertEqual(
+            sorted(dict((field, item[field]) for field in fields)
+                   for item in full_items),
+            sorted(items))
+
+        item, count = self._count_queries(
+            lambda context: show_func(context, full_items[0]['id'],
+                                      fields=fields))
+        self.assertEqual(1, count)
+        self.assertEqual(dict((field, full_items[0][field])
+                              for field in fields), item)
+
+    def test_get_networks_projection(self):
+        self._test_projection(self.plugin.get_networks,
+                              self.plugin.get_network,
+                              ['id', 'name', 'shared'])
+
+    def test_get_subnets_projection(self):
+        self._test_projection(self.plugin.get_subnets,
+                              self.plugin.get_subnet,
+                              ['id', 'cidr', 'gateway_ip'])
+
+    def test_get_ports_projection(self):
+        self._test_projection(self.plugin.get_ports,
+                              self.plugin.get_port,
+                              ['id', 'device_id', 'device_owner'])
+
+    def test_get_ports_projection_with_fixed_ips_filter(self):
+        self._create_networks(0, 10)
+        port = self.plugin.get_ports(self.context)[3]
+        ports = self.plugin.get_ports(
+            self.context, filters={'fixed_ips': {
+                'ip_address': [port['fixed_ips'][0]['ip_address']]}},
+            fields=['id'])
+        self.assertEqual([{'id': port['id']}], ports)
+
+    def test_non_column_fields_are_not_projected(self):
+        self._create_networks(0, 10)
+        networks = self.plugin.get_networks(self.context,
+                                            fields=['id', 'subnets'])
+        self.assertEqual(1, len(networks[0]['subnets']))
+        network = self.plugin.get_network(self.context, networks[0]['id'],
+                                          fields=['id', 'subnets'])
+        self.assertEqual(networks[0], network)
+
+    def test_get_network_projection_not_found(self):
+        self.assertRaises(q_exc.NetworkNotFound, self.plugin.get_network,
+                          self.context, 'missing', fields=['id'])
+
+
+class TestSlaveReads(NeutronDbPluginV2TestCase):
+    """The API reads from the slave database when one is configured."""
+
+    def setUp(self):
+        super(TestSlaveReads, self).setUp()
+        # an empty database, which tells the reads made on the slave
+        cfg.CONF.set_override('slave_connection', 'sqlite://', 'database')
+        self.addCleanup(cfg.CONF.clear_override, 'slave_connection',
+                        'database')
+        slave_engine = db_session.get_engine(sqlite_fk=True,
+                                             slave_engine=True)
+        model_base.BASEV2.metadata.create_all(slave_engine)
+
+    def test_list_and_show_read_from_slave(self):
+        with self.network() as network:
+            self.assertEqual([], self._list('networks')['networks'])
+            self._show('networks', network['network']['id'],
+                       expected_code=webob.exc.HTTPNotFound.code)
+
+    def test_master_session_records_writes(self):
+        session = db.get_session()
+        self.assertFalse(session.wrote_changes)
+        session.query(models_v2.Network).all()
+        self.assertFalse(session.wrote_changes)
+        with session.begin():
+            session.add(models_v2.Network(id='net-id', name='net'))
+        self.assertTrue(session.wrote_changes)
+        self.assertFalse(hasattr(db.get_session(slave_session=True),
+                                 'wrote_changes'))
+
+    def test_writes_use_master(self):
+        with self.network() as network:
+            req = self.new_update_request('networks',
+                                          {'network': {'name': 'renamed'}},
+                                          network['network']['id'])
+            res = self.deserialize(self.fmt, req.get_response(self.api))
+            self.assertEqual('renamed', res['network']['name'])
+
+    def test_slave_session_refuses_writes(self):
+        session = db.get_session(slave_session=True)
+        session.add(models_v2.Network(id='net-id', name='net'))
+        e = self.assertRaises(db_exc.DBError, session.flush)
+        self.assertIsInstance(e.inner_exception, q_exc.SlaveDatabaseWrite)
+
+    def test_handler_without_slave_reads_support(self):
+        get_networks = db_base_plugin_v2.NeutronDbPluginV2.__dict__[
+            'get_networks']
+        with mock.patch.object(get_networks, 'slave_reads_support', False):
+            with self.network() as network:
+                self.assertEqual([network['network']['id']],
+                                 [net['id'] for net in
+                                  self._list('networks')['networks']])
@@ -15,6 +15,7 @@
 
 import mock
 
+from neutron.db import device_rpc_base
 from neutron.db import dhcp_rpc_base
 from neutron.tests import base
 
@@ -49,6 +50,38 @@ class TestDhcpRpcCallackMixin(base.BaseTestCase):
 
         self.assertEqual(len(self.log.mock_calls), 1)
 
+    def test_get_networks_info(self):
+        self.plugin.get_networks.return_value = [dict(id='a'), dict(id='b')]
+        self.plugin.get_subnets.return_value = [dict(id='s',
+                                                     network_id='b')]
+        self.plugin.get_ports.return_value = [dict(id='p', network_id='a')]
+
+        networks = self.callbacks.get_networks_info(mock.Mock(),
+                                                    network_ids=['a', 'b'],
+                                                    host='host')
+
+        self.plugin.assert_has_calls(
+            [mock.call.get_networks(mock.ANY, filters=dict(id=['a', 'b']))])
+        self.assertEqual([[dict(id='p', network_id='a')], []],
+                         [n['ports'] for n in networks])
+        self.assertEqual([[], [dict(id='s', network_id='b')]],
+                         [n['subnets'] for n in networks])
+
+    def test_get_networks_info_slave_reads(self):
+        self.plugin.get_networks.return_value = []
+        context = mock.Mock()
+        with mock.patch('neutron.db.api.slave_reads') as slave_reads:
+            self.callbacks.get_networks_info(context, network_ids=['a'],
+                                             host='host')
+        slave_reads.assert_called_once_with(
+            context, 'get_networks_info', self.plugin.get_networks,
+            self.plugin.get_subnets, self.plugin.get_ports)
+
+    def test_get_networks_info_no_ids(self):
+        self.assertEqual([], self.callbacks.get_networks_info(
+            mock.Mock(), network_ids=[], host='host'))
+        self.assertFalse(self.plugin.get_networks.called)
+
     def test_get_network_info(self):
         network_retval = dict(id='a')
 
@@ -148,3 +181,43 @@ class TestDhcpRpcCallackMixin(base.BaseTestCase):
                                                        device_id=['devid'])),
             mock.call.update_port(mock.ANY, 'port_id',
                                   dict(port=port_update))])
+
+
+class TestDeviceRpcCallbackMixin(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestDeviceRpcCallbackMixin, self).setUp()
+        self.callbacks = device_rpc_base.DeviceRpcCallbackMixin()
+        self.callbacks.get_device_details = mock.Mock(
+            side_effect=lambda context, **kwargs: {'device':
+                                                   kwargs['device']})
+        self.callbacks.update_device_up = mock.Mock()
+        self.callbacks.update_device_down = mock.Mock(
+            side_effect=lambda context, **kwargs: {'device':
+                                                   kwargs['device'],
+                                                   'exists': True})
+
+    def test_get_devices_details_list(self):
+        devices = self.callbacks.get_devices_details_list(
+            mock.ANY, devices=['a', 'b'], agent_id='agent')
+        self.assertEqual(devices, [{'device': 'a'}, {'device': 'b'}])
+        self.callbacks.get_device_details.assert_has_calls([
+            mock.call(mock.ANY, device='a', agent_id='agent'),
+            mock.call(mock.ANY, device='b', agent_id='agent')])
+
+    def test_update_devices_up(self):
+        self.callbacks.update_devices_up(mock.ANY, devices=['a', 'b'],
+                                         agent_id='agent', host='host')
+        self.callbacks.update_device_up.assert_has_calls([
+            mock.call(mock.ANY, device='a', agent_id='agent', host='host'),
+            mock.call(mock.ANY, device='b', agent_id='agent', host='host')])
+
+    def test_update_devices_down(self):
+        devices = self.callbacks.update_devices_down(
+            mock.ANY, devices=['a'], agent_id='agent', host='host')
+        self.assertEqual(devices, [{'device': 'a', 'exists': True}])
+
+    def test_no_devices(self):
+        self.assertEqual(self.callbacks.get_devices_details_list(
+            mock.ANY, agent_id='agent'), [])
+        self.assertFalse(self.callbacks.get_device_details.called)
@@ -15,6 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import copy
 import os
 import sys
@@ -32,6 +33,7 @@ from neutron.agent.linux import dhcp
 from neutron.agent.linux import interface
 from neutron.common import constants as const
 from neutron.common import exceptions
+from neutron.openstack.common.rpc import common as rpc_common
 from neutron.tests import base
 
 
@@ -228,7 +230,10 @@ class TestDhcpAgent(base.BaseTestCase):
     def _test_sync_state_helper(self, known_networks, active_networks):
         with mock.patch(DHCP_PLUGIN) as plug:
             mock_plugin = mock.Mock()
-            mock_plugin.get_active_networks_info.return_value = active_networks
+            mock_plugin.get_active_networks.return_value = active_networks
+            mock_plugin.get_networks_info.side_effect = (
+                lambda ids: [mock.Mock(id=net_id, admin_state_up=False)
+                             for net_id in ids])
             plug.return_value = mock_plugin
 
             dhcp = dhcp_agent.DhcpAgent(HOSTNAME)
@@ -263,7 +268,7 @@ class TestDhcpAgent(base.BaseTestCase):
     def test_sync_state_plugin_error(self):
         with mock.patch(DHCP_PLUGIN) as plug:
             mock_plugin = mock.Mock()
-            mock_plugin.get_active_networks_info.side_effect = Exception
+            mock_plugin.get_active_networks.side_effect = Exception
             plug.return_value = mock_plugin
 
             with mock.patch.object(dhcp_agent.LOG, 'exception') as log:
@@ -273,6 +278,98 @@ class TestDhcpAgent(base.BaseTestCase):
                 self.assertTrue(log.called)
                 self.assertTrue(dhcp.needs_resync)
 
+    def test_sync_state_in_batches(self):
+        cfg.CONF.set_override('sync_batch_size', 2)
+        network_ids = ['a', 'b', 'c', 'd', 'e']
+        with mock.patch(DHCP_PLUGIN) as plug:
+            mock_plugin = mock.Mock()
+            mock_plugin.get_active_networks.return_value = network_ids
+            # 'b' was deleted after the network ids were listed
+            mock_plugin.get_networks_info.side_effect = (
+                lambda ids: [mock.Mock(id=net_id) for net_id in ids
+                             if net_id != 'b'])
+            plug.return_value = mock_plugin
+
+            dhcp = dhcp_agent.DhcpAgent(HOSTNAME)
+            with contextlib.nested(
+                mock.patch.object(dhcp, 'configure_dhcp_for_network'),
+                mock.patch.object(dhcp_agent.eventlet, 'GreenPool')
+            ) as (configure, pool):
+                pool.return_value.spawn_n.side_effect = (
+                    lambda func, *args: func(*args))
+                dhcp.sync_state()
+                self.assertEqual(4, configure.call_count)
+
+            mock_plugin.get_networks_info.assert_has_calls(
+                [mock.call(['a', 'b']), mock.call(['c', 'd']),
+                 mock.call(['e'])])
+            self.assertEqual(5, dhcp.sync_progress['sync_networks_total'])
+            self.assertEqual(5, dhcp.sync_progress['sync_networks_done'])
+            self.assertIsNotNone(dhcp.sync_progress['sync_duration'])
+            self.assertFalse(dhcp.needs_resync)
+
+    def test_sync_state_batch_error(self):
+        cfg.CONF.set_override('sync_batch_size', 1)
+        with mock.patch(DHCP_PLUGIN) as plug:
+            mock_plugin = mock.Mock()
+            mock_plugin.get_active_networks.return_value = ['a', 'b']
+            mock_plugin.get_networks_info.side_effect = [
+                Exception, [mock.Mock(id='b')]]
+            plug.return_value = mock_plugin
+
+            dhcp = dhcp_agent.DhcpAgent(HOSTNAME)
+            with contextlib.nested(
+                mock.patch.object(dhcp, 'configure_dhcp_for_network'),
+                mock.patch.object(dhcp_agent.eventlet, 'GreenPool')
+            ) as (configure, pool):
+                pool.return_value.spawn_n.side_effect = (
+                    lambda func, *args: func(*args))
+                dhcp.sync_state()
+                self.assertEqual(1, configure.call_count)
+            self.assertTrue(dhcp.needs_resync)
+            self.assertEqual(2, dhcp.sync_progress['sync_networks_done'])
+
+    def _test_sync_state_networks_info_unsupported(self, error):
+        cfg.CONF.set_override('sync_batch_size', 2)
+        with mock.patch(DHCP_PLUGIN) as plug:
+            mock_plugin = mock.Mock()
+            mock_plugin.get_active_networks.return_value = ['a', 'b', 'c']
+            mock_plugin.get_networks_info.side_effect = error
+            # 'b' was deleted after the network ids were listed
+            mock_plugin.get_active_networks_info.return_value = [
+                mock.Mock(id='a'), mock.Mock(id='c')]
+            plug.return_value = mock_plugin
+
+            dhcp = dhcp_agent.DhcpAgent(HOSTNAME)
+            with contextlib.nested(
+                mock.patch.object(dhcp, 'configure_dhcp_for_network'),
+                mock.patch.object(dhcp_agent.eventlet, 'GreenPool')
+            ) as (configure, pool):
+                pool.return_value.spawn_n.side_effect = (
+                    lambda func, *args: func(*args))
+                dhcp.sync_state()
+                self.assertEqual(2, configure.call_count)
+                dhcp.sync_state()
+
+            mock_plugin.get_networks_info.assert_called_once_with(['a', 'b'])
+            self.assertEqual(
+                2, mock_plugin.get_active_networks_info.call_count)
+            self.assertFalse(dhcp.use_networks_info)
+            self.assertFalse(dhcp.needs_resync)
+            self.assertEqual(3, dhcp.sync_progress['sync_networks_done'])
+
+    def test_sync_state_networks_info_unsupported_version(self):
+        self._test_sync_state_networks_info_unsupported(
+            rpc_common.RemoteError('UnsupportedRpcVersion'))
+
+    def test_sync_state_networks_info_missing_method(self):
+        self._test_sync_state_networks_info_unsupported(
+            rpc_common.RemoteError('AttributeError'))
+
+    def test_sync_state_networks_info_deserialized_missing_method(self):
+        self._test_sync_state_networks_info_unsupported(
+            AttributeError('No such RPC function'))
+
     def test_periodic_resync(self):
         dhcp = dhcp_agent.DhcpAgent(HOSTNAME)
         with mock.patch.object(dhcp_agent.eventlet, 'spawn') as spawn:
@@ -728,12 +825,40 @@ class TestDhcpAgentEventHandler(base.BaseTestCase):
     def test_port_update_end(self):
         payload = dict(port=vars(fake_port2))
         self.cache.get_network_by_id.return_value = fake_network
-        self.cache.get_port_by_id.return_value = fake_port2
+        self.cache.get_port_by_id.return_value = None
         self.dhcp.port_update_end(None, payload)
         self.cache.assert_has_calls(
             [mock.call.get_network_by_id(fake_port2.network_id),
              mock.call.get_port_by_id(fake_port2.id),
              mock.call.put_port(mock.ANY)])
+        self.call_driver.assert_called_once_with(
+            'reload_ports', fake_network,
+            mac_addresses=[fake_port2.mac_address], update_options=False)
+
+    def test_port_update_end_unchanged(self):
+        payload = dict(port=vars(fake_port2))
+        self.cache.get_network_by_id.return_value = fake_network
+        self.cache.get_port_by_id.return_value = fake_port2
+        self.dhcp.port_update_end(None, payload)
+        self.cache.assert_has_calls([mock.call.put_port(mock.ANY)])
+        self.assertFalse(self.call_driver.called)
+
+    def test_port_update_end_extra_dhcp_opts(self):
+        port = dict(vars(fake_port2),
+                    extra_dhcp_opts=[dict(opt_name='bootfile-name',
+                                          opt_value='pxelinux.0')])
+        self.cache.get_network_by_id.return_value = fake_network
+        self.cache.get_port_by_id.return_value = fake_port2
+        self.dhcp.port_update_end(None, dict(port=port))
+        self.call_driver.assert_called_once_with(
+            'reload_ports', fake_network,
+            mac_addresses=[fake_port2.mac_address], update_options=True)
+
+    def test_port_update_end_dhcp_port(self):
+        port = dict(vars(fake_port2), device_owner=const.DEVICE_OWNER_DHCP)
+        self.cache.get_network_by_id.return_value = fake_network
+        self.cache.get_port_by_id.return_value = fake_port2
+        self.dhcp.port_update_end(None, dict(port=port))
         self.call_driver.assert_called_once_with('reload_allocations',
                                                  fake_network)
 
@@ -754,7 +879,9 @@ class TestDhcpAgentEventHandler(base.BaseTestCase):
                 fake_network,
                 mac_address=fake_port1.mac_address,
                 removed_ips=set([updated_fake_port1.fixed_ips[0].ip_address])),
-             mock.call.call_driver('reload_allocations', fake_network)])
+             mock.call.call_driver('reload_ports', fake_network,
+                                   mac_addresses=[fake_port1.mac_address],
+                                   update_options=False)])
 
     def test_port_delete_end(self):
         payload = dict(port_id=fake_port2.id)
@@ -773,7 +900,9 @@ class TestDhcpAgentEventHandler(base.BaseTestCase):
                                    fake_network,
                                    mac_address=fake_port2.mac_address,
                                    removed_ips=removed_ips),
-             mock.call.call_driver('reload_allocations', fake_network)])
+             mock.call.call_driver('reload_ports', fake_network,
+                                   mac_addresses=[fake_port2.mac_address],
+                                   update_options=False)])
 
     def test_port_delete_end_unknown_port(self):
         payload = dict(port_id='unknown')
@@ -820,6 +949,22 @@ class TestDhcpPluginApiProxy(base.BaseTestCase):
                                               device_id='devid',
                                               host='foo')
 
+    def test_get_active_networks(self):
+        self.proxy.get_active_networks()
+        self.make_msg.assert_called_once_with('get_active_networks',
+                                              host='foo')
+
+    def test_get_networks_info(self):
+        self.call.return_value = [dict(id='a')]
+        retval = self.proxy.get_networks_info(['a'])
+        self.assertEqual(['a'], [n.id for n in retval])
+        self.make_msg.assert_called_once_with('get_networks_info',
+                                              network_ids=['a'],
+                                              host='foo')
+        self.call.assert_called_once_with(
+            mock.ANY, mock.ANY, topic=mock.ANY,
+            version=dhcp_agent.NETWORKS_INFO_RPC_VERSION)
+
     def test_get_active_networks_info(self):
         self.proxy.get_active_networks_info()
         self.make_msg.assert_called_once_with('get_active_networks_info',
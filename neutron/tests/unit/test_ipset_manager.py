@@ -0,0 +1,69 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from neutron.agent.linux import ipset_manager
+from neutron.tests import base
+
+
+class IpsetManagerTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(IpsetManagerTestCase, self).setUp()
+        self.execute = mock.Mock()
+        self.ipset = ipset_manager.IpsetManager(_execute=self.execute,
+                                                root_helper='sudo')
+
+    def _restored(self):
+        return self.execute.call_args[1]['process_input']
+
+    def test_new_set_is_created_and_flushed(self):
+        self.ipset.set_members('NIPv6sg', 'IPv6', ['fe80::2', 'fe80::1'])
+        self.execute.assert_called_once_with(
+            ['ipset', 'restore', '-exist'],
+            process_input='create NIPv6sg hash:net family inet6\n'
+                          'flush NIPv6sg\n'
+                          'add NIPv6sg fe80::1\n'
+                          'add NIPv6sg fe80::2\n',
+            root_helper='sudo')
+
+    def test_members_are_updated_incrementally(self):
+        self.ipset.set_members('NIPv4sg', 'IPv4', ['10.0.0.1', '10.0.0.2'])
+        self.ipset.set_members('NIPv4sg', 'IPv4', ['10.0.0.2', '10.0.0.3'])
+        self.assertEqual('del NIPv4sg 10.0.0.1\nadd NIPv4sg 10.0.0.3\n',
+                         self._restored())
+        self.execute.reset_mock()
+        self.ipset.set_members('NIPv4sg', 'IPv4', ['10.0.0.3', '10.0.0.2'])
+        self.assertFalse(self.execute.called)
+
+    def test_set_in_namespace(self):
+        self.ipset.namespace = 'ns'
+        self.ipset.set_members('NIPv4sg', 'IPv4', [])
+        self.assertEqual(['ip', 'netns', 'exec', 'ns',
+                          'ipset', 'restore', '-exist'],
+                         self.execute.call_args[0][0])
+
+    def test_destroy_set(self):
+        self.ipset.destroy_set('NIPv4sg')
+        self.assertFalse(self.execute.called)
+        self.ipset.set_members('NIPv4sg', 'IPv4', [])
+        self.ipset.destroy_set('NIPv4sg')
+        self.execute.assert_called_with(['ipset', 'destroy', 'NIPv4sg'],
+                                        process_input=None,
+                                        root_helper='sudo')
+        self.assertEqual({}, self.ipset.sets)
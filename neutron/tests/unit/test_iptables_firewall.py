@@ -1126,3 +1126,75 @@ class IptablesFirewallTestCase(base.BaseTestCase):
                  call.add_rule('ofake_dev', '-j $sg-fallback'),
                  call.add_rule('sg-chain', '-j ACCEPT')]
         self.v4filter_inst.assert_has_calls(calls)
+
+
+class IptablesFirewallIpsetTestCase(IptablesFirewallTestCase):
+    def setUp(self):
+        cfg.CONF.set_override('enable_ipset', True, 'SECURITYGROUP')
+        self.addCleanup(cfg.CONF.reset)
+        self.ipset_cls_p = mock.patch(
+            'neutron.agent.linux.ipset_manager.IpsetManager')
+        self.ipset_cls = self.ipset_cls_p.start()
+        self.addCleanup(self.ipset_cls_p.stop)
+        super(IptablesFirewallIpsetTestCase, self).setUp()
+        self.ipset = self.ipset_cls.return_value
+
+    def _fake_port(self):
+        port = super(IptablesFirewallIpsetTestCase, self)._fake_port()
+        port['security_groups'] = ['sg1']
+        return port
+
+    def _set_remote_group(self):
+        rule = {'ethertype': 'IPv4',
+                'direction': 'ingress',
+                'protocol': 'tcp',
+                'port_range_min': 22,
+                'port_range_max': 22,
+                'remote_group_id': 'sg2'}
+        self.firewall.update_security_group_rules('sg1', [rule])
+        self.firewall.update_security_group_members(
+            'sg2', {'IPv4': ['10.0.0.2', '10.0.0.3'], 'IPv6': []})
+
+    def test_members_are_set_in_ipsets(self):
+        self._set_remote_group()
+        self.ipset.assert_has_calls(
+            [call.set_members('NIPv4sg2', 'IPv4', ['10.0.0.2', '10.0.0.3']),
+             call.set_members('NIPv6sg2', 'IPv6', [])])
+
+    def test_set_name_is_truncated(self):
+        sg_id = _uuid()
+        self.firewall.update_security_group_members(sg_id, {})
+        set_name = 'NIPv4' + sg_id.replace('-', '')
+        self.ipset.set_members.assert_any_call(set_name[:31], 'IPv4', [])
+
+    def test_prepare_port_filter_with_remote_group(self):
+        self._set_remote_group()
+        ingress = call.add_rule(
+            'ifake_dev',
+            '-p tcp -m tcp --dport 22 -m set --match-set NIPv4sg2 src '
+            '-j RETURN')
+        egress = call.add_rule('ofake_dev', '-j RETURN')
+        self._test_prepare_port_filter({'ethertype': 'IPv4',
+                                        'direction': 'egress'},
+                                       ingress, egress)
+
+    def test_member_update_keeps_expanded_rules(self):
+        self._set_remote_group()
+        port = self._fake_port()
+        self.firewall.prepare_port_filter(port)
+        expanded = self.firewall._expanded_sg_rules
+        self.assertTrue(expanded)
+        self.firewall.update_security_group_members(
+            'sg2', {'IPv4': ['10.0.0.2'], 'IPv6': []})
+        self.assertIs(expanded, self.firewall._expanded_sg_rules)
+        self.assertTrue(self.firewall.updates_members_in_place)
+
+    def test_unused_ipsets_are_destroyed(self):
+        self._set_remote_group()
+        port = self._fake_port()
+        self.firewall.prepare_port_filter(port)
+        self.assertFalse(self.ipset.destroy_set.called)
+        self.firewall.remove_port_filter(port)
+        self.ipset.assert_has_calls([call.destroy_set('NIPv4sg2'),
+                                     call.destroy_set('NIPv6sg2')])
+        self.assertEqual({}, self.firewall.sg_members)
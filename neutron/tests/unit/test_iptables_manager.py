@@ -20,6 +20,7 @@
 import inspect
 import os
 
+import mock
 import mox
 
 from neutron.agent.linux import iptables_manager
@@ -562,3 +563,90 @@ class IptablesManagerStateLessTestCase(base.BaseTestCase):
 
     def test_nat_not_found(self):
         self.assertFalse('nat' in self.iptables.ipv4)
+
+
+class IptablesManagerIncrementalTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(IptablesManagerIncrementalTestCase, self).setUp()
+        self.root_helper = 'sudo'
+        self.execute = mock.Mock(return_value='')
+        self.iptables = iptables_manager.IptablesManager(
+            _execute=self.execute, root_helper=self.root_helper,
+            incremental=True)
+        self.filter = self.iptables.ipv4['filter']
+        # the first apply rewrites the whole tables
+        self.iptables.apply()
+        self.execute.reset_mock()
+
+    def _assert_restored(self, lines):
+        self.execute.assert_called_once_with(
+            ['iptables-restore', '--noflush'],
+            process_input='\n'.join(lines) % IPTABLES_ARG + '\n',
+            root_helper=self.root_helper)
+
+    def test_first_apply_is_full(self):
+        iptables = iptables_manager.IptablesManager(
+            _execute=self.execute, root_helper=self.root_helper,
+            incremental=True)
+        iptables.apply()
+        self.execute.assert_has_calls([
+            mock.call(['iptables-save', '-c'], root_helper=self.root_helper),
+            mock.call(['iptables-restore', '-c'], process_input=mock.ANY,
+                      root_helper=self.root_helper)])
+
+    def test_apply_without_changes_does_nothing(self):
+        self.iptables.apply()
+        self.assertFalse(self.execute.called)
+
+    def test_apply_rewrites_changed_chains_only(self):
+        self.filter.add_chain('sg-chain')
+        self.filter.add_rule('sg-chain', '-j ACCEPT')
+        self.filter.add_rule('sg-chain', '-s 10.0.0.1 -j DROP', top=True)
+        self.filter.add_rule('FORWARD', '-j $sg-chain')
+        self.iptables.apply()
+        self._assert_restored([
+            '*filter',
+            ':%(bn)s-FORWARD - [0:0]',
+            ':%(bn)s-sg-chain - [0:0]',
+            '-A %(bn)s-FORWARD -j %(bn)s-sg-chain',
+            '-A %(bn)s-sg-chain -s 10.0.0.1 -j DROP',
+            '-A %(bn)s-sg-chain -j ACCEPT',
+            'COMMIT'])
+
+    def test_apply_removes_chains(self):
+        self.filter.add_chain('sg-chain')
+        self.filter.add_rule('FORWARD', '-j $sg-chain')
+        self.iptables.apply()
+        self.execute.reset_mock()
+
+        self.filter.remove_chain('sg-chain')
+        self.iptables.apply()
+        self._assert_restored([
+            '*filter',
+            ':%(bn)s-FORWARD - [0:0]',
+            ':%(bn)s-sg-chain - [0:0]',
+            '-X %(bn)s-sg-chain',
+            'COMMIT'])
+
+    def test_apply_unwrapped_change_is_full(self):
+        self.filter.add_rule('FORWARD', '-j ACCEPT', wrap=False)
+        self.iptables.apply()
+        self.execute.assert_has_calls([
+            mock.call(['iptables-save', '-c'], root_helper=self.root_helper),
+            mock.call(['iptables-restore', '-c'], process_input=mock.ANY,
+                      root_helper=self.root_helper)])
+
+    def test_apply_falls_back_to_full_on_error(self):
+        def execute(args, **kwargs):
+            if '--noflush' in args:
+                raise RuntimeError()
+            return ''
+        self.execute.side_effect = execute
+        self.filter.add_rule('INPUT', '-j ACCEPT')
+        self.iptables.apply()
+        self.assertEqual(
+            [['iptables-restore', '--noflush'], ['iptables-save', '-c'],
+             ['iptables-restore', '-c']],
+            [c[0][0] for c in self.execute.call_args_list])
+        self.assertFalse(self.filter.dirty_chains)
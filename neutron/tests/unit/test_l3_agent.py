@@ -15,9 +15,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import copy
 
 import mock
+import netaddr
 from oslo.config import cfg
 
 from neutron.agent.common import config as agent_config
@@ -55,6 +57,7 @@ class TestBasicRouterOperations(base.BaseTestCase):
         self.utils_exec_p = mock.patch(
             'neutron.agent.linux.utils.execute')
         self.utils_exec = self.utils_exec_p.start()
+        self.utils_exec.side_effect = self._fake_execute
 
         self.external_process_p = mock.patch(
             'neutron.agent.linux.external_process.ProcessManager')
@@ -84,6 +87,22 @@ class TestBasicRouterOperations(base.BaseTestCase):
 
         self.addCleanup(mock.patch.stopall)
 
+    def _fake_execute(self, *args, **kwargs):
+        if kwargs.get('return_stderr'):
+            return '', ''
+        return ''
+
+    def _check_batch_executed(self, namespace, lines):
+        if namespace:
+            cmd = ['ip', 'netns', 'exec', namespace, 'ip']
+        else:
+            cmd = ['ip']
+        cmd += ['-force', '-batch', '-']
+        self.utils_exec.assert_any_call(
+            cmd, root_helper=self.conf.root_helper,
+            process_input='\n'.join(lines) + '\n',
+            check_exit_code=False, return_stderr=True)
+
     def test_router_info_create(self):
         id = _uuid()
         ri = l3_agent.RouterInfo(id, self.conf.root_helper,
@@ -205,6 +224,11 @@ class TestBasicRouterOperations(base.BaseTestCase):
         if action == 'add':
             self.device_exists.return_value = False
             agent.floating_ip_added(ri, ex_gw_port, floating_ip, fixed_ip)
+            broadcast = netaddr.IPNetwork(floating_ip + '/32').broadcast
+            self._check_batch_executed(
+                ri.ns_name(),
+                ['addr add 20.0.0.100/32 brd %s scope global dev %s' %
+                 (broadcast, interface_name)])
             arping_cmd = ['arping', '-A', '-U',
                           '-I', interface_name,
                           '-c', self.conf.send_arp_for_ha,
@@ -219,6 +243,9 @@ class TestBasicRouterOperations(base.BaseTestCase):
         elif action == 'remove':
             self.device_exists.return_value = True
             agent.floating_ip_removed(ri, ex_gw_port, floating_ip, fixed_ip)
+            self._check_batch_executed(
+                ri.ns_name(),
+                ['addr del 20.0.0.100/32 dev %s' % interface_name])
         else:
             raise Exception("Invalid action %s" % action)
 
@@ -306,28 +333,25 @@ class TestBasicRouterOperations(base.BaseTestCase):
         ri.router['routes'] = fake_new_routes
         agent.routes_updated(ri)
 
-        expected = [['ip', 'route', 'replace', 'to', '110.100.30.0/24',
-                    'via', '10.100.10.30'],
-                    ['ip', 'route', 'replace', 'to', '110.100.31.0/24',
-                    'via', '10.100.10.30']]
-
-        self._check_agent_method_called(agent, expected, namespace)
+        self._check_batch_executed(
+            ri.ns_name(),
+            ['route replace to 110.100.31.0/24 via 10.100.10.30',
+             'route replace to 110.100.30.0/24 via 10.100.10.30'])
 
         fake_new_routes = [{'destination': "110.100.30.0/24",
                             'nexthop': "10.100.10.30"}]
         ri.router['routes'] = fake_new_routes
         agent.routes_updated(ri)
-        expected = [['ip', 'route', 'delete', 'to', '110.100.31.0/24',
-                    'via', '10.100.10.30']]
-
-        self._check_agent_method_called(agent, expected, namespace)
+        self._check_batch_executed(
+            ri.ns_name(),
+            ['route delete to 110.100.31.0/24 via 10.100.10.30'])
         fake_new_routes = []
         ri.router['routes'] = fake_new_routes
         agent.routes_updated(ri)
 
-        expected = [['ip', 'route', 'delete', 'to', '110.100.30.0/24',
-                    'via', '10.100.10.30']]
-        self._check_agent_method_called(agent, expected, namespace)
+        self._check_batch_executed(
+            ri.ns_name(),
+            ['route delete to 110.100.30.0/24 via 10.100.10.30'])
 
     def _verify_snat_rules(self, rules, router, negate=False):
         interfaces = router[l3_constants.INTERFACE_KEY]
@@ -409,6 +433,45 @@ class TestBasicRouterOperations(base.BaseTestCase):
         del router['gw_port']
         agent.process_router(ri)
 
+    def test_process_router_floating_ips_in_one_batch(self):
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        router = self._prepare_router_data()
+        router[l3_constants.FLOATINGIP_KEY] = [
+            {'id': _uuid(),
+             'floating_ip_address': '8.8.8.%d' % i,
+             'fixed_ip_address': '7.7.7.%d' % i,
+             'port_id': _uuid()} for i in range(1, 4)]
+        ri = l3_agent.RouterInfo(router['id'], self.conf.root_helper,
+                                 self.conf.use_namespaces, router=router)
+        ex_gw_port = agent._get_ex_gw_port(ri)
+        ri.ex_gw_port = ex_gw_port
+        agent.process_router_floating_ips(ri, ex_gw_port)
+
+        batches = [call for call in self.utils_exec.call_args_list
+                   if '-batch' in call[0][0]]
+        self.assertEqual(1, len(batches))
+        self.assertEqual(3, batches[0][1]['process_input'].count('addr add'))
+        self.assertEqual(3, len(ri.floating_ips))
+
+        # remove one floating ip and remap another
+        fips = copy.deepcopy(router[l3_constants.FLOATINGIP_KEY])
+        del fips[0]
+        fips[0]['fixed_ip_address'] = '7.7.7.9'
+        router[l3_constants.FLOATINGIP_KEY] = fips
+        self.utils_exec.reset_mock()
+        agent.process_router_floating_ips(ri, ex_gw_port)
+
+        batches = [call[1]['process_input']
+                   for call in self.utils_exec.call_args_list
+                   if '-batch' in call[0][0]]
+        self.assertEqual(2, len(batches))
+        self.assertEqual(2, batches[0].count('addr del'))
+        self.assertEqual(1, batches[1].count('addr add'))
+        self.assertEqual(
+            set([('8.8.8.2', '7.7.7.9'), ('8.8.8.3', '7.7.7.3')]),
+            set([(fip['floating_ip_address'], fip['fixed_ip_address'])
+                 for fip in ri.floating_ips]))
+
     def test_process_router_snat_disabled(self):
         agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
         router = self._prepare_router_data(enable_snat=True)
@@ -497,22 +560,166 @@ class TestBasicRouterOperations(base.BaseTestCase):
         self.assertEqual(len(nat_rules_delta), 1)
         self._verify_snat_rules(nat_rules_delta, router, negate=True)
 
-    def test_handle_router_snat_rules_add_back_jump(self):
+    def test_handle_router_snat_rules_keeps_jump(self):
         agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
         ri = mock.MagicMock()
+        ri.snat_rules = []
         port = {'fixed_ips': [{'ip_address': '192.168.1.4'}]}
 
         agent._handle_router_snat_rules(ri, port, [], "iface", "add_rules")
 
         nat = ri.iptables_manager.ipv4['nat']
-        nat.empty_chain.assert_any_call('snat')
-        nat.add_rule.assert_any_call('snat', '-j $float-snat')
-        for call in nat.mock_calls:
-            name, args, kwargs = call
-            if name == 'add_rule':
-                self.assertEqual(args, ('snat', '-j $float-snat'))
-                self.assertEqual(kwargs, {})
-                break
+        self.assertFalse(nat.empty_chain.called)
+        self.assertFalse(nat.remove_rule.called)
+        self.assertEqual(ri.snat_rules, agent.external_gateway_nat_rules(
+            '192.168.1.4', [], "iface"))
+        for rule in ri.snat_rules:
+            nat.add_rule.assert_any_call(*rule)
+
+    def test_handle_router_snat_rules_only_changes_diff(self):
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        ri = mock.MagicMock()
+        port = {'fixed_ips': [{'ip_address': '192.168.1.4'}]}
+        ri.snat_rules = agent.external_gateway_nat_rules(
+            '192.168.1.4', ['10.0.0.1/24', '10.0.1.1/24'], "iface")
+
+        agent._handle_router_snat_rules(ri, port,
+                                        ['10.0.1.1/24', '10.0.2.1/24'],
+                                        "iface", "add_rules")
+
+        nat = ri.iptables_manager.ipv4['nat']
+        nat.remove_rule.assert_called_once_with(
+            'snat', '-s 10.0.0.1/24 -j SNAT --to-source 192.168.1.4')
+        nat.add_rule.assert_called_once_with(
+            'snat', '-s 10.0.2.1/24 -j SNAT --to-source 192.168.1.4')
+
+    def test_handle_router_snat_rules_remove_rules(self):
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        ri = mock.MagicMock()
+        port = {'fixed_ips': [{'ip_address': '192.168.1.4'}]}
+        ri.snat_rules = agent.external_gateway_nat_rules(
+            '192.168.1.4', ['10.0.0.1/24'], "iface")
+        old_rules = ri.snat_rules
+
+        agent._handle_router_snat_rules(ri, port, ['10.0.0.1/24'],
+                                        "iface", "remove_rules")
+
+        nat = ri.iptables_manager.ipv4['nat']
+        self.assertEqual(nat.remove_rule.call_count, len(old_rules))
+        self.assertFalse(nat.add_rule.called)
+        self.assertEqual(ri.snat_rules, [])
+
+    def _process_routers(self, agent, routers, **kwargs):
+        agent._process_routers(copy.deepcopy(routers), **kwargs)
+        agent._process_router_updates()
+
+    def test_process_routers_skips_unchanged_router(self):
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        self.plugin_api.get_external_network_id.return_value = None
+        router = self._prepare_router_data()
+        router.update({'admin_state_up': True,
+                       'external_gateway_info': {}})
+        with mock.patch.object(agent, 'process_router') as process_router:
+            self._process_routers(agent, [router])
+            self._process_routers(agent, [router], all_routers=True)
+            self.assertEqual(process_router.call_count, 1)
+
+            router['routes'] = [{'destination': '110.100.30.0/24',
+                                 'nexthop': '10.100.10.30'}]
+            self._process_routers(agent, [router])
+            self.assertEqual(process_router.call_count, 2)
+        self.assertIn(router['id'], agent.router_info)
+
+    def test_process_routers_retries_failed_router(self):
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        self.plugin_api.get_external_network_id.return_value = None
+        router = self._prepare_router_data()
+        router.update({'admin_state_up': True,
+                       'external_gateway_info': {}})
+        with mock.patch.object(agent, 'process_router',
+                               side_effect=[RuntimeError, None]) as process:
+            self._process_routers(agent, [router])
+            self.assertIsNone(agent.router_info[router['id']].fingerprint)
+            self.assertTrue(agent.fullsync)
+            self._process_routers(agent, [router])
+            self.assertEqual(process.call_count, 2)
+            self.assertIsNotNone(
+                agent.router_info[router['id']].fingerprint)
+
+    def test_process_routers_removes_missing_router(self):
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        self.plugin_api.get_external_network_id.return_value = None
+        router = self._prepare_router_data()
+        router.update({'admin_state_up': True,
+                       'external_gateway_info': {}})
+        with mock.patch.object(agent, 'process_router'):
+            self._process_routers(agent, [router], timestamp=1)
+            with mock.patch.object(agent, '_router_removed') as removed:
+                # a resync whose data is older than the router is ignored
+                self._process_routers(agent, [], all_routers=True,
+                                      timestamp=0.5)
+                self.assertFalse(removed.called)
+                self._process_routers(agent, [], all_routers=True,
+                                      timestamp=2)
+                removed.assert_called_once_with(router['id'])
+
+    def test_process_routers_ignores_stale_deleted_router(self):
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        self.plugin_api.get_external_network_id.return_value = None
+        router = self._prepare_router_data()
+        router.update({'admin_state_up': True,
+                       'external_gateway_info': {}})
+        with contextlib.nested(
+            mock.patch.object(agent, 'process_router'),
+            mock.patch.object(agent, '_router_added',
+                              wraps=agent._router_added),
+            mock.patch.object(agent, '_router_removed')
+        ) as (process_router, added, removed):
+            removed.side_effect = lambda router_id: agent.router_info.pop(
+                router_id)
+            self._process_routers(agent, [router], timestamp=1)
+            # a resync fetches the routers at 2, the router is deleted at 3
+            # before the fetched routers are queued
+            agent._queue.add(l3_agent.RouterUpdate(
+                router['id'], l3_agent.PRIORITY_RPC,
+                action=l3_agent.DELETE_ROUTER, timestamp=3))
+            agent._process_router_updates()
+            removed.assert_called_once_with(router['id'])
+            self._process_routers(agent, [router], all_routers=True,
+                                  timestamp=2)
+            self.assertNotIn(router['id'], agent.router_info)
+            self.assertEqual(added.call_count, 1)
+
+            # the router is added again after its deletion
+            self._process_routers(agent, [router], timestamp=4)
+            self.assertIn(router['id'], agent.router_info)
+            self.assertEqual(added.call_count, 2)
+            self.assertNotIn(router['id'], agent._deleted_routers)
+
+    def test_spawn_router_workers_is_bounded(self):
+        self.conf.set_override('router_processing_workers', 2)
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        for i in range(5):
+            agent._queue.add(l3_agent.RouterUpdate(
+                _uuid(), l3_agent.PRIORITY_RPC, router={}))
+        with mock.patch.object(agent._pool, 'spawn_n') as spawn_n:
+            agent._spawn_router_workers()
+        self.assertEqual(spawn_n.call_count, 2)
+
+    def test_rpc_loop_queues_updated_and_removed_routers(self):
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        self.plugin_api.get_routers.return_value = []
+        agent.routers_updated(None, ['r1'])
+        agent.router_deleted(None, 'r2')
+        with mock.patch.object(agent, '_spawn_router_workers') as spawn:
+            agent._rpc_loop()
+        self.plugin_api.get_routers.assert_called_once_with(agent.context,
+                                                            ['r1'])
+        update = agent._queue.pop()
+        self.assertEqual((update.id, update.action, update.priority),
+                         ('r2', l3_agent.DELETE_ROUTER,
+                          l3_agent.PRIORITY_RPC))
+        spawn.assert_called_once_with()
 
     def test_routers_with_admin_state_down(self):
         agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
@@ -566,6 +773,8 @@ class TestBasicRouterOperations(base.BaseTestCase):
         agent.router_deleted(None, router['id'])
         agent._process_router_delete()
         self.assertFalse(list(agent.removed_routers))
+        agent._process_router_updates()
+        self.assertNotIn(router['id'], agent.router_info)
 
     def test_destroy_namespace(self):
 
@@ -684,6 +893,23 @@ class TestBasicRouterOperations(base.BaseTestCase):
                  '-p tcp -m tcp --dport 8775 -j ACCEPT')
         self.assertEqual([rules], agent.metadata_filter_rules())
 
+    def test_report_state_includes_queue_stats(self):
+        agent_config.register_agent_state_opts_helper(cfg.CONF)
+        with mock.patch('neutron.agent.rpc.PluginReportStateAPI') as api:
+            agent = l3_agent.L3NATAgentWithStateReport(HOSTNAME, self.conf)
+        agent._queue.add(l3_agent.RouterUpdate(_uuid(),
+                                               l3_agent.PRIORITY_RPC))
+        agent._record_processing_time(1.0)
+        agent._record_processing_time(2.0)
+        agent._report_state()
+        configurations = api.return_value.report_state.call_args[0][1][
+            'configurations']
+        self.assertEqual(configurations['router_update_queue_depth'], 1)
+        self.assertEqual(configurations['router_processing_time_avg'], 1.5)
+        self.assertEqual(configurations['router_processing_time_max'], 2.0)
+        agent._report_state()
+        self.assertEqual(configurations['router_processing_time_max'], 0.0)
+
 
 class TestL3AgentEventHandler(base.BaseTestCase):
 
@@ -762,3 +988,60 @@ class TestL3AgentEventHandler(base.BaseTestCase):
                 ])
         finally:
             self.external_process_p.start()
+
+
+class TestRouterUpdateQueue(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestRouterUpdateQueue, self).setUp()
+        self.queue = l3_agent.RouterUpdateQueue()
+
+    def _update(self, router_id, priority=l3_agent.PRIORITY_RPC,
+                timestamp=None, router=None):
+        return l3_agent.RouterUpdate(router_id, priority, router=router,
+                                     timestamp=timestamp)
+
+    def test_pop_empty(self):
+        self.assertIsNone(self.queue.pop())
+
+    def test_pop_by_priority(self):
+        self.queue.add(self._update('r1', l3_agent.PRIORITY_SYNC_ROUTERS_TASK))
+        self.queue.add(self._update('r2', l3_agent.PRIORITY_RPC))
+        self.queue.add(self._update('r3', l3_agent.PRIORITY_SYNC_ROUTERS_TASK))
+        self.assertEqual([self.queue.pop().id for i in range(3)],
+                         ['r2', 'r1', 'r3'])
+
+    def test_coalesce_updates(self):
+        self.queue.add(self._update('r1', l3_agent.PRIORITY_SYNC_ROUTERS_TASK,
+                                    timestamp=1, router={'rev': 1}))
+        self.queue.add(self._update('r2', l3_agent.PRIORITY_RPC))
+        self.queue.add(self._update('r1', l3_agent.PRIORITY_RPC,
+                                    timestamp=2, router={'rev': 2}))
+        self.queue.add(self._update('r3', l3_agent.PRIORITY_SYNC_ROUTERS_TASK))
+        self.assertEqual(len(self.queue), 3)
+        self.assertEqual(self.queue.pop().id, 'r2')
+        update = self.queue.pop()
+        self.assertEqual((update.id, update.router), ('r1', {'rev': 2}))
+        self.assertEqual(self.queue.pop().id, 'r3')
+        self.assertIsNone(self.queue.pop())
+
+    def test_coalesce_keeps_newer_data(self):
+        self.queue.add(self._update('r1', l3_agent.PRIORITY_SYNC_ROUTERS_TASK,
+                                    timestamp=2, router={'rev': 2}))
+        self.queue.add(self._update('r1', l3_agent.PRIORITY_RPC,
+                                    timestamp=1, router={'rev': 1}))
+        update = self.queue.pop()
+        self.assertEqual(update.router, {'rev': 2})
+        self.assertEqual(update.priority, l3_agent.PRIORITY_RPC)
+        self.assertIsNone(self.queue.pop())
+
+    def test_router_in_progress_is_not_handed_out(self):
+        self.queue.add(self._update('r1'))
+        self.assertEqual(self.queue.pop().id, 'r1')
+        self.queue.add(self._update('r1'))
+        self.assertIsNone(self.queue.pop())
+        self.assertEqual(len(self.queue), 1)
+        self.queue.task_done('r1')
+        self.assertEqual(self.queue.pop().id, 'r1')
+        self.queue.task_done('r1')
+        self.assertIsNone(self.queue.pop())
@@ -15,6 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import os
 
 import mock
@@ -868,6 +869,71 @@ tag:tag1,249,%s,%s""".lstrip() % (fake_v6,
                                     mock.call(exp_opt_name, exp_opt_data)])
         self.execute.assert_called_once_with(exp_args, 'sudo')
 
+    def _test_reload_ports(self, update_options):
+        exp_host_name = '/dhcp/cccccccc-cccc-cccc-cccc-cccccccccccc/host'
+        old_host_data = ('00:00:80:aa:bb:cc,host-192-168-0-9.openstacklocal,'
+                         '192.168.0.9\n'
+                         '00:00:0f:aa:bb:cc,host-192-168-0-3.openstacklocal,'
+                         '192.168.0.3\n'
+                         '00:00:0f:aa:bb:cc,host-fdca-3ba5-a17a-4ba3--3.'
+                         'openstacklocal,fdca:3ba5:a17a:4ba3::3\n'
+                         '00:00:11:aa:bb:cc,host-192-168-0-7.openstacklocal,'
+                         '192.168.0.7\n')
+        exp_host_data = ('00:00:0f:aa:bb:cc,host-192-168-0-3.openstacklocal,'
+                         '192.168.0.3\n'
+                         '00:00:0f:aa:bb:cc,host-fdca-3ba5-a17a-4ba3--3.'
+                         'openstacklocal,fdca:3ba5:a17a:4ba3::3\n'
+                         '00:00:80:aa:bb:cc,host-192-168-0-2.openstacklocal,'
+                         '192.168.0.2\n')
+        with mock.patch('os.path.isdir') as isdir:
+            isdir.return_value = True
+            with mock.patch.object(dhcp.Dnsmasq, 'active') as active:
+                active.__get__ = mock.Mock(return_value=True)
+                with mock.patch.object(dhcp.Dnsmasq, 'pid') as pid:
+                    pid.__get__ = mock.Mock(return_value=5)
+                    dm = dhcp.Dnsmasq(self.conf, FakeDualNetwork(),
+                                      version=float(2.59))
+                    method_name = '_make_subnet_interface_ip_map'
+                    with contextlib.nested(
+                        mock.patch.object(dm, 'device_manager'),
+                        mock.patch.object(dhcp.Dnsmasq, method_name),
+                        mock.patch('os.path.exists', return_value=True),
+                        mock.patch('__builtin__.open',
+                                   mock.mock_open(read_data=old_host_data),
+                                   create=True)
+                    ) as (mgr, ip_map, exists, open_):
+                        ip_map.return_value = {}
+                        # port 1 moved to 192.168.0.2, the port of
+                        # 00:00:11:aa:bb:cc was deleted
+                        dm.reload_ports(['00:00:80:aa:bb:cc',
+                                         '00:00:11:aa:bb:cc'],
+                                        update_options=update_options)
+                        open_.assert_called_once_with(exp_host_name)
+                        self.assertFalse(mgr.update.called)
+
+        self.safe.assert_has_calls([mock.call(exp_host_name, exp_host_data)])
+        self.assertEqual(2 if update_options else 1, self.safe.call_count)
+        self.execute.assert_called_once_with(['kill', '-HUP', 5], 'sudo')
+
+    def test_reload_ports(self):
+        self._test_reload_ports(False)
+
+    def test_reload_ports_update_options(self):
+        self._test_reload_ports(True)
+
+    def test_reload_ports_without_hosts_file(self):
+        with contextlib.nested(
+            mock.patch('os.path.isdir', return_value=True),
+            mock.patch('os.path.exists', return_value=False),
+            mock.patch.object(dhcp.Dnsmasq, '_output_hosts_file'),
+            mock.patch.object(dhcp.Dnsmasq, '_reload')
+        ) as (isdir, exists, output_hosts, reload):
+            dm = dhcp.Dnsmasq(self.conf, FakeDualNetwork(),
+                              version=float(2.59))
+            dm.reload_ports(['00:00:80:aa:bb:cc'], update_options=False)
+            output_hosts.assert_called_once_with()
+            reload.assert_called_once_with()
+
     def test_reload_allocations_stale_pid(self):
         exp_host_name = '/dhcp/cccccccc-cccc-cccc-cccc-cccccccccccc/host'
         exp_host_data = ('00:00:80:aa:bb:cc,host-192-168-0-2.openstacklocal,'
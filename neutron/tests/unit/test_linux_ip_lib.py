@@ -15,7 +15,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import socket
+
 import mock
+from oslo.config import cfg
 
 from neutron.agent.linux import ip_lib
 from neutron.common import exceptions
@@ -352,6 +355,8 @@ class TestIPCommandBase(base.BaseTestCase):
         self.ip = mock.Mock()
         self.ip.root_helper = 'sudo'
         self.ip.namespace = 'namespace'
+        self.ip.batch = None
+        self.ip.use_netlink = False
         self.ip_cmd = ip_lib.IpCommandBase(self.ip)
         self.ip_cmd.COMMAND = 'foo'
 
@@ -394,6 +399,8 @@ class TestIPCmdBase(base.BaseTestCase):
         self.parent = mock.Mock()
         self.parent.name = 'eth0'
         self.parent.root_helper = 'sudo'
+        self.parent.batch = None
+        self.parent.use_netlink = False
 
     def _assert_call(self, options, args):
         self.parent.assert_has_calls([
@@ -675,6 +682,259 @@ class TestIpNetnsCommand(TestIPCmdBase):
                 root_helper='sudo', check_exit_code=True)
 
 
+class TestIpBatch(base.BaseTestCase):
+    def setUp(self):
+        super(TestIpBatch, self).setUp()
+        self.execute_p = mock.patch('neutron.agent.linux.utils.execute')
+        self.execute = self.execute_p.start()
+        self.execute.return_value = ('', '')
+        self.addCleanup(self.execute_p.stop)
+
+    def _assert_batch_executed(self, lines, namespace='ns'):
+        if namespace:
+            cmd = ['ip', 'netns', 'exec', namespace, 'ip']
+        else:
+            cmd = ['ip']
+        cmd += ['-force', '-batch', '-']
+        self.execute.assert_called_once_with(
+            cmd, root_helper='sudo',
+            process_input='\n'.join(lines) + '\n',
+            check_exit_code=False, return_stderr=True)
+
+    def test_device_changes_are_queued(self):
+        with ip_lib.IpBatch('sudo', 'ns') as batch:
+            device = batch.device('tap0')
+            device.link.set_up()
+            device.addr.add(4, '10.0.0.1/24', '10.0.0.255')
+            device.route.add_gateway('10.0.0.254')
+            self.assertFalse(self.execute.called)
+        self._assert_batch_executed(
+            ['link set tap0 up',
+             'addr add 10.0.0.1/24 brd 10.0.0.255 scope global dev tap0',
+             'route replace default via 10.0.0.254 dev tap0'])
+
+    def test_reads_are_not_queued(self):
+        with ip_lib.IpBatch('sudo', 'ns') as batch:
+            self.execute.return_value = ''
+            batch.device('tap0').addr.list()
+            self.execute.assert_called_once_with(
+                ['ip', 'netns', 'exec', 'ns', 'ip', 'addr', 'show', 'tap0'],
+                root_helper='sudo')
+            self.execute.reset_mock()
+            self.execute.return_value = ('', '')
+        self.assertFalse(self.execute.called)
+
+    def test_no_namespace(self):
+        batch = ip_lib.IpBatch('sudo')
+        batch.add('route', ['replace', 'to', '10.1.0.0/16', 'via', '10.0.0.1'])
+        batch.execute()
+        self._assert_batch_executed(
+            ['route replace to 10.1.0.0/16 via 10.0.0.1'], namespace=None)
+
+    def test_not_executed_on_exception(self):
+        def _fail():
+            with ip_lib.IpBatch('sudo', 'ns') as batch:
+                batch.device('tap0').link.set_up()
+                raise ValueError()
+        self.assertRaises(ValueError, _fail)
+        self.assertFalse(self.execute.called)
+
+    def test_no_root_helper(self):
+        batch = ip_lib.IpBatch()
+        batch.add('link', ['set', 'tap0', 'up'])
+        self.assertRaises(exceptions.SudoRequired, batch.execute)
+
+    def test_failures_are_reported_per_command(self):
+        self.execute.return_value = (
+            '', 'RTNETLINK answers: File exists\nCommand failed -:2\n'
+                'Cannot find device "tap1"\nCommand failed -:3\n')
+        batch = ip_lib.IpBatch('sudo', 'ns')
+        batch.add('link', ['set', 'tap0', 'up'])
+        batch.add('addr', ['add', '10.0.0.1/24', 'dev', 'tap0'])
+        batch.add('link', ['set', 'tap1', 'up'])
+        try:
+            batch.execute()
+        except ip_lib.IpBatchError as e:
+            self.assertEqual(
+                [('addr add 10.0.0.1/24 dev tap0',
+                  'RTNETLINK answers: File exists'),
+                 ('link set tap1 up', 'Cannot find device "tap1"')],
+                e.failures)
+        else:
+            self.fail('IpBatchError not raised')
+
+    def test_unchecked_failures_are_ignored(self):
+        self.execute.return_value = (
+            '', 'RTNETLINK answers: No such process\nCommand failed -:1\n')
+        batch = ip_lib.IpBatch('sudo', 'ns')
+        batch.add('route', ['delete', 'to', '10.1.0.0/16', 'via', '10.0.0.1'],
+                  check_exit_code=False)
+        batch.execute()
+
+    def test_global_error_fails_all_commands(self):
+        self.execute.return_value = ('', 'Cannot open network namespace\n')
+        batch = ip_lib.IpBatch('sudo', 'ns')
+        batch.add('link', ['set', 'tap0', 'up'])
+        batch.add('link', ['set', 'tap1', 'up'])
+        try:
+            batch.execute()
+        except ip_lib.IpBatchError as e:
+            self.assertEqual(
+                [('link set tap0 up', 'Cannot open network namespace'),
+                 ('link set tap1 up', 'Cannot open network namespace')],
+                e.failures)
+        else:
+            self.fail('IpBatchError not raised')
+
+    def test_set_netns_executes_queued_commands(self):
+        batch = ip_lib.IpBatch('sudo', 'ns')
+        device = batch.device('tap0')
+        device.link.set_address('fa:16:3e:00:00:01')
+        device.link.set_netns('other')
+        device.link.set_up()
+        self.assertEqual(
+            [mock.call(['ip', 'netns', 'exec', 'ns', 'ip', '-force',
+                        '-batch', '-'],
+                       root_helper='sudo',
+                       process_input='link set tap0 address '
+                                     'fa:16:3e:00:00:01\n',
+                       check_exit_code=False, return_stderr=True),
+             mock.call(['ip', 'netns', 'exec', 'ns', 'ip', 'link', 'set',
+                        'tap0', 'netns', 'other'], root_helper='sudo'),
+             mock.call(['ip', 'netns', 'exec', 'other', 'ip', 'link', 'set',
+                        'tap0', 'up'], root_helper='sudo')],
+            self.execute.call_args_list)
+        self.assertEqual([], batch.commands)
+
+
+class TestIpLibNetlink(base.BaseTestCase):
+    LINKS = [{'index': 1, 'name': 'lo', 'type': 772,
+              'address': '00:00:00:00:00:00',
+              'broadcast': '00:00:00:00:00:00', 'mtu': 16436,
+              'qdisc': 'noqueue', 'txqlen': 0, 'operstate': 'UNKNOWN',
+              'alias': None},
+             {'index': 2, 'name': 'eth0', 'type': 1,
+              'address': 'cc:dd:ee:ff:ab:cd',
+              'broadcast': 'ff:ff:ff:ff:ff:ff', 'mtu': 1500,
+              'qdisc': 'mq', 'txqlen': 1000, 'operstate': 'UP',
+              'alias': 'openvswitch'}]
+
+    ADDRESSES = [{'index': 2, 'family': socket.AF_INET,
+                  'address': '172.16.77.240', 'prefixlen': 24,
+                  'broadcast': '172.16.77.255', 'scope': 'global',
+                  'flags': 0x80},
+                 {'index': 2, 'family': socket.AF_INET6,
+                  'address': '2001:470:9:1224:5595:dd51:6ba2:e788',
+                  'prefixlen': 64, 'broadcast': None, 'scope': 'global',
+                  'flags': 0x1},
+                 {'index': 1, 'family': socket.AF_INET,
+                  'address': '127.0.0.1', 'prefixlen': 8,
+                  'broadcast': None, 'scope': 'host', 'flags': 0x80}]
+
+    ROUTES = [{'table': 254, 'dst': None, 'dst_len': 0,
+               'gateway': '10.35.19.254', 'oif': 2, 'priority': 100,
+               'protocol': 3, 'scope': 'global', 'type': 1},
+              {'table': 254, 'dst': '10.35.16.0', 'dst_len': 22,
+               'gateway': None, 'oif': 2, 'priority': None,
+               'protocol': 2, 'scope': 'link', 'type': 1}]
+
+    def setUp(self):
+        super(TestIpLibNetlink, self).setUp()
+        cfg.CONF.register_opts(ip_lib.OPTS)
+        cfg.CONF.set_override('ip_lib_use_netlink', True)
+        self.addCleanup(cfg.CONF.reset)
+        self.execute_p = mock.patch('neutron.agent.linux.utils.execute')
+        self.execute = self.execute_p.start()
+        self.addCleanup(self.execute_p.stop)
+        self.netlink_p = mock.patch.multiple(
+            ip_lib.netlink,
+            get_links=mock.Mock(return_value=self.LINKS),
+            get_addresses=mock.Mock(return_value=self.ADDRESSES),
+            get_routes=mock.Mock(return_value=self.ROUTES),
+            namespace_exists=mock.Mock(return_value=True))
+        self.netlink_p.start()
+        self.addCleanup(self.netlink_p.stop)
+
+    def test_get_devices(self):
+        devices = ip_lib.IPWrapper('sudo', 'ns').get_devices(
+            exclude_loopback=True)
+        self.assertEqual([ip_lib.IPDevice('eth0', namespace='ns')], devices)
+        ip_lib.netlink.get_links.assert_called_once_with('ns')
+        self.assertFalse(self.execute.called)
+
+    def test_link_attributes(self):
+        device = ip_lib.IPDevice('eth0')
+        self.assertEqual({'link/ether': 'cc:dd:ee:ff:ab:cd',
+                          'brd': 'ff:ff:ff:ff:ff:ff',
+                          'mtu': 1500, 'qdisc': 'mq', 'qlen': 1000,
+                          'state': 'UP', 'alias': 'openvswitch'},
+                         device.link.attributes)
+        self.assertEqual('cc:dd:ee:ff:ab:cd', device.link.address)
+        self.assertFalse(self.execute.called)
+
+    def test_device_exists(self):
+        self.assertTrue(ip_lib.device_exists('eth0'))
+        self.assertFalse(ip_lib.device_exists('eth1'))
+        self.assertFalse(self.execute.called)
+
+    def test_addr_list(self):
+        addresses = ip_lib.IPDevice('eth0').addr.list()
+        self.assertEqual(
+            [dict(cidr='172.16.77.240/24', broadcast='172.16.77.255',
+                  scope='global', ip_version=4, dynamic=False),
+             dict(cidr='2001:470:9:1224:5595:dd51:6ba2:e788/64',
+                  broadcast='::', scope='global', ip_version=6,
+                  dynamic=True)],
+            addresses)
+        self.assertFalse(self.execute.called)
+
+    def test_addr_list_filtered(self):
+        device = ip_lib.IPDevice('eth0')
+        self.assertEqual(
+            ['172.16.77.240/24'],
+            [a['cidr'] for a in device.addr.list(scope='global',
+                                                 filters=['permanent'])])
+        self.assertEqual(
+            ['2001:470:9:1224:5595:dd51:6ba2:e788/64'],
+            [a['cidr'] for a in device.addr.list(to='2001:470:9::/48')])
+        self.assertEqual([], device.addr.list(scope='link'))
+
+    def test_addr_list_unsupported_filter_runs_ip(self):
+        self.execute.return_value = ''
+        ip_lib.IPDevice('eth0').addr.list(filters=['label', 'eth0:1'])
+        self.execute.assert_called_once_with(
+            ['ip', 'addr', 'show', 'eth0', 'label', 'eth0:1'],
+            root_helper=None)
+
+    def test_get_gateway(self):
+        self.assertEqual({'gateway': '10.35.19.254', 'metric': 100},
+                         ip_lib.IPDevice('eth0').route.get_gateway())
+        self.assertIsNone(ip_lib.IPDevice('lo').route.get_gateway())
+        self.assertFalse(self.execute.called)
+
+    def test_netns_exists(self):
+        self.assertTrue(ip_lib.IPWrapper('sudo').netns.exists('ns'))
+        ip_lib.netlink.namespace_exists.assert_called_once_with('ns')
+        self.assertFalse(self.execute.called)
+
+    def test_netlink_error_runs_ip(self):
+        ip_lib.netlink.get_links.side_effect = ip_lib.netlink.NetlinkError()
+        self.execute.return_value = LINK_SAMPLE[1]
+        self.assertEqual(
+            'cc:dd:ee:ff:ab:cd',
+            ip_lib.IPDevice('eth0', 'sudo', 'ns').link.address)
+        self.execute.assert_called_once_with(
+            ['ip', 'netns', 'exec', 'ns', 'ip', '-o', 'link', 'show',
+             'eth0'], root_helper='sudo')
+
+    def test_disabled(self):
+        cfg.CONF.set_override('ip_lib_use_netlink', False)
+        self.execute.return_value = ''
+        ip_lib.IPWrapper().get_devices()
+        self.assertFalse(ip_lib.netlink.get_links.called)
+        self.assertTrue(self.execute.called)
+
+
 class TestDeviceExists(base.BaseTestCase):
     def test_device_exists(self):
         with mock.patch.object(ip_lib.IPDevice, '_execute') as _execute:
@@ -0,0 +1,206 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import errno
+import socket
+import struct
+
+import mock
+
+from neutron.agent.linux import netlink
+from neutron.tests import base
+
+
+def _attr(attr_type, data):
+    length = netlink.RTATTR.size + len(data)
+    padding = b'\0' * (netlink._align(length) - length)
+    return netlink.RTATTR.pack(length, attr_type) + data + padding
+
+
+def _message(msg_type, payload, seq):
+    return netlink.NLMSGHDR.pack(netlink.NLMSGHDR.size + len(payload),
+                                 msg_type, 2, seq, 0) + payload
+
+
+class FakeSocket(object):
+    """Answer a dump request with messages in two reads."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.reads = []
+        self.closed = False
+
+    def sendall(self, request):
+        seq = netlink.NLMSGHDR.unpack_from(request)[3]
+        self.request = request
+        data = b''.join(_message(msg_type, payload, seq)
+                        for msg_type, payload in self.messages)
+        self.reads = [data, _message(netlink.NLMSG_DONE, b'\0' * 4, seq)]
+
+    def recv(self, size):
+        return self.reads.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+class TestNetlinkDumps(base.BaseTestCase):
+    def setUp(self):
+        super(TestNetlinkDumps, self).setUp()
+        self.open_p = mock.patch.object(netlink, '_open_socket')
+        self.open_socket = self.open_p.start()
+        self.addCleanup(self.open_p.stop)
+
+    def _answer(self, messages):
+        sock = FakeSocket(messages)
+        self.open_socket.return_value = sock
+        return sock
+
+    def test_get_links(self):
+        payload = (netlink.IFINFOMSG.pack(0, 1, 4, 0x1043, 0) +
+                   _attr(netlink.IFLA_IFNAME, b'tap0\0') +
+                   _attr(netlink.IFLA_ADDRESS, b'\xfa\x16\x3e\x00\x00\x01') +
+                   _attr(netlink.IFLA_BROADCAST, b'\xff' * 6) +
+                   _attr(netlink.IFLA_MTU, struct.pack('I', 1500)) +
+                   _attr(netlink.IFLA_QDISC, b'pfifo_fast\0') +
+                   _attr(netlink.IFLA_OPERSTATE, b'\x06'))
+        sock = self._answer([(netlink.RTM_NEWLINK, payload)])
+
+        links = netlink.get_links('ns')
+
+        self.open_socket.assert_called_once_with('ns')
+        self.assertEqual(
+            netlink.RTM_GETLINK,
+            netlink.NLMSGHDR.unpack_from(sock.request)[1])
+        self.assertTrue(sock.closed)
+        self.assertEqual([{'index': 4,
+                           'name': 'tap0',
+                           'type': 1,
+                           'flags': 0x1043,
+                           'address': 'fa:16:3e:00:00:01',
+                           'broadcast': 'ff:ff:ff:ff:ff:ff',
+                           'mtu': 1500,
+                           'qdisc': 'pfifo_fast',
+                           'txqlen': None,
+                           'operstate': 'UP',
+                           'alias': None}], links)
+
+    def test_get_link(self):
+        payloads = [(netlink.RTM_NEWLINK,
+                     netlink.IFINFOMSG.pack(0, 1, index, 0, 0) +
+                     _attr(netlink.IFLA_IFNAME, name + b'\0'))
+                    for index, name in ((1, b'lo'), (2, b'eth0'))]
+        self._answer(payloads)
+        self.assertEqual(2, netlink.get_link('eth0')['index'])
+        self._answer(payloads)
+        self.assertIsNone(netlink.get_link('eth1'))
+
+    def test_get_addresses(self):
+        ipv4 = (netlink.IFADDRMSG.pack(socket.AF_INET, 24, 0x80, 0, 4) +
+                _attr(netlink.IFA_ADDRESS, socket.inet_aton('10.0.0.1')) +
+                _attr(netlink.IFA_LOCAL, socket.inet_aton('10.0.0.1')) +
+                _attr(netlink.IFA_BROADCAST, socket.inet_aton('10.0.0.255')))
+        ipv6 = (netlink.IFADDRMSG.pack(socket.AF_INET6, 64, 0x80, 253, 4) +
+                _attr(netlink.IFA_ADDRESS,
+                      socket.inet_pton(socket.AF_INET6, 'fe80::1')) +
+                _attr(netlink.IFA_FLAGS, struct.pack('I', 0)))
+        self._answer([(netlink.RTM_NEWADDR, ipv4),
+                      (netlink.RTM_NEWADDR, ipv6)])
+
+        self.assertEqual(
+            [{'index': 4, 'family': socket.AF_INET, 'address': '10.0.0.1',
+              'prefixlen': 24, 'broadcast': '10.0.0.255', 'scope': 'global',
+              'flags': 0x80},
+             {'index': 4, 'family': socket.AF_INET6, 'address': 'fe80::1',
+              'prefixlen': 64, 'broadcast': None, 'scope': 'link',
+              'flags': 0}],
+            netlink.get_addresses())
+
+    def test_get_routes(self):
+        default = (netlink.RTMSG.pack(socket.AF_INET, 0, 0, 0, 254, 4, 0, 1,
+                                      0) +
+                   _attr(netlink.RTA_GATEWAY, socket.inet_aton('10.0.0.254')) +
+                   _attr(netlink.RTA_OIF, struct.pack('I', 4)) +
+                   _attr(netlink.RTA_PRIORITY, struct.pack('I', 100)))
+        subnet = (netlink.RTMSG.pack(socket.AF_INET, 24, 0, 0, 254, 2, 253, 1,
+                                     0) +
+                  _attr(netlink.RTA_DST, socket.inet_aton('10.0.0.0')) +
+                  _attr(netlink.RTA_OIF, struct.pack('I', 4)))
+        self._answer([(netlink.RTM_NEWROUTE, default),
+                      (netlink.RTM_NEWROUTE, subnet)])
+
+        routes = netlink.get_routes()
+
+        self.assertEqual(
+            [{'table': 254, 'dst': None, 'dst_len': 0,
+              'gateway': '10.0.0.254', 'oif': 4, 'priority': 100,
+              'protocol': 4, 'scope': 'global', 'type': 1},
+             {'table': 254, 'dst': '10.0.0.0', 'dst_len': 24,
+              'gateway': None, 'oif': 4, 'priority': None,
+              'protocol': 2, 'scope': 'link', 'type': 1}],
+            routes)
+
+    def test_error_message(self):
+        sock = self._answer([])
+        sock.sendall = lambda request: setattr(sock, 'reads', [_message(
+            netlink.NLMSG_ERROR,
+            struct.pack('i', -errno.EINVAL) + request,
+            netlink.NLMSGHDR.unpack_from(request)[3])])
+        self.assertRaises(netlink.NetlinkError, netlink.get_links)
+        self.assertTrue(sock.closed)
+
+
+class TestNetlinkNamespaces(base.BaseTestCase):
+    def setUp(self):
+        super(TestNetlinkNamespaces, self).setUp()
+        self.addCleanup(setattr, netlink, '_setns_denied', False)
+        self.socket_p = mock.patch.object(netlink, '_new_socket')
+        self.new_socket = self.socket_p.start()
+        self.addCleanup(self.socket_p.stop)
+        self.os_p = mock.patch.object(netlink, 'os')
+        self.os = self.os_p.start()
+        self.os.open.side_effect = ['target', 'own']
+        self.os.path = mock.Mock()
+        self.addCleanup(self.os_p.stop)
+
+    def test_socket_in_namespace(self):
+        with mock.patch.object(netlink, '_setns') as setns:
+            sock = netlink._open_socket('ns')
+        self.assertEqual(self.new_socket.return_value, sock)
+        setns.assert_has_calls([mock.call('target'), mock.call('own')])
+        self.os.close.assert_has_calls([mock.call('own'),
+                                        mock.call('target')])
+
+    def test_setns_denied(self):
+        with mock.patch.object(netlink, '_setns') as setns:
+            setns.side_effect = OSError(errno.EPERM, 'denied')
+            self.assertRaises(netlink.NetlinkError,
+                              netlink._open_socket, 'ns')
+            self.assertRaises(netlink.NetlinkError,
+                              netlink._open_socket, 'ns2')
+        self.assertEqual(1, setns.call_count)
+        self.assertFalse(self.new_socket.called)
+
+    def test_missing_namespace(self):
+        self.os.open.side_effect = OSError(errno.ENOENT, 'missing')
+        self.assertRaises(netlink.NetlinkError, netlink._open_socket, 'ns')
+
+    def test_root_namespace(self):
+        with mock.patch.object(netlink, '_setns') as setns:
+            netlink._open_socket()
+        self.assertFalse(setns.called)
+        self.new_socket.assert_called_once_with()
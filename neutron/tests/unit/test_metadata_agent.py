@@ -38,6 +38,10 @@ class FakeConf(object):
     nova_metadata_ip = '9.9.9.9'
     nova_metadata_port = 8775
     metadata_proxy_shared_secret = 'secret'
+    metadata_cache_size = 16
+    metadata_cache_ttl = 5
+    nova_metadata_pool_size = 4
+    metadata_stats_interval = 0
 
 
 class TestMetadataProxyHandler(base.BaseTestCase):
@@ -182,6 +186,28 @@ class TestMetadataProxyHandler(base.BaseTestCase):
             self._get_instance_id_helper(headers, ports, networks=['the_id'])
         )
 
+    def test_get_instance_id_cached(self):
+        headers = {'X-Neutron-Network-ID': 'the_id',
+                   'X-Forwarded-For': '192.168.1.1'}
+        req = mock.Mock(headers=headers)
+        with mock.patch.object(self.handler, '_lookup_instance_id',
+                               return_value='device_id') as lookup:
+            self.assertEqual('device_id', self.handler._get_instance_id(req))
+            self.assertEqual('device_id', self.handler._get_instance_id(req))
+            self.assertEqual(1, lookup.call_count)
+        self.assertEqual(1, self.handler.stats['cache_hits'])
+        self.assertEqual(1, self.handler.stats['cache_misses'])
+
+    def test_get_instance_id_no_match_not_cached(self):
+        headers = {'X-Neutron-Network-ID': 'the_id',
+                   'X-Forwarded-For': '192.168.1.1'}
+        req = mock.Mock(headers=headers)
+        with mock.patch.object(self.handler, '_lookup_instance_id',
+                               return_value=None) as lookup:
+            self.assertIsNone(self.handler._get_instance_id(req))
+            self.assertIsNone(self.handler._get_instance_id(req))
+            self.assertEqual(2, lookup.call_count)
+
     def _proxy_request_test_helper(self, response_code=200, method='GET'):
         hdrs = {'X-Forwarded-For': '8.8.8.8'}
         body = 'body'
@@ -222,8 +248,18 @@ class TestMetadataProxyHandler(base.BaseTestCase):
                               webob.exc.HTTPForbidden)
 
     def test_proxy_request_404(self):
+        self.handler.instance_ids.set((None, '8.8.8.8'), 'the_id')
         self.assertIsInstance(self._proxy_request_test_helper(404),
                               webob.exc.HTTPNotFound)
+        self.assertIsNone(self.handler.instance_ids.get((None, '8.8.8.8')))
+
+    def test_proxy_request_reuses_http_client(self):
+        self._proxy_request_test_helper()
+        with mock.patch('httplib2.Http') as mock_http:
+            self.handler._proxy_request('the_id', mock.Mock(
+                path_info='/', query_string='', headers={}, body=''))
+            self.assertFalse(mock_http.called)
+        self.assertEqual(2, self.handler.stats['upstream_requests'])
 
     def test_proxy_request_409(self):
         self.assertIsInstance(self._proxy_request_test_helper(409),
@@ -237,6 +273,14 @@ class TestMetadataProxyHandler(base.BaseTestCase):
         with testtools.ExpectedException(Exception):
             self._proxy_request_test_helper(302)
 
+    def test_stats_logged(self):
+        self.handler.conf = mock.Mock(metadata_stats_interval=1)
+        self.handler._stats_logged = 0
+        self.handler._record_upstream_request(0.5)
+        self.assertEqual(1, self.log.info.call_count)
+        self.handler._record_upstream_request(0.5)
+        self.assertEqual(1, self.log.info.call_count)
+
     def test_sign_instance_id(self):
         self.assertEqual(
             self.handler._sign_instance_id('foo'),
@@ -244,6 +288,55 @@ class TestMetadataProxyHandler(base.BaseTestCase):
         )
 
 
+class TestInstanceIdCache(base.BaseTestCase):
+    def test_get_set(self):
+        cache = agent.InstanceIdCache(2, 5)
+        cache.set('k', 'v')
+        self.assertEqual('v', cache.get('k'))
+        self.assertIsNone(cache.get('other'))
+
+    def test_lru_eviction(self):
+        cache = agent.InstanceIdCache(2, 5)
+        cache.set('k1', 'v1')
+        cache.set('k2', 'v2')
+        cache.get('k1')
+        cache.set('k3', 'v3')
+        self.assertEqual('v1', cache.get('k1'))
+        self.assertIsNone(cache.get('k2'))
+        self.assertEqual('v3', cache.get('k3'))
+
+    def test_lru_eviction_after_many_uses(self):
+        cache = agent.InstanceIdCache(2, 5)
+        cache.set('k1', 'v1')
+        cache.set('k2', 'v2')
+        for i in range(10):
+            cache.get('k2')
+            cache.get('k1')
+        cache.set('k3', 'v3')
+        self.assertEqual('v1', cache.get('k1'))
+        self.assertIsNone(cache.get('k2'))
+        self.assertEqual('v3', cache.get('k3'))
+
+    def test_expiry(self):
+        cache = agent.InstanceIdCache(2, 5)
+        with mock.patch('time.time', return_value=100):
+            cache.set('k', 'v')
+        with mock.patch('time.time', return_value=106):
+            self.assertIsNone(cache.get('k'))
+
+    def test_disabled(self):
+        cache = agent.InstanceIdCache(0, 5)
+        cache.set('k', 'v')
+        self.assertIsNone(cache.get('k'))
+
+    def test_invalidate(self):
+        cache = agent.InstanceIdCache(2, 5)
+        cache.set('k', 'v')
+        cache.invalidate('k')
+        cache.invalidate('k')
+        self.assertIsNone(cache.get('k'))
+
+
 class TestUnixDomainHttpProtocol(base.BaseTestCase):
     def test_init_empty_client(self):
         u = agent.UnixDomainHttpProtocol(mock.Mock(), '', mock.Mock())
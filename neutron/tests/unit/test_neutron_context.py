@@ -16,6 +16,7 @@
 #    under the License.
 
 import mock
+from oslo.config import cfg
 
 from neutron import context
 from neutron.tests import base
@@ -70,3 +71,46 @@ class TestNeutronContext(base.BaseTestCase):
     def test_neutron_context_with_load_roles_false(self):
         ctx = context.get_admin_context(load_admin_roles=False)
         self.assertFalse(ctx.roles)
+
+
+class TestNeutronContextSlaveReads(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestNeutronContextSlaveReads, self).setUp()
+        self.master = mock.Mock(wrote_changes=False)
+        self.slave = mock.Mock()
+        self.get_session_p = mock.patch(
+            'neutron.db.api.get_session',
+            side_effect=lambda slave_session=False:
+            self.slave if slave_session else self.master)
+        self.get_session = self.get_session_p.start()
+        self.addCleanup(self.get_session_p.stop)
+        cfg.CONF.set_override('slave_connection', 'mysql://slave',
+                              'database')
+        self.addCleanup(cfg.CONF.clear_override, 'slave_connection',
+                        'database')
+        self.cxt = context.Context('user_id', 'tenant_id')
+
+    def test_session_in_block_is_slave(self):
+        with self.cxt.slave_reads('get_networks'):
+            self.assertEqual(self.slave, self.cxt.session)
+        self.assertEqual(self.master, self.cxt.session)
+
+    def test_slave_not_configured(self):
+        cfg.CONF.set_override('slave_connection', '', 'database')
+        with self.cxt.slave_reads('get_networks'):
+            self.assertEqual(self.master, self.cxt.session)
+
+    def test_master_used_after_writes(self):
+        self.cxt.session
+        with self.cxt.slave_reads('get_networks'):
+            self.assertEqual(self.slave, self.cxt.session)
+        self.master.wrote_changes = True
+        with self.cxt.slave_reads('get_networks'):
+            self.assertEqual(self.master, self.cxt.session)
+
+    def test_nested_blocks(self):
+        with self.cxt.slave_reads('sync_routers'):
+            with self.cxt.slave_reads('get_sync_data'):
+                pass
+            self.assertEqual(self.slave, self.cxt.session)
@@ -17,10 +17,12 @@
 
 import json
 import StringIO
+import time
 import urllib2
 
 import fixtures
 import mock
+from testtools import content
 
 import neutron
 from neutron.api.v2 import attributes
@@ -395,6 +397,55 @@ class NeutronPolicyTestCase(base.BaseTestCase):
         result = policy.enforce(self.context, action, target)
         self.assertTrue(result)
 
+    def test_depends_on_target(self):
+        self.rules['get_network:shared'] = common_policy.parse_rule(
+            'rule:admin_only or rule:regular_user')
+        self.assertFalse(policy.depends_on_target('get_network:shared'))
+        self.assertTrue(policy.depends_on_target('get_network'))
+
+    def test_depends_on_target_generic_check(self):
+        self.rules['get_network:name'] = common_policy.parse_rule(
+            'user_id:%(user_id)s or role:admin')
+        self.rules['get_network:status'] = common_policy.parse_rule(
+            'user_id:fake and not rule:missing')
+        self.assertTrue(policy.depends_on_target('get_network:name'))
+        self.assertFalse(policy.depends_on_target('get_network:status'))
+
+    def test_depends_on_target_non_existent_action_raises(self):
+        self.assertRaises(exceptions.PolicyRuleNotFound,
+                          policy.depends_on_target, 'get_network:fake')
+
+    def test_match_rule_cache(self):
+        target = {'tenant_id': 'fake', 'name': 'net1'}
+        rule = policy._prepare_check(self.context, 'create_network',
+                                     target)[0]
+        self.assertIs(rule, policy._prepare_check(
+            self.context, 'create_network', {'tenant_id': 'other'})[0])
+        shared_rule = policy._prepare_check(
+            self.context, 'create_network', dict(target, shared=True))[0]
+        self.assertIsNot(rule, shared_rule)
+        self.assertEqual(str(policy._build_match_rule(
+            'create_network', dict(target, shared=True))), str(shared_rule))
+
+    def test_check_many(self):
+        targets = [{'tenant_id': 'fake', 'shared': False},
+                   {'tenant_id': 'somebody_else', 'shared': True},
+                   {'tenant_id': 'somebody_else', 'shared': False}]
+        allowed = policy.check_many(self.context, 'get_network', targets)
+        self.assertEqual(targets[:2], allowed)
+        self.assertEqual(
+            [t for t in targets
+             if policy.check(self.context, 'get_network', t)], allowed)
+
+    def test_check_many_target_independent_rule(self):
+        self.rules['get_network'] = common_policy.parse_rule('role:user')
+        targets = [{'tenant_id': 'fake'}, {'tenant_id': 'somebody_else'}]
+        with mock.patch.object(common_policy, 'check',
+                               return_value=True) as check:
+            self.assertEqual(targets, policy.check_many(
+                self.context, 'get_network', targets))
+        self.assertEqual(1, check.call_count)
+
     def test_enforce_firewall_policy_shared(self):
         action = "get_firewall_policy"
         target = {'shared': True, 'tenant_id': 'somebody_else'}
@@ -548,3 +599,54 @@ class NeutronPolicyTestCase(base.BaseTestCase):
             {'extension:provider_network:set': 'rule:admin_only'},
             dict((policy, 'rule:admin_only') for policy in
                  expected_policies))
+
+
+class PolicyBenchmarkTestCase(base.BaseTestCase):
+    """Measure policy checks per second for list operations.
+
+    The figures are attached to the test result as details.
+    """
+
+    def setUp(self):
+        super(PolicyBenchmarkTestCase, self).setUp()
+        policy.reset()
+        self.addCleanup(policy.reset)
+        rules = dict((k, common_policy.parse_rule(v)) for k, v in {
+            "context_is_admin": "role:admin",
+            "admin_or_owner": ("rule:context_is_admin or "
+                               "tenant_id:%(tenant_id)s"),
+            "shared": "field:networks:shared=True",
+            "external": "field:networks:router:external=True",
+            "get_network": "rule:admin_or_owner or "
+                           "rule:shared or "
+                           "rule:external",
+        }.items())
+        init = mock.patch.object(
+            policy, 'init',
+            new=lambda: common_policy.set_rules(common_policy.Rules(rules)))
+        init.start()
+        self.addCleanup(init.stop)
+        self.context = context.Context('fake', 'fake', roles=['user'])
+
+    def _benchmark(self, ctx, name):
+        targets = [{'tenant_id': 'fake' if i % 2 else 'somebody_else',
+                    'shared': i % 3 == 0, 'router:external': False}
+                   for i in xrange(2000)]
+        start = time.time()
+        expected = [t for t in targets
+                    if policy.check(ctx, 'get_network', t)]
+        check_time = time.time() - start
+        start = time.time()
+        allowed = policy.check_many(ctx, 'get_network', targets)
+        check_many_time = time.time() - start
+        self.assertEqual(expected, allowed)
+        self.addDetail('%s_checks_per_second' % name, content.text_content(
+            'check: %d, check_many: %d' % (
+                len(targets) / max(check_time, 1e-6),
+                len(targets) / max(check_many_time, 1e-6))))
+
+    def test_tenant_context(self):
+        self._benchmark(self.context, 'tenant')
+
+    def test_admin_context(self):
+        self._benchmark(context.get_admin_context(), 'admin')
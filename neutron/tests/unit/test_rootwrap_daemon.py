@@ -0,0 +1,73 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import StringIO
+
+import mock
+
+from neutron.cmd import rootwrap_daemon
+from neutron.openstack.common.rootwrap import cmd
+from neutron.openstack.common.rootwrap import wrapper
+from neutron.tests import base
+
+
+class RootwrapDaemonTest(base.BaseTestCase):
+
+    def setUp(self):
+        super(RootwrapDaemonTest, self).setUp()
+        self.config = mock.Mock(exec_dirs=['/bin', '/usr/bin'],
+                                use_syslog=False)
+        self.filters = [wrapper.build_filter('CommandFilter', 'cat', 'root')]
+
+    def _run(self, request):
+        return rootwrap_daemon.run_command('rootwrap', self.config,
+                                           self.filters, request)
+
+    def test_run_command(self):
+        response = self._run({'cmd': ['cat'], 'process_input': u'\xff\n'})
+        self.assertEqual({'returncode': 0, 'stdout': u'\xff\n',
+                          'stderr': u''}, response)
+
+    def test_run_command_failure(self):
+        response = self._run({'cmd': ['cat', '/nonexistent']})
+        self.assertNotEqual(0, response['returncode'])
+        self.assertTrue(response['stderr'])
+
+    def test_run_command_unauthorized(self):
+        response = self._run({'cmd': ['rm', '-rf', '/']})
+        self.assertEqual(cmd.RC_UNAUTHORIZED, response['returncode'])
+        self.assertIn('Unauthorized command', response['stderr'])
+
+    def test_run_command_not_executable(self):
+        self.config.exec_dirs = ['/nonexistent']
+        self.filters = [wrapper.build_filter('CommandFilter', 'nonexistent',
+                                             'root')]
+        response = self._run({'cmd': ['nonexistent']})
+        self.assertEqual(cmd.RC_NOEXECFOUND, response['returncode'])
+
+    def test_serve_answers_each_request(self):
+        stdin = StringIO.StringIO(
+            json.dumps({'cmd': ['cat'], 'process_input': 'a'}) + '\n' +
+            json.dumps({'cmd': ['rm']}) + '\n')
+        stdout = StringIO.StringIO()
+        rootwrap_daemon.serve('rootwrap', self.config, self.filters,
+                              stdin, stdout)
+        responses = [json.loads(l) for l in stdout.getvalue().splitlines()]
+        self.assertEqual(2, len(responses))
+        self.assertEqual('a', responses[0]['stdout'])
+        self.assertEqual(cmd.RC_UNAUTHORIZED, responses[1]['returncode'])
@@ -16,6 +16,7 @@
 #    under the License.
 
 from contextlib import nested
+import sys
 
 import mock
 from mock import call
@@ -33,12 +34,24 @@ from neutron.db import securitygroups_rpc_base as sg_db_rpc
 from neutron.extensions import allowedaddresspairs as addr_pair
 from neutron.extensions import securitygroup as ext_sg
 from neutron.manager import NeutronManager
+from neutron.openstack.common.rpc import common as rpc_common
 from neutron.openstack.common.rpc import proxy
 from neutron.tests import base
 from neutron.tests.unit import test_extension_security_group as test_sg
 from neutron.tests.unit import test_iptables_firewall as test_fw
 
 
+def _remote_missing_method_error():
+    """Return the error an agent gets from a server without the RPC."""
+    try:
+        raise AttributeError("No such RPC function "
+                             "'security_group_info_for_devices'")
+    except AttributeError:
+        data = rpc_common.serialize_remote_exception(sys.exc_info(),
+                                                     log_failure=False)
+    return rpc_common.deserialize_remote_exception(cfg.CONF, data)
+
+
 class FakeSGCallback(sg_db_rpc.SecurityGroupServerRpcCallbackMixin):
     def get_port_from_device(self, device):
         device = self.devices.get(device)
@@ -285,6 +298,104 @@ class SGServerRpcCallBackMixinTestCase(test_sg.SecurityGroupDBTestCase):
                 self._delete('ports', port_id1)
                 self._delete('ports', port_id2)
 
+    def test_security_group_info_for_devices_ipv4_source_group(self):
+
+        with self.network() as n:
+            with nested(self.subnet(n),
+                        self.security_group(),
+                        self.security_group()) as (subnet_v4,
+                                                   sg1,
+                                                   sg2):
+                sg1_id = sg1['security_group']['id']
+                sg2_id = sg2['security_group']['id']
+                rule1 = self._build_security_group_rule(
+                    sg1_id,
+                    'ingress', const.PROTO_NAME_TCP, '24',
+                    '25', remote_group_id=sg2['security_group']['id'])
+                rules = {
+                    'security_group_rules': [rule1['security_group_rule']]}
+                res = self._create_security_group_rule(self.fmt, rules)
+                self.deserialize(self.fmt, res)
+                self.assertEqual(res.status_int, webob.exc.HTTPCreated.code)
+
+                res1 = self._create_port(
+                    self.fmt, n['network']['id'],
+                    security_groups=[sg1_id,
+                                     sg2_id])
+                ports_rest1 = self.deserialize(self.fmt, res1)
+                port_id1 = ports_rest1['port']['id']
+                self.rpc.devices = {port_id1: ports_rest1['port']}
+                devices = [port_id1, 'no_exist_device']
+
+                res2 = self._create_port(
+                    self.fmt, n['network']['id'],
+                    security_groups=[sg2_id])
+                ports_rest2 = self.deserialize(self.fmt, res2)
+                port_id2 = ports_rest2['port']['id']
+                ctx = context.get_admin_context()
+                info = self.rpc.security_group_info_for_devices(
+                    ctx, devices=devices)
+
+                self.assertEqual([port_id1], info['devices'].keys())
+                port_rpc = info['devices'][port_id1]
+                self.assertEqual([], port_rpc['security_group_rules'])
+                self.assertEqual([sg2_id],
+                                 port_rpc['security_group_source_groups'])
+                expected = [{'direction': 'egress', 'ethertype': const.IPv4,
+                             'security_group_id': sg1_id},
+                            {'direction': 'egress', 'ethertype': const.IPv6,
+                             'security_group_id': sg1_id},
+                            {'direction': u'ingress',
+                             'protocol': const.PROTO_NAME_TCP,
+                             'ethertype': const.IPv4,
+                             'port_range_max': 25, 'port_range_min': 24,
+                             'remote_group_id': sg2_id,
+                             'security_group_id': sg1_id}]
+                self.assertEqual(expected, info['security_groups'][sg1_id])
+                self.assertEqual(2, len(info['security_groups'][sg2_id]))
+                self.assertEqual(
+                    {sg2_id: {const.IPv4: ['10.0.0.2', '10.0.0.3'],
+                              const.IPv6: []}},
+                    info['sg_member_ips'])
+                self._delete('ports', port_id1)
+                self._delete('ports', port_id2)
+
+    def test_get_ports_with_security_groups(self):
+        with self.network() as n:
+            with nested(self.subnet(n),
+                        self.security_group()) as (subnet_v4, sg1):
+                sg1_id = sg1['security_group']['id']
+                ports = [self.deserialize(self.fmt, self._create_port(
+                    self.fmt, n['network']['id'],
+                    security_groups=[sg1_id]))['port'] for i in range(3)]
+                devices_by_port_id = dict((port['id'][:8], 'tap' + port['id'])
+                                          for port in ports)
+                devices_by_port_id['bad_id'] = 'tapbad_id'
+                # the four devices are looked up in two queries
+                with mock.patch.object(sg_db_rpc, 'MAX_PORTS_PER_QUERY', 2):
+                    result = sg_db_rpc.get_ports_with_security_groups(
+                        devices_by_port_id, prefix_match=True)
+                self.assertEqual(set(['tap' + port['id'] for port in ports]),
+                                 set(result))
+                for port in ports:
+                    port_rpc = result['tap' + port['id']]
+                    self.assertEqual(port['id'], port_rpc['id'])
+                    self.assertEqual([sg1_id], port_rpc['security_groups'])
+                    self.assertEqual([port['fixed_ips'][0]['ip_address']],
+                                     port_rpc['fixed_ips'])
+                # exact ids are looked up with IN
+                result = sg_db_rpc.get_ports_with_security_groups(
+                    {ports[0]['id'][:8]: 'd0', ports[1]['id']: 'd1'})
+                self.assertEqual(['d1'], result.keys())
+                for port in ports:
+                    self._delete('ports', port['id'])
+
+    def test_get_ports_from_devices_default(self):
+        self.rpc.devices = {'d1': {'id': 'p1', 'fixed_ips': []}}
+        ports = self.rpc.get_ports_from_devices(['d1', 'd2'])
+        self.assertEqual(['d1'], ports.keys())
+        self.assertEqual('p1', ports['d1']['id'])
+
     def test_security_group_rules_for_devices_ipv6_ingress(self):
         fake_prefix = test_fw.FAKE_PREFIX[const.IPv6]
         with self.network() as n:
@@ -564,6 +675,34 @@ class SecurityGroupAgentRpcTestCase(base.BaseTestCase):
         self.agent.security_groups_member_updated(['fake_sgid3', 'fake_sgid4'])
         self.agent.refresh_firewall.assert_has_calls([])
 
+    def _use_security_group_info(self):
+        self.agent.use_security_group_info = True
+        self.firewall.updates_members_in_place = True
+        info = {'devices': {'fake_device': self.fake_device},
+                'security_groups': {},
+                'sg_member_ips': {'fake_sgid2': {'IPv4': ['10.0.0.1'],
+                                                 'IPv6': []}}}
+        self.agent.plugin_rpc.security_group_info_for_devices.return_value = (
+            info)
+
+    def test_security_groups_member_updated_in_place(self):
+        self._use_security_group_info()
+        self.agent.security_groups_member_updated(['fake_sgid2'])
+        self.firewall.update_security_group_members.assert_called_once_with(
+            'fake_sgid2', {'IPv4': ['10.0.0.1'], 'IPv6': []})
+        self.assertFalse(self.firewall.update_port_filter.called)
+        self.assertFalse(self.firewall.defer_apply.called)
+
+    def test_security_groups_member_updated_in_place_fallback(self):
+        self._use_security_group_info()
+        rpc = self.agent.plugin_rpc
+        rpc.security_group_info_for_devices.side_effect = (
+            _remote_missing_method_error())
+        self.agent.security_groups_member_updated(['fake_sgid2'])
+        self.assertFalse(self.agent.use_security_group_info)
+        self.firewall.update_port_filter.assert_called_once_with(
+            self.fake_device)
+
     def test_security_groups_provider_updated(self):
         self.agent.refresh_firewall = mock.Mock()
         self.agent.security_groups_provider_updated()
@@ -1232,6 +1371,9 @@ class TestSecurityGroupAgentWithIptables(base.BaseTestCase):
 
         self.rpc = mock.Mock()
         self.agent.plugin_rpc = self.rpc
+        # a server without the security group information RPC
+        self.rpc.security_group_info_for_devices.side_effect = (
+            _remote_missing_method_error())
         rule1 = [{'direction': 'ingress',
                   'protocol': const.PROTO_NAME_UDP,
                   'ethertype': const.IPv4,
@@ -1364,6 +1506,76 @@ class TestSecurityGroupAgentWithIptables(base.BaseTestCase):
         self.mox.VerifyAll()
 
 
+class TestSecurityGroupAgentWithIptablesSGInfo(
+        TestSecurityGroupAgentWithIptables):
+    """Same scenarios, with the rules and members sent per group."""
+
+    def setUp(self):
+        super(TestSecurityGroupAgentWithIptablesSGInfo, self).setUp()
+        self.rpc.security_group_info_for_devices.side_effect = (
+            self._security_group_info_for_devices)
+
+    def _security_group_info_for_devices(self, context, device_ids):
+        """Convert the device fixtures into the compact format.
+
+        In the fixtures, the ingress rules from a member of
+        security_group1 are those with a source_ip_prefix but no
+        protocol.
+        """
+        devices = self.rpc.security_group_rules_for_devices.return_value
+        member_rule = {'direction': 'ingress',
+                       'ethertype': const.IPv4,
+                       'remote_group_id': 'security_group1'}
+        sg_rules = []
+        member_ips = []
+        compact_devices = {}
+        for device_id, device in sorted(devices.items()):
+            member_ips.extend(device['fixed_ips'])
+            provider_rules = []
+            for rule in device['security_group_rules']:
+                if 'source_port_range_min' in rule:
+                    provider_rules.append(rule)
+                    continue
+                if 'source_ip_prefix' in rule and 'protocol' not in rule:
+                    rule = member_rule
+                if rule not in sg_rules:
+                    sg_rules.append(rule)
+            compact_devices[device_id] = dict(
+                device, security_group_rules=provider_rules)
+        if member_rule not in sg_rules:
+            # a port alone in the group has no member to allow
+            sg_rules.append(member_rule)
+        return {'devices': compact_devices,
+                'security_groups': {'security_group1': sg_rules},
+                'sg_member_ips': {'security_group1': {
+                    const.IPv4: member_ips, const.IPv6: []}}}
+
+    def _regex(self, value):
+        # member rules are sent as cidrs by the server
+        for chain, ip in (('i_port1', '10.0.0.4'), ('i_port2', '10.0.0.3')):
+            value = value.replace('%s -s %s ' % (chain, ip),
+                                  '%s -s %s/32 ' % (chain, ip))
+        return super(TestSecurityGroupAgentWithIptablesSGInfo,
+                     self)._regex(value)
+
+    def test_expanded_rules_are_shared(self):
+        self.rpc.security_group_rules_for_devices.return_value = self.devices2
+        self.agent.firewall.iptables.execute = mock.Mock(return_value='')
+        self.agent.prepare_devices_filter(['tap_port1', 'tap_port2'])
+        firewall = self.agent.firewall
+        self.assertEqual(['security_group1'], firewall.sg_rules.keys())
+        with mock.patch.object(firewall, 'update_security_group_rules'):
+            with mock.patch.object(firewall, '_expand_sg_rules',
+                                   wraps=firewall._expand_sg_rules) as exp:
+                self.agent.refresh_firewall()
+                # once per port and direction, served from the cache
+                self.assertEqual(4, exp.call_count)
+        self.assertEqual(
+            set([('security_group1', 'ingress'),
+                 ('security_group1', 'egress')]),
+            set(firewall._expanded_sg_rules.keys()))
+
+
 class SGNotificationTestMixin():
     def test_security_group_rule_updated(self):
         name = 'webservers'
@@ -0,0 +1,82 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo.config import cfg
+
+from neutron.db import db_base_plugin_v2
+from neutron import service
+from neutron.tests import base
+
+
+class FakeRpcPlugin(db_base_plugin_v2.NeutronDbPluginV2):
+
+    def start_rpc_listener(self):
+        return [mock.Mock()]
+
+
+class TestServeRpc(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestServeRpc, self).setUp()
+        self.addCleanup(cfg.CONF.reset)
+        get_plugin_p = mock.patch(
+            'neutron.manager.NeutronManager.get_plugin')
+        self.get_plugin = get_plugin_p.start()
+        self.addCleanup(get_plugin_p.stop)
+        engine_p = mock.patch.object(service.db_api, 'get_engine')
+        self.get_engine = engine_p.start()
+        self.addCleanup(engine_p.stop)
+
+    def test_rpc_workers_supported(self):
+        self.assertTrue(FakeRpcPlugin().rpc_workers_supported())
+        self.assertFalse(
+            db_base_plugin_v2.NeutronDbPluginV2().rpc_workers_supported())
+
+    def test_serve_rpc_not_supported(self):
+        self.get_plugin.return_value = db_base_plugin_v2.NeutronDbPluginV2()
+        self.assertRaises(NotImplementedError, service.serve_rpc)
+
+    def test_serve_rpc_in_process(self):
+        plugin = FakeRpcPlugin()
+        self.get_plugin.return_value = plugin
+        with mock.patch.object(plugin, 'start_rpc_listener') as listener:
+            listener.return_value = [mock.Mock()]
+            rpc = service.serve_rpc()
+            listener.assert_called_once_with()
+            self.get_engine.return_value.pool.dispose.assert_called_once_with()
+            rpc.stop()
+            listener.return_value[0].close.assert_called_once_with()
+            # wait() returns once the worker is stopped
+            rpc.wait()
+
+    def test_serve_rpc_workers(self):
+        cfg.CONF.set_override('rpc_workers', 3)
+        self.get_plugin.return_value = FakeRpcPlugin()
+        with mock.patch('neutron.wsgi.WorkerLauncher') as launcher:
+            self.assertEqual(launcher.return_value, service.serve_rpc())
+            launcher.return_value.launch_service.assert_called_once_with(
+                mock.ANY, workers=3)
+
+    def test_serve_rpc_workers_shared_launcher(self):
+        cfg.CONF.set_override('rpc_workers', 2)
+        self.get_plugin.return_value = FakeRpcPlugin()
+        launcher = mock.Mock()
+        self.assertIsNone(service.serve_rpc(launcher))
+        worker = launcher.launch_service.call_args[0][0]
+        self.assertIsInstance(worker, service.RpcWorker)
+        launcher.launch_service.assert_called_once_with(worker, workers=2)
@@ -15,7 +15,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import os
+import signal
 import socket
 import urllib2
 
@@ -28,6 +30,7 @@ import webob.exc
 from neutron.api.v2 import attributes
 from neutron.common import constants
 from neutron.common import exceptions as exception
+from neutron.openstack.common import jsonutils
 from neutron.tests import base
 from neutron import wsgi
 
@@ -92,6 +95,60 @@ class TestWSGIServer(base.BaseTestCase):
                             mock_listen.return_value)
                     ])
 
+    def test_start_multiple_workers(self):
+        server = wsgi.Server("test_multiple_workers")
+        with mock.patch.object(wsgi, 'WorkerLauncher') as launcher:
+            server.start(None, 0, host="127.0.0.1", workers=2)
+            launcher.return_value.launch_service.assert_called_once_with(
+                mock.ANY, workers=2)
+            worker = launcher.return_value.launch_service.call_args[0][0]
+            self.assertIsInstance(worker, wsgi.WorkerService)
+
+            server.stop()
+            self.assertFalse(launcher.return_value.running)
+            server.wait()
+            launcher.return_value.wait.assert_called_once_with()
+
+    def test_worker_service(self):
+        server = mock.Mock()
+        with mock.patch.object(wsgi.api, 'get_engine') as get_engine:
+            worker = wsgi.WorkerService(server, 'app')
+            worker.start()
+            get_engine.return_value.pool.dispose.assert_called_once_with()
+        server.pool.spawn.assert_called_once_with(server._run, 'app',
+                                                  server._socket)
+        worker.stop()
+        server.pool.spawn.return_value.kill.assert_called_once_with()
+        server.pool.waitall.assert_called_once_with()
+
+    def test_worker_service_disposes_slave_engine(self):
+        cfg.CONF.set_override('slave_connection', 'sqlite://', 'database')
+        self.addCleanup(cfg.CONF.clear_override, 'slave_connection',
+                        'database')
+        with mock.patch.object(wsgi.api, 'get_engine') as get_engine:
+            wsgi.WorkerService(mock.Mock(), 'app').start()
+            get_engine.assert_has_calls([mock.call(),
+                                         mock.call(slave_engine=True)],
+                                        any_order=True)
+            dispose = get_engine.return_value.pool.dispose
+            self.assertEqual(2, dispose.call_count)
+
+    def test_worker_launcher_sighup_stops_children(self):
+        with contextlib.nested(
+            mock.patch('signal.signal'),
+            mock.patch('os.pipe', return_value=(1, 2)),
+            mock.patch('eventlet.greenio.GreenPipe'),
+            mock.patch('os.kill')
+        ) as (signal_signal, pipe, green_pipe, kill):
+            launcher = wsgi.WorkerLauncher()
+            signal_signal.assert_any_call(signal.SIGHUP,
+                                          launcher._handle_sighup)
+            launcher.children = {10: mock.Mock(), 11: mock.Mock()}
+            launcher._handle_sighup(signal.SIGHUP, None)
+            kill.assert_has_calls([mock.call(10, signal.SIGTERM),
+                                   mock.call(11, signal.SIGTERM)],
+                                  any_order=True)
+
     def test_app(self):
         greetings = 'Hello, World!!!'
 
@@ -588,6 +645,27 @@ class JSONDictSerializerTest(base.BaseTestCase):
 
         self.assertEqual(result, expected_json)
 
+    def test_json_with_generator(self):
+        networks = [{'id': i, 'name': u'\u7f51'} for i in range(5)]
+        input_dict = {'networks': (network for network in networks),
+                      'networks_links': [{'rel': 'next'}]}
+        serializer = wsgi.JSONDictSerializer()
+        serializer.chunk_items = 2
+        result = serializer.serialize(input_dict)
+
+        chunks = list(result)
+        self.assertEqual(jsonutils.loads(''.join(chunks)),
+                         {'networks': networks,
+                          'networks_links': [{'rel': 'next'}]})
+        self.assertEqual(1, sum('"id": 4' in chunk for chunk in chunks))
+        self.assertEqual(1, sum('"id": 0' in chunk and '"id": 1' in chunk
+                                for chunk in chunks))
+
+    def test_json_with_empty_generator(self):
+        serializer = wsgi.JSONDictSerializer()
+        result = serializer.serialize({'networks': (n for n in [])})
+        self.assertEqual('{"networks": []}', ''.join(result))
+
 
 class TextDeserializerTest(base.BaseTestCase):
 
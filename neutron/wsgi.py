@@ -22,10 +22,12 @@ from __future__ import print_function
 
 import errno
 import os
+import signal
 import socket
 import ssl
 import sys
 import time
+import types
 from xml.etree import ElementTree as etree
 from xml.parsers import expat
 
@@ -39,9 +41,11 @@ import webob.exc
 from neutron.common import constants
 from neutron.common import exceptions as exception
 from neutron import context
+from neutron.db import api
 from neutron.openstack.common import gettextutils
 from neutron.openstack.common import jsonutils
 from neutron.openstack.common import log as logging
+from neutron.openstack.common import service as common_service
 
 socket_opts = [
     cfg.IntOpt('backlog',
@@ -84,12 +88,64 @@ def run_server(application, port):
     eventlet.wsgi.server(sock, application)
 
 
+class WorkerService(object):
+    """Wraps the server of one API worker process for the ProcessLauncher."""
+
+    def __init__(self, service, application):
+        self._service = service
+        self._application = application
+        self._server = None
+
+    def start(self):
+        # We have just been forked from the parent process.  Drop the
+        # database connections inherited from it, so the worker does not
+        # share sockets with the parent or with its siblings.
+        api.dispose_connections()
+        self._server = self._service.pool.spawn(self._service._run,
+                                                self._application,
+                                                self._service._socket)
+
+    def wait(self):
+        self._service.pool.waitall()
+
+    def stop(self):
+        # Stop accepting connections, then let the requests in progress
+        # complete.  A second SIGTERM kills the worker right away.
+        if self._server is not None:
+            self._server.kill()
+            self._server = None
+            self._service.pool.waitall()
+
+
+class WorkerLauncher(common_service.ProcessLauncher):
+    """Launches the API workers and restarts them on SIGHUP."""
+
+    def __init__(self):
+        super(WorkerLauncher, self).__init__()
+        signal.signal(signal.SIGHUP, self._handle_sighup)
+
+    def _handle_sighup(self, signo, frame):
+        # The children are respawned by wait() once they have exited.
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError as exc:
+                if exc.errno != errno.ESRCH:
+                    raise
+
+    def _child_process(self, service):
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        super(WorkerLauncher, self)._child_process(service)
+
+
 class Server(object):
     """Server class to manage multiple WSGI sockets and applications."""
 
     def __init__(self, name, threads=1000):
         self.pool = eventlet.GreenPool(threads)
         self.name = name
+        self._launcher = None
+        self._server = None
 
     def _get_socket(self, host, port, backlog):
         bind_addr = (host, port)
@@ -168,8 +224,12 @@ class Server(object):
 
         return sock
 
-    def start(self, application, port, host='0.0.0.0'):
-        """Run a WSGI server with the given application."""
+    def start(self, application, port, host='0.0.0.0', workers=0):
+        """Run a WSGI server with the given application.
+
+        With workers > 0 the socket is bound once and shared by that number
+        of forked worker processes, which are supervised by this process.
+        """
         self._host = host
         self._port = port
         backlog = CONF.backlog
@@ -177,7 +237,13 @@ class Server(object):
         self._socket = self._get_socket(self._host,
                                         self._port,
                                         backlog=backlog)
-        self._server = self.pool.spawn(self._run, application, self._socket)
+        if workers < 1:
+            self._server = self.pool.spawn(self._run, application,
+                                           self._socket)
+        else:
+            self._launcher = WorkerLauncher()
+            self._server = WorkerService(self, application)
+            self._launcher.launch_service(self._server, workers=workers)
 
     @property
     def host(self):
@@ -187,13 +253,25 @@ class Server(object):
     def port(self):
         return self._socket.getsockname()[1] if self._socket else self._port
 
+    @property
+    def launcher(self):
+        """The launcher supervising the worker processes, if any."""
+        return self._launcher
+
     def stop(self):
-        self._server.kill()
+        if self._launcher:
+            # the parent process does not serve requests itself
+            self._launcher.running = False
+        else:
+            self._server.kill()
 
     def wait(self):
         """Wait until all servers have completed running."""
         try:
-            self.pool.waitall()
+            if self._launcher:
+                self._launcher.wait()
+            else:
+                self.pool.waitall()
         except KeyboardInterrupt:
             pass
 
@@ -344,13 +422,49 @@ class DictSerializer(ActionDispatcher):
 
 
 class JSONDictSerializer(DictSerializer):
-    """Default JSON request body serialization."""
+    """Default JSON request body serialization.
+
+    When values of the data are generators, the document is returned as
+    an iterator of chunks, and the generators are consumed one item at a
+    time, so that the items of a large collection are never all held in
+    memory.
+    """
+
+    # number of generator items serialized in a chunk
+    chunk_items = 100
 
     def default(self, data):
         def sanitizer(obj):
             return unicode(obj)
+        if isinstance(data, dict) and any(
+                isinstance(value, types.GeneratorType)
+                for value in data.itervalues()):
+            return self._iter_chunks(data, sanitizer)
         return jsonutils.dumps(data, default=sanitizer)
 
+    def _iter_chunks(self, data, sanitizer):
+        yield '{'
+        separator = ''
+        for key, value in data.iteritems():
+            prefix = '%s%s: ' % (separator, jsonutils.dumps(key))
+            separator = ', '
+            if not isinstance(value, types.GeneratorType):
+                yield prefix + jsonutils.dumps(value, default=sanitizer)
+                continue
+            yield prefix + '['
+            items = []
+            item_separator = ''
+            for item in value:
+                items.append(jsonutils.dumps(item, default=sanitizer))
+                if len(items) == self.chunk_items:
+                    yield item_separator + ', '.join(items)
+                    item_separator = ', '
+                    items = []
+            if items:
+                yield item_separator + ', '.join(items)
+            yield ']'
+        yield '}'
+
 
 class XMLDictSerializer(DictSerializer):
 
@@ -391,6 +505,8 @@ class XMLDictSerializer(DictSerializer):
                 root_key = (len(data) == 1 and
                             data.keys()[0] or constants.VIRTUAL_ROOT_KEY)
                 root_value = data.get(root_key, data)
+                if isinstance(root_value, types.GeneratorType):
+                    root_value = list(root_value)
             doc = etree.Element("_temp_root")
             used_prefixes = []
             self._to_xml_node(doc, self.metadata, root_key,
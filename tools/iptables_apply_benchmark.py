@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the cost of IptablesManager.apply() against the rule count.
+
+The iptables commands are not run; a fake executor hands back the last
+restored tables as iptables-save output, so the figures cover the work
+done by the agent and the amount of input fed to iptables-restore.
+
+    python tools/iptables_apply_benchmark.py [rules ...]
+"""
+
+import sys
+import time
+
+from neutron.agent.linux import iptables_manager
+
+RULES_PER_CHAIN = 20
+
+
+class FakeIptables(object):
+
+    def __init__(self):
+        self.saved = {}
+        self.restored_bytes = 0
+
+    def execute(self, args, process_input=None, root_helper=None):
+        cmd = args[0].split('-')[0]
+        if args[0].endswith('-save'):
+            return self.saved.get(cmd, '')
+        self.restored_bytes += len(process_input)
+        if '--noflush' not in args:
+            self.saved[cmd] = process_input
+        return ''
+
+
+def _populate(manager, rules):
+    for tables in (manager.ipv4, manager.ipv6):
+        table = tables['filter']
+        for chain_index in range(rules // RULES_PER_CHAIN):
+            chain = 'p%d' % chain_index
+            table.add_chain(chain)
+            table.add_rule('FORWARD', '-m physdev --physdev-out tap%d '
+                           '-j $%s' % (chain_index, chain))
+            for rule_index in range(RULES_PER_CHAIN):
+                table.add_rule(chain, '-s 10.%d.%d.0/24 -j RETURN' %
+                               (chain_index % 256, rule_index))
+
+
+def _time_update(manager, fake):
+    for tables in (manager.ipv4, manager.ipv6):
+        tables['filter'].add_rule('p0', '-s 192.168.0.1 -j RETURN')
+    fake.restored_bytes = 0
+    start = time.time()
+    manager.apply()
+    return time.time() - start, fake.restored_bytes
+
+
+def main(argv):
+    counts = [int(arg) for arg in argv[1:]] or [1000, 5000, 20000]
+    print('%8s %14s %14s %14s %14s' % ('rules', 'full (s)', 'full (bytes)',
+                                       'incr. (s)', 'incr. (bytes)'))
+    for rules in counts:
+        results = []
+        for incremental in (False, True):
+            fake = FakeIptables()
+            manager = iptables_manager.IptablesManager(
+                _execute=fake.execute, use_ipv6=True,
+                incremental=incremental)
+            _populate(manager, rules)
+            manager.apply()
+            results.extend(_time_update(manager, fake))
+        print('%8d %14.4f %14d %14.4f %14d' % tuple([rules] + results))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
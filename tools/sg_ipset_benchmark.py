@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack Foundation.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare remote group rules with and without ipsets.
+
+Ports are filtered by IptablesFirewallDriver with a security group that
+allows ingress from its own members.  The iptables and ipset commands are
+not run; a fake executor counts the rules fed to iptables-restore, so the
+figures cover the work done by the agent.
+
+    python tools/sg_ipset_benchmark.py [members ...]
+"""
+
+import sys
+import time
+
+from oslo.config import cfg
+
+from neutron.agent.common import config
+from neutron.agent.linux import iptables_firewall
+
+PORTS = 2
+SG_ID = 'd0ee0b4e-8ec6-4d9b-a1c5-5c0d1a7c1b54'
+
+
+class FakeExecutor(object):
+
+    def __init__(self):
+        self.saved = {}
+        self.rules = 0
+
+    def execute(self, args, process_input=None, root_helper=None):
+        cmd = args[0]
+        if cmd == 'ipset':
+            return ''
+        if cmd.endswith('-save'):
+            return self.saved.get(cmd.split('-')[0], '')
+        if '--noflush' not in args:
+            self.saved[cmd.split('-')[0]] = process_input
+        self.rules += process_input.count('\n-A ') + process_input.count(
+            '] -A ')
+        return ''
+
+
+def _member_ips(members):
+    return {'IPv4': ['10.%d.%d.%d' % (i >> 16 & 255, i >> 8 & 255, i & 255)
+                     for i in range(1, members + 1)],
+            'IPv6': []}
+
+
+def _ports():
+    return [{'device': 'tap%d' % i,
+             'mac_address': 'fa:16:3e:00:00:%02x' % i,
+             'fixed_ips': ['10.0.0.%d' % (i + 1)],
+             'security_groups': [SG_ID],
+             'security_group_rules': []} for i in range(PORTS)]
+
+
+def _run(members, enable_ipset):
+    cfg.CONF.set_override('enable_ipset', enable_ipset, 'SECURITYGROUP')
+    fake = FakeExecutor()
+    firewall = iptables_firewall.IptablesFirewallDriver()
+    firewall.iptables.execute = fake.execute
+    if enable_ipset:
+        firewall.ipset.execute = fake.execute
+    firewall.update_security_group_rules(
+        SG_ID, [{'direction': 'ingress', 'ethertype': 'IPv4',
+                 'remote_group_id': SG_ID, 'security_group_id': SG_ID}])
+
+    start = time.time()
+    with firewall.defer_apply():
+        firewall.update_security_group_members(SG_ID, _member_ips(members))
+        for port in _ports():
+            firewall.prepare_port_filter(port)
+    prepare_time = time.time() - start
+    rules = fake.rules
+
+    # one member leaves the group
+    fake.rules = 0
+    start = time.time()
+    if firewall.updates_members_in_place:
+        firewall.update_security_group_members(SG_ID,
+                                               _member_ips(members - 1))
+    else:
+        with firewall.defer_apply():
+            firewall.update_security_group_members(
+                SG_ID, _member_ips(members - 1))
+            for port in firewall.ports.values():
+                firewall.update_port_filter(port)
+    update_time = time.time() - start
+    return rules, prepare_time, update_time, fake.rules
+
+
+def main(argv):
+    config.register_root_helper(cfg.CONF)
+    counts = [int(arg) for arg in argv[1:]] or [1000, 5000, 10000]
+    print('%d ports in the remote group' % PORTS)
+    print('%8s %6s %10s %12s %12s %14s' % ('members', 'ipset', 'rules',
+                                           'prepare (s)', 'update (s)',
+                                           'update rules'))
+    for members in counts:
+        for enable_ipset in (False, True):
+            print('%8d %6s %10d %12.4f %12.4f %14d' % (
+                (members, enable_ipset) + _run(members, enable_ipset)))
+
+
+if __name__ == '__main__':
+    main(sys.argv)